@@ -10,6 +10,8 @@ from datetime import datetime
 
 from .routers import jd_router, resume_router, ranking_router, communication_router, chat_router
 from .models import HealthResponse
+from communication_agent.outbox import get_outbox
+from communication_agent.templating import get_template_store
 
 # Create FastAPI app
 app = FastAPI(
@@ -66,6 +68,19 @@ app.include_router(
 )
 
 
+# Background services
+@app.on_event("startup")
+async def start_background_services():
+    """Compile the email templates and resume sending emails left in the outbox by a previous process"""
+    get_template_store()
+    get_outbox()
+
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    """Let the outbox workers finish their current batch"""
+    get_outbox().stop()
+
 
 # Root endpoint
 @app.get("/", response_model=dict)
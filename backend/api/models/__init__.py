@@ -9,8 +9,15 @@ from .responses import (
     ResumeParseResponse,
     BatchResumeParseResponse,
     CandidateListItem,
+    ResumeSearchHit,
+    ResumeSearchResponse,
+    SimilarCandidate,
+    SimilarCandidatesResponse,
     RankingRequest,
     RankingResponse,
+    RankingPreviewRequest,
+    RankingPreviewCandidate,
+    RankingPreviewResponse,
     RankingListItem,
     CommunicationRequest,
     CommunicationResponse,
@@ -26,8 +33,15 @@ __all__ = [
     "ResumeParseResponse",
     "BatchResumeParseResponse",
     "CandidateListItem",
+    "ResumeSearchHit",
+    "ResumeSearchResponse",
+    "SimilarCandidate",
+    "SimilarCandidatesResponse",
     "RankingRequest",
     "RankingResponse",
+    "RankingPreviewRequest",
+    "RankingPreviewCandidate",
+    "RankingPreviewResponse",
     "RankingListItem",
     "CommunicationRequest",
     "CommunicationResponse",
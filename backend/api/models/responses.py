@@ -3,7 +3,7 @@ Pydantic response models for API endpoints
 """
 
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 
 
@@ -14,6 +14,11 @@ from datetime import datetime
 class JDParseRequest(BaseModel):
     """Request body for parsing job description"""
     jd_text: str = Field(description="Job description text to parse")
+    parse_mode: Literal["llm", "auto", "fast"] = Field(
+        default="llm",
+        description="llm = full LLM parse, auto = fast parse + LLM for low-confidence fields, "
+                    "fast = fast parse now, LLM refinement in the background"
+    )
 
 
 class JDParseResponse(BaseModel):
@@ -27,6 +32,8 @@ class JDParseResponse(BaseModel):
     mandatory_skills: List[str]
     good_to_have_skills: List[str]
     message: str
+    field_confidence: Optional[Dict[str, float]] = None
+    refinement_pending: bool = False
 
 
 class JDListItem(BaseModel):
@@ -49,6 +56,7 @@ class ResumeParseResponse(BaseModel):
     candidate_name: str
     candidate_email: str
     message: str
+    tokens: Optional[Dict[str, int]] = None  # Batch mode: prompt/output/total tokens attributed to this resume
 
 
 class BatchResumeParseResponse(BaseModel):
@@ -69,6 +77,36 @@ class CandidateListItem(BaseModel):
     location: str
 
 
+class ResumeSearchHit(BaseModel):
+    """Single ranked hit from resume full-text search"""
+    candidate_id: str
+    name: Optional[str] = None
+    target_job_title: Optional[str] = None
+    score: float
+    matched_terms: List[str]
+
+
+class ResumeSearchResponse(BaseModel):
+    """Response from resume full-text search"""
+    query: str
+    total_hits: int
+    took_ms: float
+    results: List[ResumeSearchHit]
+
+
+class SimilarCandidate(BaseModel):
+    """Candidate returned by semantic similarity search"""
+    candidate_id: str
+    similarity: float
+
+
+class SimilarCandidatesResponse(BaseModel):
+    """Response from similar candidates endpoint"""
+    candidate_id: str
+    took_ms: float
+    similar: List[SimilarCandidate]
+
+
 # ============================================================================
 # Ranking Models
 # ============================================================================
@@ -89,6 +127,57 @@ class RankingResponse(BaseModel):
     acceptable: int
     not_recommended: int
     message: str
+    retained_candidates: Optional[int] = Field(default=None, description="Candidates kept in shortlist mode (top_k/min_score)")
+    llm_reviews: Optional[int] = Field(default=None, description="Candidates reviewed by the LLM in hybrid mode")
+
+
+class RankingPreviewRequest(BaseModel):
+    """What-if ranking request - JD fields left out keep their stored values"""
+    jd_id: str = Field(description="Job description ID to preview against")
+    role_title: Optional[str] = Field(default=None, description="Override the title used to select candidates")
+    mandatory_skills: Optional[List[str]] = None
+    good_to_have_skills: Optional[List[str]] = None
+    experience_min: Optional[int] = Field(default=None, ge=0)
+    experience_max: Optional[int] = Field(default=None, ge=0)
+    location: Optional[str] = None
+    relocation_allowed: Optional[bool] = None
+    salary_min: Optional[int] = Field(default=None, ge=0)
+    salary_max: Optional[int] = Field(default=None, ge=0)
+    scoring_profile: Optional[str] = Field(default=None, description="Weight profile (defaults to the JD's profile)")
+    match_mode: Literal["exact", "fuzzy"] = "exact"
+    semantic_prefilter: bool = False
+    top_n: int = Field(default=10, ge=1, le=200, description="Number of candidates to return")
+
+
+class RankingPreviewCandidate(BaseModel):
+    """Candidate in a what-if ranking preview"""
+    rank: int
+    candidate_id: str
+    candidate_name: str
+    candidate_email: str
+    total_score: float
+    match_score: Dict[str, float]
+    recommendation: str
+    mandatory_matched: List[str]
+    mandatory_missing: List[str]
+    experience_years: float
+    experience_alignment: str
+    location_compatibility: str
+
+
+class RankingPreviewResponse(BaseModel):
+    """Response from the what-if ranking preview (nothing is saved)"""
+    jd_id: str
+    jd_title: str
+    scoring_profile: str
+    match_mode: str
+    total_indexed: int
+    pool_size: int
+    highly_recommended: int
+    recommended: int
+    not_recommended: int
+    took_ms: float
+    candidates: List[RankingPreviewCandidate]
 
 
 class RankingListItem(BaseModel):
@@ -117,6 +206,8 @@ class CommunicationResponse(BaseModel):
     job_title: str
     emails_sent: int
     emails_failed: int
+    emails_queued: int = 0
+    already_notified: int = 0
     message: str
 
 
@@ -127,6 +218,10 @@ class CommunicationListItem(BaseModel):
     job_title: str
     emails_sent: int
     sent_at: str
+    ranking_id: Optional[str] = None
+    emails_failed: int = 0
+    emails_bounced: int = 0
+    emails_queued: int = 0
 
 
 # ============================================================================
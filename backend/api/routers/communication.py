@@ -2,32 +2,68 @@
 Communication API Router
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pathlib import Path
-import json
-from typing import List
+import sys
+from typing import List, Literal, Optional
 
 from ..models import CommunicationRequest, CommunicationResponse, CommunicationListItem
 from ..utils import run_communication_agent
 
 router = APIRouter()
 
-# Path to data directory
-DATA_DIR = Path(__file__).parent.parent.parent / "data" / "communications"
+# Add parent directory to import agents
+parent_dir = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(parent_dir))
+
+from communication_agent.event_log import get_communication_log
+from communication_agent.outbox import get_outbox
+from communication_agent.pipeline import run_communication_pipeline
 
 
 @router.post("/send/{ranking_id}", response_model=CommunicationResponse)
-async def send_emails(ranking_id: str):
+async def send_emails(
+    ranking_id: str,
+    mode: Literal["direct", "agent"] = Query("direct", description="direct: select, render and send in code; agent: LLM tool loop (one model call per candidate)"),
+    personalize: bool = Query(False, description="Add an LLM-written paragraph per candidate (one batched call, direct mode only)"),
+    wait_seconds: float = Query(60, ge=0, le=600, description="Direct mode: wait up to this long for the first delivery attempt (0 = return once queued)")
+):
     """
     Send shortlist emails for a ranking
     
     **Input:** Ranking ID (e.g., RANK-JD-2025-002-TEST)
     
     **Output:** Email delivery status
+    
+    The default direct mode reads the ranking, selects top and acceptable
+    candidates and queues templated emails in the outbox without the LLM
+    (communication_agent/pipeline.py); `personalize=true` adds one batched LLM
+    call for personal paragraphs. Candidates already emailed for the ranking
+    are not emailed again, and failed sends are retried in the background.
+    
+    Only direct mode is idempotent: the agent's send tool bypasses the outbox,
+    so `mode=agent` is refused (409) for a ranking that already has emails
+    sent or queued, in either mode.
     """
     try:
-        # Run communication agent
-        result = await run_communication_agent(ranking_id)
+        if mode == "direct":
+            result = await run_communication_pipeline(ranking_id, personalize_emails=personalize, wait_seconds=wait_seconds)
+        else:
+            # The agent sends one email per tool call, outside the outbox - it cannot skip
+            # candidates who were already emailed, so refuse rankings that have emails
+            notified = [
+                campaign for campaign in get_communication_log().campaigns(ranking_id=ranking_id, limit=1000)
+                if campaign["sent"] or campaign["queued"] or campaign["deferred"]
+            ]
+            if notified:
+                raise HTTPException(
+                    status_code=409,
+                    detail=f"Ranking {ranking_id} already has shortlist emails ({notified[0]['communication_id']}); "
+                           f"use mode=direct, which only emails candidates not notified yet"
+                )
+            
+            # Run communication agent
+            result = await run_communication_agent(ranking_id)
         
         # Convert result to response model
         return CommunicationResponse(
@@ -37,9 +73,15 @@ async def send_emails(ranking_id: str):
             job_title=result.get("job_title"),
             emails_sent=result.get("total_sent", 0),
             emails_failed=result.get("total_failed", 0),
-            message=f"Sent {result.get('total_sent', 0)} emails successfully"
+            emails_queued=result.get("total_queued", 0),
+            already_notified=len(result.get("already_notified", [])),
+            message=result.get("summary") or f"Sent {result.get('total_sent', 0)} emails successfully"
         )
     
+    except HTTPException:
+        raise
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -48,33 +90,33 @@ async def send_emails(ranking_id: str):
 
 
 @router.get("/list", response_model=List[CommunicationListItem])
-async def list_communications():
+async def list_communications(
+    job_id: Optional[str] = Query(None, description="Only batches for this JD"),
+    ranking_id: Optional[str] = Query(None, description="Only batches for this ranking"),
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0)
+):
     """
-    Get all communication logs
+    Get communication logs, newest first
     
-    **Output:** List of all email communications
+    **Output:** One entry per email batch with its sent / failed / bounced /
+    queued counts (read from the communication event log index)
     """
     try:
-        communications = []
-        
-        if not DATA_DIR.exists():
-            return []
-        
-        for comm_file in DATA_DIR.glob("*.json"):
-            with open(comm_file, 'r', encoding='utf-8') as f:
-                comm_data = json.load(f)
-                communications.append(CommunicationListItem(
-                    communication_id=comm_data.get("communication_id"),
-                    job_id=comm_data.get("job_id"),
-                    job_title=comm_data.get("job_title"),
-                    emails_sent=len(comm_data.get("emails_sent", [])),
-                    sent_at=comm_data.get("logged_at", "")
-                ))
-        
-        # Sort by sent_at descending
-        communications.sort(key=lambda x: x.sent_at, reverse=True)
-        
-        return communications
+        return [
+            CommunicationListItem(
+                communication_id=campaign["communication_id"],
+                job_id=campaign["job_id"] or "",
+                job_title=campaign["job_title"] or "",
+                emails_sent=campaign["sent"],
+                sent_at=campaign["logged_at"] or "",
+                ranking_id=campaign["ranking_id"],
+                emails_failed=campaign["failed"],
+                emails_bounced=campaign["bounced"],
+                emails_queued=campaign["queued"]
+            )
+            for campaign in get_communication_log().campaigns(job_id, ranking_id, limit, offset)
+        ]
     
     except Exception as e:
         raise HTTPException(
@@ -83,26 +125,83 @@ async def list_communications():
         )
 
 
+@router.get("/candidate/{candidate_id}")
+async def get_candidate_communications(candidate_id: str):
+    """
+    Get the communication history of a candidate
+    
+    **Input:** Candidate ID (e.g., CAND-001)
+    
+    **Output:** All queued / sent / deferred / failed / bounced events, oldest first
+    """
+    try:
+        events = get_communication_log().candidate_history(candidate_id)
+        return {"candidate_id": candidate_id, "total": len(events), "events": events}
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get candidate communications: {str(e)}"
+        )
+
+
+@router.get("/outbox")
+async def outbox_stats():
+    """
+    Email outbox metrics
+    
+    **Output:** Queue depth, due and retrying emails, sent/failed totals,
+    retries, age of the oldest pending email and the send rate over the last minute
+    """
+    try:
+        return get_outbox().stats()
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get outbox stats: {str(e)}"
+        )
+
+
+@router.post("/outbox/retry-failed")
+async def retry_failed_emails(
+    ranking_id: Optional[str] = Query(None, description="Only retry the failed emails of this ranking")
+):
+    """
+    Re-queue emails that ran out of attempts
+    
+    **Output:** Number of emails re-queued
+    """
+    try:
+        requeued = get_outbox().requeue_failed(ranking_id)
+        return {"success": True, "requeued": requeued}
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to re-queue emails: {str(e)}"
+        )
+
+
 @router.get("/{communication_id}")
 async def get_communication(communication_id: str):
     """
     Get specific communication log by ID
     
-    **Input:** Communication ID (e.g., COMM-20260108-193000)
+    **Input:** Communication ID (e.g., COMM-20260108-193000-a1b2c3)
     
-    **Output:** Full communication data with all emails
+    **Output:** Full communication data with each email's current status
     """
     try:
-        comm_file = DATA_DIR / f"{communication_id}.json"
+        communication = get_communication_log().campaign(communication_id)
         
-        if not comm_file.exists():
+        if communication is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Communication log not found: {communication_id}"
             )
         
-        with open(comm_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return communication
     
     except HTTPException:
         raise
@@ -111,3 +210,31 @@ async def get_communication(communication_id: str):
             status_code=500,
             detail=f"Failed to get communication: {str(e)}"
         )
+
+
+@router.get("/{communication_id}/stats")
+async def get_communication_stats(communication_id: str):
+    """
+    Get delivery statistics of a communication batch
+    
+    **Output:** Recipients by status (sent, failed, bounced, retrying, queued),
+    delivery rate, event counts and first / last event time
+    """
+    try:
+        stats = get_communication_log().campaign_stats(communication_id)
+        
+        if stats is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"Communication log not found: {communication_id}"
+            )
+        
+        return stats
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get communication stats: {str(e)}"
+        )
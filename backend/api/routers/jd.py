@@ -2,15 +2,16 @@
 JD (Job Description) API Router with PDF support
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Query
 from pathlib import Path
 import json
-from typing import List
+from typing import Any, Dict, List, Literal, Tuple
 from PyPDF2 import PdfReader
 import io
 
 from ..models import JDParseRequest, JDParseResponse, JDListItem, ErrorResponse
 from ..utils import run_jd_parsing_agent
+from jd_parsing_agent.refinement import parse_jd_two_tier, refine_jd
 
 router = APIRouter()
 
@@ -33,6 +34,39 @@ def extract_text_from_pdf(file_content: bytes) -> str:
         raise ValueError(f"Failed to extract text from PDF: {str(e)}")
 
 
+async def _parse_jd_text(jd_text: str, parse_mode: str, background_tasks: BackgroundTasks) -> Tuple[Dict[str, Any], bool]:
+    """
+    Parses JD text in the requested mode
+
+    Returns:
+        (parsed JD document, whether LLM refinement is still running in the background)
+    """
+    if parse_mode == "llm":
+        return await run_jd_parsing_agent(jd_text), False
+    
+    result, pending = await parse_jd_two_tier(jd_text, mode=parse_mode)
+    if pending:
+        background_tasks.add_task(refine_jd, result["job_id"], jd_text)
+    return result, pending
+
+
+def _jd_response(result: Dict[str, Any], message: str, pending: bool) -> JDParseResponse:
+    """Convert a parsed JD document to the response model"""
+    return JDParseResponse(
+        success=True,
+        jd_id=result.get("job_id"),
+        role_title=result.get("role_title"),
+        experience_min=result.get("experience_min", 0),
+        experience_max=result.get("experience_max", 0),
+        location=result.get("location", "Unspecified"),
+        mandatory_skills=result.get("mandatory_skills", []),
+        good_to_have_skills=result.get("good_to_have_skills", []),
+        message=message,
+        field_confidence=result.get("parsing", {}).get("field_confidence"),
+        refinement_pending=pending
+    )
+
+
 @router.put("/{jd_id}")
 async def update_jd(jd_id: str, updates: dict):
     """
@@ -74,30 +108,22 @@ async def update_jd(jd_id: str, updates: dict):
 
 
 @router.post("/parse", response_model=JDParseResponse)
-async def parse_jd(request: JDParseRequest):
+async def parse_jd(request: JDParseRequest, background_tasks: BackgroundTasks):
     """
     Parse job description from text
     
-    **Input:** Job description text
+    **Input:** Job description text and parse mode (llm, auto or fast)
     
     **Output:** Structured JD data with skills, experience, location
+    (plus per-field confidence for the auto/fast modes)
     """
     try:
-        # Run JD parsing agent
-        result = await run_jd_parsing_agent(request.jd_text)
-        
-        # Convert result to response model
-        return JDParseResponse(
-            success=True,
-            jd_id=result.get("job_id"),
-            role_title=result.get("role_title"),
-            experience_min=result.get("experience_min", 0),
-            experience_max=result.get("experience_max", 0),
-            location=result.get("location", "Unspecified"),
-            mandatory_skills=result.get("mandatory_skills", []),
-            good_to_have_skills=result.get("good_to_have_skills", []),
-            message="Job description parsed successfully"
-        )
+        result, pending = await _parse_jd_text(request.jd_text, request.parse_mode, background_tasks)
+        
+        message = "Job description parsed successfully"
+        if pending:
+            message += " (refining low-confidence fields in the background)"
+        return _jd_response(result, message, pending)
     
     except Exception as e:
         raise HTTPException(
@@ -107,11 +133,15 @@ async def parse_jd(request: JDParseRequest):
 
 
 @router.post("/parse-file", response_model=JDParseResponse)
-async def parse_jd_file(file: UploadFile = File(...)):
+async def parse_jd_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    parse_mode: Literal["llm", "auto", "fast"] = Query("llm", description="auto = LLM only for low-confidence fields, fast = refine them in the background")
+):
     """
     Parse job description from uploaded file (PDF, TXT, DOCX)
     
-    **Input:** Uploaded file
+    **Input:** Uploaded file and parse mode (llm, auto or fast)
     
     **Output:** Structured JD data
     """
@@ -133,21 +163,12 @@ async def parse_jd_file(file: UploadFile = File(...)):
         if not jd_text.strip():
             raise HTTPException(status_code=400, detail="No text could be extracted from the file")
         
-        # Run JD parsing agent
-        result = await run_jd_parsing_agent(jd_text)
-        
-        # Convert result to response model
-        return JDParseResponse(
-            success=True,
-            jd_id=result.get("job_id"),
-            role_title=result.get("role_title"),
-            experience_min=result.get("experience_min", 0),
-            experience_max=result.get("experience_max", 0),
-            location=result.get("location", "Unspecified"),
-            mandatory_skills=result.get("mandatory_skills", []),
-            good_to_have_skills=result.get("good_to_have_skills", []),
-            message=f"Job description parsed successfully from {file.filename}"
-        )
+        result, pending = await _parse_jd_text(jd_text, parse_mode, background_tasks)
+        
+        message = f"Job description parsed successfully from {file.filename}"
+        if pending:
+            message += " (refining low-confidence fields in the background)"
+        return _jd_response(result, message, pending)
     
     except HTTPException:
         raise
@@ -2,35 +2,94 @@
 Ranking API Router
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from pathlib import Path
 import json
-from typing import List
+from typing import List, Literal, Optional
 from datetime import datetime
 
-from ..models import RankingRequest, RankingResponse, RankingListItem
-from ..utils.agent_runner import run_smart_ranking_agent  # Use smart ADK agent!
+from ..models import RankingRequest, RankingResponse, RankingListItem, RankingPreviewRequest, RankingPreviewResponse
+from ..utils.agent_runner import run_smart_ranking_agent
+from ..utils.ranking_preview import PREVIEW_OVERRIDE_FIELDS, preview_ranking
+from ranking_agent.scoring_profiles import get_profile_registry
+from ranking_agent.evaluation_cache import get_evaluation_cache
 
 router = APIRouter()
 
 # Path to data directory
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "rankings"
+JD_DIR = Path(__file__).parent.parent.parent / "data" / "parsed_jds"
 
 
 @router.post("/rank/{jd_id}", response_model=RankingResponse)
-async def rank_candidates(jd_id: str, force_rerank: bool = False):
+async def rank_candidates(
+    jd_id: str,
+    force_rerank: bool = False,
+    match_mode: Literal["exact", "fuzzy"] = "exact",
+    semantic_prefilter: bool = False,
+    top_k: Optional[int] = Query(None, ge=1, description="Keep only the K best candidates"),
+    min_score: Optional[float] = Query(None, ge=0, le=100, description="Keep only candidates scoring at least this"),
+    scoring_profile: Optional[str] = Query(None, description="Weight profile to rank with (defaults to the JD's profile)"),
+    compare_profiles: Optional[List[str]] = Query(None, description="Extra weight profiles scored in the same pass"),
+    mode: Literal["fast", "hybrid", "smart"] = Query(
+        "fast", description="hybrid = fast scores plus LLM reviews for top/borderline candidates; smart = LLM evaluates every matched candidate"
+    ),
+    refine_top_n: int = Query(5, ge=0, le=50, description="Hybrid: best candidates always reviewed by the LLM"),
+    borderline_band: float = Query(5.0, ge=0, le=50, description="Hybrid: points either side of a cut-off that count as borderline"),
+    max_llm_calls: int = Query(20, ge=0, le=100, description="Hybrid: upper bound on LLM calls")
+):
     """
     Rank all candidates for a specific job description
     
-    **Input:** JD ID (e.g., JD-2025-002), force_rerank (optional, default=False)
+    **Input:** JD ID (e.g., JD-2025-002), force_rerank (optional, default=False),
+    match_mode (optional, "exact" or "fuzzy" - fuzzy gives partial credit for related skills),
+    semantic_prefilter (optional - also include candidates with semantically similar titles/profiles),
+    top_k / min_score (optional - shortlist mode, only the retained candidates are scored in full and saved),
+    scoring_profile / compare_profiles (optional - weight profiles, see GET /api/ranking/profiles),
+    mode=hybrid (optional - the LLM reviews only the top refine_top_n candidates and those within
+    borderline_band points of a recommendation cut-off, at most max_llm_calls calls),
+    mode=smart (optional - the smart ranking agent evaluates every title-matched candidate with the LLM,
+    reusing cached evaluations; supports semantic_prefilter and scoring_profile only)
     
     **Output:** Ranked candidate list with scores
     
     **Note:** Returns most recent existing ranking by default. 
     Set force_rerank=True to generate a new ranking (takes 2-3 minutes).
+    Fuzzy matching, semantic prefilter, shortlist, scoring profile, hybrid
+    and smart requests always generate a new ranking.
     """
     try:
-        print(f"🔍 Ranking request for JD: {jd_id}, force_rerank={force_rerank}")
+        print(f"🔍 Ranking request for JD: {jd_id}, mode={mode}, force_rerank={force_rerank}, match_mode={match_mode}, top_k={top_k}, min_score={min_score}")
+        # Any non-default scoring option bypasses the cached latest ranking
+        custom_request = (
+            match_mode != "exact" or semantic_prefilter
+            or top_k is not None or min_score is not None or bool(scoring_profile) or bool(compare_profiles) or mode != "fast"
+        )
+        
+        # Validate profile names before doing any work
+        available_profiles = get_profile_registry().names()
+        unknown_profiles = [p for p in [scoring_profile, *(compare_profiles or [])] if p and p not in available_profiles]
+        if unknown_profiles:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown scoring profile(s): {', '.join(unknown_profiles)}. Available: {', '.join(available_profiles)}"
+            )
+        
+        if mode == "smart":
+            # The agent scores every matched candidate itself - no fuzzy credit, shortlist or profile comparison
+            unsupported = [
+                option for option, used in (
+                    ("match_mode=fuzzy", match_mode != "exact"),
+                    ("top_k", top_k is not None),
+                    ("min_score", min_score is not None),
+                    ("compare_profiles", bool(compare_profiles)),
+                ) if used
+            ]
+            if unsupported:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"mode=smart does not support: {', '.join(unsupported)}"
+                )
         
         # Ensure DATA_DIR exists
         DATA_DIR.mkdir(parents=True, exist_ok=True)
@@ -39,7 +98,7 @@ async def rank_candidates(jd_id: str, force_rerank: bool = False):
         ranking_files = list(DATA_DIR.glob(f"RANK-{jd_id}-*.json"))
         
         # If we have existing rankings and not forcing re-rank, use the latest one
-        if ranking_files and not force_rerank:
+        if ranking_files and not force_rerank and not custom_request:
             # Get most recent file
             latest_file = max(ranking_files, key=lambda p: p.stat().st_mtime)
             file_age_seconds = (datetime.now().timestamp() - latest_file.stat().st_mtime)
@@ -61,14 +120,49 @@ async def rank_candidates(jd_id: str, force_rerank: bool = False):
                 message=f"Returned existing ranking (created {int(file_age_seconds)}s ago)"
             )
         
-        # No existing ranking or forced re-rank - run fast ranking!
-        print(f"🚀 Running fast ranking (deterministic analysis with job title filtering)...")
-        
-        # Use fast deterministic ranking (no LLM, instant results!)
-        from api.utils.simple_ranking import fast_rank_candidates
-        result = fast_rank_candidates(jd_id)
-        
-        print(f"✅ Fast ranking completed!")
+        if mode == "hybrid":
+            # Fast scores for everyone, LLM reviews only for top and borderline candidates
+            print(f"🚀 Running hybrid ranking (deterministic scores + bounded LLM reviews)...")
+            from api.utils.hybrid_ranking import run_hybrid_ranking
+            result = await run_hybrid_ranking(
+                jd_id,
+                match_mode=match_mode,
+                semantic_prefilter=semantic_prefilter,
+                top_k=top_k,
+                min_score=min_score,
+                scoring_profile=scoring_profile,
+                compare_profiles=compare_profiles,
+                refine_top_n=refine_top_n,
+                borderline_band=borderline_band,
+                max_llm_calls=max_llm_calls
+            )
+            print(f"✅ Hybrid ranking completed!")
+        elif mode == "smart":
+            # Every matched candidate is evaluated by the smart ranking agent (cached evaluations reused)
+            print(f"🤖 Running smart ranking agent...")
+            await run_smart_ranking_agent(
+                jd_id,
+                semantic_prefilter=semantic_prefilter,
+                scoring_profile=scoring_profile
+            )
+            print(f"✅ Smart ranking completed!")
+        else:
+            # No existing ranking or forced re-rank - run fast ranking!
+            print(f"🚀 Running fast ranking (deterministic analysis with job title filtering)...")
+            
+            # Use fast deterministic ranking (no LLM, instant results!)
+            from api.utils.simple_ranking import fast_rank_candidates
+            result = fast_rank_candidates(
+                jd_id,
+                match_mode=match_mode,
+                semantic_prefilter=semantic_prefilter,
+                top_k=top_k,
+                min_score=min_score,
+                scoring_profile=scoring_profile,
+                compare_profiles=compare_profiles
+            )
+            
+            print(f"✅ Fast ranking completed!")
         
         # Find the newly created ranking file
         ranking_files = list(DATA_DIR.glob(f"RANK-{jd_id}-*.json"))
@@ -93,9 +187,13 @@ async def rank_candidates(jd_id: str, force_rerank: bool = False):
             top_candidates=len(result.get("top_candidates", [])),
             acceptable=len(result.get("acceptable_candidates", [])),
             not_recommended=len(result.get("not_recommended", [])),
-            message=f"AI-powered ranking completed. Ranking ID: {result.get('ranking_id')}"
+            message=f"AI-powered ranking completed. Ranking ID: {result.get('ranking_id')}",
+            retained_candidates=result.get("aggregate_counts", {}).get("retained"),
+            llm_reviews=result.get("refinement", {}).get("refined")
         )
     
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         error_trace = traceback.format_exc()
@@ -107,6 +205,97 @@ async def rank_candidates(jd_id: str, force_rerank: bool = False):
         )
 
 
+@router.post("/preview", response_model=RankingPreviewResponse)
+async def preview_rank(request: RankingPreviewRequest):
+    """
+    What-if ranking with overridden JD requirements
+    
+    **Input:** JD ID plus any of role_title, mandatory_skills, good_to_have_skills,
+    experience_min/max, location, relocation_allowed, salary_min/max to override,
+    and scoring_profile, match_mode, semantic_prefilter, top_n
+    
+    **Output:** Top N candidates with scores and recommendation counts for the whole pool
+    
+    **Note:** Scores an in-memory candidate feature matrix - no resumes are re-read
+    and nothing is saved. Use POST /rank/{jd_id} to persist a ranking.
+    """
+    try:
+        jd_file = JD_DIR / f"{request.jd_id}.json"
+        if not jd_file.exists():
+            raise HTTPException(status_code=404, detail=f"JD not found: {request.jd_id}")
+        
+        available_profiles = get_profile_registry().names()
+        if request.scoring_profile and request.scoring_profile not in available_profiles:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown scoring profile: {request.scoring_profile}. Available: {', '.join(available_profiles)}"
+            )
+        
+        with open(jd_file, 'r', encoding='utf-8') as f:
+            jd_data = json.load(f)
+        
+        result = preview_ranking(
+            jd_data,
+            overrides=request.model_dump(include=set(PREVIEW_OVERRIDE_FIELDS), exclude_none=True),
+            top_n=request.top_n,
+            match_mode=request.match_mode,
+            scoring_profile=request.scoring_profile,
+            semantic_prefilter=request.semantic_prefilter
+        )
+        result["jd_id"] = request.jd_id
+        
+        print(f"🔮 Preview for {request.jd_id}: {result['pool_size']} candidates scored in {result['took_ms']}ms")
+        return RankingPreviewResponse(**result)
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to preview ranking: {str(e)}"
+        )
+
+
+@router.get("/profiles")
+async def list_scoring_profiles():
+    """
+    Get available scoring profiles
+    
+    **Output:** Compiled weights and recommendation cut-offs per profile, and the
+    default profile for each JD profile_type
+    """
+    try:
+        registry = get_profile_registry()
+        return {
+            "profiles": [registry.get(name).to_dict() for name in registry.names()],
+            "profile_types": registry.profile_types
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to list scoring profiles: {str(e)}"
+        )
+
+
+@router.get("/evaluation-cache")
+async def evaluation_cache_stats():
+    """
+    Get smart ranking evaluation cache statistics
+    
+    **Output:** Cached (candidate, JD) evaluations, size, limits and lifetime
+    hit/miss/store/eviction counts
+    """
+    try:
+        return get_evaluation_cache().stats()
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get evaluation cache stats: {str(e)}"
+        )
+
+
 @router.get("/list", response_model=List[RankingListItem])
 async def list_rankings():
     """
@@ -2,7 +2,8 @@
 Resume API Router
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, HTTPException, UploadFile, File, Query
 from pathlib import Path
 import json
 import subprocess
@@ -13,10 +14,18 @@ from google.genai import types
 import sys
 import PyPDF2
 
-from ..models import ResumeParseResponse, BatchResumeParseResponse, CandidateListItem
+from ..models import ResumeParseResponse, BatchResumeParseResponse, CandidateListItem, ResumeSearchResponse, SimilarCandidatesResponse
+from ..utils.ranking_preview import invalidate_feature_matrix
+from ..utils.sharded_ranking import invalidate_feature_file
 
 router = APIRouter()
 
+
+def _invalidate_ranking_features():
+    """Parsed resumes changed - ranking previews and sharded ranking must rebuild their features"""
+    invalidate_feature_matrix()
+    invalidate_feature_file()
+
 # Path to data directory
 DATA_DIR = Path(__file__).parent.parent.parent / "data" / "parsed_resumes"
 RESUME_DIR = Path(__file__).parent.parent.parent / "data" / "resumes"
@@ -26,6 +35,14 @@ parent_dir = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(parent_dir))
 
 from resume_parsing_agent import root_agent as resume_agent
+from resume_parsing_agent.batch_parsing import parse_resumes
+from resume_parsing_agent.enrichment import enrich_resumes, save_fast_resume
+from resume_parsing_agent.deferred_verification import verify_and_merge, verify_in_background
+from resume_parsing_agent.github_analyzer import get_repo_cache
+from resume_parsing_agent.profile_cache import get_profile_cache
+from resume_parsing_agent.rate_limiter import get_rate_limiter
+from shared.resume_search import search_resumes
+from shared.semantic_index import find_similar_candidates
 
 
 def extract_text_from_pdf(pdf_path: Path) -> str:
@@ -43,7 +60,11 @@ def extract_text_from_pdf(pdf_path: Path) -> str:
 
 @router.post("/upload", response_model=List[ResumeParseResponse])
 async def upload_resumes(
-    files: List[UploadFile] = File(..., description="Upload up to 5 PDF resumes")
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="Upload up to 5 PDF resumes"),
+    batch: bool = Query(False, description="Pack the resumes into shared LLM requests under a token budget (reports tokens per resume)"),
+    fast: bool = Query(False, description="Save a deterministic record immediately and run the LLM evaluation in the background"),
+    verify_profiles: bool = Query(False, description="Verify GitHub/LeetCode/Stack Overflow links in the background after saving and adjust the score")
 ):
     """
     Upload and parse up to 5 resume PDFs
@@ -52,6 +73,21 @@ async def upload_resumes(
     
     **Output:** Parsed candidate data for each resume
     
+    **Batch mode:** With `batch=true` several resumes are parsed per LLM request
+    (see resume_parsing_agent/batch_parsing.py); resumes whose batch entry fails
+    validation are re-parsed individually.
+    
+    **Fast mode:** With `fast=true` contact details, links, skills and experience
+    are extracted locally (resume_parsing_agent/fast_extractor.py) and saved in
+    milliseconds, so candidates are rankable right away. The full LLM evaluation
+    runs after the response and enriches the same candidate record.
+    
+    **Profile verification:** With `verify_profiles=true` the candidates' GitHub,
+    LeetCode and Stack Overflow links are checked after the response is sent
+    (after the LLM evaluation in fast mode); verified data replaces
+    external_profiles and the external profile score / final score are adjusted
+    (see resume_parsing_agent/deferred_verification.py).
+    
     **Note:** In Swagger UI, click "Add string item" multiple times to upload multiple files.
     Alternatively, use the "Try it out" feature and manually add multiple file inputs.
     """
@@ -74,6 +110,8 @@ async def upload_resumes(
     RESUME_DIR.mkdir(parents=True, exist_ok=True)
     
     results = []
+    batch_inputs = []
+    enrichment_inputs = []
     
     for file in files:
         try:
@@ -89,6 +127,23 @@ async def upload_resumes(
             if not resume_text or len(resume_text) < 50:
                 raise ValueError(f"PDF appears to be empty or unreadable: {file.filename}")
             
+            if fast:
+                document = save_fast_resume(resume_text)
+                candidate_info = document.get("candidate_info", {})
+                enrichment_inputs.append((document["candidate_id"], resume_text))
+                results.append(ResumeParseResponse(
+                    success=True,
+                    candidate_id=document["candidate_id"],
+                    candidate_name=candidate_info.get("name", "Unknown"),
+                    candidate_email=candidate_info.get("email", ""),
+                    message=f"Resume saved from fast extraction: {file.filename} (LLM evaluation queued)"
+                ))
+                continue
+            
+            if batch:
+                batch_inputs.append((file.filename, resume_text))
+                continue
+            
             # Parse resume using agent with ACTUAL TEXT CONTENT
             session_service = InMemorySessionService()
             session = await session_service.create_session(
@@ -131,10 +186,11 @@ async def upload_resumes(
             # Extract candidate info from the nested structure
             candidate_info = parsed_resume.get("candidate_info", {})
             evaluation = parsed_resume.get("evaluation", {})
+            candidate_id = parsed_resume.get("candidate_id") or session.state.get("candidate_id", "")
             
             results.append(ResumeParseResponse(
                 success=True,
-                candidate_id=parsed_resume.get("candidate_id", ""),
+                candidate_id=candidate_id,
                 candidate_name=candidate_info.get("name", "Unknown"),
                 candidate_email=candidate_info.get("email", ""),
                 message=f"Resume parsed successfully: {file.filename} (Score: {evaluation.get('final_score', 0)}/100)"
@@ -149,9 +205,50 @@ async def upload_resumes(
                 message=f"Failed to parse {file.filename}: {str(e)}"
             ))
     
+    if batch_inputs:
+        for parsed in await parse_resumes(batch_inputs):
+            if parsed["success"]:
+                message = f"Resume parsed successfully: {parsed['resume']} (Score: {parsed['final_score']}/100, {parsed['mode']})"
+            else:
+                message = f"Failed to parse {parsed['resume']}: {parsed['error']}"
+            results.append(ResumeParseResponse(
+                success=parsed["success"],
+                candidate_id=parsed["candidate_id"],
+                candidate_name=parsed["candidate_name"],
+                candidate_email=parsed["candidate_email"],
+                message=message,
+                tokens=parsed["tokens"]
+            ))
+    
+    # New parsed resumes - ranking features must be rebuilt
+    if any(r.success for r in results):
+        _invalidate_ranking_features()
+    
+    if enrichment_inputs:
+        background_tasks.add_task(_enrich_in_background, enrichment_inputs, verify_profiles)
+    elif verify_profiles:
+        verify_ids = [r.candidate_id for r in results if r.success and r.candidate_id]
+        if verify_ids:
+            background_tasks.add_task(_verify_in_background, verify_ids)
+    
     return results
 
 
+async def _enrich_in_background(items, verify_profiles: bool = False):
+    """LLM evaluation of fast-path records after the upload response is sent"""
+    await enrich_resumes(items)
+    _invalidate_ranking_features()
+    # Verified profiles must be merged into the enriched record, not the fast one
+    if verify_profiles:
+        await _verify_in_background([candidate_id for candidate_id, _ in items])
+
+
+async def _verify_in_background(candidate_ids):
+    """Profile verification of saved candidates after the upload response is sent"""
+    await verify_in_background(candidate_ids)
+    _invalidate_ranking_features()
+
+
 @router.post("/batch", response_model=BatchResumeParseResponse)
 async def batch_parse_resumes():
     """
@@ -172,6 +269,8 @@ async def batch_parse_resumes():
         if result.returncode != 0:
             raise Exception(f"Batch processing failed: {result.stderr}")
         
+        _invalidate_ranking_features()
+        
         # Count processed candidates
         candidate_ids = []
         if DATA_DIR.exists():
@@ -219,6 +318,121 @@ async def list_candidates():
         )
 
 
+@router.get("/search", response_model=ResumeSearchResponse)
+async def search_candidates(
+    q: str = Query(..., min_length=1, description="Free-text query, e.g. 'kubernetes terraform aws'"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results")
+):
+    """
+    Full-text search over parsed resumes (BM25)
+    
+    **Input:** Query text matched against summary, work experience, projects and skills
+    
+    **Output:** Candidates ranked by relevance
+    
+    **Note:** The on-disk index is refreshed incrementally when new resumes are parsed.
+    """
+    try:
+        return ResumeSearchResponse(**search_resumes(q, limit=limit))
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to search candidates: {str(e)}"
+        )
+
+
+@router.get("/profile-cache")
+async def profile_cache_stats():
+    """
+    Get external profile cache statistics
+    
+    **Output:** Cached GitHub/LeetCode/Stack Overflow responses per platform, TTL
+    settings and lifetime hit/stale/miss/304/refresh counts, plus the number of
+    GitHub repositories with cached language bytes
+    """
+    try:
+        return {**get_profile_cache().stats(), "github_repos": get_repo_cache().stats()["repos"]}
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get profile cache stats: {str(e)}"
+        )
+
+
+@router.get("/profile-rate-limits")
+async def profile_rate_limit_stats():
+    """
+    Get external profile API rate limiter state
+    
+    **Output:** Per host: current pace, queue depth, in-flight requests, average/max
+    wait, throttled responses, retries and the last reported quota
+    """
+    try:
+        return get_rate_limiter().stats()
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to get rate limiter stats: {str(e)}"
+        )
+
+
+@router.post("/{candidate_id}/verify-profiles")
+async def verify_candidate_profiles(candidate_id: str):
+    """
+    Verify a candidate's external profile links now
+    
+    **Input:** Candidate ID
+    
+    **Output:** Verification block - platforms checked/accessible, errors and the
+    evaluation delta (external profile score and final score before/after)
+    """
+    try:
+        outcome = await asyncio.get_running_loop().run_in_executor(None, verify_and_merge, candidate_id)
+        if outcome["status"] == "not_found":
+            raise HTTPException(status_code=404, detail=f"Candidate not found: {candidate_id}")
+        if outcome["status"] == "verified":
+            _invalidate_ranking_features()
+        return {"candidate_id": candidate_id, **outcome}
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to verify profiles: {str(e)}"
+        )
+
+
+@router.get("/{candidate_id}/similar", response_model=SimilarCandidatesResponse)
+async def get_similar_candidates(
+    candidate_id: str,
+    limit: int = Query(5, ge=1, le=50, description="Number of similar candidates")
+):
+    """
+    Find candidates with similar profiles (semantic nearest neighbours)
+    
+    **Input:** Candidate ID (e.g., CAND-20260111-120916)
+    
+    **Output:** Most similar candidates by title, skills and summary
+    """
+    try:
+        return SimilarCandidatesResponse(**find_similar_candidates(candidate_id, limit=limit))
+    
+    except KeyError:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Candidate not found: {candidate_id}"
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to find similar candidates: {str(e)}"
+        )
+
+
 @router.get("/{candidate_id}")
 async def get_candidate(candidate_id: str):
     """
@@ -7,9 +7,11 @@ from pathlib import Path
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
 from google.genai import types
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime
+import asyncio
 import json
+import os
 
 # Add parent directory to Python path to import agents
 parent_dir = Path(__file__).parent.parent.parent
@@ -19,6 +21,15 @@ sys.path.insert(0, str(parent_dir))
 from jd_parsing_agent import root_agent as jd_agent
 from ranking_agent.smart_agent import root_agent as smart_ranking_agent
 from communication_agent import root_agent as comm_agent
+from shared.semantic_index import semantic_title_matches
+from shared.title_index import get_title_index, load_matching_candidates
+from ranking_agent.scoring_profiles import get_scoring_profile
+from ranking_agent.evaluation_cache import content_digest, get_evaluation_cache, instruction_version, pair_key
+from ranking_agent.output_decoding import decode_ranked_candidates
+from .simple_ranking import calculate_fit_scores, extract_jd_requirements
+
+# Concurrent single-candidate re-requests after a partially failed ranking batch
+RANKING_RETRY_CONCURRENCY = int(os.getenv("RANKING_RETRY_CONCURRENCY", "4"))
 
 
 # ============================================================================
@@ -97,12 +108,19 @@ async def run_jd_parsing_agent(jd_text: str) -> Dict[str, Any]:
 # Smart Ranking Agent Runner (NEW!)
 # ============================================================================
 
-async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
+async def run_smart_ranking_agent(
+    jd_id: str,
+    semantic_prefilter: bool = False,
+    scoring_profile: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Run smart ranking agent with pre-parsed data
     
     Args:
         jd_id: Job description ID to rank candidates for
+        semantic_prefilter: Also admit candidates whose profile is semantically
+            close to the JD, not only substring title matches
+        scoring_profile: Weight profile name overriding the JD's default
         
     Returns:
         Ranking data
@@ -118,42 +136,29 @@ async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
         with open(jd_path, 'r', encoding='utf-8') as f:
             jd_data = json.load(f)
         
-        # Load all parsed resumes
+        profile = get_scoring_profile(jd_data, scoring_profile)
+        
+        # Check parsed resumes exist
         resumes_dir = Path(__file__).parent.parent.parent / "data" / "parsed_resumes"
         print(f"📂 Looking for resumes in: {resumes_dir}")
-        
+
         if not resumes_dir.exists():
             raise ValueError(f"No parsed resumes directory found at: {resumes_dir}")
-        
-        candidate_files = list(resumes_dir.glob("CAND-*.json"))
-        if not candidate_files:
-            raise ValueError(f"No candidate resumes found in: {resumes_dir}")
-        
-        candidates_data = []
-        for candidate_file in candidate_files:
-            with open(candidate_file, 'r', encoding='utf-8') as f:
-                candidates_data.append(json.load(f))
-        
+
         print(f"✅ Loaded JD: {jd_id} - {jd_data.get('role_title', jd_data.get('job_title', 'Unknown'))}")
-        print(f"✅ Loaded {len(candidates_data)} candidate resumes")
-        
-        # FILTER CANDIDATES BY JOB TITLE MATCH
+
+        # FILTER CANDIDATES BY JOB TITLE MATCH (index lookup - only matched resumes are loaded)
         jd_role = jd_data.get("role_title", jd_data.get("job_title", "")).lower().strip()
-        
-        filtered_candidates = []
-        for candidate in candidates_data:
-            candidate_target = candidate.get("candidate_info", {}).get("target_job_title", "").lower().strip()
-            
-            # Simple matching: if JD role contains candidate target or vice versa
-            if jd_role and candidate_target and (jd_role in candidate_target or candidate_target in jd_role):
-                filtered_candidates.append(candidate)
-                print(f"  ✓ Matched: {candidate.get('candidate_name', 'Unknown')} ({candidate_target}) for {jd_role}")
-            else:
-                print(f"  ✗ Skipped: {candidate.get('candidate_name', 'Unknown')} ({candidate_target}) - doesn't match {jd_role}")
-        
+        semantic_matches = semantic_title_matches(jd_data) if semantic_prefilter else {}
+        filtered_candidates, total_indexed = load_matching_candidates(jd_role, semantic_matches)
+
+        if not total_indexed:
+            raise ValueError(f"No candidate resumes found in: {resumes_dir}")
+
         if not filtered_candidates:
+            available_titles = get_title_index().titles()
             print(f"⚠️ No candidates matched job title: {jd_role}")
-            print(f"Available candidates: {[c.get('candidate_info', {}).get('target_job_title', 'N/A') for c in candidates_data]}")
+            print(f"Available candidates: {available_titles}")
             
             # Save empty ranking with clear message
             ranking_id = f"RANK-{jd_id}-{int(datetime.now().timestamp())}"
@@ -173,7 +178,7 @@ async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
                 "top_candidates": [],
                 "acceptable_candidates": [],
                 "not_recommended": [],
-                "summary": f"No candidates matched the job title: {jd_data.get('role_title', jd_data.get('job_title', 'Unknown'))}. Available candidate titles: {', '.join([c.get('candidate_info', {}).get('target_job_title', 'N/A') for c in candidates_data])}"
+                "summary": f"No candidates matched the job title: {jd_data.get('role_title', jd_data.get('job_title', 'Unknown'))}. Available candidate titles: {', '.join(available_titles)}"
             }
             
             # Save to file
@@ -188,89 +193,64 @@ async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
             
             return {"status": "completed", "ranking_id": ranking_id}
         
-        print(f"📊 Filtered to {len(filtered_candidates)} matching candidates (from {len(candidates_data)} total)")
-        
-        # Create session with pre-loaded data in state
-        session_service = InMemorySessionService()
-        session = await session_service.create_session(user_id="api_user", app_name="ranking")
+        print(f"📊 Filtered to {len(filtered_candidates)} matching candidates (from {total_indexed} total)")
         
-        # Inject parsed data into session state (as Python objects, not JSON strings)
-        session.state["jd_data"] = jd_data
-        session.state["candidates_data"] = filtered_candidates  # Only pass filtered candidates
-        session.state["jd_id"] = jd_id
-        session.state["jd_title"] = jd_data.get("role_title", jd_data.get("job_title", "Unknown"))
+        # Location/salary points are computed here in batch - the agent copies them
+        jd_requirements = extract_jd_requirements(jd_data)
+        filtered_candidates = [
+            {**candidate, "fit_scores": _fit_scores(candidate, jd_requirements, profile)}
+            for candidate in filtered_candidates
+        ]
         
         # Handle location field safely
         jd_location = jd_data.get("location", "Unknown")
         if isinstance(jd_location, dict):
             jd_location = jd_location.get("location_type", "Unknown")
-        session.state["jd_location"] = jd_location
-        
-        print(f"📝 Injected data into session state")
         
-        # Create runner
-        runner = Runner(
-            agent=smart_ranking_agent,
-            session_service=session_service,
-            app_name="ranking"
-        )
-        
-        # Simple message to trigger the agent
-        message = types.Content(
-            role="user",
-            parts=[types.Part.from_text(text=f"Rank all candidates for job {jd_id}")]
+        # Reuse cached evaluations of unchanged (candidate, JD, instruction) pairs
+        cache = get_evaluation_cache()
+        version = instruction_version(smart_ranking_agent.model, smart_ranking_agent.instruction)
+        jd_digest = content_digest({
+            "role_title": jd_data.get("role_title", jd_data.get("job_title", "")),
+            "requirements": {k: v for k, v in jd_requirements.items() if k != "location_matcher"},
+            "scoring_rules": profile.scoring_rules(),
+            "recommendation_rules": profile.recommendation_rules(),
+        })
+        pair_keys = {
+            candidate.get("candidate_id", ""): pair_key(content_digest(candidate), jd_digest, version)
+            for candidate in filtered_candidates
+        }
+        cached = cache.get_many(pair_keys.values())
+        reused = [cached[key] for key in pair_keys.values() if key in cached]
+        pending = [c for c in filtered_candidates if pair_keys[c.get("candidate_id", "")] not in cached]
+        print(f"♻️ Evaluation cache: {len(reused)} reused, {len(pending)} to evaluate with the LLM")
+        
+        evaluated, failed = [], {}
+        if pending:
+            evaluated, failed = await _evaluate_candidates_with_llm(jd_id, jd_data, jd_location, pending, profile)
+            if not evaluated and not reused:
+                raise ValueError("Agent completed but produced no valid ranking output")
+            cache.put_many(
+                (pair_keys[entry["candidate_id"]], entry["candidate_id"], jd_id, version, entry)
+                for entry in evaluated
+                if entry.get("candidate_id") in pair_keys
+            )
+        
+        # Merge reused and fresh evaluations and re-number ranks
+        ranked_list = sorted(
+            reused + evaluated, key=lambda c: c.get("match_score", {}).get("total_score", 0), reverse=True
         )
-        
-        # Run agent (single LLM call!)
-        print(f"🚀 Running smart ranking agent (AI-powered analysis)...")
-        events = list(runner.run(
-            new_message=message,
-            user_id="api_user",
-            session_id=session.id
-        ))
-        
-        print(f"✅ Agent execution completed, processed {len(events)} events")
-        
-        # Get ranking output from session state (agent saves with output_key)
-        ranking_output = session.state.get("ranking_output")
-        
-        if not ranking_output:
-            print(f"⚠️  No ranking output in session state!")
-            print(f"📊 Session state keys: {list(session.state.keys())}")
-            # Try to get from the last event
-            for event in reversed(events):
-                if hasattr(event, 'content') and event.content:
-                    for part in event.content.parts:
-                        if hasattr(part, 'text') and part.text:
-                            try:
-                                import json as json_lib
-                                ranking_output = json_lib.loads(part.text)
-                                print(f"✅ Found ranking in event text")
-                                break
-                            except:
-                                pass
-                if ranking_output:
-                    break
-        
-        if not ranking_output:
-            raise ValueError("Agent completed but produced no ranking output")
-        
-        # Convert Pydantic to dict if needed
-        if hasattr(ranking_output, 'model_dump'):
-            ranking_data = ranking_output.model_dump()
-        elif hasattr(ranking_output, 'dict'):
-            ranking_data = ranking_output.dict()
-        else:
-            ranking_data = ranking_output
+        for i, entry in enumerate(ranked_list):
+            entry["rank"] = i + 1
         
         # Save ranking to file
         ranking_id = f"RANK-{jd_id}-{int(datetime.now().timestamp())}"
         
-        # Categorize candidates
-        ranked_list = ranking_data.get("ranked_candidates", [])
-        top_candidates = [c["candidate_id"] for c in ranked_list if c["match_score"]["total_score"] >= 70]
-        acceptable = [c["candidate_id"] for c in ranked_list if 50 <= c["match_score"]["total_score"] < 70]
-        not_recommended = [c["candidate_id"] for c in ranked_list if c["match_score"]["total_score"] < 50]
+        # Categorize candidates (cut-offs from the scoring profile)
+        categories = profile.categorize(ranked_list)
+        top_candidates = categories["top_candidates"]
+        acceptable = categories["acceptable_candidates"]
+        not_recommended = categories["not_recommended"]
         
         document = {
             "ranking_id": ranking_id,
@@ -278,12 +258,15 @@ async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
             "jd_id": jd_id,
             "jd_title": jd_data.get("job_title", "Unknown"),
             "jd_location": jd_location,
+            "scoring_profile": profile.name,
             "total_candidates_evaluated": len(ranked_list),
+            "evaluation_cache": {"reused": len(reused), "evaluated": len(evaluated)},
+            "failed_candidates": failed,
             "ranked_candidates": ranked_list,
             "top_candidates": top_candidates,
             "acceptable_candidates": acceptable,
             "not_recommended": not_recommended,
-            "summary": f"{len(ranked_list)} candidates evaluated. {len(top_candidates)} highly recommended, {len(acceptable)} acceptable, {len(not_recommended)} not recommended."
+            "summary": f"{len(ranked_list)} candidates evaluated ({len(reused)} reused from cache{f', {len(failed)} could not be ranked' if failed else ''}). {len(top_candidates)} highly recommended, {len(acceptable)} acceptable, {len(not_recommended)} not recommended."
         }
         
         # Save to file
@@ -306,6 +289,130 @@ async def run_smart_ranking_agent(jd_id: str) -> Dict[str, Any]:
         raise
 
 
+async def _evaluate_candidates_with_llm(
+    jd_id: str,
+    jd_data: Dict[str, Any],
+    jd_location: str,
+    candidates: List[Dict[str, Any]],
+    profile
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Runs the smart ranking agent on the given candidates
+    
+    All candidates go out in one LLM call. The output is decoded per candidate
+    (see ranking_agent.output_decoding); candidates whose entry is missing,
+    truncated or fails validation are re-requested one at a time, concurrently,
+    instead of rerunning the whole batch.
+    
+    Returns:
+        (ranked candidate entries, candidate_id -> error for candidates that
+        still failed after the individual retry)
+    """
+    session_service = InMemorySessionService()
+    runner = Runner(
+        agent=smart_ranking_agent,
+        session_service=session_service,
+        app_name="ranking"
+    )
+    
+    # Session state shared by the batch call and the per-candidate retries
+    base_state = {
+        "jd_data": jd_data,
+        "jd_id": jd_id,
+        "jd_title": jd_data.get("role_title", jd_data.get("job_title", "Unknown")),
+        # Scoring weights and cut-offs rendered into the agent instruction
+        "scoring_profile": profile.name,
+        "scoring_rules": profile.scoring_rules(),
+        "recommendation_rules": profile.recommendation_rules(),
+        "jd_location": jd_location,
+    }
+    
+    # Run agent (single LLM call for the whole batch)
+    print(f"🚀 Running smart ranking agent on {len(candidates)} candidates (AI-powered analysis)...")
+    candidate_ids = [c.get("candidate_id", "") for c in candidates]
+    try:
+        raw_output = await _run_ranking_call(runner, session_service, base_state, candidates, jd_id)
+    except Exception as e:
+        print(f"⚠️ Batch ranking call failed: {e}")
+        raw_output = None
+    evaluated, failed = decode_ranked_candidates(raw_output, candidate_ids)
+    print(f"✅ Decoded {len(evaluated)} of {len(candidates)} candidates from the batch output")
+    
+    if not failed:
+        return evaluated, {}
+    
+    # Re-request only the candidates without a valid entry
+    by_id = {c.get("candidate_id", ""): c for c in candidates}
+    retry_ids = list(failed)
+    print(f"🔁 Re-requesting {len(retry_ids)} candidates individually (concurrency {RANKING_RETRY_CONCURRENCY})...")
+    semaphore = asyncio.Semaphore(max(1, RANKING_RETRY_CONCURRENCY))
+    
+    async def retry(candidate_id: str):
+        async with semaphore:
+            raw = await _run_ranking_call(runner, session_service, base_state, [by_id[candidate_id]], jd_id)
+        return decode_ranked_candidates(raw, [candidate_id])
+    
+    results = await asyncio.gather(*(retry(cid) for cid in retry_ids), return_exceptions=True)
+    still_failed: Dict[str, str] = {}
+    for candidate_id, result in zip(retry_ids, results):
+        if isinstance(result, BaseException):
+            still_failed[candidate_id] = f"retry failed: {result}"
+            continue
+        valid, errors = result
+        if valid:
+            evaluated.extend(valid)
+        else:
+            still_failed[candidate_id] = f"retry failed: {errors.get(candidate_id, 'no output')}"
+    
+    for candidate_id, error in still_failed.items():
+        print(f"⚠️ Could not rank {candidate_id}: {error} (first attempt: {failed[candidate_id]})")
+    print(f"✅ Retries recovered {len(retry_ids) - len(still_failed)} of {len(retry_ids)} candidates")
+    return evaluated, still_failed
+
+
+async def _run_ranking_call(
+    runner: Runner,
+    session_service: InMemorySessionService,
+    base_state: Dict[str, Any],
+    candidates: List[Dict[str, Any]],
+    jd_id: str
+) -> Any:
+    """One smart ranking agent call; returns the raw output saved under output_key"""
+    session = await session_service.create_session(
+        user_id="api_user",
+        app_name="ranking",
+        state={**base_state, "candidates_data": candidates}
+    )
+    message = types.Content(
+        role="user",
+        parts=[types.Part.from_text(text=f"Rank all candidates for job {jd_id}")]
+    )
+    
+    final_text = None
+    async for event in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+        if event.content and event.content.parts:
+            text = "".join(part.text for part in event.content.parts if getattr(part, "text", None))
+            if text:
+                final_text = text
+    
+    session = await session_service.get_session(app_name="ranking", user_id="api_user", session_id=session.id)
+    ranking_output = session.state.get("ranking_output") if session else None
+    # Fall back to the last text the model produced if nothing was saved to state
+    return ranking_output if ranking_output else final_text
+
+
+def _fit_scores(candidate: Dict[str, Any], jd_requirements: Dict[str, Any], profile) -> Dict[str, Any]:
+    """Precomputed location and salary points for the smart ranking agent"""
+    location_match, salary_match = calculate_fit_scores(candidate, jd_requirements)
+    scores = profile.component_scores(0, 0, "Perfect Match", location_match["fit"], salary_match["fit"])
+    return {
+        "location_score": scores["location_score"],
+        "location_compatibility": location_match["compatibility"],
+        "salary_score": scores["salary_score"],
+        "salary_alignment": salary_match["alignment"],
+    }
+
+
 # ============================================================================
 # Communication Agent Runner
 # ============================================================================
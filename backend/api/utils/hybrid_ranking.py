@@ -0,0 +1,273 @@
+"""
+Hybrid ranking - deterministic scores for every candidate, LLM review for a bounded few
+
+build_fast_ranking() scores the whole pool. Only the top N candidates and the
+candidates sitting close to the scoring profile's recommendation cut-offs
+(where a human would look twice) are sent to the candidate review agent, one
+call per candidate, run concurrently. The reviews replace the templated
+justification and add red/green flags; scores, order and categories stay
+deterministic, so the saved document has the same schema as any other ranking.
+"""
+
+import asyncio
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from ranking_agent.refinement_agent import CandidateReview, build_assessment, build_candidate_profile, candidate_review_agent
+from ranking_agent.scoring_profiles import ScoringProfile, get_scoring_profile
+from shared.resume_search import RESUMES_DIR
+from .simple_ranking import build_fast_ranking, extract_jd_requirements, save_ranking
+
+
+# Concurrent review calls (Gemini requests in flight)
+REFINEMENT_CONCURRENCY = int(os.getenv("RANKING_REFINEMENT_CONCURRENCY", "4"))
+REFINEMENT_TIMEOUT_SECONDS = float(os.getenv("RANKING_REFINEMENT_TIMEOUT", "60"))
+
+DEFAULT_REFINE_TOP_N = 5
+DEFAULT_BORDERLINE_BAND = 5.0  # Points either side of a recommendation cut-off
+DEFAULT_MAX_LLM_CALLS = 20
+
+APP_NAME = "ranking_review"
+
+
+# ============================================================================
+# Candidate Selection
+# ============================================================================
+
+def select_for_refinement(
+    ranked_candidates: List[Dict[str, Any]],
+    profile: ScoringProfile,
+    top_n: int = DEFAULT_REFINE_TOP_N,
+    band: float = DEFAULT_BORDERLINE_BAND,
+    max_calls: int = DEFAULT_MAX_LLM_CALLS
+) -> Dict[str, str]:
+    """
+    Picks the candidates worth an LLM review.
+
+    The top N come first, then candidates within `band` points of the
+    "Highly Recommended" or "Recommended" cut-off, closest first, until
+    max_calls is reached.
+
+    Args:
+        ranked_candidates: Ranked entries sorted by total score
+        profile: Scoring profile the ranking was scored with
+        top_n: Number of best candidates to always review
+        band: Distance in points from a cut-off that counts as borderline
+        max_calls: Upper bound on reviews (LLM calls) for the ranking
+
+    Returns:
+        candidate_id -> reason for the review (used in the prompt)
+    """
+    selected: Dict[str, str] = {}
+    for entry in ranked_candidates[:min(top_n, max_calls)]:
+        selected[entry["candidate_id"]] = f"in the top {top_n} of the ranking"
+
+    cut_offs = (
+        (profile.highly_recommended, "Highly Recommended"),
+        (profile.recommended, "Recommended"),
+    )
+    borderline: List[Tuple[float, int, str, str]] = []
+    for position, entry in enumerate(ranked_candidates):
+        if entry["candidate_id"] in selected:
+            continue
+        total_score = entry["match_score"]["total_score"]
+        distance, cut_off, label = min((abs(total_score - c), c, l) for c, l in cut_offs)
+        if distance <= band:
+            if distance == 0:
+                reason = f"exactly on the {cut_off:g}-point \"{label}\" cut-off"
+            else:
+                side = "above" if total_score > cut_off else "below"
+                reason = f"{distance:g} points {side} the {cut_off:g}-point \"{label}\" cut-off"
+            borderline.append((distance, position, entry["candidate_id"], reason))
+
+    borderline.sort(key=lambda b: b[:2])
+    for _, _, candidate_id, reason in borderline:
+        if len(selected) >= max_calls:
+            break
+        selected[candidate_id] = reason
+    return selected
+
+
+# ============================================================================
+# Concurrent Reviews
+# ============================================================================
+
+def _jd_summary(jd_data: Dict[str, Any]) -> str:
+    requirements = extract_jd_requirements(jd_data)
+    return json.dumps({
+        "mandatory_skills": requirements["mandatory_skills"],
+        "good_to_have_skills": requirements["good_to_have_skills"],
+        "experience": f"{requirements['experience_min']}-{requirements['experience_max']} years",
+        "location": requirements["location"],
+        "relocation_allowed": requirements["relocation_allowed"],
+    }, ensure_ascii=False)
+
+
+async def _review_candidate(
+    runner: Runner,
+    session_service: InMemorySessionService,
+    state: Dict[str, Any],
+    semaphore: asyncio.Semaphore
+) -> Dict[str, Any]:
+    async with semaphore:
+        session = await session_service.create_session(app_name=APP_NAME, user_id="api_user", state=state)
+        message = types.Content(
+            role="user",
+            parts=[types.Part.from_text(text="Review this candidate")]
+        )
+
+        async def run():
+            async for _ in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+                pass
+
+        await asyncio.wait_for(run(), timeout=REFINEMENT_TIMEOUT_SECONDS)
+        session = await session_service.get_session(app_name=APP_NAME, user_id="api_user", session_id=session.id)
+        review = session.state.get("candidate_review") if session else None
+        if not review:
+            raise ValueError("Review agent produced no output")
+        if hasattr(review, "model_dump"):
+            review = review.model_dump()
+        return CandidateReview.model_validate(review).model_dump()
+
+
+def _load_candidate(candidate_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(RESUMES_DIR / f"{candidate_id}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+async def refine_ranking(
+    result: Dict[str, Any],
+    jd_data: Dict[str, Any],
+    profile: ScoringProfile,
+    top_n: int = DEFAULT_REFINE_TOP_N,
+    band: float = DEFAULT_BORDERLINE_BAND,
+    max_calls: int = DEFAULT_MAX_LLM_CALLS,
+    concurrency: int = REFINEMENT_CONCURRENCY
+) -> Dict[str, Any]:
+    """
+    Reviews the selected candidates concurrently and merges the reviews into the ranking.
+
+    Args:
+        result: Ranking document from build_fast_ranking() (updated in place)
+        jd_data: Parsed JD the ranking was built for
+        profile: Scoring profile the ranking was scored with
+        top_n, band, max_calls: See select_for_refinement()
+        concurrency: Maximum review calls in flight
+
+    Returns:
+        Refinement stats (also stored as result["refinement"])
+    """
+    started = time.perf_counter()
+    ranked_candidates = result.get("ranked_candidates", [])
+    selected = select_for_refinement(ranked_candidates, profile, top_n, band, max_calls)
+    entries = {entry["candidate_id"]: entry for entry in ranked_candidates}
+
+    jd_title = result.get("jd_title", "Unknown")
+    jd_summary = _jd_summary(jd_data)
+    session_service = InMemorySessionService()
+    runner = Runner(agent=candidate_review_agent, session_service=session_service, app_name=APP_NAME)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    candidate_ids, tasks = [], []
+    for candidate_id, reason in selected.items():
+        candidate = _load_candidate(candidate_id)
+        if candidate is None:
+            print(f"⚠️ Skipping review for {candidate_id}: parsed resume not found")
+            continue
+        state = {
+            "jd_title": jd_title,
+            "jd_summary": jd_summary,
+            "candidate_profile": json.dumps(build_candidate_profile(candidate), ensure_ascii=False),
+            "assessment": json.dumps(build_assessment(entries[candidate_id]), ensure_ascii=False),
+            "review_reason": reason,
+        }
+        candidate_ids.append(candidate_id)
+        tasks.append(_review_candidate(runner, session_service, state, semaphore))
+
+    print(f"🤖 Reviewing {len(tasks)} of {len(ranked_candidates)} candidates with the LLM (concurrency {concurrency})...")
+    reviews = await asyncio.gather(*tasks, return_exceptions=True)
+
+    refined, failed = [], []
+    for candidate_id, review in zip(candidate_ids, reviews):
+        entry = entries[candidate_id]
+        if isinstance(review, BaseException):
+            print(f"⚠️ Review failed for {candidate_id}: {review}")
+            failed.append(candidate_id)
+            continue
+        entry.update(review)
+        entry["review"] = {"source": "llm", "reason": selected[candidate_id]}
+        refined.append(candidate_id)
+
+    # Same schema for every entry - unreviewed candidates keep the deterministic justification
+    for entry in ranked_candidates:
+        entry.setdefault("red_flags", [])
+        entry.setdefault("green_flags", [])
+        entry.setdefault("review", {"source": "deterministic"})
+
+    stats = {
+        "mode": "hybrid",
+        "top_n": top_n,
+        "borderline_band": band,
+        "max_llm_calls": max_calls,
+        "llm_calls": len(tasks),
+        "refined": len(refined),
+        "failed": len(failed),
+        "failed_candidates": failed,
+        "took_seconds": round(time.perf_counter() - started, 2),
+    }
+    result["refinement"] = stats
+    print(f"✅ LLM reviews merged: {len(refined)} refined, {len(failed)} failed in {stats['took_seconds']}s")
+    return stats
+
+
+async def run_hybrid_ranking(
+    jd_id: str,
+    match_mode: str = "exact",
+    semantic_prefilter: bool = False,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    scoring_profile: Optional[str] = None,
+    compare_profiles: Optional[List[str]] = None,
+    refine_top_n: int = DEFAULT_REFINE_TOP_N,
+    borderline_band: float = DEFAULT_BORDERLINE_BAND,
+    max_llm_calls: int = DEFAULT_MAX_LLM_CALLS
+) -> Dict[str, Any]:
+    """
+    Deterministic ranking plus LLM reviews for the top and borderline candidates
+
+    Args:
+        jd_id: Job description ID to rank candidates for
+        match_mode, semantic_prefilter, top_k, min_score, scoring_profile, compare_profiles:
+            As in fast_rank_candidates()
+        refine_top_n: Number of best candidates to always review
+        borderline_band: Points either side of a recommendation cut-off that count as borderline
+        max_llm_calls: Upper bound on LLM calls for this ranking
+
+    Returns:
+        Saved ranking document
+    """
+    result = build_fast_ranking(
+        jd_id, match_mode, semantic_prefilter, top_k, min_score, scoring_profile, compare_profiles
+    )
+    result["ranking_mode"] = "hybrid"
+
+    if result["ranked_candidates"] and max_llm_calls > 0:
+        jd_path = RESUMES_DIR.parent / "parsed_jds" / f"{jd_id}.json"
+        with open(jd_path, "r", encoding="utf-8") as f:
+            jd_data = json.load(f)
+        profile = get_scoring_profile(jd_data, scoring_profile)
+
+        stats = await refine_ranking(result, jd_data, profile, refine_top_n, borderline_band, max_llm_calls)
+        result["summary"] += f" {stats['refined']} top/borderline candidates reviewed by the LLM."
+
+    save_ranking(result)
+    return result
@@ -0,0 +1,415 @@
+"""
+What-if ranking previews against an in-memory candidate feature matrix.
+
+Every parsed resume is flattened once into columns (experience years and an
+interned (years, location, expected salary) context) plus an inverted skill index (skill id ->
+candidate rows). A preview applies JD overrides, compiles them against the
+matrix vocabulary and scores the title-matched pool without touching resume
+files or writing a ranking. The matrix is rebuilt lazily after resume ingestion
+(invalidate_feature_matrix()) or when the parsed resume directory changes.
+
+Scores are identical to score_candidate() in simple_ranking.py.
+"""
+
+import heapq
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ranking_agent.tools import calculate_salary_score, normalize_skill
+from ranking_agent.skill_similarity import FUZZY_MATCH_THRESHOLD
+from ranking_agent.scoring_profiles import ScoreComponents, ScoringProfile, get_scoring_profile
+from shared.resume_search import RESUMES_DIR
+from shared.semantic_index import semantic_title_matches
+from shared.title_index import get_title_index
+from .simple_ranking import (
+    calculate_experience_score,
+    extract_jd_requirements,
+    get_candidate_expected_salary,
+    get_candidate_skill_list,
+)
+from .sharded_ranking import _skill_credit_spec
+
+
+# JD fields a preview may override
+PREVIEW_OVERRIDE_FIELDS = (
+    "role_title",
+    "mandatory_skills",
+    "good_to_have_skills",
+    "experience_min",
+    "experience_max",
+    "location",
+    "relocation_allowed",
+    "salary_min",
+    "salary_max",
+)
+
+
+# ============================================================================
+# Feature Matrix
+# ============================================================================
+
+class CandidateFeatureMatrix:
+    """Column-oriented scoring features for a set of parsed resumes, held in memory."""
+
+    def __init__(self, candidates: List[Dict[str, Any]], source_mtime: Optional[float] = None):
+        # Rows follow candidate id order, the same order fast ranking sees its pool in
+        candidates = sorted(candidates, key=lambda c: c.get("candidate_id", ""))
+        self.source_mtime = source_mtime
+        self.candidate_ids: List[str] = []
+        self.row_index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.emails: List[str] = []
+        self.years: List[float] = []
+        self.context_ids: List[int] = []
+        self.contexts: List[Tuple[float, int, float]] = []  # (years, location id, expected salary)
+        self.locations: List[str] = []
+        self.vocabulary: List[str] = []
+        self.postings: Dict[int, List[int]] = {}  # skill id -> rows having it
+        self._normalized_vocabulary: Optional[List[str]] = None
+
+        location_index: Dict[str, int] = {}
+        context_index: Dict[Tuple[float, int, float], int] = {}
+        vocabulary_index: Dict[str, int] = {}
+        for row, candidate in enumerate(candidates):
+            info = candidate.get("candidate_info", {}) or {}
+            candidate_id = candidate.get("candidate_id", "")
+            self.candidate_ids.append(candidate_id)
+            self.row_index[candidate_id] = row
+            self.names.append(info.get("name") or candidate.get("candidate_name", "Unknown"))
+            self.emails.append(info.get("email") or "")
+            years = float(candidate.get("parsed_data", {}).get("total_experience_years", 0) or 0)
+            self.years.append(years)
+
+            location = (info.get("location") or "").strip().lower()
+            lid = location_index.get(location)
+            if lid is None:
+                lid = location_index[location] = len(self.locations)
+                self.locations.append(location)
+
+            context = (years, lid, float(get_candidate_expected_salary(candidate) or 0))
+            ctx = context_index.get(context)
+            if ctx is None:
+                ctx = context_index[context] = len(self.contexts)
+                self.contexts.append(context)
+            self.context_ids.append(ctx)
+
+            seen: Set[int] = set()
+            for skill in get_candidate_skill_list(candidate):
+                key = skill.lower().strip()
+                sid = vocabulary_index.get(key)
+                if sid is None:
+                    sid = vocabulary_index[key] = len(self.vocabulary)
+                    self.vocabulary.append(key)
+                if sid not in seen:
+                    seen.add(sid)
+                    self.postings.setdefault(sid, []).append(row)
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+    @property
+    def normalized_vocabulary(self) -> List[str]:
+        """Vocabulary in fuzzy-matching form, computed on first fuzzy preview."""
+        if self._normalized_vocabulary is None:
+            self._normalized_vocabulary = [normalize_skill(skill) for skill in self.vocabulary]
+        return self._normalized_vocabulary
+
+    @classmethod
+    def load(cls, resumes_dir: Path = RESUMES_DIR) -> "CandidateFeatureMatrix":
+        """Builds the matrix from data/parsed_resumes/."""
+        resumes_dir = Path(resumes_dir)
+        if not resumes_dir.exists():
+            return cls([])
+        source_mtime = resumes_dir.stat().st_mtime
+        candidates = []
+        for resume_file in resumes_dir.glob("CAND-*.json"):
+            try:
+                with open(resume_file, "r", encoding="utf-8") as f:
+                    candidates.append(json.load(f))
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable resume {resume_file.name}: {e}")
+        return cls(candidates, source_mtime)
+
+    def coverage(self, rows: Set[int], skill_spec: Dict[str, Any]) -> Dict[int, Dict[int, float]]:
+        """
+        Best credit per requirement for every row in the pool that has any credit.
+
+        Only the postings of skills that satisfy a requirement are walked.
+        """
+        best: Dict[int, Dict[int, float]] = {}
+        for sid, hits in skill_spec["credit_by_skill"].items():
+            for row in self.postings.get(sid, ()):
+                if row not in rows:
+                    continue
+                credits = best.setdefault(row, {})
+                for req_index, credit in hits:
+                    if credit > credits.get(req_index, 0.0):
+                        credits[req_index] = credit
+        return best
+
+
+_matrix: Optional[CandidateFeatureMatrix] = None
+_matrix_lock = threading.Lock()
+
+
+def get_feature_matrix() -> CandidateFeatureMatrix:
+    """Returns the process-wide feature matrix, rebuilding it if resumes changed."""
+    global _matrix
+    source_mtime = RESUMES_DIR.stat().st_mtime if RESUMES_DIR.exists() else None
+    matrix = _matrix
+    if matrix is None or matrix.source_mtime != source_mtime:
+        with _matrix_lock:
+            if _matrix is None or _matrix.source_mtime != source_mtime:
+                started = time.perf_counter()
+                _matrix = CandidateFeatureMatrix.load()
+                print(f"🧮 Built candidate feature matrix: {len(_matrix)} candidates, "
+                      f"{len(_matrix.vocabulary)} skills in {(time.perf_counter() - started) * 1000:.0f}ms")
+            matrix = _matrix
+    return matrix
+
+
+def invalidate_feature_matrix():
+    """Drops the cached matrix; call after parsed resumes are added or changed."""
+    global _matrix
+    with _matrix_lock:
+        _matrix = None
+
+
+# ============================================================================
+# Preview Scoring
+# ============================================================================
+
+def _coverage_percent(credits: Optional[Dict[int, float]], skill_spec: Dict[str, Any]) -> float:
+    # Same arithmetic as sharded_ranking._coverage()
+    if not skill_spec["count"] or not credits:
+        return 0.0
+    return round(sum(credits[req_index] for req_index in sorted(credits)) / skill_spec["count"] * 100, 1)
+
+
+def apply_jd_overrides(jd_data: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns a copy of the JD with the given preview fields replaced."""
+    return {**jd_data, **{k: v for k, v in overrides.items() if k in PREVIEW_OVERRIDE_FIELDS and v is not None}}
+
+
+def score_preview(
+    matrix: CandidateFeatureMatrix,
+    jd_data: Dict[str, Any],
+    rows: Optional[Set[int]] = None,
+    top_n: int = 10,
+    match_mode: str = "exact",
+    profile: Optional[ScoringProfile] = None
+) -> Dict[str, Any]:
+    """
+    Scores a pool of matrix rows against a JD.
+
+    Args:
+        matrix: Candidate feature matrix
+        jd_data: JD (overrides already applied)
+        rows: Pool of matrix rows (default: every candidate)
+        top_n: Number of candidates to return
+        match_mode: "exact" or "fuzzy"
+        profile: Scoring profile (default: the JD's profile)
+
+    Returns:
+        Dictionary with pool_size, recommendation counts and the top_n candidates
+    """
+    profile = profile or get_scoring_profile(jd_data)
+    jd_requirements = extract_jd_requirements(jd_data)
+    rows = set(range(len(matrix))) if rows is None else rows
+
+    normalized_vocabulary = matrix.normalized_vocabulary if match_mode == "fuzzy" else None
+    mandatory_spec = _skill_credit_spec(matrix.vocabulary, jd_requirements["mandatory_skills"], match_mode, normalized_vocabulary)
+    good_to_have_spec = _skill_credit_spec(matrix.vocabulary, jd_requirements["good_to_have_skills"], match_mode, normalized_vocabulary)
+    mandatory = matrix.coverage(rows, mandatory_spec)
+    good_to_have = matrix.coverage(rows, good_to_have_spec)
+
+    # Experience, location and salary fit only depend on a row's context
+    # (years, location, expected salary) - resolved once per distinct context
+    matcher = jd_requirements["location_matcher"]
+    location_results: Dict[int, Dict[str, Any]] = {}
+    alignments: Dict[float, str] = {}
+    salary_fits: Dict[float, Optional[float]] = {0.0: None}
+    factors: Dict[int, Tuple[str, Optional[float], Optional[float]]] = {}
+
+    def context_factors(ctx: int) -> Tuple[str, Optional[float], Optional[float]]:
+        years, lid, salary = matrix.contexts[ctx]
+        if lid not in location_results:
+            location_results[lid] = matcher.match(matrix.locations[lid])
+        if years not in alignments:
+            alignments[years] = calculate_experience_score(
+                years, jd_requirements["experience_min"], jd_requirements["experience_max"], profile
+            )["alignment"]
+        if salary not in salary_fits:
+            result = calculate_salary_score(int(salary), jd_requirements["salary_min"], jd_requirements["salary_max"])
+            salary_fits[salary] = None if result["alignment"] == "Unknown" else result["score"] / 5
+        factors[ctx] = (alignments[years], location_results[lid]["fit"], salary_fits[salary])
+        return factors[ctx]
+
+    # Rows without any skill credit score the same within a context
+    credited = mandatory.keys() | good_to_have.keys()
+    no_credit = (_coverage_percent(None, mandatory_spec) / 100, _coverage_percent(None, good_to_have_spec) / 100)
+    base_scores: Dict[int, float] = {}
+
+    def components(row: int) -> ScoreComponents:
+        ctx = matrix.context_ids[row]
+        return (
+            _coverage_percent(mandatory.get(row), mandatory_spec) / 100,
+            _coverage_percent(good_to_have.get(row), good_to_have_spec) / 100,
+            *(factors.get(ctx) or context_factors(ctx)),
+        )
+
+    pool = sorted(rows)
+    scores = []
+    for row in pool:
+        if row in credited:
+            scores.append(profile.total(components(row)))
+            continue
+        ctx = matrix.context_ids[row]
+        total_score = base_scores.get(ctx)
+        if total_score is None:
+            total_score = base_scores[ctx] = profile.total(no_credit + (factors.get(ctx) or context_factors(ctx)))
+        scores.append(total_score)
+
+    highly_recommended = sum(1 for total_score in scores if total_score >= profile.highly_recommended)
+    recommended = sum(1 for total_score in scores if total_score >= profile.recommended) - highly_recommended
+
+    # Highest score first, ties in candidate id order (as in select_top_candidates; nlargest is stable)
+    best = heapq.nlargest(top_n, range(len(pool)), key=scores.__getitem__)
+
+    matched_credit = FUZZY_MATCH_THRESHOLD if match_mode == "fuzzy" else 1.0
+    requirements = mandatory_spec["requirements"]
+    top_candidates = []
+    for rank, i in enumerate(best, start=1):
+        row = pool[i]
+        credits = mandatory.get(row, {})
+        match_score = profile.component_scores(*components(row))
+        alignment = factors[matrix.context_ids[row]][0]
+        top_candidates.append({
+            "rank": rank,
+            "candidate_id": matrix.candidate_ids[row],
+            "candidate_name": matrix.names[row],
+            "candidate_email": matrix.emails[row],
+            "total_score": match_score["total_score"],
+            "match_score": match_score,
+            "recommendation": profile.recommendation(match_score["total_score"]),
+            "mandatory_matched": [r for j, r in enumerate(requirements) if credits.get(j, 0.0) >= matched_credit],
+            "mandatory_missing": [r for j, r in enumerate(requirements) if credits.get(j, 0.0) < matched_credit],
+            "experience_years": matrix.years[row],
+            "experience_alignment": alignment,
+            "location_compatibility": location_results[matrix.contexts[matrix.context_ids[row]][1]]["compatibility"],
+        })
+
+    return {
+        "scoring_profile": profile.name,
+        "match_mode": match_mode,
+        "pool_size": len(pool),
+        "highly_recommended": highly_recommended,
+        "recommended": recommended,
+        "not_recommended": len(pool) - highly_recommended - recommended,
+        "candidates": top_candidates,
+    }
+
+
+def preview_ranking(
+    jd_data: Dict[str, Any],
+    overrides: Optional[Dict[str, Any]] = None,
+    top_n: int = 10,
+    match_mode: str = "exact",
+    scoring_profile: Optional[str] = None,
+    semantic_prefilter: bool = False
+) -> Dict[str, Any]:
+    """
+    What-if ranking for a JD with overridden requirements - nothing is persisted.
+
+    The candidate pool is resolved the same way as fast ranking (title index,
+    optionally semantic matches), using the (possibly overridden) role title.
+
+    Args:
+        jd_data: Parsed JD
+        overrides: Replacement values for PREVIEW_OVERRIDE_FIELDS
+        top_n: Number of candidates to return
+        match_mode: "exact" or "fuzzy"
+        scoring_profile: Weight profile name overriding the JD's default
+        semantic_prefilter: Also admit candidates with semantically similar profiles
+
+    Returns:
+        score_preview() result plus jd_title, total_indexed and took_ms
+    """
+    started = time.perf_counter()
+    jd_data = apply_jd_overrides(jd_data, overrides or {})
+    profile = get_scoring_profile(jd_data, scoring_profile)
+    matrix = get_feature_matrix()
+
+    jd_role = jd_data.get("role_title", jd_data.get("job_title", "")).lower().strip()
+    candidate_ids = set(get_title_index().match(jd_role))
+    if semantic_prefilter:
+        candidate_ids |= set(semantic_title_matches(jd_data))
+    rows = {matrix.row_index[cid] for cid in candidate_ids if cid in matrix.row_index}
+
+    result = score_preview(matrix, jd_data, rows, top_n, match_mode, profile)
+    result["jd_id"] = jd_data.get("job_id", "")
+    result["jd_title"] = jd_data.get("role_title", jd_data.get("job_title", "Unknown"))
+    result["total_indexed"] = len(matrix)
+    result["took_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import platform
+    import random
+
+    parser = argparse.ArgumentParser(description="Benchmark what-if ranking previews")
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    # Preview latency depends on the machine, so report what this run was measured on.
+    print(f"🖥️  {platform.processor() or platform.machine()}, {os.cpu_count()} CPUs, "
+          f"Python {platform.python_version()} ({platform.system()})")
+
+    random.seed(7)
+    skills = [f"skill-{i}" for i in range(2000)]
+    locations = ["Mumbai", "Bengaluru", "Pune, MH", "Hyderabad", "London", "", "Remote"]
+    candidates = [
+        {
+            "candidate_id": f"CAND-{i:07d}",
+            "candidate_info": {"name": f"Candidate {i}", "location": random.choice(locations)},
+            "parsed_data": {
+                "total_experience_years": float(random.randint(0, 15)),
+                "technical_skills": {"languages": random.sample(skills[:40], 4) + random.sample(skills, 10)},
+            },
+        }
+        for i in range(args.candidates)
+    ]
+
+    started = time.perf_counter()
+    matrix = CandidateFeatureMatrix(candidates)
+    print(f"🧮 Built matrix for {len(matrix):,} candidates in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    jd = {
+        "role_title": "Engineer",
+        "mandatory_skills": skills[:8],
+        "good_to_have_skills": skills[8:14],
+        "experience_min": 3,
+        "experience_max": 8,
+        "location": "Mumbai, Bangalore",
+    }
+    timings = []
+    for run in range(args.runs):
+        overrides = {"mandatory_skills": random.sample(skills[:40], 8), "experience_min": random.randint(1, 6)}
+        started = time.perf_counter()
+        result = score_preview(matrix, apply_jd_overrides(jd, overrides), top_n=args.top_n)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"⚡ Preview over {len(matrix):,} candidates: median {timings[len(timings) // 2]:.1f}ms, "
+          f"max {timings[-1]:.1f}ms, top score {result['candidates'][0]['total_score']}")
@@ -0,0 +1,639 @@
+"""
+Sharded multi-process ranking executor.
+
+Every parsed resume is flattened into a binary feature file (experience years,
+expected salaries, interned location ids, skill-id lists and their
+vocabularies) under data/cache/features/ that worker processes memory-map, so no
+candidate data is pickled between processes. The file is built once and reused
+until the parsed resume directory changes or invalidate_feature_file() is
+called. Each worker scores a contiguous shard of the pool's rows and returns a
+partial top-K heap; the parent merges the heaps and only builds full ranking
+entries for the retained candidates.
+
+Scores are identical to score_candidate() in simple_ranking.py.
+"""
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ranking_agent.tools import calculate_salary_score, normalize_skill
+from ranking_agent.skill_similarity import get_similarity_table
+from ranking_agent.scoring_profiles import ScoringProfile, get_scoring_profile
+from shared.resume_search import DATA_DIR, RESUMES_DIR
+from .simple_ranking import calculate_experience_score, get_candidate_expected_salary, get_candidate_skill_list
+
+
+# Pools smaller than this are ranked in-process; spawning workers costs more
+PARALLEL_MIN_CANDIDATES = 20000
+
+_MAGIC = b"HRFEAT02"
+_HEADER = struct.Struct("<8sQQ")  # magic, candidate count, total skill ids
+_HEADER_SIZE = 32  # Header padded so the float64/uint64 sections stay 8-byte aligned
+
+FEATURES_DIR = DATA_DIR / "cache" / "features"
+
+
+# ============================================================================
+# Feature File
+# ============================================================================
+
+def write_feature_file(
+    path: Path,
+    candidate_ids: List[str],
+    experience_years: List[float],
+    skill_lists: List[List[int]],
+    vocabulary: List[str],
+    expected_salaries: Optional[List[float]] = None,
+    location_ids: Optional[List[int]] = None,
+    locations: Optional[List[str]] = None,
+    source_mtime: Optional[float] = None
+) -> Path:
+    """
+    Writes candidate features to a memory-mappable file.
+
+    Layout: header | years float64[n] | expected salary float64[n] (0 = unknown) |
+    skill offsets uint64[n+1] | location ids uint32[n] | skill ids uint32[total].
+    Candidate ids, the skill vocabulary, the location vocabulary and the resume
+    directory mtime the file was built from go to a JSON sidecar next to it.
+    """
+    path = Path(path)
+    count = len(candidate_ids)
+    offsets = array("Q", [0])
+    skill_ids = array("I")
+    for skills in skill_lists:
+        skill_ids.extend(skills)
+        offsets.append(len(skill_ids))
+
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, count, len(skill_ids)).ljust(_HEADER_SIZE, b"\0"))
+        array("d", experience_years).tofile(f)
+        array("d", expected_salaries if expected_salaries is not None else [0.0] * count).tofile(f)
+        offsets.tofile(f)
+        array("I", location_ids if location_ids is not None else [0] * count).tofile(f)
+        skill_ids.tofile(f)
+        f.write(b"\0" * 4)  # mmap refuses zero-length trailing sections
+
+    with open(path.with_suffix(".json"), "w", encoding="utf-8") as f:
+        json.dump({
+            "candidate_ids": candidate_ids,
+            "vocabulary": vocabulary,
+            "locations": locations if locations is not None else [""],
+            "source_mtime": source_mtime,
+        }, f, ensure_ascii=False)
+    return path
+
+
+def build_feature_file(
+    candidates: List[Dict[str, Any]],
+    path: Path,
+    source_mtime: Optional[float] = None
+) -> Tuple[Path, List[str], List[str]]:
+    """
+    Flattens parsed resumes into a feature file.
+
+    Skills are stored the way exact matching compares them (lowercased, stripped);
+    locations are interned so location fit is computed once per distinct string.
+
+    Returns:
+        (feature file path, skill vocabulary, location vocabulary)
+    """
+    vocabulary: List[str] = []
+    vocabulary_index: Dict[str, int] = {}
+    locations: List[str] = []
+    locations_index: Dict[str, int] = {}
+    candidate_ids, years, salaries, location_ids, skill_lists = [], [], [], [], []
+
+    for candidate in candidates:
+        skill_ids = []
+        for skill in get_candidate_skill_list(candidate):
+            key = skill.lower().strip()
+            sid = vocabulary_index.get(key)
+            if sid is None:
+                sid = vocabulary_index[key] = len(vocabulary)
+                vocabulary.append(key)
+            skill_ids.append(sid)
+
+        location = (candidate.get("candidate_info", {}).get("location") or "").strip().lower()
+        lid = locations_index.get(location)
+        if lid is None:
+            lid = locations_index[location] = len(locations)
+            locations.append(location)
+
+        candidate_ids.append(candidate.get("candidate_id", ""))
+        years.append(float(candidate.get("parsed_data", {}).get("total_experience_years", 0) or 0))
+        salaries.append(float(get_candidate_expected_salary(candidate) or 0))
+        location_ids.append(lid)
+        skill_lists.append(skill_ids)
+
+    write_feature_file(path, candidate_ids, years, skill_lists, vocabulary, salaries, location_ids, locations, source_mtime)
+    return Path(path), vocabulary, locations
+
+
+class FeatureView:
+    """Read-only memory-mapped view of a feature file."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, total = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Not a candidate feature file: {self.path}")
+
+        self._buffer = buffer = memoryview(self._mmap)
+        count = self.count
+        years_end = _HEADER_SIZE + 8 * count
+        salaries_end = years_end + 8 * count
+        offsets_end = salaries_end + 8 * (count + 1)
+        locations_end = offsets_end + 4 * count
+        self.years = buffer[_HEADER_SIZE:years_end].cast("d")
+        self.salaries = buffer[years_end:salaries_end].cast("d")
+        self.offsets = buffer[salaries_end:offsets_end].cast("Q")
+        self.location_ids = buffer[offsets_end:locations_end].cast("I")
+        self.skill_ids = buffer[locations_end:locations_end + 4 * total].cast("I")
+
+    def skills(self, index: int):
+        return self.skill_ids[self.offsets[index]:self.offsets[index + 1]]
+
+    def close(self):
+        """Unmaps the file (slices returned by skills() must no longer be in use)."""
+        for view in (self.years, self.salaries, self.offsets, self.location_ids, self.skill_ids, self._buffer):
+            view.release()
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> "FeatureView":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# One mapping per worker process, reused across the shards it is handed.
+# Only workers use it (they exit with their pool); the parent always unmaps.
+_views: Dict[Tuple[str, float], FeatureView] = {}
+
+
+def _open_view(path: str) -> FeatureView:
+    key = (path, os.stat(path).st_mtime)
+    view = _views.get(key)
+    if view is None:
+        for stale in [k for k in _views if k[0] == path]:
+            _views.pop(stale).close()
+        view = _views[key] = FeatureView(Path(path))
+    return view
+
+
+# ============================================================================
+# Persisted Feature File
+# ============================================================================
+
+class FeatureFile:
+    """A feature file on disk with its sidecar loaded (candidate ids -> rows, vocabularies)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path.with_suffix(".json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.candidate_ids: List[str] = meta["candidate_ids"]
+        self.vocabulary: List[str] = meta["vocabulary"]
+        self.locations: List[str] = meta["locations"]
+        self.source_mtime: Optional[float] = meta.get("source_mtime")
+        self.row_index = {candidate_id: row for row, candidate_id in enumerate(self.candidate_ids)}
+
+    def __len__(self) -> int:
+        return len(self.candidate_ids)
+
+    def rows_for(self, candidates: List[Dict[str, Any]]) -> Optional[List[int]]:
+        """File rows of the given candidates, or None if any of them is not in the file."""
+        rows = []
+        for candidate in candidates:
+            row = self.row_index.get(candidate.get("candidate_id", ""))
+            if row is None:
+                return None
+            rows.append(row)
+        return rows
+
+    @classmethod
+    def build(cls, resumes_dir: Path = RESUMES_DIR, features_dir: Path = FEATURES_DIR) -> "FeatureFile":
+        """
+        Writes a new feature file for every parsed resume.
+
+        Each build gets its own file name, so shards of a ranking that started
+        before the rebuild keep reading the file they were given. Only the
+        previous build is kept besides the new one.
+        """
+        resumes_dir, features_dir = Path(resumes_dir), Path(features_dir)
+        source_mtime = resumes_dir.stat().st_mtime if resumes_dir.exists() else None
+        candidates = []
+        for resume_file in sorted(resumes_dir.glob("CAND-*.json")):
+            try:
+                with open(resume_file, "r", encoding="utf-8") as f:
+                    candidates.append(json.load(f))
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable resume {resume_file.name}: {e}")
+
+        features_dir.mkdir(parents=True, exist_ok=True)
+        path = features_dir / f"candidates-{time.time_ns()}.bin"
+        build_feature_file(candidates, path, source_mtime)
+
+        for old in sorted(features_dir.glob("candidates-*.bin"))[:-2]:
+            old.unlink(missing_ok=True)
+            old.with_suffix(".json").unlink(missing_ok=True)
+        return cls(path)
+
+    @classmethod
+    def latest(cls, features_dir: Path = FEATURES_DIR) -> Optional["FeatureFile"]:
+        """The newest feature file still having a sidecar (written by an earlier run), if any."""
+        for sidecar in sorted(Path(features_dir).glob("candidates-*.json"), reverse=True):
+            try:
+                return cls(sidecar.with_suffix(".bin"))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Ignoring unreadable feature file {sidecar.name}: {e}")
+        return None
+
+
+_feature_file: Optional[FeatureFile] = None
+_feature_file_lock = threading.Lock()
+
+
+def get_feature_file() -> FeatureFile:
+    """Returns the feature file of all parsed resumes, rebuilding it if resumes changed."""
+    global _feature_file
+    source_mtime = RESUMES_DIR.stat().st_mtime if RESUMES_DIR.exists() else None
+    features = _feature_file
+    if features is None or features.source_mtime != source_mtime:
+        with _feature_file_lock:
+            if _feature_file is None or _feature_file.source_mtime != source_mtime:
+                started = time.perf_counter()
+                latest = FeatureFile.latest(FEATURES_DIR)
+                if latest is not None and latest.source_mtime == source_mtime and latest.path.exists():
+                    _feature_file = latest
+                else:
+                    _feature_file = FeatureFile.build(RESUMES_DIR, FEATURES_DIR)
+                    print(f"🧮 Built candidate feature file: {len(_feature_file)} candidates, "
+                          f"{len(_feature_file.vocabulary)} skills in {(time.perf_counter() - started) * 1000:.0f}ms")
+            features = _feature_file
+    return features
+
+
+def invalidate_feature_file():
+    """Drops the feature file; call after parsed resumes are added or changed."""
+    global _feature_file
+    with _feature_file_lock:
+        _feature_file = None
+        # Rankings already holding the file keep using it; the next one rebuilds
+        for sidecar in FEATURES_DIR.glob("candidates-*.json"):
+            sidecar.unlink(missing_ok=True)
+
+
+# ============================================================================
+# Scoring Spec
+# ============================================================================
+
+def _skill_credit_spec(
+    vocabulary: List[str],
+    required_skills: List[str],
+    match_mode: str,
+    normalized_vocabulary: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Inverts required skills into skill id -> [(requirement index, credit)].
+
+    Mirrors calculate_skill_match_score(): exact mode counts every listed
+    requirement, fuzzy mode dedupes normalized requirements and uses the
+    similarity table. Both give 0% coverage when nothing is required.
+    """
+    credit_by_skill: Dict[int, List[Tuple[int, float]]] = {}
+
+    if match_mode == "fuzzy":
+        requirements = sorted(set(normalize_skill(s) for s in required_skills if s))
+        table = get_similarity_table()
+        table.ensure(set(normalized_vocabulary) | set(requirements))
+        for req_index, required in enumerate(requirements):
+            row = table.row(required)
+            for sid, skill in enumerate(normalized_vocabulary):
+                credit = row.get(skill)
+                if credit:
+                    credit_by_skill.setdefault(sid, []).append((req_index, credit))
+    else:
+        requirements = [s.lower().strip() for s in required_skills]
+        vocabulary_index = {skill: sid for sid, skill in enumerate(vocabulary)}
+        for req_index, required in enumerate(requirements):
+            sid = vocabulary_index.get(required)
+            if sid is not None:
+                credit_by_skill.setdefault(sid, []).append((req_index, 1.0))
+
+    return {
+        "credit_by_skill": credit_by_skill,
+        "requirements": requirements,
+        "count": len(requirements),
+    }
+
+
+def build_scoring_spec(
+    vocabulary: List[str],
+    jd_requirements: Dict[str, Any],
+    match_mode: str = "exact",
+    profile: Optional[ScoringProfile] = None,
+    locations: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Compiles JD requirements and the scoring profile against the feature vocabulary (small enough to pickle per shard).
+
+    Location fit is resolved once per distinct location string, so workers only index a list.
+    """
+    matcher = jd_requirements["location_matcher"]
+    normalized_vocabulary = [normalize_skill(s) for s in vocabulary] if match_mode == "fuzzy" else None
+    spec = {
+        "mandatory": _skill_credit_spec(vocabulary, jd_requirements["mandatory_skills"], match_mode, normalized_vocabulary),
+        "good_to_have": _skill_credit_spec(vocabulary, jd_requirements["good_to_have_skills"], match_mode, normalized_vocabulary),
+        "experience_min": jd_requirements["experience_min"],
+        "experience_max": jd_requirements["experience_max"],
+        "location_fits": [matcher.match(location)["fit"] for location in (locations or [""])],
+        "salary_min": jd_requirements["salary_min"],
+        "salary_max": jd_requirements["salary_max"],
+        "profile": profile or get_scoring_profile(),
+    }
+    if match_mode == "fuzzy":
+        get_similarity_table().save()
+    return spec
+
+
+def _coverage(skills, skill_spec: Dict[str, Any]) -> float:
+    count = skill_spec["count"]
+    if not count:
+        return 0.0
+    credit_by_skill = skill_spec["credit_by_skill"]
+    best: Dict[int, float] = {}
+    for sid in skills:
+        hits = credit_by_skill.get(sid)
+        if hits:
+            for req_index, credit in hits:
+                if credit > best.get(req_index, 0.0):
+                    best[req_index] = credit
+    # Sum in requirement order so float rounding matches the serial path
+    return round(sum(best[req_index] for req_index in sorted(best)) / count * 100, 1)
+
+
+# ============================================================================
+# Workers
+# ============================================================================
+
+def _score_shard(
+    path: str,
+    rows: Sequence[int],
+    offset: int,
+    spec: Dict[str, Any],
+    top_k: Optional[int],
+    min_score: Optional[float]
+) -> Tuple[List[Tuple[float, int]], Dict[str, int]]:
+    """Worker entry point: scores one shard of a feature file."""
+    return _score_rows(_open_view(path), rows, offset, spec, top_k, min_score)
+
+
+def _score_rows(
+    view: FeatureView,
+    rows: Sequence[int],
+    offset: int,
+    spec: Dict[str, Any],
+    top_k: Optional[int],
+    min_score: Optional[float]
+) -> Tuple[List[Tuple[float, int]], Dict[str, int]]:
+    """
+    Scores the given file rows and returns a partial heap of (score, -position).
+
+    Positions count from offset in pool order, so ties break the way the serial path does.
+    """
+    mandatory, good_to_have = spec["mandatory"], spec["good_to_have"]
+    exp_min, exp_max, profile = spec["experience_min"], spec["experience_max"], spec["profile"]
+    location_fits, salary_min, salary_max = spec["location_fits"], spec["salary_min"], spec["salary_max"]
+    # Experience alignment and salary fit only depend on one value each - memoize per distinct value
+    alignments: Dict[float, str] = {}
+    salary_fits: Dict[float, Optional[float]] = {0.0: None}
+
+    heap: List[Tuple[float, int]] = []
+    counts = {"fully_scored": 0, "pruned_by_bound": 0, "below_min_score": 0}
+
+    for position, index in enumerate(rows, offset):
+        skills = view.skills(index)
+        mandatory_coverage = _coverage(skills, mandatory) / 100
+
+        # Same upper bound as select_top_candidates()
+        upper_bound = profile.upper_bound(mandatory_coverage)
+        if min_score is not None and upper_bound < min_score:
+            counts["below_min_score"] += 1
+            continue
+        if top_k and len(heap) >= top_k and upper_bound <= heap[0][0]:
+            counts["pruned_by_bound"] += 1
+            continue
+
+        years = view.years[index]
+        alignment = alignments.get(years)
+        if alignment is None:
+            alignment = alignments[years] = calculate_experience_score(years, exp_min, exp_max, profile)["alignment"]
+
+        expected_salary = view.salaries[index]
+        if expected_salary not in salary_fits:
+            salary = calculate_salary_score(int(expected_salary), salary_min, salary_max)
+            salary_fits[expected_salary] = None if salary["alignment"] == "Unknown" else salary["score"] / 5
+
+        total_score = profile.total((
+            mandatory_coverage,
+            _coverage(skills, good_to_have) / 100,
+            alignment,
+            location_fits[view.location_ids[index]],
+            salary_fits[expected_salary]
+        ))
+        counts["fully_scored"] += 1
+        if min_score is not None and total_score < min_score:
+            counts["below_min_score"] += 1
+            continue
+
+        item = (total_score, -position)
+        if not top_k or len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item > heap[0]:
+            heapq.heapreplace(heap, item)
+
+    return heap, counts
+
+
+def _shard_bounds(count: int, shards: int) -> List[Tuple[int, int]]:
+    size = -(-count // shards)
+    return [(start, min(start + size, count)) for start in range(0, count, size)]
+
+
+def _pool_context():
+    # Forking the multithreaded API server can copy held locks into workers, so
+    # workers come from a forkserver with this module preloaded (spawn where
+    # forkserver is unavailable)
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+def rank_feature_file(
+    path: Path,
+    spec: Dict[str, Any],
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    workers: Optional[int] = None,
+    rows: Optional[List[int]] = None
+) -> Tuple[List[Tuple[float, int]], Dict[str, int]]:
+    """
+    Scores candidates in a feature file across a process pool.
+
+    Args:
+        path: Feature file written by write_feature_file/build_feature_file
+        spec: Scoring spec from build_scoring_spec
+        top_k: Candidates to keep (None = all)
+        min_score: Minimum total score to keep
+        workers: Worker processes (defaults to the CPU count; 1 runs in-process)
+        rows: File rows of the pool to score, in pool order (None = every row)
+
+    Returns:
+        ([(score, position)] best first, aggregate counts); position indexes rows
+        (or the file when rows is None)
+    """
+    path = str(path)
+    with FeatureView(Path(path)) as view:
+        if rows is None:
+            rows = range(view.count)
+        count = len(rows)
+        workers = max(1, min(workers or os.cpu_count() or 1, count or 1))
+        if workers == 1:
+            partials = [_score_rows(view, rows, 0, spec, top_k, min_score)]
+
+    if workers > 1:
+        # A few shards per worker keeps the pool busy when shards finish unevenly
+        bounds = _shard_bounds(count, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+            futures = [
+                pool.submit(_score_shard, path, rows[start:end], start, spec, top_k, min_score)
+                for start, end in bounds
+            ]
+            partials = [future.result() for future in futures]
+
+    counts = {"pool_size": count, "fully_scored": 0, "pruned_by_bound": 0, "below_min_score": 0}
+    merged: List[Tuple[float, int]] = []
+    for heap, shard_counts in partials:
+        merged.extend(heap)
+        for key, value in shard_counts.items():
+            counts[key] += value
+
+    if top_k:
+        best = heapq.nlargest(top_k, merged)
+    else:
+        best = sorted(merged, reverse=True)
+    counts["retained"] = len(best)
+    return [(score, -neg_index) for score, neg_index in best], counts
+
+
+def sharded_select_top_candidates(
+    candidates: List[Dict[str, Any]],
+    jd_requirements: Dict[str, Any],
+    match_mode: str = "exact",
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    workers: Optional[int] = None,
+    profile: Optional[ScoringProfile] = None,
+    compare_profiles: Optional[List[ScoringProfile]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Drop-in parallel replacement for select_top_candidates().
+
+    Candidates are looked up in the persisted feature file of all parsed
+    resumes; a pool with candidates the file does not know about (not under
+    data/parsed_resumes/) gets a temporary file of its own. Only the retained
+    candidates are scored in full (with skill match details) in the parent
+    process.
+    """
+    from .simple_ranking import score_candidate
+
+    features = get_feature_file()
+    rows = features.rows_for(candidates)
+    if rows is not None:
+        spec = build_scoring_spec(features.vocabulary, jd_requirements, match_mode, profile, features.locations)
+        best, counts = rank_feature_file(features.path, spec, top_k, min_score, workers, rows)
+    else:
+        with tempfile.TemporaryDirectory(prefix="hr-features-") as tmp:
+            path, vocabulary, locations = build_feature_file(candidates, Path(tmp) / "candidates.bin")
+            spec = build_scoring_spec(vocabulary, jd_requirements, match_mode, profile, locations)
+            best, counts = rank_feature_file(path, spec, top_k, min_score, workers)
+
+    retained = [
+        score_candidate(candidates[index], jd_requirements, match_mode, profile=spec["profile"], compare_profiles=compare_profiles)
+        for _, index in best
+    ]
+    return retained, counts
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+if __name__ == "__main__":
+    import argparse
+    import random
+
+    from ranking_agent.location_matching import LocationMatcher
+
+    parser = argparse.ArgumentParser(description="Benchmark the sharded ranking executor")
+    parser.add_argument("--candidates", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--top-k", type=int, default=50)
+    args = parser.parse_args()
+
+    random.seed(7)
+    vocabulary = [f"skill-{i}" for i in range(2000)]
+    requirements = {
+        "mandatory_skills": vocabulary[:8],
+        "good_to_have_skills": vocabulary[8:14],
+        "experience_min": 3,
+        "experience_max": 8,
+        "location": "Mumbai, Bangalore",
+        "location_matcher": LocationMatcher("Mumbai, Bangalore"),
+        "salary_min": 1_200_000,
+        "salary_max": 2_000_000,
+    }
+    locations = ["", "mumbai", "bengaluru", "pune, mh", "hyderabad", "london", "remote"]
+
+    with tempfile.TemporaryDirectory(prefix="hr-features-") as tmp:
+        path = Path(tmp) / "bench.bin"
+        print(f"🔧 Generating {args.candidates:,} synthetic candidates...")
+        hot = list(range(40))  # Make JD skills common enough to matter
+        write_feature_file(
+            path,
+            [f"CAND-{i}" for i in range(args.candidates)],
+            [float(random.randint(0, 15)) for _ in range(args.candidates)],
+            [random.sample(hot, 4) + random.sample(range(2000), 10) for _ in range(args.candidates)],
+            vocabulary,
+            [float(random.choice((0, 1_000_000, 1_800_000, 2_400_000))) for _ in range(args.candidates)],
+            [random.randrange(len(locations)) for _ in range(args.candidates)],
+            locations,
+        )
+        spec = build_scoring_spec(vocabulary, requirements, locations=locations)
+
+        baseline = None
+        for workers in args.workers:
+            started = time.perf_counter()
+            best, counts = rank_feature_file(path, spec, top_k=args.top_k, workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"⚡ workers={workers}: {elapsed:.2f}s "
+                  f"({args.candidates / elapsed:,.0f} candidates/s, speedup x{baseline / elapsed:.2f}) "
+                  f"top score {best[0][0] if best else 'n/a'}, scored {counts['fully_scored']:,}")
@@ -3,21 +3,34 @@ Simple, fast ranking logic that doesn't require LLM calls.
 Uses already-parsed resume and JD data to generate rankings.
 """
 
+import heapq
 import json
+import os
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 
+from ranking_agent.skill_similarity import fuzzy_skill_match, get_similarity_table
+from ranking_agent.scoring_profiles import ScoringProfile, get_profile_registry, get_scoring_profile
+from ranking_agent.location_matching import LocationMatcher
+from ranking_agent.tools import calculate_salary_score
+from shared.semantic_index import semantic_title_matches
+from shared.title_index import get_title_index, load_matching_candidates
 
-def calculate_skill_match_score(candidate_skills: List[str], required_skills: List[str]) -> Dict[str, Any]:
+
+def calculate_skill_match_score(candidate_skills: List[str], required_skills: List[str], match_mode: str = "exact") -> Dict[str, Any]:
     """Calculate how many required skills the candidate has"""
-    candidate_skills_lower = [s.lower().strip() for s in candidate_skills]
+    if match_mode == "fuzzy":
+        # Partial credit from the precomputed skill similarity table
+        return fuzzy_skill_match(candidate_skills, required_skills)
+    
+    candidate_skills_lower = set(s.lower().strip() for s in candidate_skills)
     required_skills_lower = [s.lower().strip() for s in required_skills]
     
     matched = [skill for skill in required_skills_lower if skill in candidate_skills_lower]
     missing = [skill for skill in required_skills_lower if skill not in candidate_skills_lower]
     
-    coverage_percent = (len(matched) / len(required_skills_lower) * 100) if required_skills_lower else 0
+    coverage_percent = (len(matched) / len(required_skills_lower) * 100) if required_skills_lower else 0.0
     
     return {
         "matched": matched,
@@ -26,34 +39,362 @@ def calculate_skill_match_score(candidate_skills: List[str], required_skills: Li
     }
 
 
-def calculate_experience_score(candidate_years: float, required_min: int, required_max: int) -> Dict[str, Any]:
-    """Score candidate based on experience requirements"""
+def calculate_experience_score(
+    candidate_years: float,
+    required_min: int,
+    required_max: int,
+    profile: Optional[ScoringProfile] = None
+) -> Dict[str, Any]:
+    """Score candidate based on experience requirements (points come from the scoring profile)"""
     if candidate_years >= required_min and candidate_years <= required_max:
         alignment = "Perfect Match"
-        score = 25
     elif candidate_years >= required_min * 0.8:
         alignment = "Close Match"
-        score = 20
     elif candidate_years >= required_min * 0.5:
         alignment = "Below Requirements"
-        score = 10
     else:
         alignment = "Underqualified"
-        score = 5
+    
+    profile = profile or get_scoring_profile()
     
     return {
         "candidate_years": candidate_years,
         "required_min": required_min,
         "required_max": required_max,
         "alignment": alignment,
-        "score": score,
+        "score": profile.experience_points[alignment],
         "alignment_notes": f"{candidate_years} years vs {required_min}-{required_max} required"
     }
 
 
-def fast_rank_candidates(jd_id: str) -> Dict[str, Any]:
+def extract_jd_requirements(jd_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Read scoring inputs from a parsed JD
+
+    Parsed JDs are flat (JDSchema: mandatory_skills, experience_min, location, ...);
+    older documents nest skills and an "X-Y years" experience string under "requirements".
+    """
+    requirements = jd_data.get("requirements", {}) or {}
+    
+    exp_min, exp_max = jd_data.get("experience_min"), jd_data.get("experience_max")
+    if exp_min is None:
+        # Parse experience range (e.g., "5-10 years")
+        exp_range = requirements.get("experience", "")
+        try:
+            exp_parts = exp_range.replace("years", "").replace("+", "").strip().split("-")
+            exp_min = int(exp_parts[0].strip())
+            exp_max = int(exp_parts[1].strip()) if len(exp_parts) > 1 else exp_min + 5
+        except (AttributeError, ValueError):
+            exp_min, exp_max = 0, 100
+    elif exp_max is None or exp_max < exp_min:
+        exp_max = exp_min + 5
+    
+    jd_location = jd_data.get("location", "")
+    if isinstance(jd_location, dict):
+        jd_location = jd_location.get("location_type", "")
+    relocation_allowed = bool(jd_data.get("relocation_allowed", False))
+    
+    return {
+        "mandatory_skills": jd_data.get("mandatory_skills", requirements.get("mandatory_skills", [])) or [],
+        "good_to_have_skills": jd_data.get("good_to_have_skills", requirements.get("good_to_have_skills", [])) or [],
+        "experience_min": exp_min,
+        "experience_max": exp_max,
+        "location": jd_location,
+        "relocation_allowed": relocation_allowed,
+        "salary_min": jd_data.get("salary_min"),
+        "salary_max": jd_data.get("salary_max"),
+        "location_matcher": LocationMatcher(jd_location, relocation_allowed),
+    }
+
+
+def get_candidate_expected_salary(candidate: Dict[str, Any]) -> Optional[int]:
+    """Expected salary if the resume states one"""
+    expected = (
+        candidate.get("candidate_info", {}).get("expected_salary")
+        or candidate.get("parsed_data", {}).get("expected_salary")
+    )
+    try:
+        return int(expected) if expected else None
+    except (TypeError, ValueError):
+        return None
+
+
+def calculate_fit_scores(candidate: Dict[str, Any], jd_requirements: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Location and salary compatibility for one candidate
+
+    Returns:
+        (location match, salary match) - each with a "fit" in [0, 1], or None when unknown
+    """
+    candidate_location = candidate.get("candidate_info", {}).get("location")
+    location = jd_requirements["location_matcher"].match(candidate_location)
+    location_match = {
+        "candidate_location": candidate_location,
+        "jd_location": jd_requirements["location"],
+        "compatibility": location["compatibility"],
+        "fit": location["fit"],
+    }
+    
+    salary = calculate_salary_score(
+        get_candidate_expected_salary(candidate), jd_requirements["salary_min"], jd_requirements["salary_max"]
+    )
+    salary_match = {
+        "alignment": salary["alignment"],
+        "notes": salary["notes"],
+        "fit": None if salary["alignment"] == "Unknown" else salary["score"] / 5,
+    }
+    return location_match, salary_match
+
+
+def get_candidate_skill_list(candidate: Dict[str, Any]) -> List[str]:
+    """Combine all technical skill categories of a parsed resume"""
+    tech_skills = candidate.get("parsed_data", {}).get("technical_skills", {})
+    all_skills = []
+    for skill_category in tech_skills.values():
+        if isinstance(skill_category, list):
+            all_skills.extend(skill_category)
+    return all_skills
+
+
+def score_candidate(
+    candidate: Dict[str, Any],
+    jd_requirements: Dict[str, Any],
+    match_mode: str = "exact",
+    mandatory_match: Optional[Dict[str, Any]] = None,
+    profile: Optional[ScoringProfile] = None,
+    compare_profiles: Optional[List[ScoringProfile]] = None
+) -> Dict[str, Any]:
+    """
+    Score one candidate against the JD requirements
+
+    Args:
+        candidate: Parsed resume document
+        jd_requirements: Output of extract_jd_requirements()
+        match_mode: "exact" or "fuzzy" skill matching
+        mandatory_match: Already computed mandatory skill match (reused by shortlist mode)
+        profile: Scoring profile for weights and cut-offs (defaults to "default")
+        compare_profiles: Extra profiles to score the same components under
+
+    Returns:
+        Ranked candidate entry (without rank number)
+    """
+    profile = profile or get_scoring_profile()
+    candidate_id = candidate.get("candidate_id", "")
+    candidate_info = candidate.get("candidate_info", {})
+    parsed_data = candidate.get("parsed_data", {})
+    evaluation = candidate.get("evaluation", {})
+
+    # Get candidate skills (combine all skill types)
+    all_skills = get_candidate_skill_list(candidate)
+
+    # Calculate skill matches
+    if mandatory_match is None:
+        mandatory_match = calculate_skill_match_score(all_skills, jd_requirements["mandatory_skills"], match_mode)
+    good_to_have_match = calculate_skill_match_score(all_skills, jd_requirements["good_to_have_skills"], match_mode)
+
+    # Calculate experience alignment
+    candidate_years = parsed_data.get("total_experience_years", 0)
+    exp_result = calculate_experience_score(candidate_years, jd_requirements["experience_min"], jd_requirements["experience_max"], profile)
+
+    # Location and salary compatibility (unknown fits fall back to the profile's assumed fit)
+    location_match, salary_match = calculate_fit_scores(candidate, jd_requirements)
+
+    # Calculate total score
+    components = (
+        mandatory_match["coverage_percent"] / 100,
+        good_to_have_match["coverage_percent"] / 100,
+        exp_result["alignment"],
+        location_match["fit"],
+        salary_match["fit"],
+    )
+    match_score = profile.component_scores(*components)
+    total_score = match_score["total_score"]
+
+    entry = {
+        "candidate_id": candidate_id,
+        "candidate_name": candidate_info.get("name", "Unknown"),
+        "candidate_email": candidate_info.get("email", ""),
+        "resume_evaluation_score": evaluation.get("final_score", 0),
+        "match_score": match_score,
+        "skill_match": {
+            "mandatory_matched": mandatory_match["matched"],
+            "mandatory_missing": mandatory_match["missing"],
+            "mandatory_coverage_percent": mandatory_match["coverage_percent"],
+            "good_to_have_matched": good_to_have_match["matched"],
+            "good_to_have_missing": good_to_have_match["missing"],
+            "good_to_have_coverage_percent": good_to_have_match["coverage_percent"]
+        },
+        "experience_match": exp_result,
+        "location_match": location_match,
+        "salary_match": salary_match,
+        "recommendation": profile.recommendation(total_score),
+        "justification": f"Score: {total_score}/100. Skills: {mandatory_match['coverage_percent']}% mandatory, {good_to_have_match['coverage_percent']}% optional. Experience: {exp_result['alignment']}. Location: {location_match['compatibility']}."
+    }
+
+    if compare_profiles:
+        # Same components, alternative weights
+        entry["profile_scores"] = {}
+        for other in compare_profiles:
+            other_total = other.total(components)
+            entry["profile_scores"][other.name] = {
+                "total_score": other_total,
+                "recommendation": other.recommendation(other_total)
+            }
+
+    return entry
+
+
+def select_top_candidates(
+    candidates: List[Dict[str, Any]],
+    jd_requirements: Dict[str, Any],
+    match_mode: str = "exact",
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    profile: Optional[ScoringProfile] = None,
+    compare_profiles: Optional[List[ScoringProfile]] = None
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Shortlist ranking - keeps only the top K candidates and/or those scoring at least min_score
+
+    Mandatory skill coverage is computed for everyone first and gives an upper
+    bound on each candidate's total score. Candidates are then fully scored in
+    descending bound order, and scoring stops as soon as the next bound cannot
+    beat the lowest score in the top-K heap.
+
+    Args:
+        candidates: Parsed resume documents
+        jd_requirements: Output of extract_jd_requirements()
+        match_mode: "exact" or "fuzzy" skill matching
+        top_k: Number of candidates to keep (None = no limit)
+        min_score: Minimum total score to keep (None = no minimum)
+        profile: Scoring profile used for ranking
+        compare_profiles: Extra profiles reported on the retained candidates
+
+    Returns:
+        (retained candidates sorted by score, aggregate counts)
+    """
+    profile = profile or get_scoring_profile()
+    counts = {
+        "pool_size": len(candidates),
+        "fully_scored": 0,
+        "pruned_by_bound": 0,
+        "below_min_score": 0,
+    }
+
+    # Upper bound per candidate from mandatory skill coverage
+    bounded = []
+    for idx, candidate in enumerate(candidates):
+        mandatory_match = calculate_skill_match_score(
+            get_candidate_skill_list(candidate), jd_requirements["mandatory_skills"], match_mode
+        )
+        upper_bound = profile.upper_bound(mandatory_match["coverage_percent"] / 100)
+        if min_score is not None and upper_bound < min_score:
+            counts["below_min_score"] += 1
+            continue
+        bounded.append((upper_bound, idx, mandatory_match))
+
+    bounded.sort(key=lambda b: b[0], reverse=True)
+
+    # Min-heap of (score, -position, entry) - ties keep the earlier candidate
+    heap = []
+    for position, (upper_bound, idx, mandatory_match) in enumerate(bounded):
+        if top_k and len(heap) >= top_k and upper_bound < heap[0][0]:
+            # No remaining candidate can enter the top K
+            counts["pruned_by_bound"] = len(bounded) - position
+            break
+
+        entry = score_candidate(candidates[idx], jd_requirements, match_mode, mandatory_match, profile, compare_profiles)
+        counts["fully_scored"] += 1
+        total_score = entry["match_score"]["total_score"]
+        if min_score is not None and total_score < min_score:
+            counts["below_min_score"] += 1
+            continue
+
+        item = (total_score, -idx, entry)
+        if not top_k or len(heap) < top_k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    retained = [entry for _, _, entry in sorted(heap, key=lambda h: h[:2], reverse=True)]
+    counts["retained"] = len(retained)
+    return retained, counts
+
+
+def compare_profile_rankings(ranked_candidates: List[Dict[str, Any]], profiles: List[ScoringProfile]) -> Dict[str, Any]:
+    """Order and categorize already scored candidates under each comparison profile"""
+    comparison = {}
+    for other in profiles:
+        scored = sorted(
+            ranked_candidates,
+            key=lambda c: c["profile_scores"][other.name]["total_score"],
+            reverse=True
+        )
+        categories = other.categorize(
+            {"candidate_id": c["candidate_id"], "match_score": c["profile_scores"][other.name]} for c in scored
+        )
+        comparison[other.name] = {
+            "ranking": [c["candidate_id"] for c in scored],
+            **categories
+        }
+    return comparison
+
+
+def fast_rank_candidates(
+    jd_id: str,
+    match_mode: str = "exact",
+    semantic_prefilter: bool = False,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    scoring_profile: Optional[str] = None,
+    compare_profiles: Optional[List[str]] = None
+) -> Dict[str, Any]:
     """
     Fast ranking without LLM - uses parsed data directly
+
+    Builds the ranking with build_fast_ranking() and saves it to data/rankings/.
+    """
+    result = build_fast_ranking(
+        jd_id, match_mode, semantic_prefilter, top_k, min_score, scoring_profile, compare_profiles
+    )
+    save_ranking(result)
+    return result
+
+
+def save_ranking(result: Dict[str, Any]) -> Path:
+    """Save a ranking document to data/rankings/{ranking_id}.json"""
+    rankings_dir = Path(__file__).parent.parent.parent / "data" / "rankings"
+    rankings_dir.mkdir(parents=True, exist_ok=True)
+    
+    output_path = rankings_dir / f"{result['ranking_id']}.json"
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2, ensure_ascii=False)
+    
+    print(f"✅ Ranking saved to: {output_path}")
+    print(f"📊 Total: {len(result['ranked_candidates'])}, Top: {len(result['top_candidates'])}, Acceptable: {len(result['acceptable_candidates'])}, Not Recommended: {len(result['not_recommended'])}")
+    return output_path
+
+
+def build_fast_ranking(
+    jd_id: str,
+    match_mode: str = "exact",
+    semantic_prefilter: bool = False,
+    top_k: Optional[int] = None,
+    min_score: Optional[float] = None,
+    scoring_profile: Optional[str] = None,
+    compare_profiles: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    Deterministic ranking document for a JD (not saved)
+
+    match_mode="fuzzy" scores related skills (e.g. "Spring Boot" for "Spring")
+    with partial credit instead of requiring exact matches.
+    semantic_prefilter=True also admits candidates whose profile is semantically
+    close to the JD (e.g. "DevOps Engineer" for "Site Reliability Engineer").
+    top_k / min_score switch to shortlist mode: only the retained candidates are
+    scored in full, together with aggregate counts for the pool.
+    scoring_profile overrides the JD's weight profile (see ranking_agent/scoring_profiles.json);
+    compare_profiles scores the same candidates under extra profiles in the same pass.
     """
     # Load JD
     jd_path = Path(__file__).parent.parent.parent / "data" / "parsed_jds" / f"{jd_id}.json"
@@ -63,29 +404,16 @@ def fast_rank_candidates(jd_id: str) -> Dict[str, Any]:
     with open(jd_path, 'r', encoding='utf-8') as f:
         jd_data = json.load(f)
     
-    # Load all resumes
-    resumes_dir = Path(__file__).parent.parent.parent / "data" / "parsed_resumes"
-    candidate_files = list(resumes_dir.glob("CAND-*.json"))
+    # Resolve scoring profiles up front so bad names fail before any work
+    profile = get_scoring_profile(jd_data, scoring_profile)
+    registry = get_profile_registry()
+    extra_profiles = [registry.get(name) for name in (compare_profiles or []) if name != profile.name]
     
-    all_candidates = []
-    for candidate_file in candidate_files:
-        with open(candidate_file, 'r', encoding='utf-8') as f:
-            all_candidates.append(json.load(f))
-    
-    # FILTER CANDIDATES BY JOB TITLE MATCH
+    # FILTER CANDIDATES BY JOB TITLE MATCH (index lookup - only matched resumes are loaded)
     jd_role = jd_data.get("role_title", jd_data.get("job_title", "")).lower().strip()
-    
-    candidates = []
-    for candidate in all_candidates:
-        candidate_target = candidate.get("candidate_info", {}).get("target_job_title", "").lower().strip()
-        
-        # Simple matching: if JD role contains candidate target or vice versa
-        if jd_role and candidate_target and (jd_role in candidate_target or candidate_target in jd_role):
-            candidates.append(candidate)
-            print(f"  ✓ Matched: {candidate.get('candidate_name', 'Unknown')} ({candidate_target}) for {jd_role}")
-        else:
-            print(f"  ✗ Skipped: {candidate.get('candidate_name', 'Unknown')} ({candidate_target}) - doesn't match {jd_role}")
-    
+    semantic_matches = semantic_title_matches(jd_data) if semantic_prefilter else {}
+    candidates, total_indexed = load_matching_candidates(jd_role, semantic_matches)
+
     if not candidates:
         print(f"⚠️ No candidates matched job title: {jd_role}")
         # Return empty ranking
@@ -105,112 +433,52 @@ def fast_rank_candidates(jd_id: str) -> Dict[str, Any]:
             "top_candidates": [],
             "acceptable_candidates": [],
             "not_recommended": [],
-            "summary": f"No candidates matched the job title: {jd_data.get('role_title', jd_data.get('job_title', 'Unknown'))}. Available candidate titles: {', '.join([c.get('candidate_info', {}).get('target_job_title', 'N/A') for c in all_candidates])}"
+            "summary": f"No candidates matched the job title: {jd_data.get('role_title', jd_data.get('job_title', 'Unknown'))}. Available candidate titles: {', '.join(get_title_index().titles())}"
         }
-        
-        # Save empty ranking
-        rankings_dir = Path(__file__).parent.parent.parent / "data" / "rankings"
-        rankings_dir.mkdir(parents=True, exist_ok=True)
-        output_path = rankings_dir / f"{ranking_id}.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(empty_result, f, indent=2, ensure_ascii=False)
-        
-        print(f"💾 Saved empty ranking: {output_path}")
         return empty_result
     
-    print(f"📊 Filtered to {len(candidates)} matching candidates (from {len(all_candidates)} total)")
+    print(f"📊 Filtered to {len(candidates)} matching candidates (from {total_indexed} total)")
     
-    # Extract JD requirements
-    jd_mandatory_skills = jd_data.get("requirements", {}).get("mandatory_skills", [])
-    jd_good_to_have = jd_data.get("requirements", {}).get("good_to_have_skills", [])
-    exp_range = jd_data.get("requirements", {}).get("experience", "")
+    # Imported here because sharded_ranking builds on this module
+    from .sharded_ranking import sharded_select_top_candidates, PARALLEL_MIN_CANDIDATES
+
+    # Extract JD requirements (location matcher compiled once for the whole pool)
+    jd_requirements = extract_jd_requirements(jd_data)
     
-    # Parse experience range (e.g., "5-10 years")
-    try:
-        exp_parts = exp_range.replace("years", "").replace("+", "").strip().split("-")
-        exp_min = int(exp_parts[0].strip())
-        exp_max = int(exp_parts[1].strip()) if len(exp_parts) > 1 else exp_min + 5
-    except:
-        exp_min, exp_max = 0, 100
-    
-    # Rank each candidate
-    ranked_candidates = []
-    
-    for candidate in candidates:
-        candidate_id = candidate.get("candidate_id", "")
-        candidate_info = candidate.get("candidate_info", {})
-        parsed_data = candidate.get("parsed_data", {})
-        evaluation = candidate.get("evaluation", {})
-        
-        # Get candidate skills (combine all skill types)
-        tech_skills = parsed_data.get("technical_skills", {})
-        all_skills = []
-        for skill_category in tech_skills.values():
-            if isinstance(skill_category, list):
-                all_skills.extend(skill_category)
-        
-        # Calculate skill matches
-        mandatory_match = calculate_skill_match_score(all_skills, jd_mandatory_skills)
-        good_to_have_match = calculate_skill_match_score(all_skills, jd_good_to_have)
-        
-        # Calculate experience score
-        candidate_years = parsed_data.get("total_experience_years", 0)
-        exp_result = calculate_experience_score(candidate_years, exp_min, exp_max)
-        
-        # Calculate total score
-        mandatory_score = (mandatory_match["coverage_percent"] / 100) * 40
-        good_to_have_score = (good_to_have_match["coverage_percent"] / 100) * 20
-        experience_score = exp_result["score"]
-        location_score = 10  # Assuming remote is always OK
-        salary_score = 3  # Default
-        
-        total_score = mandatory_score + good_to_have_score + experience_score + location_score + salary_score
-        
-        # Determine recommendation
-        if total_score >= 70:
-            recommendation = "Highly Recommended"
-        elif total_score >= 50:
-            recommendation = "Recommended"
+    if top_k is None and min_score is None:
+        # Rank each candidate
+        ranked_candidates = [
+            score_candidate(candidate, jd_requirements, match_mode, profile=profile, compare_profiles=extra_profiles)
+            for candidate in candidates
+        ]
+        ranked_candidates.sort(key=lambda x: x["match_score"]["total_score"], reverse=True)
+        aggregate_counts = None
+    else:
+        # Shortlist mode - only fully score candidates that can still make the cut
+        if len(candidates) >= PARALLEL_MIN_CANDIDATES and (os.cpu_count() or 1) > 1:
+            # Large pools are sharded across worker processes
+            ranked_candidates, aggregate_counts = sharded_select_top_candidates(
+                candidates, jd_requirements, match_mode, top_k, min_score, profile=profile, compare_profiles=extra_profiles
+            )
         else:
-            recommendation = "Not Recommended"
-        
-        ranked_candidates.append({
-            "candidate_id": candidate_id,
-            "candidate_name": candidate_info.get("name", "Unknown"),
-            "candidate_email": candidate_info.get("email", ""),
-            "resume_evaluation_score": evaluation.get("final_score", 0),
-            "match_score": {
-                "mandatory_skills_score": round(mandatory_score, 1),
-                "good_to_have_skills_score": round(good_to_have_score, 1),
-                "experience_score": experience_score,
-                "location_score": location_score,
-                "salary_score": salary_score,
-                "total_score": round(total_score, 1)
-            },
-            "skill_match": {
-                "mandatory_matched": mandatory_match["matched"],
-                "mandatory_missing": mandatory_match["missing"],
-                "mandatory_coverage_percent": mandatory_match["coverage_percent"],
-                "good_to_have_matched": good_to_have_match["matched"],
-                "good_to_have_missing": good_to_have_match["missing"],
-                "good_to_have_coverage_percent": good_to_have_match["coverage_percent"]
-            },
-            "experience_match": exp_result,
-            "recommendation": recommendation,
-            "justification": f"Score: {round(total_score, 1)}/100. Skills: {mandatory_match['coverage_percent']}% mandatory, {good_to_have_match['coverage_percent']}% optional. Experience: {exp_result['alignment']}."
-        })
-    
-    # Sort by total score
-    ranked_candidates.sort(key=lambda x: x["match_score"]["total_score"], reverse=True)
+            ranked_candidates, aggregate_counts = select_top_candidates(
+                candidates, jd_requirements, match_mode, top_k, min_score, profile=profile, compare_profiles=extra_profiles
+            )
+        print(f"✂️ Shortlist mode: scored {aggregate_counts['fully_scored']}, pruned {aggregate_counts['pruned_by_bound']} by upper bound")
+    
+    if match_mode == "fuzzy":
+        # Persist similarity rows computed for newly seen skills
+        get_similarity_table().save()
     
     # Add rank numbers
     for i, candidate in enumerate(ranked_candidates):
         candidate["rank"] = i + 1
     
-    # Categorize candidates
-    top_candidates = [c["candidate_id"] for c in ranked_candidates if c["match_score"]["total_score"] >= 70]
-    acceptable_candidates = [c["candidate_id"] for c in ranked_candidates if 50 <= c["match_score"]["total_score"] < 70]
-    not_recommended = [c["candidate_id"] for c in ranked_candidates if c["match_score"]["total_score"] < 50]
+    # Categorize candidates (cut-offs from the scoring profile)
+    categories = profile.categorize(ranked_candidates)
+    top_candidates = categories["top_candidates"]
+    acceptable_candidates = categories["acceptable_candidates"]
+    not_recommended = categories["not_recommended"]
     
     # Create ranking output
     ranking_id = f"RANK-{jd_id}-{int(datetime.now().timestamp())}"
@@ -226,7 +494,9 @@ def fast_rank_candidates(jd_id: str) -> Dict[str, Any]:
         "jd_id": jd_id,
         "jd_title": jd_data.get("role_title", jd_data.get("job_title", "Unknown")),
         "jd_location": jd_location,
-        "total_candidates_evaluated": len(ranked_candidates),
+        "total_candidates_evaluated": len(candidates),
+        "match_mode": match_mode,
+        "scoring_profile": profile.name,
         "ranked_candidates": ranked_candidates,
         "top_candidates": top_candidates,
         "acceptable_candidates": acceptable_candidates,
@@ -234,15 +504,16 @@ def fast_rank_candidates(jd_id: str) -> Dict[str, Any]:
         "summary": f"{len(ranked_candidates)} candidates evaluated. {len(top_candidates)} highly recommended, {len(acceptable_candidates)} acceptable, {len(not_recommended)} not recommended."
     }
     
-    # Save to file
-    rankings_dir = Path(__file__).parent.parent.parent / "data" / "rankings"
-    rankings_dir.mkdir(parents=True, exist_ok=True)
-    
-    output_path = rankings_dir / f"{ranking_id}.json"
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(result, f, indent=2, ensure_ascii=False)
+    if extra_profiles:
+        result["profile_comparison"] = compare_profile_rankings(ranked_candidates, extra_profiles)
     
-    print(f"✅ Fast ranking saved to: {output_path}")
-    print(f"📊 Total: {len(ranked_candidates)}, Top: {len(top_candidates)}, Acceptable: {len(acceptable_candidates)}, Not Recommended: {len(not_recommended)}")
+    if aggregate_counts is not None:
+        result["shortlist"] = {"top_k": top_k, "min_score": min_score}
+        result["aggregate_counts"] = aggregate_counts
+        result["summary"] = (
+            f"{len(candidates)} candidates in pool, {len(ranked_candidates)} retained "
+            f"(top_k={top_k}, min_score={min_score}). {len(top_candidates)} highly recommended, "
+            f"{len(acceptable_candidates)} acceptable, {len(not_recommended)} not recommended."
+        )
     
     return result
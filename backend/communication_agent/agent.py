@@ -26,7 +26,7 @@ from .tools import (
 
 def save_communication_log(callback_context):
     """
-    Callback to save communication results to local JSON file after agent completes.
+    Callback to save communication results to the communication event log after agent completes.
     """
     try:
         # Get the communication data from state
@@ -46,7 +46,7 @@ def save_communication_log(callback_context):
         result = log_communication(comm_dict)
         
         if result.get("status") == "success":
-            print(f"✅ Communication log saved: {result.get('file_path')}")
+            print(f"✅ Communication log saved: {result.get('communication_id')}")
             print(f"📧 Emails Sent: {comm_dict.get('total_sent', 0)}")
             print(f" Failed: {comm_dict.get('total_failed', 0)}")
         else:
@@ -0,0 +1,473 @@
+"""
+Append-only communication log (data/communications/events.db)
+
+Every email produces events instead of one JSON file per campaign being
+rewritten:
+
+    queued     added to the outbox
+    sent       accepted by the mail server
+    deferred   temporary failure, the outbox retries it
+    failed     gave up (attempts exhausted, or sent directly and failed)
+    bounced    recipient rejected by the mail server (5xx)
+
+Events are only ever inserted (UPDATE / DELETE on the table are rejected).
+They are indexed by communication_id, job_id, ranking_id, candidate_id and
+time. The campaigns table holds one row per communication batch with
+per-event counters, which a trigger keeps current, so listing campaigns does
+not read the events at all.
+
+Campaign logs written as COMM-*.json files by earlier versions are imported
+once when the database is created.
+"""
+
+import json
+import secrets
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+COMMUNICATIONS_DIR = Path(__file__).parent.parent / "data" / "communications"
+EVENT_LOG_PATH = COMMUNICATIONS_DIR / "events.db"
+
+EVENTS = ("queued", "sent", "deferred", "failed", "bounced")
+
+# Final events - the latest of these is a recipient's status in a campaign
+_FINAL = ("sent", "failed", "bounced")
+
+
+def new_communication_id() -> str:
+    """Unique communication batch ID (COMM-YYYYMMDD-HHMMSS-xxxxxx)."""
+    return f"COMM-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+def _timestamp(value: Optional[str]) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(value).timestamp() if value else None
+    except (TypeError, ValueError):
+        return None
+
+
+class CommunicationLog:
+    """
+    SQLite event log of all communications.
+
+    Tables:
+        events(id, ts, communication_id, job_id, ranking_id, candidate_id, email,
+               candidate_name, type, event, message_id, error)      - append-only
+        campaigns(communication_id, job_id, ranking_id, job_title, pipeline, summary,
+                  total_shortlisted, created_at, queued, sent, deferred, failed, bounced)
+    """
+
+    def __init__(self, path: Path = EVENT_LOG_PATH, import_dir: Optional[Path] = COMMUNICATIONS_DIR):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_tables()
+        if import_dir is not None:
+            self._import_legacy(Path(import_dir))
+
+    def _create_tables(self):
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS campaigns (
+                communication_id TEXT PRIMARY KEY,
+                job_id TEXT,
+                ranking_id TEXT,
+                job_title TEXT,
+                pipeline TEXT,
+                summary TEXT,
+                total_shortlisted INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                queued INTEGER NOT NULL DEFAULT 0,
+                sent INTEGER NOT NULL DEFAULT 0,
+                deferred INTEGER NOT NULL DEFAULT 0,
+                failed INTEGER NOT NULL DEFAULT 0,
+                bounced INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS campaigns_created ON campaigns (created_at);
+            CREATE INDEX IF NOT EXISTS campaigns_job ON campaigns (job_id, created_at);
+            CREATE INDEX IF NOT EXISTS campaigns_ranking ON campaigns (ranking_id, created_at);
+
+            CREATE TABLE IF NOT EXISTS events (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                communication_id TEXT NOT NULL,
+                job_id TEXT,
+                ranking_id TEXT,
+                candidate_id TEXT,
+                email TEXT,
+                candidate_name TEXT,
+                type TEXT,
+                event TEXT NOT NULL,
+                message_id TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS events_campaign ON events (communication_id, id);
+            CREATE INDEX IF NOT EXISTS events_candidate ON events (candidate_id, ts);
+            CREATE INDEX IF NOT EXISTS events_job ON events (job_id, ts);
+            CREATE INDEX IF NOT EXISTS events_ranking ON events (ranking_id, ts);
+            CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+
+            CREATE TRIGGER IF NOT EXISTS events_count AFTER INSERT ON events BEGIN
+                INSERT OR IGNORE INTO campaigns (communication_id, job_id, ranking_id, created_at)
+                VALUES (NEW.communication_id, NEW.job_id, NEW.ranking_id, NEW.ts);
+                UPDATE campaigns SET
+                    queued = queued + (NEW.event = 'queued'),
+                    sent = sent + (NEW.event = 'sent'),
+                    deferred = deferred + (NEW.event = 'deferred'),
+                    failed = failed + (NEW.event = 'failed'),
+                    bounced = bounced + (NEW.event = 'bounced')
+                WHERE communication_id = NEW.communication_id;
+            END;
+            CREATE TRIGGER IF NOT EXISTS events_no_update BEFORE UPDATE ON events BEGIN
+                SELECT RAISE(ABORT, 'events are append-only');
+            END;
+            CREATE TRIGGER IF NOT EXISTS events_no_delete BEFORE DELETE ON events BEGIN
+                SELECT RAISE(ABORT, 'events are append-only');
+            END;
+
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+        """)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, events: List[Dict[str, Any]]):
+        """
+        Appends events (one transaction)
+
+        Args:
+            events: [{"communication_id", "event", "candidate_id", "email", "candidate_name",
+                      "job_id", "ranking_id", "type", "message_id", "error", "ts" (default now)}]
+        """
+        if not events:
+            return
+        now = time.time()
+        rows = []
+        for event in events:
+            if event["event"] not in EVENTS:
+                raise ValueError(f"Unknown communication event: {event['event']}")
+            rows.append((
+                event.get("ts") or now, event["communication_id"], event.get("job_id"), event.get("ranking_id"),
+                event.get("candidate_id"), event.get("email"), event.get("candidate_name"),
+                event.get("type", "shortlist"), event["event"], event.get("message_id"), event.get("error"),
+            ))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO events (ts, communication_id, job_id, ranking_id, candidate_id, email, "
+                    "candidate_name, type, event, message_id, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def exists(self, communication_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM campaigns WHERE communication_id = ?", (communication_id,)
+            ).fetchone() is not None
+
+    def record_campaign(self, document: Dict[str, Any], record_emails: bool = False):
+        """
+        Creates or updates a campaign's metadata from a CommunicationOutput document
+
+        Args:
+            document: Communication batch (communication_id, job_id, ranking_id,
+                job_title, summary, total_shortlisted, pipeline, emails_sent)
+            record_emails: Also append one sent/failed event per entry of
+                emails_sent - for batches that were sent directly, not through the outbox
+        """
+        communication_id = document["communication_id"]
+        created_at = _timestamp(document.get("logged_at")) or time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO campaigns (communication_id, job_id, ranking_id, job_title, pipeline, summary, "
+                "total_shortlisted, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (communication_id) DO UPDATE SET job_id = COALESCE(excluded.job_id, job_id), "
+                "ranking_id = COALESCE(excluded.ranking_id, ranking_id), job_title = excluded.job_title, "
+                "pipeline = excluded.pipeline, summary = excluded.summary, total_shortlisted = excluded.total_shortlisted",
+                (communication_id, document.get("job_id"), document.get("ranking_id"), document.get("job_title"),
+                 document.get("pipeline", "agent"), document.get("summary"), document.get("total_shortlisted", 0),
+                 created_at)
+            )
+        if record_emails:
+            self.append([
+                {
+                    "ts": _timestamp(email.get("sent_at")) or created_at,
+                    "communication_id": communication_id,
+                    "job_id": document.get("job_id"),
+                    "ranking_id": document.get("ranking_id"),
+                    "candidate_id": email.get("candidate_id"),
+                    "email": email.get("email"),
+                    "candidate_name": email.get("candidate_name"),
+                    "type": email.get("type", "shortlist"),
+                    "event": "sent" if email.get("status") == "sent" else "failed",
+                    "message_id": email.get("message_id"),
+                    "error": email.get("error_message"),
+                }
+                for email in document.get("emails_sent") or []
+            ])
+
+    def _import_legacy(self, directory: Path):
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_imported'").fetchone():
+                return
+        imported = 0
+        for path in sorted(directory.glob("COMM-*.json")):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    document = json.load(f)
+                document.setdefault("communication_id", path.stem)
+                if not self.exists(document["communication_id"]):
+                    self.record_campaign(document, record_emails=True)
+                    imported += 1
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Skipping communication log {path.name}: {e}")
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_imported', ?)", (str(imported),))
+        if imported:
+            print(f"📥 Imported {imported} communication logs into the event log")
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _campaign_row(row: sqlite3.Row) -> Dict[str, Any]:
+        return {
+            "communication_id": row["communication_id"],
+            "job_id": row["job_id"],
+            "ranking_id": row["ranking_id"],
+            "job_title": row["job_title"],
+            "pipeline": row["pipeline"],
+            "summary": row["summary"],
+            "total_shortlisted": row["total_shortlisted"],
+            "logged_at": _iso(row["created_at"]),
+            "queued": row["queued"],
+            "sent": row["sent"],
+            "deferred": row["deferred"],
+            "failed": row["failed"],
+            "bounced": row["bounced"],
+        }
+
+    def campaigns(self, job_id: Optional[str] = None, ranking_id: Optional[str] = None,
+                  limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Communication batches, newest first, with their event counters."""
+        query = "SELECT * FROM campaigns"
+        params: List[Any] = []
+        if job_id:
+            query += " WHERE job_id = ?"
+            params.append(job_id)
+        elif ranking_id:
+            query += " WHERE ranking_id = ?"
+            params.append(ranking_id)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            return [self._campaign_row(row) for row in self._conn.execute(query, params)]
+
+    def _events(self, where: str, params: List[Any], limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        query = f"SELECT * FROM events WHERE {where} ORDER BY ts, id"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [
+            {
+                "at": _iso(row["ts"]),
+                "event": row["event"],
+                "communication_id": row["communication_id"],
+                "job_id": row["job_id"],
+                "ranking_id": row["ranking_id"],
+                "candidate_id": row["candidate_id"],
+                "email": row["email"],
+                "candidate_name": row["candidate_name"],
+                "type": row["type"],
+                "message_id": row["message_id"],
+                "error": row["error"],
+            }
+            for row in rows
+        ]
+
+    def candidate_history(self, candidate_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """All communication events of one candidate, oldest first."""
+        return self._events("candidate_id = ?", [candidate_id], limit)
+
+    @staticmethod
+    def _recipients(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Folds a campaign's events into each recipient's current state."""
+        emails: Dict[Any, Dict[str, Any]] = {}
+        for event in events:
+            email = emails.setdefault(event["candidate_id"] or event["email"], {
+                "candidate_id": event["candidate_id"],
+                "email": event["email"],
+                "candidate_name": event["candidate_name"],
+                "type": event["type"],
+                "status": "queued",
+                "message_id": None,
+                "sent_at": None,
+                "error_message": None,
+                "attempts": 0,
+            })
+            if event["event"] == "queued":
+                continue
+            email["attempts"] += 1
+            # A late deferral never hides a final outcome
+            if email["status"] in _FINAL and event["event"] not in _FINAL:
+                continue
+            email["status"] = "retrying" if event["event"] == "deferred" else event["event"]
+            email["message_id"] = event["message_id"] or email["message_id"]
+            email["error_message"] = event["error"] if event["event"] != "sent" else None
+            email["sent_at"] = event["at"]
+        return list(emails.values())
+
+    def campaign(self, communication_id: str) -> Optional[Dict[str, Any]]:
+        """
+        A communication batch in the CommunicationOutput shape
+
+        emails_sent holds each recipient's current status: the latest of
+        sent / failed / bounced, otherwise "retrying" (deferred) or "queued".
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM campaigns WHERE communication_id = ?", (communication_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        document = self._campaign_row(row)
+        emails = self._recipients(self._events("communication_id = ?", [communication_id]))
+        statuses = [email["status"] for email in emails]
+        document.update(
+            emails_sent=emails,
+            total_sent=statuses.count("sent"),
+            total_failed=statuses.count("failed") + statuses.count("bounced"),
+            total_bounced=statuses.count("bounced"),
+            total_pending=statuses.count("queued") + statuses.count("retrying"),
+        )
+        return document
+
+    def campaign_stats(self, communication_id: str) -> Optional[Dict[str, Any]]:
+        """Recipient status counts, event counts and timing of one campaign."""
+        if not self.exists(communication_id):
+            return None
+        events = self._events("communication_id = ?", [communication_id])
+        statuses = [email["status"] for email in self._recipients(events)]
+        first = events[0]["at"] if events else None
+        last = events[-1]["at"] if events else None
+        return {
+            "communication_id": communication_id,
+            "recipients": len(statuses),
+            **{status: statuses.count(status) for status in ("sent", "failed", "bounced", "retrying", "queued")},
+            "delivery_rate": round(statuses.count("sent") / len(statuses), 3) if statuses else 0.0,
+            "events": {name: sum(1 for e in events if e["event"] == name) for name in EVENTS},
+            "first_event_at": first,
+            "last_event_at": last,
+            "duration_seconds": round(
+                (datetime.fromisoformat(last) - datetime.fromisoformat(first)).total_seconds(), 3
+            ) if events else 0.0,
+        }
+
+
+_log: Optional[CommunicationLog] = None
+_log_lock = threading.Lock()
+
+
+def get_communication_log() -> CommunicationLog:
+    """Returns the process-wide communication log."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = CommunicationLog()
+    return _log
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import tempfile
+
+    campaigns = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    recipients = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    def timed(label: str, call, repeat: int = 20):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = call()
+        elapsed = (time.perf_counter() - started) / repeat
+        print(f"  {label:<40} {elapsed * 1000:9.2f} ms")
+        return result
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        log = CommunicationLog(tmp / "events.db", import_dir=None)
+        print(f"🧪 {campaigns:,} campaigns x {recipients} recipients "
+              f"({campaigns * recipients:,} emails, ~{campaigns * recipients * 2:,} events)")
+
+        started = time.perf_counter()
+        for c in range(campaigns):
+            communication_id = f"COMM-BENCH-{c:05d}"
+            job_id = f"JD-{c % 50:03d}"
+            document = {
+                "communication_id": communication_id, "job_id": job_id, "ranking_id": f"RANK-{job_id}-{c}",
+                "job_title": "Backend Engineer", "summary": "bench", "total_shortlisted": recipients,
+                "pipeline": "direct", "emails_sent": [],
+            }
+            log.record_campaign(document)
+            base = time.time() - (campaigns - c) * 60
+            emails = []
+            for r in range(recipients):
+                candidate = {"communication_id": communication_id, "job_id": job_id,
+                             "ranking_id": document["ranking_id"], "candidate_id": f"CAND-{random.randrange(20000):05d}",
+                             "email": f"c{r}@example.com", "candidate_name": f"Candidate {r}"}
+                emails.append({**candidate, "event": "queued", "ts": base})
+                outcome = random.random()
+                emails.append({**candidate, "ts": base + 1,
+                               "event": "sent" if outcome < 0.9 else "deferred" if outcome < 0.97 else "bounced"})
+            log.append(emails)
+
+            # The per-campaign JSON file the old log_communication() wrote
+            with open(tmp / f"{communication_id}.json", "w", encoding="utf-8") as f:
+                json.dump({**document, "logged_at": datetime.now().isoformat(),
+                           "emails_sent": [{**e, "status": e["event"]} for e in emails[1::2]]}, f, indent=2)
+        print(f"📥 Loaded in {time.perf_counter() - started:.1f}s")
+
+        def reparse_all():
+            items = []
+            for path in tmp.glob("COMM-*.json"):
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                items.append((data.get("logged_at", ""), data["communication_id"], len(data["emails_sent"])))
+            return sorted(items, reverse=True)
+
+        print("⏱️ Query latency")
+        timed("old: reparse every COMM-*.json", reparse_all, repeat=1)
+        timed("list newest 100 campaigns", lambda: log.campaigns(limit=100))
+        timed("list campaigns of one JD", lambda: log.campaigns(job_id="JD-007"))
+        history = timed("candidate history", lambda: log.candidate_history("CAND-01234"))
+        timed("campaign detail", lambda: log.campaign(f"COMM-BENCH-{campaigns // 2:05d}"))
+        stats = timed("campaign stats", lambda: log.campaign_stats(f"COMM-BENCH-{campaigns // 2:05d}"))
+        print(f"✅ Candidate CAND-01234: {len(history)} events; campaign stats: {stats['sent']} sent, "
+              f"{stats['retrying']} retrying, {stats['bounced']} bounced")
+
+        try:
+            log._conn.execute("DELETE FROM events WHERE id = 1")
+        except sqlite3.DatabaseError as e:
+            print(f"🔒 DELETE rejected: {e}")
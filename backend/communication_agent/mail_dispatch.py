@@ -0,0 +1,397 @@
+"""
+Bulk email dispatch over pooled SMTP connections or one SendGrid client
+
+send_shortlist_email() used to connect, STARTTLS, log in and QUIT for every
+candidate, and build a new SendGridAPIClient per call. MailDispatcher keeps
+the transport open instead:
+
+- SMTP: up to SMTP_POOL_SIZE authenticated connections are reused across
+  messages (recycled after SMTP_MAX_MESSAGES_PER_CONNECTION, replaced when the
+  server drops them)
+- SendGrid: one API client for the process
+
+send_batch() sends on MAIL_DISPATCH_WORKERS threads and returns one result per
+recipient, in input order.
+"""
+
+import os
+import queue
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import Message
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formataddr, make_msgid, parseaddr
+from typing import Any, Dict, List, Optional
+
+
+# Concurrent sends per batch
+DISPATCH_WORKERS = int(os.getenv("MAIL_DISPATCH_WORKERS", "8"))
+
+# Open SMTP connections kept for reuse (one per worker by default)
+SMTP_POOL_SIZE = int(os.getenv("SMTP_POOL_SIZE", str(DISPATCH_WORKERS)))
+
+# Reconnect after this many messages - many providers cap messages per session
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
+
+SMTP_TIMEOUT = 30
+
+
+def new_message_id(from_email: Optional[str] = None) -> str:
+    """A fresh Message-ID in the sender's domain."""
+    from_email = from_email or os.getenv("FROM_EMAIL", "recruitment@onix-coe.com")
+    return make_msgid(domain=from_email.rsplit("@", 1)[-1])
+
+
+def build_message(recipient: str, subject: str, html: str, text: Optional[str] = None,
+                  from_email: Optional[str] = None, from_name: Optional[str] = None,
+                  message_id: Optional[str] = None) -> Message:
+    """
+    MIME message for one recipient (text/plain + text/html when text is given)
+
+    Args:
+        recipient: To address
+        subject: Subject line
+        html: HTML body
+        text: Optional plain-text alternative
+        from_email: Sender address (FROM_EMAIL by default)
+        from_name: Sender display name (FROM_NAME by default)
+        message_id: Message-ID to reuse (a resend of the same email keeps its ID)
+
+    Returns:
+        email.message.Message with a Message-ID
+    """
+    from_email = from_email or os.getenv("FROM_EMAIL", "recruitment@onix-coe.com")
+    from_name = from_name or os.getenv("FROM_NAME", "Onix Recruitment Team")
+
+    # email.mime (compat32) instead of EmailMessage: the same wire format, built ~20x faster
+    if text:
+        msg = MIMEMultipart("alternative")
+        msg.attach(MIMEText(text, "plain", "utf-8"))
+        msg.attach(MIMEText(html, "html", "utf-8"))
+    else:
+        msg = MIMEText(html, "html", "utf-8")
+    msg["Subject"] = subject
+    msg["From"] = formataddr((from_name, from_email))
+    msg["To"] = recipient
+    msg["Message-ID"] = message_id or new_message_id(from_email)
+    return msg
+
+
+# ============================================================================
+# Transports
+# ============================================================================
+
+class SMTPConnectionPool:
+    """
+    Pool of authenticated SMTP connections.
+
+    security is "starttls" (SMTP + STARTTLS, port 587), "ssl" (implicit TLS,
+    port 465) or "none" (plain, for local relays and test servers).
+    """
+
+    method = "smtp"
+
+    def __init__(self, host: str, port: int, user: Optional[str] = None, password: Optional[str] = None,
+                 security: str = "starttls", size: int = SMTP_POOL_SIZE,
+                 max_messages: int = SMTP_MAX_MESSAGES_PER_CONNECTION, timeout: float = SMTP_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.security = security
+        self.size = max(1, size)
+        self.max_messages = max_messages
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.security == "ssl":
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == "starttls":
+                server.starttls()
+        if self.password:
+            server.login(self.user, self.password)
+        with self._lock:
+            self.connections_opened += 1
+        server.messages_sent = 0
+        return server
+
+    @staticmethod
+    def _close(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def _acquire(self) -> smtplib.SMTP:
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, server: smtplib.SMTP, broken: bool = False):
+        if broken or server.messages_sent >= self.max_messages:
+            self._close(server)
+        else:
+            self._idle.put(server)
+        self._slots.release()
+
+    def send(self, msg: Message) -> str:
+        """Sends one message on a pooled connection; returns its Message-ID."""
+        for attempt in range(2):
+            server = self._acquire()
+            try:
+                server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # Idle connection closed by the server - retry once on a fresh one
+                self._release(server, broken=True)
+                if attempt:
+                    raise
+                continue
+            except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError):
+                # The server rejected this message; the connection is still usable (smtplib sent RSET)
+                server.messages_sent += 1
+                self._release(server)
+                raise
+            except Exception:
+                self._release(server, broken=True)
+                raise
+            server.messages_sent += 1
+            self._release(server)
+            return msg["Message-ID"]
+
+    def close(self):
+        """Closes all idle connections."""
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+class SendGridTransport:
+    """One SendGridAPIClient reused for every message."""
+
+    method = "sendgrid"
+
+    def __init__(self, api_key: str):
+        from sendgrid import SendGridAPIClient
+
+        self.client = SendGridAPIClient(api_key)
+
+    def send(self, msg: Message) -> str:
+        from sendgrid.helpers.mail import Mail
+
+        bodies = {
+            part.get_content_subtype(): part.get_payload(decode=True).decode(part.get_content_charset() or "utf-8")
+            for part in msg.walk() if part.get_content_maintype() == "text"
+        }
+        sender_name, sender_email = parseaddr(str(msg["From"]))
+        message = Mail(
+            from_email=(sender_email, sender_name or None),
+            to_emails=str(msg["To"]),
+            subject=str(msg["Subject"]),
+            html_content=bodies.get("html"),
+            plain_text_content=bodies.get("plain")
+        )
+        response = self.client.send(message)
+        return response.headers.get("X-Message-Id", "unknown")
+
+    def close(self):
+        pass
+
+
+def transport_from_env():
+    """
+    SendGrid when SENDGRID_API_KEY is set, else an SMTP pool from SMTP_* settings
+
+    Raises:
+        ValueError: If no email service is configured
+    """
+    sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
+    if sendgrid_api_key:
+        return SendGridTransport(sendgrid_api_key)
+
+    smtp_host = os.getenv("SMTP_HOST")
+    if not smtp_host:
+        raise ValueError("No email service configured. Please set either SENDGRID_API_KEY or SMTP_HOST in environment")
+
+    use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+    security = os.getenv("SMTP_SECURITY", "starttls" if use_tls else "ssl").lower()
+    password = os.getenv("SMTP_PASSWORD")
+    if security != "none" and not password:
+        raise ValueError("SMTP_PASSWORD not configured in environment")
+    return SMTPConnectionPool(
+        host=smtp_host,
+        port=int(os.getenv("SMTP_PORT", "587")),
+        user=os.getenv("SMTP_USER", os.getenv("FROM_EMAIL", "recruitment@onix-coe.com")),
+        password=password,
+        security=security
+    )
+
+
+def is_permanent_failure(error: Exception) -> bool:
+    """True when resending cannot help - every recipient was rejected with a 5xx code."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return bool(error.recipients) and all(code >= 500 for code, _ in error.recipients.values())
+    return False
+
+
+# ============================================================================
+# Dispatcher
+# ============================================================================
+
+class MailDispatcher:
+    """Sends messages over one transport on a bounded worker pool."""
+
+    def __init__(self, transport, workers: int = DISPATCH_WORKERS):
+        self.transport = transport
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="mail-dispatch")
+
+    def send(self, msg: Message, candidate_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Sends one message
+
+        Returns:
+            {"recipient", "candidate_id", "status": "sent" | "failed", "method",
+             "message_id", "sent_at", "error", "permanent"} - permanent marks
+            failures a retry cannot fix (rejected recipient)
+        """
+        result = {
+            "recipient": str(msg["To"]),
+            "candidate_id": candidate_id,
+            "method": self.transport.method,
+        }
+        try:
+            message_id = self.transport.send(msg)
+            result.update(status="sent", message_id=message_id, error=None, permanent=False)
+        except Exception as e:
+            result.update(status="failed", message_id=None, error=str(e), permanent=is_permanent_failure(e))
+        result["sent_at"] = datetime.now().isoformat()
+        return result
+
+    def send_batch(self, messages: List[Message], candidate_ids: Optional[List[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Sends a batch concurrently
+
+        Args:
+            messages: One message per recipient
+            candidate_ids: Optional candidate ID per message (echoed in the results)
+
+        Returns:
+            One send() result per message, in input order
+        """
+        candidate_ids = candidate_ids or [None] * len(messages)
+        return list(self._executor.map(self.send, messages, candidate_ids))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.transport.close()
+
+
+_dispatcher: Optional[MailDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_mail_dispatcher() -> MailDispatcher:
+    """
+    Returns the process-wide dispatcher for the configured email service
+
+    Raises:
+        ValueError: If no email service is configured
+    """
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = MailDispatcher(transport_from_env())
+    return _dispatcher
+
+
+if __name__ == "__main__":
+    import asyncio
+    import socket
+    import sys
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("The benchmark needs aiosmtpd: pip install -r requirements-dev.txt")
+
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    handshake_latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.03
+    message_latency = float(sys.argv[3]) if len(sys.argv) > 3 else 0.005
+
+    class CountingHandler:
+        """Local SMTP stand-in; EHLO latency stands in for TLS + AUTH round-trips."""
+
+        def __init__(self):
+            self.connections = 0
+            self.messages = 0
+
+        async def handle_EHLO(self, server, session, envelope, hostname, responses):
+            self.connections += 1
+            session.host_name = hostname
+            await asyncio.sleep(handshake_latency)
+            return responses
+
+        async def handle_DATA(self, server, session, envelope):
+            self.messages += 1
+            await asyncio.sleep(message_latency)
+            return "250 Message accepted for delivery"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    messages = [
+        build_message(f"candidate{i}@example.com", "Exciting Opportunity - Backend Engineer",
+                      f"<p>Congratulations, Candidate {i}!</p>", f"Congratulations, Candidate {i}!")
+        for i in range(recipients)
+    ]
+    print(f"🧪 {recipients} recipients, aiosmtpd on port {port} "
+          f"({handshake_latency * 1000:.0f} ms handshake, {message_latency * 1000:.0f} ms per message)")
+
+    def report(label: str, elapsed: float, results: List[Dict[str, Any]]):
+        sent = sum(1 for r in results if r["status"] == "sent")
+        print(f"{label:<40} {elapsed:6.2f}s  {recipients / elapsed:7.1f} msg/s  "
+              f"{sent} sent, {handler.connections} connections")
+        handler.connections = handler.messages = 0
+
+    # Before: connect, send and QUIT per recipient, one after another
+    started = time.perf_counter()
+    results = []
+    for msg in messages:
+        server = smtplib.SMTP("127.0.0.1", port, timeout=SMTP_TIMEOUT)
+        server.send_message(msg)
+        server.quit()
+        results.append({"status": "sent"})
+    report("🐢 New connection per email, sequential", time.perf_counter() - started, results)
+
+    for workers in (1, DISPATCH_WORKERS, 32):
+        dispatcher = MailDispatcher(SMTPConnectionPool("127.0.0.1", port, security="none", size=workers), workers=workers)
+        started = time.perf_counter()
+        results = dispatcher.send_batch(messages, [f"CAND-{i}" for i in range(recipients)])
+        report(f"⚡ Pooled, {workers} workers", time.perf_counter() - started, results)
+        dispatcher.close()
+
+    controller.stop()
@@ -0,0 +1,548 @@
+"""
+Persistent email outbox (data/communications/outbox.db)
+
+Emails are not sent by the request that creates them. They are written to a
+SQLite outbox keyed by (ranking_id, candidate_id, template), and background
+workers drain it:
+
+- idempotent: enqueueing a recipient that is already in the outbox is a no-op,
+  so re-running a campaign never emails anyone twice (each row also keeps a
+  fixed Message-ID)
+- rate limited: a token bucket (OUTBOX_RATE_PER_SECOND / OUTBOX_BURST) paces
+  all workers together
+- retried: failed sends are rescheduled with exponential backoff and jitter
+  until OUTBOX_MAX_ATTEMPTS; rejected recipients (5xx) fail immediately
+- crash-safe: a claimed row is leased for OUTBOX_LEASE_SECONDS, so rows of a
+  worker that died are picked up again
+- logged: rows queued with a communication_id append their queued / sent /
+  deferred / failed / bounced events to the communication log (event_log.py)
+
+Row status: pending -> sending -> sent | failed (pending again while retries remain).
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .event_log import CommunicationLog, get_communication_log
+from .mail_dispatch import get_mail_dispatcher, new_message_id
+from .tools import render_email, render_emails
+
+
+OUTBOX_PATH = Path(__file__).parent.parent / "data" / "communications" / "outbox.db"
+
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "2"))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "32"))
+
+# Sends per second across all workers (0 = unlimited) and the burst allowed
+OUTBOX_RATE_PER_SECOND = float(os.getenv("OUTBOX_RATE_PER_SECOND", "10"))
+OUTBOX_BURST = int(os.getenv("OUTBOX_BURST", "20"))
+
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_BACKOFF_BASE_SECONDS = float(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "30"))
+OUTBOX_MAX_BACKOFF_SECONDS = float(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", "3600"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+
+POLL_SECONDS = 1.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket; rate 0 disables it."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def take(self, wanted: int) -> int:
+        """Blocks until at least one token is available; takes up to wanted."""
+        if self.rate <= 0:
+            return wanted
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    taken = min(wanted, int(self._tokens))
+                    self._tokens -= taken
+                    return taken
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def refund(self, tokens: int):
+        if self.rate <= 0 or tokens <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + tokens)
+
+
+# ============================================================================
+# Outbox
+# ============================================================================
+
+class EmailOutbox:
+    """
+    SQLite outbox with background drain workers.
+
+    Table:
+        outbox(id, ranking_id, candidate_id, template, job_id, recipient, payload, status,
+               attempts, next_attempt_at, lease_until, last_error, message_id,
+               created_at, updated_at, sent_at)
+    """
+
+    def __init__(self, path: Path = OUTBOX_PATH, workers: int = OUTBOX_WORKERS,
+                 rate_per_second: float = OUTBOX_RATE_PER_SECOND, burst: int = OUTBOX_BURST,
+                 max_attempts: int = OUTBOX_MAX_ATTEMPTS, backoff_base: float = OUTBOX_BACKOFF_BASE_SECONDS,
+                 max_backoff: float = OUTBOX_MAX_BACKOFF_SECONDS, dispatcher=None,
+                 event_log: Optional[CommunicationLog] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self._dispatcher = dispatcher
+        # Receives queued / sent / deferred / failed / bounced events of rows with a communication_id
+        self.event_log = event_log
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._create_tables()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def _create_tables(self):
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ranking_id TEXT NOT NULL,
+                candidate_id TEXT NOT NULL,
+                template TEXT NOT NULL,
+                job_id TEXT,
+                recipient TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                lease_until REAL,
+                last_error TEXT,
+                message_id TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                sent_at REAL,
+                UNIQUE (ranking_id, candidate_id, template)
+            );
+            CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+            CREATE INDEX IF NOT EXISTS outbox_sent ON outbox (sent_at);
+        """)
+
+    # ------------------------------------------------------------------
+    # Enqueue
+    # ------------------------------------------------------------------
+
+    def existing(self, ranking_id: str, template: str, candidate_ids: Iterable[str]) -> set:
+        """Candidate IDs of the campaign that are already in the outbox."""
+        ids = list(candidate_ids)
+        found = set()
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                found.update(row[0] for row in self._conn.execute(
+                    f"SELECT candidate_id FROM outbox WHERE ranking_id = ? AND template = ? "
+                    f"AND candidate_id IN ({','.join('?' * len(chunk))})",
+                    [ranking_id, template, *chunk]
+                ))
+        return found
+
+    def enqueue(self, ranking_id: str, template: str, items: List[Dict[str, Any]], job_id: Optional[str] = None) -> Dict[str, List[str]]:
+        """
+        Adds recipients to the outbox (idempotent)
+
+        Args:
+            ranking_id: Campaign the emails belong to
+            template: Template name, rendered by tools.render_emails()
+            items: Template payloads, each with "candidate_id" and "email"
+            job_id: JD of the campaign
+
+        Returns:
+            {"queued": candidate IDs added, "duplicates": candidate IDs already in the outbox}
+        """
+        now = time.time()
+        queued, duplicates = [], []
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for item in items:
+                    payload = {**item, "message_id": item.get("message_id") or new_message_id()}
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO outbox (ranking_id, candidate_id, template, job_id, recipient, payload, "
+                        "next_attempt_at, message_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (ranking_id, item["candidate_id"], template, job_id, item["email"],
+                         json.dumps(payload, ensure_ascii=False), now, payload["message_id"], now, now)
+                    )
+                    (queued if cursor.rowcount else duplicates).append(item["candidate_id"])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if queued and self.event_log is not None:
+            new = set(queued)
+            self.event_log.append([
+                self._event(ranking_id, template, item, "queued", now)
+                for item in items if item["candidate_id"] in new and item.get("communication_id")
+            ])
+        if queued:
+            self.start()
+            self._wakeup.set()
+        return {"queued": queued, "duplicates": duplicates}
+
+    @staticmethod
+    def _event(ranking_id: str, template: str, payload: Dict[str, Any], event: str, ts: float,
+               error: Optional[str] = None) -> Dict[str, Any]:
+        return {
+            "ts": ts, "communication_id": payload["communication_id"], "event": event,
+            "job_id": payload.get("job_id"), "ranking_id": ranking_id, "candidate_id": payload["candidate_id"],
+            "email": payload.get("email"), "candidate_name": payload.get("name"), "type": template,
+            "message_id": payload.get("message_id"), "error": error,
+        }
+
+    def requeue_failed(self, ranking_id: Optional[str] = None) -> int:
+        """Gives failed emails (all, or of one campaign) a fresh set of attempts."""
+        now = time.time()
+        query = "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ?, updated_at = ? WHERE status = 'failed'"
+        params: List[Any] = [now, now]
+        if ranking_id:
+            query += " AND ranking_id = ?"
+            params.append(ranking_id)
+        with self._lock:
+            count = self._conn.execute(query, params).rowcount
+        if count:
+            self.start()
+            self._wakeup.set()
+        return count
+
+    # ------------------------------------------------------------------
+    # Draining
+    # ------------------------------------------------------------------
+
+    def claim(self, limit: int) -> List[Dict[str, Any]]:
+        """Leases up to limit due rows (pending, or sending with an expired lease)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT id, ranking_id, candidate_id, template, payload, attempts FROM outbox "
+                    "WHERE (status = 'pending' AND next_attempt_at <= ?) OR (status = 'sending' AND lease_until < ?) "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (now, now, limit)
+                ).fetchall()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE outbox SET status = 'sending', attempts = attempts + 1, lease_until = ?, updated_at = ? "
+                        f"WHERE id IN ({','.join('?' * len(rows))})",
+                        [now + OUTBOX_LEASE_SECONDS, now, *(row[0] for row in rows)]
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [
+            {"id": row[0], "ranking_id": row[1], "candidate_id": row[2], "template": row[3],
+             "payload": json.loads(row[4]), "attempts": row[5] + 1}
+            for row in rows
+        ]
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_backoff, self.backoff_base * 2 ** (attempts - 1))
+        return random.uniform(delay / 2, delay)
+
+    def complete(self, row: Dict[str, Any], result: Dict[str, Any]) -> str:
+        """
+        Records a send result: sent, rescheduled, or failed for good
+
+        Returns:
+            The communication event: sent, deferred, failed or bounced
+        """
+        now = time.time()
+        with self._lock:
+            if result["status"] == "sent":
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'sent', sent_at = ?, updated_at = ?, lease_until = NULL, last_error = NULL "
+                    "WHERE id = ?",
+                    (now, now, row["id"])
+                )
+                return "sent"
+            if result.get("permanent") or row["attempts"] >= self.max_attempts:
+                self._conn.execute(
+                    "UPDATE outbox SET status = 'failed', last_error = ?, updated_at = ?, lease_until = NULL WHERE id = ?",
+                    (result.get("error"), now, row["id"])
+                )
+                # Rejected by the server (5xx) - a template error is a plain failure
+                return "bounced" if result.get("permanent") and not result.get("render_error") else "failed"
+            self._conn.execute(
+                "UPDATE outbox SET status = 'pending', last_error = ?, next_attempt_at = ?, updated_at = ?, "
+                "lease_until = NULL WHERE id = ?",
+                (result.get("error"), now + self._backoff(row["attempts"]), now, row["id"])
+            )
+            return "deferred"
+
+    def _send(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        try:
+            dispatcher = self._dispatcher or get_mail_dispatcher()
+        except ValueError as e:
+            # Not configured yet - retried with backoff in case the configuration is fixed
+            return [{"status": "failed", "error": str(e)} for _ in rows]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(rows)
+        messages, positions = [], []
+        templates = {row["template"] for row in rows}
+        try:
+            if len(templates) > 1:
+                raise ValueError("mixed templates")
+            messages = render_emails(templates.pop(), [row["payload"] for row in rows])
+            positions = list(range(len(rows)))
+        except Exception:
+            # Render one by one so a bad row only fails itself
+            for i, row in enumerate(rows):
+                try:
+                    messages.append(render_email(row["template"], row["payload"]))
+                    positions.append(i)
+                except Exception as e:
+                    results[i] = {"status": "failed", "error": f"Failed to render email: {e}", "permanent": True,
+                                  "render_error": True}
+        for i, result in zip(positions, dispatcher.send_batch(messages, [rows[i]["candidate_id"] for i in positions])):
+            results[i] = result
+        return results
+
+    def drain_once(self) -> int:
+        """Claims and sends one batch; returns the number of rows processed."""
+        tokens = self.bucket.take(OUTBOX_BATCH_SIZE)
+        rows = self.claim(tokens)
+        self.bucket.refund(tokens - len(rows))
+        if not rows:
+            return 0
+        events = []
+        for row, result in zip(rows, self._send(rows)):
+            event = self.complete(row, result)
+            if self.event_log is not None and row["payload"].get("communication_id"):
+                events.append(self._event(row["ranking_id"], row["template"], row["payload"], event,
+                                          time.time(), result.get("error")))
+        if events:
+            try:
+                self.event_log.append(events)
+            except Exception as e:
+                print(f"⚠️ Failed to record {len(events)} communication events: {e}")
+        return len(rows)
+
+    def _worker(self):
+        while not self._stop.is_set():
+            try:
+                if self.drain_once():
+                    continue
+            except Exception as e:
+                print(f"⚠️ Outbox worker error: {e}")
+            self._wakeup.wait(POLL_SECONDS)
+            self._wakeup.clear()
+
+    def start(self):
+        """Starts the drain workers (once)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop.clear()
+            self._threads = [
+                threading.Thread(target=self._worker, name=f"outbox-worker-{i}", daemon=True)
+                for i in range(self.workers)
+            ]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    # ------------------------------------------------------------------
+    # Status and metrics
+    # ------------------------------------------------------------------
+
+    def status(self, ranking_id: str, template: str, candidate_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-candidate state of a campaign
+
+        Returns:
+            {candidate_id: {"status": sent | failed | retrying | queued, "attempts",
+                            "message_id", "sent_at", "error"}}
+        """
+        ids = list(candidate_ids)
+        states = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                for candidate_id, status, attempts, message_id, sent_at, error in self._conn.execute(
+                    f"SELECT candidate_id, status, attempts, message_id, sent_at, last_error FROM outbox "
+                    f"WHERE ranking_id = ? AND template = ? AND candidate_id IN ({','.join('?' * len(chunk))})",
+                    [ranking_id, template, *chunk]
+                ):
+                    if status in ("pending", "sending") and attempts:
+                        status = "retrying" if status == "pending" else "sending"
+                    elif status == "pending":
+                        status = "queued"
+                    states[candidate_id] = {
+                        "status": status, "attempts": attempts, "message_id": message_id,
+                        "sent_at": sent_at, "error": error,
+                    }
+        return states
+
+    async def wait_for(self, ranking_id: str, template: str, candidate_ids: List[str],
+                       timeout: float) -> Dict[str, Dict[str, Any]]:
+        """
+        Waits until every listed email was sent, failed or scheduled for a retry
+
+        Returns:
+            status() of the candidates at that point (or at the timeout)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            states = self.status(ranking_id, template, candidate_ids)
+            settled = all(s["status"] in ("sent", "failed", "retrying") for s in states.values())
+            if settled or time.monotonic() >= deadline:
+                return states
+            await asyncio.sleep(0.05)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, send rate and retry counts."""
+        now = time.time()
+        with self._lock:
+            by_status = dict(self._conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            due, retrying, oldest = self._conn.execute(
+                "SELECT SUM(next_attempt_at <= ?), SUM(attempts > 0), MIN(created_at) FROM outbox WHERE status = 'pending'",
+                (now,)
+            ).fetchone()
+            sent_last_minute = self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE sent_at >= ?", (now - 60,)
+            ).fetchone()[0]
+            retries = self._conn.execute(
+                "SELECT COALESCE(SUM(attempts - 1), 0) FROM outbox WHERE attempts > 1"
+            ).fetchone()[0]
+        return {
+            "queue_depth": by_status.get("pending", 0) + by_status.get("sending", 0),
+            "pending": by_status.get("pending", 0),
+            "due": due or 0,
+            "retrying": retrying or 0,
+            "sending": by_status.get("sending", 0),
+            "sent": by_status.get("sent", 0),
+            "failed": by_status.get("failed", 0),
+            "retries": retries,
+            "oldest_pending_seconds": round(now - oldest, 1) if oldest else 0.0,
+            "sent_last_minute": sent_last_minute,
+            "send_rate_per_second": round(sent_last_minute / 60, 2),
+            "rate_limit_per_second": self.bucket.rate,
+            "workers": len(self._threads),
+        }
+
+
+_outbox: Optional[EmailOutbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> EmailOutbox:
+    """Returns the process-wide outbox, with its workers running."""
+    global _outbox
+    if _outbox is None:
+        with _outbox_lock:
+            if _outbox is None:
+                outbox = EmailOutbox(event_log=get_communication_log())
+                # Pick up emails left pending by a previous process
+                outbox.start()
+                _outbox = outbox
+    return _outbox
+
+
+if __name__ == "__main__":
+    import socket
+    import sys
+    import tempfile
+    from collections import Counter
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("The benchmark needs aiosmtpd: pip install -r requirements-dev.txt")
+
+    from .mail_dispatch import MailDispatcher, SMTPConnectionPool
+
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    failure_rate = float(sys.argv[3]) if len(sys.argv) > 3 else 0.1
+
+    class FlakyHandler:
+        """Accepts mail, answers a share of messages with a temporary 451."""
+
+        def __init__(self):
+            self.delivered = Counter()
+            self.rejected = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            await asyncio.sleep(0.005)
+            if random.random() < failure_rate:
+                self.rejected += 1
+                return "451 4.3.0 Temporary failure, try again later"
+            for recipient in envelope.rcpt_tos:
+                self.delivered[recipient] += 1
+            return "250 Message accepted for delivery"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = FlakyHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+
+    items = [
+        {"candidate_id": f"CAND-{i:05d}", "email": f"candidate{i}@example.com", "name": f"Candidate {i}",
+         "top_skills": ["Python", "FastAPI"], "role_title": "Backend Engineer"}
+        for i in range(recipients)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = EmailOutbox(
+            Path(tmp) / "outbox.db", rate_per_second=rate, burst=int(rate) or 1,
+            backoff_base=0.2, max_backoff=2,
+            dispatcher=MailDispatcher(SMTPConnectionPool("127.0.0.1", port, security="none"))
+        )
+        print(f"🧪 {recipients} recipients, {rate:.0f}/s outbox rate limit, {failure_rate:.0%} temporary SMTP failures")
+        started = time.perf_counter()
+        first = outbox.enqueue("RANK-BENCH", "shortlist", items, job_id="JD-BENCH")
+        again = outbox.enqueue("RANK-BENCH", "shortlist", items, job_id="JD-BENCH")
+        print(f"📥 Enqueued {len(first['queued'])}; re-running the campaign added {len(again['queued'])} "
+              f"({len(again['duplicates'])} duplicates ignored)")
+
+        while outbox.stats()["queue_depth"]:
+            time.sleep(0.1)
+        elapsed = time.perf_counter() - started
+        stats = outbox.stats()
+        outbox.stop()
+
+    controller.stop()
+    print(f"✅ Drained in {elapsed:.2f}s ({stats['sent'] / elapsed:.0f} emails/s): {stats['sent']} sent, "
+          f"{stats['failed']} failed, {stats['retries']} retries after {handler.rejected} temporary failures")
+    print(f"🔁 Most deliveries to one recipient: {max(handler.delivered.values())}")
@@ -0,0 +1,379 @@
+"""
+Direct communication pipeline - shortlist emails without the agent tool loop
+
+The communication agent has the model call load_ranking_by_id, load_jd_by_id
+and then send_shortlist_email once per candidate, so notifying N candidates
+costs N + 3 model round-trips. notify_shortlist() does the same work in code:
+
+1. select the shortlisted candidates (top_candidates + acceptable_candidates)
+   from the ranking
+2. optionally ask the LLM for one personal paragraph per candidate - a single
+   batched call (PERSONALIZATION_BATCH_SIZE recipients per call, calls run
+   concurrently)
+3. queue the emails in the outbox (outbox.py), which renders them from the
+   compiled templates (templating.py) and sends them through the mail
+   dispatcher (mail_dispatch.py) with rate limiting and retries; candidates
+   already emailed for the ranking are left out
+
+The result has the CommunicationOutput shape and is logged like the agent's.
+"""
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+from pydantic import BaseModel, Field
+
+from .event_log import get_communication_log, new_communication_id
+from .outbox import EmailOutbox, get_outbox
+from .tools import load_jd_by_id, load_ranking_by_id
+
+
+COMPANY_NAME = os.getenv("COMPANY_NAME", "Onix Center of Excellence")
+
+# Recipients per personalization request
+PERSONALIZATION_BATCH_SIZE = int(os.getenv("COMM_PERSONALIZATION_BATCH_SIZE", "100"))
+
+# How long a request waits for the outbox to attempt its emails
+OUTBOX_WAIT_SECONDS = float(os.getenv("OUTBOX_WAIT_SECONDS", "60"))
+
+APP_NAME = "communication_personalization"
+
+
+# ============================================================================
+# Shortlist Selection
+# ============================================================================
+
+def select_shortlist(ranking: Dict[str, Any]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Shortlisted candidates of a ranking, in rank order
+
+    Returns:
+        {"recipients": [{"candidate_id", "email", "name", "top_skills", "ranked"}],
+         "skipped": [{"candidate_id", "candidate_name", "reason"}]}
+    """
+    shortlisted = set(ranking.get("top_candidates") or []) | set(ranking.get("acceptable_candidates") or [])
+    ranked = sorted(
+        (c for c in ranking.get("ranked_candidates") or [] if c.get("candidate_id") in shortlisted),
+        key=lambda c: c.get("rank") or 0
+    )
+
+    recipients, skipped = [], []
+    for candidate in ranked:
+        if not candidate.get("candidate_email"):
+            skipped.append({
+                "candidate_id": candidate["candidate_id"],
+                "candidate_name": candidate.get("candidate_name", ""),
+                "reason": "No email address"
+            })
+            continue
+        recipients.append({
+            "candidate_id": candidate["candidate_id"],
+            "email": candidate["candidate_email"],
+            "name": candidate.get("candidate_name", ""),
+            "top_skills": (candidate.get("skill_match") or {}).get("mandatory_matched", [])[:5],
+            "ranked": candidate,
+        })
+    return {"recipients": recipients, "skipped": skipped}
+
+
+# ============================================================================
+# Optional Personalization (one LLM call per batch of recipients)
+# ============================================================================
+
+class PersonalParagraph(BaseModel):
+    """Personal paragraph for one candidate"""
+    candidate_id: str = Field(description="Candidate ID from the input")
+    paragraph: str = Field(description="One or two sentences for the shortlist email")
+
+
+class PersonalParagraphs(BaseModel):
+    """Personal paragraphs for a batch of candidates"""
+    paragraphs: List[PersonalParagraph] = Field(description="One entry per candidate in the input")
+
+
+personalization_agent = Agent(
+    name="shortlist_email_personalizer",
+    model="gemini-2.5-flash",
+    description="Writes one personal paragraph per shortlisted candidate for the shortlist email",
+    instruction="""You write one short personal paragraph for each candidate's shortlist email.
+
+The message contains the role, the company and a JSON list of shortlisted candidates with their
+matched skills, experience and the ranking justification.
+
+Rules:
+- Exactly one entry per candidate, using the candidate_id from the input
+- One or two sentences, warm and professional, addressed to the candidate ("Your work with ...")
+- Mention only strengths present in the input; never invent experience or projects
+- No salary, interview dates, scores or promises of an offer
+- No greeting or sign-off - the email template adds those
+
+Return ONLY a valid JSON object, no commentary.
+""",
+    output_schema=PersonalParagraphs,
+    output_key="personal_paragraphs",
+    generate_content_config={
+        "temperature": 0.4,
+        "max_output_tokens": 8192,
+    },
+)
+
+
+def _personalization_message(recipients: List[Dict[str, Any]], role_title: str, company_name: str) -> str:
+    candidates = [
+        {
+            "candidate_id": r["candidate_id"],
+            "name": r["name"],
+            "matched_skills": (r["ranked"].get("skill_match") or {}).get("mandatory_matched", [])
+            + (r["ranked"].get("skill_match") or {}).get("good_to_have_matched", []),
+            "experience_years": (r["ranked"].get("experience_match") or {}).get("candidate_years"),
+            "justification": r["ranked"].get("justification", ""),
+        }
+        for r in recipients
+    ]
+    return (
+        f"Role: {role_title}\nCompany: {company_name}\n\n"
+        f"Candidates:\n{json.dumps(candidates, ensure_ascii=False, indent=2)}"
+    )
+
+
+async def _personalize_batch(recipients: List[Dict[str, Any]], role_title: str, company_name: str) -> Dict[str, str]:
+    session_service = InMemorySessionService()
+    runner = Runner(agent=personalization_agent, session_service=session_service, app_name=APP_NAME)
+    session = await session_service.create_session(app_name=APP_NAME, user_id="api_user")
+    message = genai_types.Content(
+        role="user",
+        parts=[genai_types.Part.from_text(text=_personalization_message(recipients, role_title, company_name))]
+    )
+    async for _ in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+        pass
+
+    session = await session_service.get_session(app_name=APP_NAME, user_id="api_user", session_id=session.id)
+    output = session.state.get("personal_paragraphs") if session else None
+    if hasattr(output, "model_dump"):
+        output = output.model_dump()
+    elif isinstance(output, str):
+        output = PersonalParagraphs.model_validate_json(output).model_dump()
+    if not output:
+        raise ValueError("Personalization agent produced no output")
+    expected = {r["candidate_id"] for r in recipients}
+    return {
+        p["candidate_id"]: p["paragraph"].strip()
+        for p in output.get("paragraphs", [])
+        if p.get("candidate_id") in expected and p.get("paragraph", "").strip()
+    }
+
+
+async def personalize(recipients: List[Dict[str, Any]], role_title: str, company_name: str) -> Dict[str, str]:
+    """
+    Personal paragraphs for all recipients
+
+    A failed batch only costs its paragraphs - those emails go out without one.
+
+    Returns:
+        {candidate_id: paragraph}
+    """
+    batches = [
+        recipients[i:i + PERSONALIZATION_BATCH_SIZE]
+        for i in range(0, len(recipients), PERSONALIZATION_BATCH_SIZE)
+    ]
+    print(f"🤖 Personalizing {len(recipients)} shortlist emails in {len(batches)} LLM call(s)")
+    results = await asyncio.gather(
+        *(_personalize_batch(batch, role_title, company_name) for batch in batches),
+        return_exceptions=True
+    )
+    paragraphs: Dict[str, str] = {}
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"⚠️ Personalization batch failed, sending without personal paragraphs: {result}")
+        else:
+            paragraphs.update(result)
+    return paragraphs
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+async def notify_shortlist(ranking: Dict[str, Any], jd: Dict[str, Any], personalize_emails: bool = False,
+                           company_name: str = COMPANY_NAME, wait_seconds: float = OUTBOX_WAIT_SECONDS,
+                           outbox: Optional[EmailOutbox] = None, communication_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Queues shortlist emails for a ranking in the outbox
+
+    Candidates already emailed for this ranking are not emailed (or personalized) again.
+
+    Args:
+        ranking: Ranking document (data/rankings)
+        jd: Parsed JD the ranking was made for
+        personalize_emails: Add an LLM-written paragraph per candidate (one batched call)
+        company_name: Company named in the emails
+        wait_seconds: How long to wait for the first delivery attempt of each email
+            (0 returns right after queueing)
+        outbox: Outbox to use (the process-wide one by default)
+        communication_id: Batch ID the outbox logs the emails' events under (new by default)
+
+    Returns:
+        CommunicationOutput fields plus ranking_id, skipped, already_notified, total_queued and timings_ms
+    """
+    started = time.perf_counter()
+    outbox = outbox or get_outbox()
+    communication_id = communication_id or new_communication_id()
+    ranking_id = ranking.get("ranking_id") or ""
+    job_id = ranking.get("jd_id") or jd.get("job_id")
+    role_title = jd.get("role_title") or ranking.get("jd_title") or ""
+    selection = select_shortlist(ranking)
+    already = outbox.existing(ranking_id, "shortlist", [r["candidate_id"] for r in selection["recipients"]])
+    recipients = [r for r in selection["recipients"] if r["candidate_id"] not in already]
+
+    personalize_started = time.perf_counter()
+    paragraphs = await personalize(recipients, role_title, company_name) if personalize_emails and recipients else {}
+    for recipient in recipients:
+        recipient["personal_note"] = paragraphs.get(recipient["candidate_id"])
+
+    send_started = time.perf_counter()
+    queued = outbox.enqueue(ranking_id, "shortlist", [
+        {**{k: v for k, v in r.items() if k != "ranked"},
+         "role_title": role_title, "company_name": company_name, "job_id": job_id,
+         "communication_id": communication_id}
+        for r in recipients
+    ], job_id=job_id)
+    # A concurrent run may have queued some of them in the meantime
+    already |= set(queued["duplicates"])
+    recipients = [r for r in recipients if r["candidate_id"] not in already]
+    ids = [r["candidate_id"] for r in recipients]
+    if wait_seconds > 0 and ids:
+        states = await outbox.wait_for(ranking_id, "shortlist", ids, wait_seconds)
+    else:
+        states = outbox.status(ranking_id, "shortlist", ids)
+    finished = time.perf_counter()
+
+    emails = []
+    for recipient in recipients:
+        state = states.get(recipient["candidate_id"], {})
+        emails.append({
+            "candidate_id": recipient["candidate_id"],
+            "email": recipient["email"],
+            "candidate_name": recipient["name"],
+            "type": "shortlist",
+            "status": state.get("status", "queued"),
+            "message_id": state.get("message_id"),
+            "sent_at": datetime.fromtimestamp(state["sent_at"]).isoformat() if state.get("sent_at") else None,
+            "error_message": state.get("error"),
+            "personalized": bool(recipient["personal_note"]),
+        })
+    total_sent = sum(1 for e in emails if e["status"] == "sent")
+    total_failed = sum(1 for e in emails if e["status"] == "failed")
+    total_queued = len(emails) - total_sent - total_failed
+
+    return {
+        "communication_id": communication_id,
+        "job_id": job_id,
+        "job_title": role_title,
+        "ranking_id": ranking_id,
+        "emails_sent": emails,
+        "skipped": selection["skipped"],
+        "already_notified": sorted(already),
+        "total_shortlisted": len(selection["recipients"]) + len(selection["skipped"]),
+        "total_sent": total_sent,
+        "total_failed": total_failed,
+        "total_queued": total_queued,
+        "summary": f"Sent {total_sent} of {len(recipients)} shortlist emails for {role_title}"
+                   + (f", {total_failed} failed" if total_failed else "")
+                   + (f", {total_queued} queued for retry" if total_queued else "")
+                   + (f", {len(already)} already notified" if already else "")
+                   + (f", {len(selection['skipped'])} skipped (no email)" if selection["skipped"] else "") + ".",
+        "pipeline": "direct+llm" if personalize_emails else "direct",
+        "timings_ms": {
+            "select": round((personalize_started - started) * 1000, 1),
+            "personalize": round((send_started - personalize_started) * 1000, 1),
+            "send": round((finished - send_started) * 1000, 1),
+            "total": round((finished - started) * 1000, 1),
+        },
+    }
+
+
+async def run_communication_pipeline(ranking_id: str, personalize_emails: bool = False,
+                                     wait_seconds: float = OUTBOX_WAIT_SECONDS) -> Dict[str, Any]:
+    """
+    Loads a ranking and its JD, queues the shortlist emails and logs the batch
+
+    Raises:
+        FileNotFoundError: If the ranking or its JD does not exist
+    """
+    ranking = load_ranking_by_id(ranking_id)
+    if "error" in ranking:
+        raise FileNotFoundError(ranking["error"])
+    jd = load_jd_by_id(ranking.get("jd_id", ""))
+    if "error" in jd:
+        raise FileNotFoundError(jd["error"])
+
+    result = await notify_shortlist(ranking, jd, personalize_emails, wait_seconds=wait_seconds)
+    # The outbox logs each email's events; this adds the batch's summary
+    try:
+        get_communication_log().record_campaign(result)
+    except Exception as e:
+        print(f"⚠️ Error saving log: {e}")
+    print(f"📧 {result['summary']} ({result['timings_ms']['total'] / 1000:.2f}s)")
+    return result
+
+
+if __name__ == "__main__":
+    import socket
+    import sys
+    import tempfile
+    from pathlib import Path
+
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        sys.exit("The benchmark needs aiosmtpd: pip install -r requirements-dev.txt")
+
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+
+    class Handler:
+        async def handle_DATA(self, server, session, envelope):
+            await asyncio.sleep(0.005)
+            return "250 Message accepted for delivery"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(Handler(), hostname="127.0.0.1", port=port)
+    controller.start()
+    os.environ.update(SMTP_HOST="127.0.0.1", SMTP_PORT=str(port), SMTP_SECURITY="none")
+
+    ranked = [
+        {
+            "candidate_id": f"CAND-{i:04d}",
+            "candidate_name": f"Candidate {i}",
+            "candidate_email": f"candidate{i}@example.com" if i % 50 else "",
+            "skill_match": {"mandatory_matched": ["Python", "FastAPI", "PostgreSQL"], "good_to_have_matched": ["Docker"]},
+            "experience_match": {"candidate_years": 3 + i % 5},
+            "justification": "Strong backend match.",
+            "rank": i + 1,
+        }
+        for i in range(candidates)
+    ]
+    ranking = {
+        "ranking_id": "RANK-BENCH", "jd_id": "JD-BENCH", "jd_title": "Backend Engineer",
+        "ranked_candidates": ranked,
+        "top_candidates": [c["candidate_id"] for c in ranked[:candidates // 2]],
+        "acceptable_candidates": [c["candidate_id"] for c in ranked[candidates // 2:]],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = EmailOutbox(Path(tmp) / "outbox.db", rate_per_second=0)
+        result = asyncio.run(notify_shortlist(ranking, {"role_title": "Backend Engineer"}, outbox=outbox))
+        rerun = asyncio.run(notify_shortlist(ranking, {"role_title": "Backend Engineer"}, outbox=outbox))
+        outbox.stop()
+    controller.stop()
+    print(f"⚡ {result['summary']}")
+    print(f"🔁 Re-run: {rerun['summary']}")
+    print(f"⏱️ {result['timings_ms']} - the agent loop needs {candidates + 3} model round-trips for the same batch")
@@ -0,0 +1,271 @@
+"""
+Email templates - loaded and compiled once, rendered in batches
+
+Templates live in communication_agent/templates/, one file per part:
+
+    templates/shortlist.subject.txt     subject line
+    templates/shortlist.html            HTML body
+    templates/shortlist.txt             plain-text body (optional - HTML-only mail without it)
+
+A company or a single JD can override any part by putting a file with the same
+name in templates/company/<company-slug>/ or templates/jd/<job_id>/ (the JD
+variant wins, then the company variant, then the default).
+
+Syntax:
+    {{ name }}                          value, HTML-escaped in .html files
+    {{#personal_note}} ... {{/personal_note}}   rendered only when the value is set
+
+Every file is parsed once, when the store is created. render_batch() then
+substitutes the fields all recipients share (role, company, sender) once per
+batch and only fills in the per-recipient fields for each email.
+"""
+
+import html
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# File name suffix of each part, and how values are escaped in it
+PARTS = {
+    "subject": (".subject.txt", lambda value: " ".join(value.split())),
+    "html": (".html", html.escape),
+    "text": (".txt", lambda value: value),
+}
+
+# A section tag alone on its line takes the line with it
+_TOKEN_RE = re.compile(
+    r"(?P<line>^[ \t]*)?\{\{\s*(?P<kind>[#/])\s*(?P<section>\w+)\s*\}\}(?(line)[ \t]*(?:\n|\Z))"
+    r"|\{\{\s*(?P<field>\w+)\s*\}\}",
+    re.MULTILINE
+)
+
+_FIELD = "field"
+_SECTION = "section"
+
+
+def _parse(source: str, name: str) -> list:
+    """Template source -> nodes: str literals, (FIELD, key) and (SECTION, key, nodes)."""
+    root: list = []
+    stack: List[Tuple[Optional[str], list]] = [(None, root)]
+    position = 0
+    for match in _TOKEN_RE.finditer(source):
+        nodes = stack[-1][1]
+        if match.start() > position:
+            nodes.append(source[position:match.start()])
+        position = match.end()
+
+        if match.group("field"):
+            nodes.append((_FIELD, match.group("field")))
+        elif match.group("kind") == "#":
+            section = (_SECTION, match.group("section"), [])
+            nodes.append(section)
+            stack.append((match.group("section"), section[2]))
+        else:
+            if stack[-1][0] != match.group("section"):
+                raise ValueError(f"{name}: unexpected {{{{/{match.group('section')}}}}}")
+            stack.pop()
+    if len(stack) > 1:
+        raise ValueError(f"{name}: unclosed {{{{#{stack[-1][0]}}}}}")
+    if position < len(source):
+        root.append(source[position:])
+    return root
+
+
+def _merge(nodes: list) -> list:
+    """Joins adjacent literals."""
+    merged: list = []
+    for node in nodes:
+        if isinstance(node, str) and merged and isinstance(merged[-1], str):
+            merged[-1] += node
+        elif node != "":
+            merged.append(node)
+    return merged
+
+
+class CompiledTemplate:
+    """One template part, parsed into literals, fields and sections."""
+
+    def __init__(self, nodes: list, escape: Callable[[str], str], name: str = ""):
+        self.nodes = nodes
+        self.escape = escape
+        self.name = name
+
+    @classmethod
+    def compile(cls, source: str, escape: Callable[[str], str], name: str = "") -> "CompiledTemplate":
+        return cls(_merge(_parse(source, name)), escape, name)
+
+    def _bind(self, nodes: list, values: Dict[str, Any]) -> list:
+        bound: list = []
+        for node in nodes:
+            if isinstance(node, str):
+                bound.append(node)
+            elif node[1] not in values:
+                bound.append(node if node[0] == _FIELD else (_SECTION, node[1], self._bind(node[2], values)))
+            elif node[0] == _FIELD:
+                value = values[node[1]]
+                bound.append(self.escape(str(value)) if value not in (None, "") else "")
+            elif values[node[1]]:
+                bound.extend(self._bind(node[2], values))
+        return _merge(bound)
+
+    def bind(self, values: Dict[str, Any]) -> "CompiledTemplate":
+        """Template with the given fields filled in (the others stay open)."""
+        return CompiledTemplate(self._bind(self.nodes, values), self.escape, self.name)
+
+    def _render(self, nodes: list, context: Dict[str, Any], out: List[str]):
+        for node in nodes:
+            if isinstance(node, str):
+                out.append(node)
+            elif node[0] == _FIELD:
+                value = context.get(node[1])
+                if value not in (None, ""):
+                    out.append(self.escape(str(value)))
+            elif context.get(node[1]):
+                self._render(node[2], context, out)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        out: List[str] = []
+        self._render(self.nodes, context, out)
+        return "".join(out)
+
+
+def company_slug(company_name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", (company_name or "").lower()).strip("-")
+
+
+# ============================================================================
+# Template Store
+# ============================================================================
+
+class TemplateStore:
+    """All templates under a directory, compiled when the store is created."""
+
+    def __init__(self, root: Path = TEMPLATES_DIR):
+        self.root = Path(root)
+        # (scope, template name, part) -> template; scope "" (default), "company/<slug>" or "jd/<job_id>"
+        self.templates: Dict[Tuple[str, str, str], CompiledTemplate] = {}
+        for path in sorted(self.root.rglob("*")):
+            if not path.is_file():
+                continue
+            # ".txt" also matches ".subject.txt" - the subject part is checked first
+            for part, (suffix, escape) in PARTS.items():
+                if path.name.endswith(suffix):
+                    scope = path.parent.relative_to(self.root).as_posix()
+                    name = path.name[:-len(suffix)]
+                    source = path.read_text(encoding="utf-8")
+                    self.templates[("" if scope == "." else scope, name, part)] = CompiledTemplate.compile(
+                        source.strip() if part == "subject" else source, escape, str(path.relative_to(self.root))
+                    )
+                    break
+
+    def names(self) -> List[str]:
+        return sorted({name for scope, name, _ in self.templates if not scope})
+
+    def resolve(self, name: str, part: str, job_id: Optional[str] = None,
+                company_name: Optional[str] = None) -> Optional[CompiledTemplate]:
+        """Most specific variant of a template part (JD, then company, then default)."""
+        scopes = []
+        if job_id:
+            scopes.append(f"jd/{job_id}")
+        if company_name:
+            scopes.append(f"company/{company_slug(company_name)}")
+        scopes.append("")
+        for scope in scopes:
+            template = self.templates.get((scope, name, part))
+            if template is not None:
+                return template
+        return None
+
+    def render_batch(self, name: str, shared: Dict[str, Any], recipients: List[Dict[str, Any]],
+                     job_id: Optional[str] = None, company_name: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """
+        Renders one template for many recipients
+
+        Args:
+            name: Template name
+            shared: Fields common to all recipients (filled in once)
+            recipients: Per-recipient fields
+            job_id: Selects a per-JD variant
+            company_name: Selects a per-company variant
+
+        Returns:
+            One {"subject", "html", "text"} per recipient ("text" is None without a text template)
+
+        Raises:
+            ValueError: If the template has no subject or HTML part
+        """
+        parts = {part: self.resolve(name, part, job_id, company_name) for part in PARTS}
+        if parts["subject"] is None or parts["html"] is None:
+            raise ValueError(f"Unknown email template: {name}")
+        bound = {part: template.bind(shared) for part, template in parts.items() if template is not None}
+        return [
+            {part: bound[part].render(recipient) if part in bound else None for part in PARTS}
+            for recipient in recipients
+        ]
+
+
+_store: Optional[TemplateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_template_store() -> TemplateStore:
+    """Returns the process-wide template store (compiled on first use - the API does it at startup)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TemplateStore()
+                print(f"✉️ Compiled email templates: {', '.join(_store.names())}")
+    return _store
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from .mail_dispatch import build_message
+
+    recipients = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    shared = {"role_title": "Backend Engineer", "company_name": "Onix Center of Excellence",
+              "from_name": "Onix Recruitment Team"}
+    people = [
+        {"name": f"Candidate <{i}>", "skills": "Python, FastAPI, PostgreSQL",
+         "personal_note": "Your work on data pipelines & APIs stood out." if i % 2 else None}
+        for i in range(recipients)
+    ]
+    sources = {part: (TEMPLATES_DIR / f"shortlist{suffix}").read_text(encoding="utf-8")
+               for part, (suffix, _) in PARTS.items()}
+
+    def timed(label: str, render) -> float:
+        started = time.perf_counter()
+        render()
+        elapsed = time.perf_counter() - started
+        print(f"  {label:<44} {elapsed * 1000:8.1f} ms  ({recipients / elapsed:>9,.0f} emails/s)")
+        return elapsed
+
+    print(f"🧪 Rendering the shortlist email (subject + HTML + text) for {recipients:,} recipients")
+    parse_each = timed("parse per recipient", lambda: [
+        {part: CompiledTemplate.compile(sources[part], PARTS[part][1]).render({**shared, **person}) for part in PARTS}
+        for person in people
+    ])
+    started = time.perf_counter()
+    store = TemplateStore()
+    print(f"  {'compile all templates once':<44} {(time.perf_counter() - started) * 1000:8.1f} ms")
+    timed("compiled, full context per recipient", lambda: [
+        {part: store.resolve("shortlist", part).render({**shared, **person}) for part in PARTS}
+        for person in people
+    ])
+    batch = timed("compiled, render_batch", lambda: store.render_batch("shortlist", shared, people))
+    rendered = store.render_batch("shortlist", shared, people)
+    timed("render_batch + MIME multipart messages", lambda: [
+        build_message(f"candidate{i}@example.com", r["subject"], r["html"], r["text"])
+        for i, r in enumerate(store.render_batch("shortlist", shared, people))
+    ])
+    print(f"⚡ render_batch is {parse_each / batch:.0f}x faster than parsing per recipient")
+    assert "Candidate &lt;1&gt;" in rendered[1]["html"] and "&amp; APIs" in rendered[1]["html"]
+    assert "Candidate <1>" in rendered[1]["text"]
@@ -7,8 +7,10 @@ import os
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Content
+
+from .event_log import get_communication_log, new_communication_id
+from .mail_dispatch import build_message, get_mail_dispatcher
+from .templating import get_template_store
 
 
 # ============================================================================
@@ -88,6 +90,9 @@ def send_shortlist_email(
     1. SMTP (default) - Uses standard email servers (Gmail, Outlook, etc.)
     2. SendGrid - Uses SendGrid API if SENDGRID_API_KEY is provided
     
+    The connection (or SendGrid client) is shared with all other sends - see
+    mail_dispatch.py.
+    
     Args:
         candidate_email: Candidate's email address
         candidate_name: Candidate's full name
@@ -98,144 +103,103 @@ def send_shortlist_email(
     Returns:
         Dictionary with status, message_id, and timestamp
     """
-    import smtplib
-    from email.mime.text import MIMEText
-    from email.mime.multipart import MIMEMultipart
+    results = send_shortlist_emails(
+        [{"email": candidate_email, "name": candidate_name, "top_skills": top_skills}],
+        role_title,
+        company_name
+    )
+    result = results[0]
+    result.pop("candidate_id", None)
+    if result["status"] == "sent":
+        result.pop("error", None)
+    return result
+
+
+def send_shortlist_emails(
+    candidates: list[dict],
+    role_title: str,
+    company_name: str = "Onix Center of Excellence"
+) -> list[dict]:
+    """
+    Send shortlist emails to a batch of candidates concurrently
     
+    Args:
+        candidates: [{"candidate_id", "email", "name", "top_skills", "personal_note"}, ...]
+        role_title: Job title/role
+        company_name: Company name (default: "Onix Center of Excellence")
+    
+    Returns:
+        One result per candidate, in input order: status ("sent" / "failed"),
+        method, message_id, sent_at, recipient, candidate_id, error
+    """
     try:
-        # Get email configuration from environment
-        from_email = os.getenv("FROM_EMAIL", "recruitment@onix-coe.com")
-        from_name = os.getenv("FROM_NAME", "Onix Recruitment Team")
-        
-        # Format matched skills
-        skills_text = ", ".join(top_skills[:5]) if top_skills else "your background"
-        
-        # Create email content
-        subject = f"Exciting Opportunity at {company_name} - {role_title}"
-        
-        html_content = f"""
-        <html>
-        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                <h2 style="color: #2c3e50;">Congratulations, {candidate_name}!</h2>
-                
-                <p>We are pleased to inform you that your profile has been <strong>shortlisted</strong> for the <strong>{role_title}</strong> position at {company_name}.</p>
-                
-                <p>We were particularly impressed by your experience in <strong>{skills_text}</strong> and believe you would be a great addition to our team.</p>
-                
-                <div style="background-color: #f8f9fa; padding: 15px; border-left: 4px solid #007bff; margin: 20px 0;">
-                    <h3 style="color: #007bff; margin-top: 0;">Next Steps</h3>
-                    <ul>
-                        <li>Our recruitment team will contact you within 2-3 business days</li>
-                        <li>We will schedule a technical interview at a mutually convenient time</li>
-                        <li>Please keep an eye on your inbox for further communication</li>
-                    </ul>
-                </div>
-                
-                <p>If you have any questions in the meantime, please feel free to reach out to us.</p>
-                
-                <p>We look forward to speaking with you!</p>
-                
-                <p style="margin-top: 30px;">
-                    Best regards,<br>
-                    <strong>{from_name}</strong><br>
-                    {company_name}
-                </p>
-                
-                <hr style="border: none; border-top: 1px solid #e0e0e0; margin-top: 30px;">
-                <p style="font-size: 12px; color: #888;">
-                    This is an automated message from our recruitment system. 
-                    Please do not reply directly to this email.
-                </p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Check which email service to use
-        sendgrid_api_key = os.getenv("SENDGRID_API_KEY")
-        smtp_host = os.getenv("SMTP_HOST")
-        
-        if sendgrid_api_key:
-            # Use SendGrid
-            from sendgrid import SendGridAPIClient
-            from sendgrid.helpers.mail import Mail
-            
-            message = Mail(
-                from_email=(from_email, from_name),
-                to_emails=candidate_email,
-                subject=subject,
-                html_content=html_content
-            )
-            
-            sg = SendGridAPIClient(sendgrid_api_key)
-            response = sg.send(message)
-            
-            return {
-                "status": "sent",
-                "method": "sendgrid",
-                "message_id": response.headers.get("X-Message-Id", "unknown"),
-                "sent_at": datetime.now().isoformat(),
-                "recipient": candidate_email
-            }
-        
-        elif smtp_host:
-            # Use SMTP
-            smtp_port = int(os.getenv("SMTP_PORT", "587"))
-            smtp_user = os.getenv("SMTP_USER", from_email)
-            smtp_password = os.getenv("SMTP_PASSWORD")
-            smtp_use_tls = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
-            
-            if not smtp_password:
-                return {
-                    "status": "failed",
-                    "error": "SMTP_PASSWORD not configured in environment",
-                    "sent_at": datetime.now().isoformat()
-                }
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = f"{from_name} <{from_email}>"
-            msg['To'] = candidate_email
-            
-            # Attach HTML content
-            html_part = MIMEText(html_content, 'html')
-            msg.attach(html_part)
-            
-            # Send via SMTP
-            if smtp_use_tls:
-                server = smtplib.SMTP(smtp_host, smtp_port)
-                server.starttls()
-            else:
-                server = smtplib.SMTP_SSL(smtp_host, smtp_port)
-            
-            server.login(smtp_user, smtp_password)
-            server.send_message(msg)
-            server.quit()
-            
-            return {
-                "status": "sent",
-                "method": "smtp",
-                "message_id": f"smtp-{datetime.now().strftime('%Y%m%d%H%M%S')}",
-                "sent_at": datetime.now().isoformat(),
-                "recipient": candidate_email
-            }
-        
-        else:
-            return {
+        dispatcher = get_mail_dispatcher()
+    except ValueError as e:
+        return [
+            {
                 "status": "failed",
-                "error": "No email service configured. Please set either SENDGRID_API_KEY or SMTP_HOST in environment",
-                "sent_at": datetime.now().isoformat()
+                "error": str(e),
+                "sent_at": datetime.now().isoformat(),
+                "recipient": candidate.get("email"),
+                "candidate_id": candidate.get("candidate_id")
             }
+            for candidate in candidates
+        ]
     
-    except Exception as e:
-        return {
-            "status": "failed",
-            "error": str(e),
-            "sent_at": datetime.now().isoformat(),
-            "recipient": candidate_email
-        }
+    messages = render_emails(
+        "shortlist",
+        [{**candidate, "role_title": role_title, "company_name": company_name} for candidate in candidates]
+    )
+    return dispatcher.send_batch(messages, [candidate.get("candidate_id") for candidate in candidates])
+
+
+def render_emails(template: str, payloads: list[dict]) -> list:
+    """
+    Build the MIME messages (text + HTML) for a batch of recipients
+    
+    Recipients with the same role, company and JD are rendered together - the
+    shared fields are filled into the compiled template once (templating.py).
+    
+    Args:
+        template: Template name ("shortlist")
+        payloads: [{"email", "name", "top_skills", "personal_note", "role_title", "company_name",
+            "job_id", "message_id" (optional, kept across resends)}, ...]
+    
+    Returns:
+        One email.message.Message per payload, in input order
+    """
+    store = get_template_store()
+    from_name = os.getenv("FROM_NAME", "Onix Recruitment Team")
+    
+    groups: dict = {}
+    for index, payload in enumerate(payloads):
+        key = (payload.get("role_title", ""), payload.get("company_name") or "Onix Center of Excellence", payload.get("job_id"))
+        groups.setdefault(key, []).append(index)
+    
+    messages = [None] * len(payloads)
+    for (role_title, company_name, job_id), indexes in groups.items():
+        shared = {"role_title": role_title, "company_name": company_name, "from_name": from_name}
+        recipients = [
+            {
+                "name": payloads[i].get("name", ""),
+                "skills": ", ".join(payloads[i]["top_skills"][:5]) if payloads[i].get("top_skills") else "your background",
+                # Optional LLM-written paragraph (see pipeline.py) - escaped like every field
+                "personal_note": payloads[i].get("personal_note"),
+            }
+            for i in indexes
+        ]
+        rendered = store.render_batch(template, shared, recipients, job_id=job_id, company_name=company_name)
+        for i, parts in zip(indexes, rendered):
+            messages[i] = build_message(
+                payloads[i]["email"], parts["subject"], parts["html"], parts["text"],
+                message_id=payloads[i].get("message_id")
+            )
+    return messages
+
+
+def render_email(template: str, payload: dict):
+    """render_emails() for one recipient."""
+    return render_emails(template, [payload])[0]
 
 
 # ============================================================================
@@ -244,38 +208,33 @@ def send_shortlist_email(
 
 def log_communication(communication_data: dict) -> dict:
     """
-    Save communication log to data/communications/{comm_id}.json
+    Save a communication batch to the communication event log (data/communications/events.db)
+    
+    Each entry of emails_sent is recorded as a sent or failed event; the batch
+    summary is stored with the campaign.
     
     Args:
         communication_data: Dictionary containing communication details
     
     Returns:
-        Dictionary with save status and file path
+        Dictionary with save status and communication_id
     """
     try:
-        # Create communications directory if  it doesn't exist
-        comm_dir = Path(__file__).parent.parent / "data" / "communications"
-        comm_dir.mkdir(parents=True, exist_ok=True)
+        log = get_communication_log()
         
-        # Generate communication ID if not provided
-        if "communication_id" not in communication_data:
-            timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-            communication_data["communication_id"] = f"COMM-{timestamp}"
+        # Generate a communication ID if missing or already used by another batch
+        if not communication_data.get("communication_id") or log.exists(communication_data["communication_id"]):
+            communication_data["communication_id"] = new_communication_id()
         
         # Add logging metadata
         communication_data["logged_at"] = datetime.now().isoformat()
         
-        # Save to file
-        comm_id = communication_data["communication_id"]
-        file_path = comm_dir / f"{comm_id}.json"
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(communication_data, f, indent=2, ensure_ascii=False)
+        log.record_campaign(communication_data, record_emails=True)
         
+        comm_id = communication_data["communication_id"]
         return {
             "status": "success",
-            "message": f"Communication log saved to {file_path}",
-            "file_path": str(file_path),
+            "message": f"Communication log saved: {comm_id}",
             "communication_id": comm_id
         }
     
@@ -14,6 +14,45 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from shared import JDSchema, generate_job_id, normalize_skill
 
 
+JDS_DIR = Path(__file__).parent.parent / "data" / "parsed_jds"
+
+
+def save_parsed_jd(jd_dict: dict) -> dict:
+    """
+    Saves one parsed JD to data/parsed_jds (written via a temp file + rename).
+
+    Args:
+        jd_dict: JDSchema fields as a dict; extra keys (e.g. "parsing") are kept
+
+    Returns:
+        Saved document
+    """
+    # Add metadata (kept when an existing JD is re-saved after refinement)
+    jd_dict.setdefault('created_at', datetime.utcnow().isoformat())
+    jd_dict.setdefault('created_by', 'system')
+    jd_dict.setdefault('status', 'active')
+    
+    # Normalize skills
+    jd_dict['mandatory_skills'] = [normalize_skill(s) for s in jd_dict.get('mandatory_skills') or []]
+    jd_dict['good_to_have_skills'] = [normalize_skill(s) for s in jd_dict.get('good_to_have_skills') or []]
+    
+    # Create output directory
+    JDS_DIR.mkdir(parents=True, exist_ok=True)
+    
+    # Save to JSON file
+    job_id = jd_dict.get('job_id') or generate_job_id()
+    jd_dict['job_id'] = job_id
+    json_file = JDS_DIR / f"{job_id}.json"
+    tmp_file = json_file.with_suffix(".json.tmp")
+    
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(jd_dict, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_file, json_file)
+    
+    print(f"✅ JD saved to: {json_file}")
+    return jd_dict
+
+
 def save_jd_output(callback_context):
     """
     Callback: Automatically save parsed JD to JSON file after agent completes
@@ -30,29 +69,10 @@ def save_jd_output(callback_context):
         if hasattr(parsed_jd, 'model_dump'):
             jd_dict = parsed_jd.model_dump()
         else:
-            jd_dict = parsed_jd
-        
-        # Add metadata
-        jd_dict['created_at'] = datetime.utcnow().isoformat()
-        jd_dict['created_by'] = 'system'
-        jd_dict['status'] = 'active'
-        
-        # Normalize skills
-        jd_dict['mandatory_skills'] = [normalize_skill(s) for s in jd_dict.get('mandatory_skills', [])]
-        jd_dict['good_to_have_skills'] = [normalize_skill(s) for s in jd_dict.get('good_to_have_skills', [])]
-        
-        # Create output directory
-        output_dir = Path(__file__).parent.parent / "data" / "parsed_jds"
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save to JSON file
-        job_id = jd_dict.get('job_id', generate_job_id())
-        json_file = output_dir / f"{job_id}.json"
-        
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(jd_dict, f, indent=2, ensure_ascii=False)
+            jd_dict = dict(parsed_jd)
         
-        print(f"✅ JD saved to: {json_file}")
+        jd_dict['parsing'] = {"tier": "llm"}
+        save_parsed_jd(jd_dict)
         
     except Exception as e:
         print(f"❌ Error saving JD: {e}")
@@ -0,0 +1,293 @@
+"""
+Deterministic fast-path JD parsing (no LLM)
+
+Most JDSchema fields follow predictable patterns: "Experience: 5-8 years",
+"Salary: 20-35 LPA", a "Location:" line, and skill lists under "Must have" /
+"Good to have" headings. parse_jd_fast() extracts them with regexes and the
+shared skill vocabulary in milliseconds and scores its confidence in each
+field, so the LLM only has to be asked about the fields it could not pin down
+(see refinement.py).
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from ranking_agent.location_matching import resolve_location
+from shared.skill_vocabulary import find_skills
+
+
+# Fields below this confidence are sent to the LLM
+CONFIDENCE_THRESHOLD = 0.75
+
+# JDSchema fields the fast parser scores (job_id is always generated locally)
+SCORED_FIELDS = (
+    "role_title", "experience_min", "experience_max", "location", "relocation_allowed",
+    "salary_min", "salary_max", "mandatory_skills", "good_to_have_skills", "profile_type",
+)
+
+
+# ============================================================================
+# Patterns
+# ============================================================================
+
+_LABEL_RE = r"^\W*(?:{labels})\W*[:\-–]\s*(?P<value>.+)$"
+_TITLE_LABEL_RE = re.compile(_LABEL_RE.format(labels="job title|title|position|role|designation"), re.IGNORECASE | re.MULTILINE)
+_LOCATION_LABEL_RE = re.compile(_LABEL_RE.format(labels="location|job location|work location|based in"), re.IGNORECASE | re.MULTILINE)
+_EXPERIENCE_LABEL_RE = re.compile(_LABEL_RE.format(labels="experience|experience required|exp"), re.IGNORECASE | re.MULTILINE)
+_SALARY_LABEL_RE = re.compile(_LABEL_RE.format(labels="salary|ctc|compensation|pay|package|salary range"), re.IGNORECASE | re.MULTILINE)
+
+_YEARS = r"(?:years?|yrs?)"
+_EXPERIENCE_RANGE_RE = re.compile(rf"(\d{{1,2}})\s*(?:-|–|—|to)\s*(\d{{1,2}})\s*\+?\s*{_YEARS}", re.IGNORECASE)
+_EXPERIENCE_PLUS_RE = re.compile(rf"(\d{{1,2}})\s*\+\s*{_YEARS}", re.IGNORECASE)
+_EXPERIENCE_MIN_RE = re.compile(rf"(?:minimum|min\.?|at least|atleast)\s*(?:of\s*)?(\d{{1,2}})\s*{_YEARS}", re.IGNORECASE)
+
+_NUMBER = r"(\d+(?:[.,]\d+)*)"
+_SALARY_RANGE_RE = re.compile(
+    rf"(₹|rs\.?|inr|\$|usd)?\s*{_NUMBER}\s*(k|l|lpa|lakhs?|lacs?|cr|crores?)?\s*(?:-|–|—|to)\s*(₹|rs\.?|inr|\$|usd)?\s*{_NUMBER}\s*(k|l|lpa|lakhs?|lacs?|cr|crores?|per annum|p\.a\.)?",
+    re.IGNORECASE
+)
+_UNIT_MULTIPLIER = {"k": 1_000, "l": 100_000, "lpa": 100_000, "lakh": 100_000, "lakhs": 100_000,
+                    "lac": 100_000, "lacs": 100_000, "cr": 10_000_000, "crore": 10_000_000, "crores": 10_000_000}
+
+_RELOCATION_NEGATIVE_RE = re.compile(r"(?:no|not|without)\s+(?:\w+\s+){0,3}relocat|relocation\s+(?:is\s+)?(?:not|unavailable)", re.IGNORECASE)
+_RELOCATION_POSITIVE_RE = re.compile(r"relocat\w*\s*(?:\w+\s+){0,2}(?:available|allowed|assistance|support|provided|offered|open|considered)|open to relocat|willing to relocat", re.IGNORECASE)
+
+_MANDATORY_HEADING_RE = re.compile(r"must[\s-]*have|mandatory|required|requirements|essential|qualifications|what you.?ll need", re.IGNORECASE)
+_OPTIONAL_HEADING_RE = re.compile(r"good[\s-]*to[\s-]*have|nice[\s-]*to[\s-]*have|preferred|bonus|desirable|plus|optional", re.IGNORECASE)
+_OTHER_HEADING_RE = re.compile(r"responsibilit|what we offer|benefits|about (?:us|the)|job description|perks|why join|how to apply", re.IGNORECASE)
+
+_LEADERSHIP_RE = re.compile(r"\b(manager|director|head|vp|vice president|chief|cto|ceo|lead)\b", re.IGNORECASE)
+_TECHNICAL_RE = re.compile(r"\b(engineer|developer|programmer|scientist|devops|sre|architect|qa|tester|analyst|administrator|data)\b", re.IGNORECASE)
+_NON_TECHNICAL_RE = re.compile(r"\b(sales|marketing|hr|human resources|recruiter|finance|accountant|operations|support|executive)\b", re.IGNORECASE)
+
+_MARKUP = re.compile(r"[#*_`>|•●▪►]+")
+
+
+def _clean(line: str) -> str:
+    return re.sub(r"\s+", " ", _MARKUP.sub(" ", line)).strip(" -:")
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    cleaned = _clean(stripped)
+    return bool(cleaned) and (
+        stripped.startswith("#")
+        or (stripped.endswith(":") and len(cleaned) <= 60)
+        or (stripped.startswith("**") and stripped.rstrip(":").endswith("**"))
+    )
+
+
+# ============================================================================
+# Field Extractors
+# ============================================================================
+
+def extract_role_title(text: str) -> Tuple[str, float]:
+    label = _TITLE_LABEL_RE.search(text)
+    if label:
+        return _clean(label.group("value")), 0.95
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        title = _clean(line)
+        # A markdown H1 is almost always the title; a plain first line usually is
+        if line.lstrip().startswith("# ") and len(title) <= 80:
+            return title, 0.9
+        if len(title) <= 80 and (_TECHNICAL_RE.search(title) or _LEADERSHIP_RE.search(title)):
+            return title, 0.7
+        return title[:80], 0.4
+    return "", 0.0
+
+
+def extract_experience(text: str) -> Tuple[int, int, float]:
+    """(min, max, confidence); open-ended "N+ years" becomes N..N+5 as in the LLM instruction."""
+    label = _EXPERIENCE_LABEL_RE.search(text)
+    sources = [(label.group("value"), 0.05)] if label else []
+    sources.append((text, 0.0))
+    for source, bonus in sources:
+        match = _EXPERIENCE_RANGE_RE.search(source)
+        if match:
+            low, high = sorted((int(match.group(1)), int(match.group(2))))
+            return low, high, 0.9 + bonus
+        match = _EXPERIENCE_PLUS_RE.search(source)
+        if match:
+            return int(match.group(1)), int(match.group(1)) + 5, 0.75 + bonus
+        match = _EXPERIENCE_MIN_RE.search(source)
+        if match:
+            return int(match.group(1)), int(match.group(1)) + 3, 0.7 + bonus
+    return 0, 10, 0.0
+
+
+def extract_location(text: str) -> Tuple[str, float]:
+    label = _LOCATION_LABEL_RE.search(text)
+    if label:
+        value = _clean(re.sub(r"\(.*?\)", "", label.group("value")))
+        place = resolve_location(value)
+        return value, 0.95 if (place.countries or place.remote) else 0.7
+    # No label - first line naming a known place
+    for line in text.splitlines()[:30]:
+        for segment in re.split(r"[|•·]", line):
+            segment = _clean(segment)
+            if segment and len(segment) <= 40 and resolve_location(segment).countries:
+                return segment, 0.6
+    if re.search(r"\b(fully remote|remote)\b", text, re.IGNORECASE):
+        return "Remote", 0.6
+    return "Unspecified", 0.0
+
+
+def extract_relocation(text: str) -> Tuple[bool, float]:
+    if _RELOCATION_NEGATIVE_RE.search(text):
+        return False, 0.9
+    if _RELOCATION_POSITIVE_RE.search(text):
+        return True, 0.9
+    # Not mentioned - defaults to no relocation, but the LLM may read it from context
+    return False, 0.5
+
+
+def _amount(number: str, unit: Optional[str], currency: Optional[str]) -> Optional[int]:
+    try:
+        value = float(number.replace(",", ""))
+    except ValueError:
+        return None
+    unit = (unit or "").lower().rstrip(".")
+    if unit in _UNIT_MULTIPLIER:
+        value *= _UNIT_MULTIPLIER[unit]
+    elif value < 1000 and not currency:
+        return None  # A bare small number is not a salary
+    return int(value)
+
+
+def extract_salary(text: str) -> Tuple[Optional[int], Optional[int], float]:
+    """(min, max, confidence) in rupees; lakh/crore units are expanded."""
+    label = _SALARY_LABEL_RE.search(text)
+    sources = [label.group("value")] if label else []
+    sources += [line for line in text.splitlines() if re.search(r"salary|ctc|lpa|₹|inr|compensation", line, re.IGNORECASE)]
+    for source in sources:
+        match = _SALARY_RANGE_RE.search(source)
+        if not match:
+            continue
+        currency = match.group(1) or match.group(4)
+        unit = match.group(6) or match.group(3)
+        low = _amount(match.group(2), match.group(3) or unit, currency)
+        high = _amount(match.group(5), unit, currency)
+        if low and high and low <= high:
+            foreign = bool(currency) and currency.lower() in ("$", "usd")
+            # JDSchema salaries are in rupees - a dollar range needs a judgement call
+            return low, high, 0.5 if foreign else 0.9
+    if label or re.search(r"\bsalary\b|\bctc\b", text, re.IGNORECASE):
+        return None, None, 0.6  # Mentioned ("competitive") but no range
+    return None, None, 0.85  # Not mentioned - JDs without a salary are common
+
+
+def extract_skills(text: str) -> Tuple[List[str], List[str], float, float]:
+    """
+    (mandatory, good_to_have, mandatory confidence, good_to_have confidence)
+
+    Skills are assigned by the heading they appear under; without any
+    requirement headings every skill counts as mandatory at low confidence.
+    """
+    mandatory_lines: List[str] = []
+    optional_lines: List[str] = []
+    other_lines: List[str] = []
+    current = other_lines
+    saw_mandatory = saw_optional = False
+    for line in text.splitlines():
+        if _is_heading(line):
+            heading = _clean(line)
+            if _OPTIONAL_HEADING_RE.search(heading):
+                current, saw_optional = optional_lines, True
+            elif _MANDATORY_HEADING_RE.search(heading):
+                current, saw_mandatory = mandatory_lines, True
+            elif _OTHER_HEADING_RE.search(heading):
+                current = other_lines
+            continue
+        current.append(line)
+
+    if not saw_mandatory:
+        everything = [skill for _, skill in find_skills(text)]
+        return everything, [], (0.4 if everything else 0.0), 0.5
+
+    mandatory = [skill for _, skill in find_skills("\n".join(mandatory_lines))]
+    good_to_have = [skill for _, skill in find_skills("\n".join(optional_lines)) if skill not in mandatory]
+
+    # Few vocabulary hits under a requirements heading means unfamiliar skills the LLM should read
+    listed = sum(1 for line in mandatory_lines if re.match(r"\s*(?:[-*•]|\d+\.)\s+", line))
+    mandatory_confidence = 0.9 if len(mandatory) >= max(2, listed // 2) else 0.5
+    good_to_have_confidence = (0.9 if good_to_have else 0.6) if saw_optional else 0.8
+    return mandatory, good_to_have, mandatory_confidence, good_to_have_confidence
+
+
+def classify_profile(role_title: str) -> Tuple[str, float]:
+    if _LEADERSHIP_RE.search(role_title) and not re.search(r"\btech(?:nical)?\s+lead\b", role_title, re.IGNORECASE):
+        return "Leadership", 0.8
+    if _TECHNICAL_RE.search(role_title):
+        return "Technical", 0.9
+    if _NON_TECHNICAL_RE.search(role_title):
+        return "Non-Technical", 0.8
+    return "Technical", 0.4
+
+
+# ============================================================================
+# Fast Parsing
+# ============================================================================
+
+def parse_jd_fast(jd_text: str) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """
+    Provisional JDSchema fields from the JD text, without an LLM
+
+    Args:
+        jd_text: Job description text
+
+    Returns:
+        (jd fields without job_id, confidence per field in 0..1)
+    """
+    started = time.perf_counter()
+    role_title, title_confidence = extract_role_title(jd_text)
+    experience_min, experience_max, experience_confidence = extract_experience(jd_text)
+    location, location_confidence = extract_location(jd_text)
+    relocation_allowed, relocation_confidence = extract_relocation(jd_text)
+    salary_min, salary_max, salary_confidence = extract_salary(jd_text)
+    mandatory, good_to_have, mandatory_confidence, good_to_have_confidence = extract_skills(jd_text)
+    profile_type, profile_confidence = classify_profile(role_title)
+
+    jd = {
+        "role_title": role_title,
+        "experience_min": experience_min,
+        "experience_max": experience_max,
+        "location": location,
+        "relocation_allowed": relocation_allowed,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "mandatory_skills": mandatory,
+        "good_to_have_skills": good_to_have,
+        "profile_type": profile_type,
+    }
+    confidence = {
+        "role_title": title_confidence,
+        "experience_min": experience_confidence,
+        "experience_max": experience_confidence,
+        "location": location_confidence,
+        "relocation_allowed": relocation_confidence,
+        "salary_min": salary_confidence,
+        "salary_max": salary_confidence,
+        "mandatory_skills": mandatory_confidence,
+        "good_to_have_skills": good_to_have_confidence,
+        "profile_type": profile_confidence,
+    }
+    print(f"⚡ Fast JD parse in {(time.perf_counter() - started) * 1000:.1f} ms")
+    return jd, {field: round(value, 2) for field, value in confidence.items()}
+
+
+def low_confidence_fields(confidence: Dict[str, float], threshold: float = CONFIDENCE_THRESHOLD) -> List[str]:
+    """Fields the LLM should be asked about."""
+    return [field for field in SCORED_FIELDS if confidence.get(field, 0.0) < threshold]
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from pathlib import Path
+
+    sample = Path(sys.argv[1]) if len(sys.argv) > 1 else Path(__file__).parent / "sample_jd.md"
+    fields, scores = parse_jd_fast(sample.read_text(encoding="utf-8"))
+    print(json.dumps({"jd": fields, "confidence": scores, "llm_fields": low_confidence_fields(scores)}, indent=2))
@@ -0,0 +1,223 @@
+"""
+Two-tier JD parsing - deterministic fields now, LLM only where they are uncertain
+
+parse_jd_two_tier() runs fast_parser.parse_jd_fast() and asks the LLM about
+the fields whose confidence is below JD_FAST_CONFIDENCE_THRESHOLD, with the
+provisional values as context, instead of re-parsing the whole JD:
+
+- mode "auto": the refinement call runs before the JD is saved (one smaller LLM call,
+  or none at all for a well-structured JD)
+- mode "fast": the provisional JD is saved immediately and refine_jd() fills in
+  the uncertain fields in the background
+
+The saved document carries a "parsing" block: tier, status, field_confidence
+and the llm_fields that were (or will be) refined.
+"""
+
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional, Tuple
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+from pydantic import BaseModel, Field
+
+from shared import generate_job_id
+
+from .agent import JDS_DIR, save_parsed_jd
+from .fast_parser import low_confidence_fields, parse_jd_fast
+
+
+# Fields the fast parser scores below this are sent to the LLM
+CONFIDENCE_THRESHOLD = float(os.getenv("JD_FAST_CONFIDENCE_THRESHOLD", "0.75"))
+
+APP_NAME = "jd_refinement"
+
+
+# ============================================================================
+# Field Refinement Agent
+# ============================================================================
+
+class JDFieldRefinement(BaseModel):
+    """JDSchema fields the LLM was asked about (the others stay null)"""
+    role_title: Optional[str] = Field(default=None, description="Job role/title")
+    experience_min: Optional[int] = Field(default=None, description="Minimum years of experience required", ge=0)
+    experience_max: Optional[int] = Field(default=None, description="Maximum years of experience", ge=0)
+    location: Optional[str] = Field(default=None, description="Job location (city)")
+    relocation_allowed: Optional[bool] = Field(default=None, description="Whether relocation is allowed")
+    salary_min: Optional[int] = Field(default=None, description="Minimum salary in rupees")
+    salary_max: Optional[int] = Field(default=None, description="Maximum salary in rupees")
+    mandatory_skills: Optional[List[str]] = Field(default=None, description="Required skills (normalized)")
+    good_to_have_skills: Optional[List[str]] = Field(default=None, description="Preferred skills (normalized)")
+    profile_type: Optional[Literal["Technical", "Non-Technical", "Leadership"]] = Field(
+        default=None, description="Type of profile required"
+    )
+
+
+jd_refinement_agent = Agent(
+    name="jd_field_refiner",
+    model="gemini-2.5-flash",
+    description="Fills in the JD fields a deterministic parser could not extract confidently",
+    instruction="""You are an expert HR data analyst checking a partially parsed job description.
+
+The message contains the job description, the provisional values a rule-based parser extracted,
+and the list of fields to extract. Return ONLY those fields; leave every other field null.
+
+Rules:
+- Read the whole job description before answering; do not guess information that is not stated
+- Experience: "5-8 years" → 5 and 8, "5+ years" → 5 and 10, "Minimum 3 years" → 3 and 6
+- Salary in rupees per year ("20-35 LPA" → 2000000 and 3500000); null if not stated
+- mandatory_skills: skills that are required / must-have / listed under requirements
+- good_to_have_skills: preferred / nice-to-have / bonus skills, never repeating a mandatory skill
+- Skill names normalized: 'k8s' → 'Kubernetes', 'postgres' → 'PostgreSQL', 'reactjs' → 'React', 'node' → 'Node.js'
+- profile_type: Technical (engineers, developers, data, QA), Non-Technical (sales, marketing, HR, finance),
+  Leadership (manager, director, VP, head of)
+- Keep a provisional value when it is correct; replace it when the job description says otherwise
+
+Return ONLY a valid JSON object, no commentary.
+""",
+    output_schema=JDFieldRefinement,
+    output_key="jd_refinement",
+    generate_content_config={
+        "temperature": 0.1,
+        "max_output_tokens": 2048,
+    },
+)
+
+
+def _refinement_message(jd_text: str, provisional: Dict[str, Any], fields: List[str]) -> str:
+    return (
+        f"Fields to extract: {', '.join(fields)}\n\n"
+        f"Provisional values:\n{json.dumps({f: provisional.get(f) for f in fields}, ensure_ascii=False, indent=2)}\n\n"
+        f"Job description:\n{jd_text}"
+    )
+
+
+async def refine_fields(jd_text: str, provisional: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    """
+    Asks the LLM for the given fields only
+
+    Args:
+        jd_text: Job description text
+        provisional: Fast-path values, shown to the model as context
+        fields: JDSchema fields to extract
+
+    Returns:
+        {field: value} for the requested fields the model filled in
+    """
+    session_service = InMemorySessionService()
+    runner = Runner(agent=jd_refinement_agent, session_service=session_service, app_name=APP_NAME)
+    session = await session_service.create_session(app_name=APP_NAME, user_id="api_user")
+    message = genai_types.Content(
+        role="user",
+        parts=[genai_types.Part.from_text(text=_refinement_message(jd_text, provisional, fields))]
+    )
+
+    print(f"🤖 Refining {len(fields)} low-confidence JD fields with the LLM: {', '.join(fields)}")
+    async for _ in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+        pass
+
+    session = await session_service.get_session(app_name=APP_NAME, user_id="api_user", session_id=session.id)
+    output = session.state.get("jd_refinement") if session else None
+    if hasattr(output, "model_dump"):
+        output = output.model_dump()
+    elif isinstance(output, str):
+        output = JDFieldRefinement.model_validate_json(output).model_dump()
+    if not output:
+        raise ValueError("Refinement agent produced no output")
+    return {field: output[field] for field in fields if output.get(field) is not None}
+
+
+def _apply_refinement(jd: Dict[str, Any], refined: Dict[str, Any]) -> Dict[str, Any]:
+    jd.update(refined)
+    if jd["experience_min"] > jd["experience_max"]:
+        jd["experience_max"] = jd["experience_min"]
+    mandatory = set(jd["mandatory_skills"])
+    jd["good_to_have_skills"] = [s for s in jd["good_to_have_skills"] if s not in mandatory]
+    return jd
+
+
+def _new_job_id() -> str:
+    """generate_job_id() is second-resolution; suffix it when two JDs land in the same second."""
+    base_id = generate_job_id()
+    job_id, suffix = base_id, 2
+    while (JDS_DIR / f"{job_id}.json").exists():
+        job_id = f"{base_id}-{suffix}"
+        suffix += 1
+    return job_id
+
+
+# ============================================================================
+# Two-Tier Parsing
+# ============================================================================
+
+async def parse_jd_two_tier(jd_text: str, mode: str = "auto") -> Tuple[Dict[str, Any], bool]:
+    """
+    Parses a JD deterministically and uses the LLM only for low-confidence fields
+
+    Args:
+        jd_text: Job description text
+        mode: "auto" refines before saving, "fast" saves the provisional JD and
+            leaves refinement to refine_jd() (run it as a background task)
+
+    Returns:
+        (saved JD document, whether a background refinement is still pending)
+    """
+    jd, confidence = parse_jd_fast(jd_text)
+    fields = low_confidence_fields(confidence, CONFIDENCE_THRESHOLD)
+    jd["job_id"] = _new_job_id()
+    parsing = {"tier": "fast", "field_confidence": confidence, "llm_fields": fields}
+
+    if not fields:
+        parsing["status"] = "complete"
+    elif mode == "fast":
+        parsing["status"] = "pending_refinement"
+    else:
+        try:
+            jd = _apply_refinement(jd, await refine_fields(jd_text, jd, fields))
+            parsing.update({"tier": "hybrid", "status": "complete"})
+        except Exception as e:
+            # The provisional values are still a usable JD
+            print(f"⚠️ JD refinement failed, keeping fast-path values: {e}")
+            parsing.update({"status": "refinement_failed", "error": str(e)})
+
+    jd["parsing"] = parsing
+    saved = save_parsed_jd(jd)
+    print(f"⚡ JD {saved['job_id']} parsed ({parsing['tier']}, {len(fields)} LLM fields)")
+    return saved, parsing["status"] == "pending_refinement"
+
+
+async def refine_jd(job_id: str, jd_text: str) -> bool:
+    """
+    Background refinement of a JD saved by parse_jd_two_tier(mode="fast")
+
+    Re-saves the JD under the same ID with the low-confidence fields replaced.
+
+    Returns:
+        True if the JD was refined
+    """
+    jd_file = JDS_DIR / f"{job_id}.json"
+    try:
+        with open(jd_file, "r", encoding="utf-8") as f:
+            jd = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Cannot refine {job_id}: {e}")
+        return False
+
+    parsing = jd.setdefault("parsing", {})
+    fields = parsing.get("llm_fields") or []
+    try:
+        jd = _apply_refinement(jd, await refine_fields(jd_text, jd, fields))
+        parsing.update({"tier": "hybrid", "status": "complete", "refined_at": datetime.now().isoformat()})
+        print(f"✨ Refined {job_id}: {', '.join(fields)}")
+        return True
+    except Exception as e:
+        print(f"⚠️ JD refinement failed for {job_id}: {e}")
+        parsing.update({"status": "refinement_failed", "error": str(e)})
+        return False
+    finally:
+        jd["parsing"] = parsing
+        save_parsed_jd(jd)
@@ -0,0 +1,228 @@
+"""
+Persistent cache of LLM candidate evaluations for smart ranking.
+
+Each ranked candidate the smart ranking agent produces is stored (without its
+rank) under a key made of three content hashes: the candidate document sent to
+the LLM, the JD requirements and scoring rules, and the ranking instruction
+version. Reranking a JD only sends candidates whose key is not cached to the
+LLM; everything else is reused. Entries live in a local SQLite file
+(data/cache/ranking_evaluations.db) bounded by entry count and total size,
+evicting the least recently used entries first.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "ranking_evaluations.db"
+
+MAX_ENTRIES = int(os.getenv("RANKING_EVALUATION_CACHE_MAX_ENTRIES", "50000"))
+MAX_BYTES = int(os.getenv("RANKING_EVALUATION_CACHE_MAX_MB", "200")) * 1024 * 1024
+
+# Eviction trims down to this fraction of the limits so it does not run on every store
+EVICTION_LOW_WATER = 0.9
+
+
+# ============================================================================
+# Content Hashes
+# ============================================================================
+
+def content_digest(value: Any) -> str:
+    """SHA-256 of a JSON-serializable value in canonical form (sorted keys, no whitespace)."""
+    canonical = json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def instruction_version(*parts: str) -> str:
+    """Version tag for an LLM instruction (e.g. model name and instruction template)."""
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def pair_key(candidate_digest: str, jd_digest: str, version: str) -> str:
+    """Cache key of one (candidate, JD, instruction version) evaluation."""
+    return hashlib.sha256(f"{candidate_digest}:{jd_digest}:{version}".encode("ascii")).hexdigest()
+
+
+# ============================================================================
+# Evaluation Cache
+# ============================================================================
+
+class PairEvaluationCache:
+    """
+    Size-bounded LRU store of candidate evaluations in SQLite.
+
+    Tables:
+        evaluations(key, candidate_id, jd_id, version, evaluation, size, created_at, last_used, hits)
+        meta(key, value) - lifetime hit/miss/store/eviction counters
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES):
+        self.cache_path = Path(cache_path)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+
+    def _create_tables(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS evaluations (
+                    key TEXT PRIMARY KEY,
+                    candidate_id TEXT NOT NULL,
+                    jd_id TEXT,
+                    version TEXT NOT NULL,
+                    evaluation TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS evaluations_last_used ON evaluations (last_used);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _bump(self, counter: str, amount: int):
+        if amount:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value",
+                (counter, amount)
+            )
+
+    # ------------------------------------------------------------------
+    # Lookups and stores
+    # ------------------------------------------------------------------
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns cached evaluations for the keys that are present.
+
+        Hits refresh the entries' last-used time; misses are counted.
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, Dict[str, Any]] = {}
+        now = time.time()
+        with self._lock, self._conn:
+            # Chunked to stay under SQLite's bound parameter limit
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                for key, evaluation in self._conn.execute(
+                    f"SELECT key, evaluation FROM evaluations WHERE key IN ({placeholders})", chunk
+                ):
+                    found[key] = json.loads(evaluation)
+            if found:
+                self._conn.executemany(
+                    "UPDATE evaluations SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+            self._bump("hits", len(found))
+            self._bump("misses", len(keys) - len(found))
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, str, Optional[str], str, Dict[str, Any]]]) -> int:
+        """
+        Stores evaluations and evicts old entries if the cache is over its limits.
+
+        Args:
+            items: (key, candidate_id, jd_id, version, evaluation) tuples;
+                a "rank" field in the evaluation is dropped
+
+        Returns:
+            Number of entries evicted
+        """
+        now = time.time()
+        rows = []
+        for key, candidate_id, jd_id, version, evaluation in items:
+            evaluation = {k: v for k, v in evaluation.items() if k != "rank"}
+            payload = json.dumps(evaluation, ensure_ascii=False)
+            rows.append((key, candidate_id, jd_id, version, payload, len(payload.encode("utf-8")), now, now))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO evaluations "
+                "(key, candidate_id, jd_id, version, evaluation, size, created_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                rows
+            )
+            self._bump("stores", len(rows))
+            evicted = self._evict()
+        return evicted
+
+    def _evict(self) -> int:
+        """Drops least recently used entries until both limits are under the low-water mark."""
+        count, total_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM evaluations").fetchone()
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return 0
+
+        target_count = int(self.max_entries * EVICTION_LOW_WATER)
+        target_bytes = int(self.max_bytes * EVICTION_LOW_WATER)
+        doomed: List[str] = []
+        for key, size in self._conn.execute("SELECT key, size FROM evaluations ORDER BY last_used, created_at"):
+            if count <= target_count and total_bytes <= target_bytes:
+                break
+            doomed.append(key)
+            count -= 1
+            total_bytes -= size
+        self._conn.executemany("DELETE FROM evaluations WHERE key = ?", [(key,) for key in doomed])
+        self._bump("evictions", len(doomed))
+        return len(doomed)
+
+    def clear(self):
+        """Removes all cached evaluations (counters are kept)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM evaluations")
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, size, limits and lifetime hit/miss/store/eviction counters."""
+        with self._lock:
+            entries, total_bytes, versions, jds = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COUNT(DISTINCT version), COUNT(DISTINCT jd_id) FROM evaluations"
+            ).fetchone()
+            counters = {key: int(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "entries": entries,
+            "size_bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "instruction_versions": versions,
+            "jds": jds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "stores": counters.get("stores", 0),
+            "evictions": counters.get("evictions", 0),
+        }
+
+
+_cache: Optional[PairEvaluationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache() -> PairEvaluationCache:
+    """Returns the process-wide evaluation cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PairEvaluationCache()
+    return _cache
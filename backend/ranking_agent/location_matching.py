@@ -0,0 +1,224 @@
+"""
+Location compatibility matching for ranking.
+
+Resumes and JDs spell places differently ("Bengaluru" vs "Bangalore, KA",
+"Gurgaon" vs "Delhi NCR", "Remote (India)"). Place names are resolved through
+a precomputed alias table to a canonical city, its region (state) and country.
+A LocationMatcher is compiled once per JD and memoizes the result for every
+distinct candidate location string, so scoring a pool costs one dict lookup
+per candidate.
+"""
+
+import re
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+# ============================================================================
+# Alias Table
+# ============================================================================
+
+# Canonical city -> (region, country, aliases)
+CITIES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    # India
+    "mumbai": ("maharashtra", "india", ("bombay", "navi mumbai", "thane", "mumbai suburban")),
+    "pune": ("maharashtra", "india", ("poona", "pimpri", "chinchwad", "pimpri-chinchwad", "hinjewadi")),
+    "nagpur": ("maharashtra", "india", ()),
+    "bangalore": ("karnataka", "india", ("bengaluru", "blr", "banglore")),
+    "mysore": ("karnataka", "india", ("mysuru",)),
+    "hyderabad": ("telangana", "india", ("hyd", "secunderabad", "cyberabad")),
+    "chennai": ("tamil nadu", "india", ("madras",)),
+    "coimbatore": ("tamil nadu", "india", ()),
+    "delhi": ("delhi ncr", "india", ("new delhi", "ncr", "delhi ncr", "gurgaon", "gurugram", "noida",
+                                      "greater noida", "faridabad", "ghaziabad")),
+    "kolkata": ("west bengal", "india", ("calcutta",)),
+    "ahmedabad": ("gujarat", "india", ("amdavad", "gandhinagar")),
+    "kochi": ("kerala", "india", ("cochin", "ernakulam")),
+    "trivandrum": ("kerala", "india", ("thiruvananthapuram",)),
+    "jaipur": ("rajasthan", "india", ()),
+    "indore": ("madhya pradesh", "india", ()),
+    "chandigarh": ("punjab", "india", ("mohali", "panchkula")),
+    # Elsewhere
+    "london": ("england", "united kingdom", ()),
+    "berlin": ("berlin", "germany", ()),
+    "munich": ("bavaria", "germany", ("münchen", "munchen")),
+    "stuttgart": ("baden-wurttemberg", "germany", ()),
+    "amsterdam": ("north holland", "netherlands", ()),
+    "dublin": ("leinster", "ireland", ()),
+    "singapore": ("singapore", "singapore", ()),
+    "dubai": ("dubai", "united arab emirates", ()),
+    "toronto": ("ontario", "canada", ()),
+    "new york": ("new york", "united states", ("nyc", "new york city", "manhattan", "brooklyn")),
+    "san francisco": ("california", "united states", ("sf", "bay area", "san francisco bay area")),
+    "san jose": ("california", "united states", ()),
+    "seattle": ("washington", "united states", ()),
+    "austin": ("texas", "united states", ()),
+}
+
+# Region / country spellings -> canonical region or country
+REGION_ALIASES: Dict[str, str] = {
+    "mh": "maharashtra", "maharashtra": "maharashtra",
+    "ka": "karnataka", "karnataka": "karnataka",
+    "tg": "telangana", "ts": "telangana", "telangana": "telangana",
+    "tn": "tamil nadu", "tamil nadu": "tamil nadu",
+    "wb": "west bengal", "west bengal": "west bengal",
+    "gj": "gujarat", "gujarat": "gujarat",
+    "kl": "kerala", "kerala": "kerala",
+    "rj": "rajasthan", "rajasthan": "rajasthan",
+    "mp": "madhya pradesh", "madhya pradesh": "madhya pradesh",
+    "pb": "punjab", "punjab": "punjab",
+    "california": "california", "ca": "california",
+    "texas": "texas", "tx": "texas",
+    "washington": "washington", "wa": "washington",
+    "ontario": "ontario", "bavaria": "bavaria", "england": "england",
+}
+
+COUNTRY_ALIASES: Dict[str, str] = {
+    "in": "india", "ind": "india", "india": "india", "bharat": "india",
+    "uk": "united kingdom", "united kingdom": "united kingdom", "gb": "united kingdom", "great britain": "united kingdom",
+    "de": "germany", "germany": "germany", "deutschland": "germany",
+    "nl": "netherlands", "netherlands": "netherlands", "holland": "netherlands",
+    "ie": "ireland", "ireland": "ireland",
+    "sg": "singapore", "singapore": "singapore",
+    "uae": "united arab emirates", "united arab emirates": "united arab emirates",
+    "us": "united states", "usa": "united states", "united states": "united states",
+    "united states of america": "united states", "america": "united states",
+    "canada": "canada",
+}
+
+REMOTE_TERMS = ("remote", "anywhere", "work from home", "wfh", "distributed", "fully remote")
+
+# Location fit (0-1) per compatibility level; "Exact Match", "Remote Possible" and
+# "Willing to Relocate" keep the 10/10/8 points of calculate_location_score
+LOCATION_FIT = {
+    "Exact Match": 1.0,
+    "Remote Possible": 1.0,
+    "Willing to Relocate": 0.8,
+    "Same Region": 0.6,
+    "Same Country": 0.3,
+    "Location Mismatch": 0.0,
+}
+
+# Flattened alias -> canonical city, built once at import
+CITY_ALIASES: Dict[str, str] = {}
+for _city, (_region, _country, _aliases) in CITIES.items():
+    CITY_ALIASES[_city] = _city
+    for _alias in _aliases:
+        CITY_ALIASES[_alias] = _city
+
+_SPLIT = re.compile(r"\s*(?:[,/|;()\[\]]|\s-\s|\bor\b|\band\b|&)\s*")
+
+
+class Place:
+    """A resolved location: canonical cities/regions/countries plus a remote flag."""
+
+    __slots__ = ("cities", "regions", "countries", "remote", "raw")
+
+    def __init__(self, cities: FrozenSet[str], regions: FrozenSet[str], countries: FrozenSet[str], remote: bool, raw: str):
+        self.cities = cities
+        self.regions = regions
+        self.countries = countries
+        self.remote = remote
+        self.raw = raw
+
+    @property
+    def known(self) -> bool:
+        return bool(self.cities or self.regions or self.countries)
+
+
+def resolve_location(text: Optional[str]) -> Place:
+    """
+    Resolves a free-form location ("Pune, MH, IN", "Mumbai / Bengaluru", "Remote - India").
+
+    Returns:
+        Place with the canonical cities, regions and countries mentioned
+    """
+    raw = (text or "").strip()
+    lowered = raw.lower()
+    remote = any(term in lowered for term in REMOTE_TERMS)
+
+    cities, regions, countries = set(), set(), set()
+    for part in _SPLIT.split(lowered):
+        part = part.strip(" .")
+        if not part:
+            continue
+        city = CITY_ALIASES.get(part)
+        if city:
+            region, country, _ = CITIES[city]
+            cities.add(city)
+            regions.add(region)
+            countries.add(country)
+        elif part in REGION_ALIASES:
+            regions.add(REGION_ALIASES[part])
+        elif part in COUNTRY_ALIASES:
+            countries.add(COUNTRY_ALIASES[part])
+        elif not any(term in part for term in REMOTE_TERMS):
+            # Unknown place name - keep it so identical spellings still match
+            cities.add(part)
+
+    # Regions imply their country for the cities we know about
+    for city_region, city_country, _ in CITIES.values():
+        if city_region in regions:
+            countries.add(city_country)
+
+    return Place(frozenset(cities), frozenset(regions), frozenset(countries), remote, raw)
+
+
+# ============================================================================
+# Per-JD Matcher
+# ============================================================================
+
+class LocationMatcher:
+    """
+    Location compatibility against one JD, memoized per candidate location string.
+
+    Args:
+        jd_location: JD location text (may list several cities or say remote)
+        relocation_allowed: JD allows relocation (candidates elsewhere get partial credit)
+    """
+
+    def __init__(self, jd_location: Optional[str], relocation_allowed: bool = False):
+        self.jd_place = resolve_location(jd_location)
+        self.relocation_allowed = bool(relocation_allowed)
+        self._memo: Dict[str, Dict[str, Any]] = {}
+
+    def match(self, candidate_location: Optional[str]) -> Dict[str, Any]:
+        """
+        Returns:
+            {"score" (0-10), "fit" (0-1 or None when unknown), "is_match", "compatibility"}
+        """
+        key = (candidate_location or "").strip().lower()
+        cached = self._memo.get(key)
+        if cached is None:
+            cached = self._memo[key] = self._match(key)
+        return cached
+
+    def _match(self, candidate_location: str) -> Dict[str, Any]:
+        jd = self.jd_place
+        if jd.remote:
+            return _result("Remote Possible", True)
+        if not candidate_location or not jd.known:
+            # Nothing to compare - leave it to the scoring profile's assumed fit
+            return {"score": None, "fit": None, "is_match": None, "compatibility": "Unknown"}
+
+        candidate = resolve_location(candidate_location)
+        if not candidate.known:
+            # e.g. just "Remote" - no physical place to compare
+            return {"score": None, "fit": None, "is_match": None, "compatibility": "Unknown"}
+        if candidate.cities & jd.cities:
+            return _result("Exact Match", True)
+        if self.relocation_allowed and (not candidate.countries or not jd.countries or candidate.countries & jd.countries):
+            return _result("Willing to Relocate", False)
+        if candidate.regions & jd.regions:
+            return _result("Same Region", False)
+        if candidate.countries & jd.countries:
+            return _result("Same Country", False)
+        return _result("Location Mismatch", False)
+
+    def match_many(self, candidate_locations: Iterable[Optional[str]]) -> List[Dict[str, Any]]:
+        """Batch form of match() for a whole candidate pool."""
+        return [self.match(location) for location in candidate_locations]
+
+
+def _result(compatibility: str, is_match: bool) -> Dict[str, Any]:
+    fit = LOCATION_FIT[compatibility]
+    return {"score": round(fit * 10, 1), "fit": fit, "is_match": is_match, "compatibility": compatibility}
@@ -0,0 +1,65 @@
+"""
+Tolerant decoding of smart ranking agent output.
+
+The model is asked for {"ranked_candidates": [...]} JSON, but what comes back
+may be wrapped in ```json fences, surrounded by prose, or cut off part-way
+through the list when the output token limit is hit. Instead of json.loads on
+the whole text (one bad character loses the entire batch), the array is
+scanned object by object: every complete candidate object is validated on its
+own against RankedCandidate, and the candidates that are missing, truncated or
+invalid are reported so the caller can re-request just those. The text
+scanning lives in shared/json_output.py.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from pydantic import ValidationError
+
+from shared.json_output import extract_array_items
+from .smart_agent import RankedCandidate
+
+
+# ============================================================================
+# Per-Candidate Validation
+# ============================================================================
+
+def decode_ranked_candidates(
+    raw_output: Any,
+    expected_ids: Iterable[str]
+) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Validates each candidate entry of the agent output on its own.
+
+    Args:
+        raw_output: Agent output - a Pydantic model, a dict or the model's raw text
+        expected_ids: Candidate IDs that were sent to the agent
+
+    Returns:
+        (valid, failed) - valid is a list of RankedCandidate dicts for expected IDs
+        (first entry wins on duplicates); failed maps every expected ID without a
+        valid entry to the reason (invalid, truncated or omitted)
+    """
+    expected = list(dict.fromkeys(expected_ids))
+    expected_set = set(expected)
+    entries, errors = extract_array_items(raw_output, "ranked_candidates", "candidate_id")
+
+    valid: Dict[str, Dict[str, Any]] = {}
+    failed: Dict[str, str] = {}
+    for entry in entries:
+        candidate_id = entry.get("candidate_id") if isinstance(entry, dict) else None
+        if candidate_id not in expected_set or candidate_id in valid:
+            continue
+        try:
+            valid[candidate_id] = RankedCandidate.model_validate(entry).model_dump()
+            failed.pop(candidate_id, None)
+        except ValidationError as e:
+            failed[candidate_id] = f"invalid entry ({e.error_count()} validation errors)"
+
+    for error in errors:
+        print(f"⚠️ Ranking output: {error}")
+
+    reason = "missing from output" if not errors else "missing or truncated in output"
+    for candidate_id in expected:
+        if candidate_id not in valid:
+            failed.setdefault(candidate_id, reason)
+    return [valid[cid] for cid in expected if cid in valid], failed
@@ -0,0 +1,120 @@
+"""
+Candidate Review Agent - LLM refinement for hybrid ranking
+
+The deterministic ranker scores every candidate. This agent only reviews one
+already-scored candidate at a time (borderline or top of the list) and writes
+the justification and red/green flags; it never changes the score, so merged
+rankings keep the deterministic ordering and recommendation cut-offs.
+"""
+
+from google.adk.agents import Agent
+from google.genai import types as genai_types
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List
+
+
+# ============================================================================
+# Pydantic Schema for Structured Output
+# ============================================================================
+
+class CandidateReview(BaseModel):
+    """LLM review of one scored candidate"""
+    justification: str = Field(description="2-3 sentence explanation of the score and recommendation")
+    red_flags: List[str] = Field(default_factory=list, description="2-4 concerns (skill gaps, experience issues)")
+    green_flags: List[str] = Field(default_factory=list, description="2-4 strengths")
+
+
+# ============================================================================
+# Prompt Inputs
+# ============================================================================
+
+def build_candidate_profile(candidate: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compact view of a parsed resume for the review prompt.
+
+    Only what the review needs - keeps each call to a few hundred tokens.
+    """
+    parsed_data = candidate.get("parsed_data", {}) or {}
+    candidate_info = candidate.get("candidate_info", {}) or {}
+    return {
+        "name": candidate_info.get("name", "Unknown"),
+        "target_job_title": candidate_info.get("target_job_title", ""),
+        "location": candidate_info.get("location", ""),
+        "summary": parsed_data.get("summary", ""),
+        "total_experience_years": parsed_data.get("total_experience_years", 0),
+        "work_experience": [
+            {
+                "title": job.get("title", ""),
+                "company": job.get("company", ""),
+                "duration": job.get("duration", ""),
+            }
+            for job in (parsed_data.get("work_experience") or [])[:5]
+            if isinstance(job, dict)
+        ],
+        "technical_skills": parsed_data.get("technical_skills", {}),
+        "projects": [
+            project.get("name", "")
+            for project in (parsed_data.get("projects") or [])[:5]
+            if isinstance(project, dict)
+        ],
+        "resume_evaluation_score": (candidate.get("evaluation", {}) or {}).get("final_score", 0),
+    }
+
+
+def build_assessment(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Deterministic scoring result the LLM explains (from score_candidate())."""
+    return {
+        "match_score": entry.get("match_score", {}),
+        "recommendation": entry.get("recommendation", ""),
+        "skill_match": entry.get("skill_match", {}),
+        "experience_alignment": entry.get("experience_match", {}).get("alignment", ""),
+        "location": entry.get("location_match", {}).get("compatibility", "Unknown"),
+    }
+
+
+# ============================================================================
+# Candidate Review Agent
+# ============================================================================
+
+candidate_review_agent = Agent(
+    name="candidate_review_agent",
+    model="gemini-2.5-flash",
+    description="Reviews one deterministically scored candidate and explains the result with red and green flags.",
+
+    # Each candidate is reviewed independently
+    include_contents='none',
+
+    instruction="""
+You are an expert technical recruiter reviewing ONE candidate for: {jd_title}
+
+## Job Requirements:
+{jd_summary}
+
+## Candidate:
+{candidate_profile}
+
+## Deterministic Assessment (already computed - do NOT change the score):
+{assessment}
+
+## Your Task:
+1. **justification**: 2-3 sentences explaining why the candidate received this score and
+   recommendation, citing concrete skills, experience and projects. The candidate sits
+   {review_reason}, so say what would tip the decision either way.
+2. **red_flags**: 2-4 specific concerns (missing mandatory skills, experience gaps, shallow evidence)
+3. **green_flags**: 2-4 specific strengths (relevant projects, related skills, seniority)
+
+Base every statement on the candidate data above. Return JSON matching the CandidateReview schema.
+""",
+
+    output_schema=CandidateReview,
+    output_key="candidate_review",
+
+    generate_content_config=genai_types.GenerateContentConfig(
+        temperature=0.2,
+        max_output_tokens=1024,
+    ),
+
+    # Disable delegation - this is a terminal agent
+    disallow_transfer_to_peers=True,
+    disallow_transfer_to_parent=True,
+)
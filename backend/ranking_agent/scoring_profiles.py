@@ -0,0 +1,279 @@
+"""
+Declarative scoring profiles for candidate ranking.
+
+Score weights, experience credit and recommendation cut-offs live in
+scoring_profiles.json instead of being repeated across the fast ranker, the
+smart ranking agent instruction and the ranking callbacks. A profile is
+selected per JD (jd_data["scoring_profile"], by name or inline) or by the JD's
+profile_type, and compiled once into a ScoringProfile that turns per-candidate
+score components into a total score and recommendation.
+"""
+
+import json
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+
+PROFILES_PATH = Path(__file__).parent / "scoring_profiles.json"
+
+DEFAULT_PROFILE = "default"
+
+SCORE_COMPONENTS = ("mandatory_skills", "good_to_have_skills", "experience", "location", "salary")
+
+EXPERIENCE_ALIGNMENTS = ("Perfect Match", "Close Match", "Below Requirements", "Underqualified")
+
+# Per-candidate components fed to a profile:
+# (mandatory coverage 0-1, good-to-have coverage 0-1, experience alignment, location fit 0-1, salary fit 0-1)
+ScoreComponents = Tuple[float, float, str, float, float]
+
+
+class ScoringProfile:
+    """
+    A compiled scoring profile.
+
+    Weights are resolved into points once, so scoring a candidate is a few
+    multiplications and a dict lookup. Instances are plain data and can be
+    pickled to ranking worker processes.
+    """
+
+    def __init__(self, name: str, config: Dict[str, Any]):
+        self.name = name
+        self.description = config.get("description", "")
+        weights = config.get("weights", {})
+        missing = [c for c in SCORE_COMPONENTS if c not in weights]
+        if missing:
+            raise ValueError(f"Scoring profile '{name}' is missing weights for: {', '.join(missing)}")
+        self.weights = {c: float(weights[c]) for c in SCORE_COMPONENTS}
+        if abs(sum(self.weights.values()) - 100) > 1e-6:
+            raise ValueError(f"Scoring profile '{name}' weights must add up to 100, got {sum(self.weights.values())}")
+
+        levels = config.get("experience_levels", {})
+        if set(levels) != set(EXPERIENCE_ALIGNMENTS):
+            raise ValueError(f"Scoring profile '{name}' must define experience_levels for: {', '.join(EXPERIENCE_ALIGNMENTS)}")
+        self.experience_levels = {a: float(levels[a]) for a in EXPERIENCE_ALIGNMENTS}
+
+        assumed = config.get("assumed", {})
+        self.assumed_location = float(assumed.get("location", 1.0))
+        self.assumed_salary = float(assumed.get("salary", 0.6))
+
+        thresholds = config.get("thresholds", {})
+        self.highly_recommended = float(thresholds.get("highly_recommended", 70))
+        self.recommended = float(thresholds.get("recommended", 50))
+        if self.recommended > self.highly_recommended:
+            raise ValueError(f"Scoring profile '{name}': recommended threshold is above highly_recommended")
+
+        # Compiled points
+        self.mandatory_points = self.weights["mandatory_skills"]
+        self.good_to_have_points = self.weights["good_to_have_skills"]
+        self.location_points = self.weights["location"]
+        self.salary_points = self.weights["salary"]
+        self.experience_points = {a: self.weights["experience"] * level for a, level in self.experience_levels.items()}
+        self.max_without_mandatory = (
+            self.good_to_have_points + max(self.experience_points.values()) + self.location_points + self.salary_points
+        )
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def component_scores(
+        self,
+        mandatory_coverage: float,
+        good_to_have_coverage: float,
+        experience_alignment: str,
+        location_fit: Optional[float] = None,
+        salary_fit: Optional[float] = None
+    ) -> Dict[str, float]:
+        """
+        Points per component plus the total (rounded to one decimal).
+
+        Coverages and fits are fractions in [0, 1]; location/salary fall back
+        to the profile's assumed fit when unknown.
+        """
+        location_fit = self.assumed_location if location_fit is None else location_fit
+        salary_fit = self.assumed_salary if salary_fit is None else salary_fit
+
+        mandatory_score = mandatory_coverage * self.mandatory_points
+        good_to_have_score = good_to_have_coverage * self.good_to_have_points
+        experience_score = self.experience_points[experience_alignment]
+        location_score = location_fit * self.location_points
+        salary_score = salary_fit * self.salary_points
+        total_score = mandatory_score + good_to_have_score + experience_score + location_score + salary_score
+
+        return {
+            "mandatory_skills_score": round(mandatory_score, 1),
+            "good_to_have_skills_score": round(good_to_have_score, 1),
+            "experience_score": round(experience_score, 1),
+            "location_score": round(location_score, 1),
+            "salary_score": round(salary_score, 1),
+            "total_score": round(total_score, 1)
+        }
+
+    def total(self, components: ScoreComponents) -> float:
+        """Total score for one component tuple (same arithmetic as component_scores)."""
+        mandatory, good_to_have, alignment, location_fit, salary_fit = components
+        location_fit = self.assumed_location if location_fit is None else location_fit
+        salary_fit = self.assumed_salary if salary_fit is None else salary_fit
+        return round(
+            mandatory * self.mandatory_points
+            + good_to_have * self.good_to_have_points
+            + self.experience_points[alignment]
+            + location_fit * self.location_points
+            + salary_fit * self.salary_points,
+            1
+        )
+
+    def upper_bound(self, mandatory_coverage: float) -> float:
+        """Best total score reachable given only mandatory skill coverage."""
+        return round(mandatory_coverage * self.mandatory_points + self.max_without_mandatory, 1)
+
+    def recommendation(self, total_score: float) -> str:
+        if total_score >= self.highly_recommended:
+            return "Highly Recommended"
+        if total_score >= self.recommended:
+            return "Recommended"
+        return "Not Recommended"
+
+    def categorize(self, ranked_candidates: Iterable[Dict[str, Any]]) -> Dict[str, List[str]]:
+        """Splits ranked candidates into top / acceptable / not recommended ids."""
+        categories = {"top_candidates": [], "acceptable_candidates": [], "not_recommended": []}
+        for candidate in ranked_candidates:
+            total_score = candidate["match_score"]["total_score"]
+            if total_score >= self.highly_recommended:
+                categories["top_candidates"].append(candidate["candidate_id"])
+            elif total_score >= self.recommended:
+                categories["acceptable_candidates"].append(candidate["candidate_id"])
+            else:
+                categories["not_recommended"].append(candidate["candidate_id"])
+        return categories
+
+    # ------------------------------------------------------------------
+    # LLM instruction fragments
+    # ------------------------------------------------------------------
+
+    def scoring_rules(self) -> str:
+        """Scoring section for the smart ranking agent instruction."""
+        exp = {a: _fmt(p) for a, p in self.experience_points.items()}
+        return "\n".join([
+            f"   - mandatory_skills_score: (coverage% / 100) * {_fmt(self.mandatory_points)}",
+            f"   - good_to_have_skills_score: (coverage% / 100) * {_fmt(self.good_to_have_points)}",
+            f"   - experience_score: {exp['Perfect Match']} if perfect, {exp['Close Match']} if close, "
+            f"{exp['Below Requirements']} if below, {exp['Underqualified']} if under",
+            f"   - location_score: copy fit_scores.location_score from the candidate (max {_fmt(self.location_points)})",
+            f"   - salary_score: copy fit_scores.salary_score from the candidate (max {_fmt(self.salary_points)})",
+            "   - **total_score**: Sum all above",
+        ])
+
+    def recommendation_rules(self) -> str:
+        return (
+            f"\"Highly Recommended\" (≥{_fmt(self.highly_recommended)}), "
+            f"\"Recommended\" (≥{_fmt(self.recommended)} and <{_fmt(self.highly_recommended)}), "
+            f"\"Not Recommended\" (<{_fmt(self.recommended)})"
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "description": self.description,
+            "weights": self.weights,
+            "experience_levels": self.experience_levels,
+            "thresholds": {"highly_recommended": self.highly_recommended, "recommended": self.recommended},
+        }
+
+
+def _fmt(value: float) -> str:
+    return f"{value:g}"
+
+
+# ============================================================================
+# Profile Registry
+# ============================================================================
+
+class ScoringProfileRegistry:
+    """Loads scoring_profiles.json, resolves "extends" chains and caches compiled profiles."""
+
+    def __init__(self, path: Path = PROFILES_PATH):
+        self.path = Path(path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            config = json.load(f)
+        self.raw_profiles: Dict[str, Dict[str, Any]] = config.get("profiles", {})
+        self.profile_types: Dict[str, str] = config.get("profile_types", {})
+        if DEFAULT_PROFILE not in self.raw_profiles:
+            raise ValueError(f"{self.path} must define a '{DEFAULT_PROFILE}' scoring profile")
+        self._compiled: Dict[str, ScoringProfile] = {}
+        self._lock = threading.Lock()
+
+    def _resolve(self, config: Dict[str, Any], seen: Tuple[str, ...] = ()) -> Dict[str, Any]:
+        parent_name = config.get("extends")
+        if not parent_name:
+            return dict(config)
+        if parent_name in seen:
+            raise ValueError(f"Circular scoring profile inheritance: {' -> '.join(seen + (parent_name,))}")
+        if parent_name not in self.raw_profiles:
+            raise ValueError(f"Unknown parent scoring profile: {parent_name}")
+        merged = self._resolve(self.raw_profiles[parent_name], seen + (parent_name,))
+        for key, value in config.items():
+            if isinstance(value, dict) and isinstance(merged.get(key), dict):
+                merged[key] = {**merged[key], **value}
+            else:
+                merged[key] = value
+        merged.pop("extends", None)
+        return merged
+
+    def names(self) -> List[str]:
+        return list(self.raw_profiles)
+
+    def get(self, name: str) -> ScoringProfile:
+        """Returns a compiled profile by name."""
+        if name not in self.raw_profiles:
+            raise KeyError(f"Unknown scoring profile: {name}. Available: {', '.join(self.raw_profiles)}")
+        profile = self._compiled.get(name)
+        if profile is None:
+            with self._lock:
+                profile = self._compiled.get(name)
+                if profile is None:
+                    profile = self._compiled[name] = ScoringProfile(name, self._resolve(self.raw_profiles[name], (name,)))
+        return profile
+
+    def compile_inline(self, config: Dict[str, Any], name: str = "custom") -> ScoringProfile:
+        """Compiles an ad-hoc profile (e.g. embedded in a JD); defaults to extending 'default'."""
+        config = {"extends": DEFAULT_PROFILE, **config}
+        return ScoringProfile(config.get("name", name), self._resolve(config, (name,)))
+
+    def for_jd(self, jd_data: Dict[str, Any], override: Optional[Union[str, Dict[str, Any]]] = None) -> ScoringProfile:
+        """
+        Picks the scoring profile for a JD.
+
+        Precedence: explicit override, the JD's own "scoring_profile" (name or
+        inline config), the mapping for its profile_type, then "default".
+        """
+        selected = override or jd_data.get("scoring_profile")
+        if isinstance(selected, dict):
+            return self.compile_inline(selected, name=f"{jd_data.get('job_id', 'jd')}-custom")
+        if selected:
+            return self.get(selected)
+        return self.get(self.profile_types.get(jd_data.get("profile_type", ""), DEFAULT_PROFILE))
+
+
+_registry: Optional[ScoringProfileRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_profile_registry() -> ScoringProfileRegistry:
+    """Returns the process-wide profile registry (loaded once)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = ScoringProfileRegistry()
+    return _registry
+
+
+def get_scoring_profile(
+    jd_data: Optional[Dict[str, Any]] = None,
+    override: Optional[Union[str, Dict[str, Any]]] = None
+) -> ScoringProfile:
+    """Shortcut for get_profile_registry().for_jd(...)."""
+    return get_profile_registry().for_jd(jd_data or {}, override)
+
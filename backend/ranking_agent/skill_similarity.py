@@ -0,0 +1,362 @@
+"""
+Fuzzy and hierarchical skill matching for the ranking agents.
+
+Exact matching treats "AWS EC2" and "AWS" as unrelated skills. This module
+precomputes a sparse skill-to-skill similarity table from a small taxonomy of
+parent skills plus token overlap, so a candidate can earn partial credit for a
+related skill. The table is cached on disk and grown incrementally as new
+skills are seen, which keeps per-candidate scoring to a handful of dict lookups.
+"""
+
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, Optional, Set
+
+from .tools import normalize_skill
+
+
+# ============================================================================
+# Taxonomy and Similarity Weights
+# ============================================================================
+
+# Child skill -> parent skill (both normalized with normalize_skill)
+SKILL_TAXONOMY: Dict[str, str] = {
+    # Cloud
+    "aws ec2": "aws",
+    "aws s3": "aws",
+    "aws lambda": "aws",
+    "aws ecs": "aws",
+    "aws eks": "aws",
+    "aws rds": "aws",
+    "aws cloudformation": "aws",
+    "azure devops": "azure",
+    "azure functions": "azure",
+    "gke": "google cloud platform",
+    "bigquery": "google cloud platform",
+    "cloud run": "google cloud platform",
+    # Java ecosystem
+    "spring boot": "spring",
+    "spring mvc": "spring",
+    "spring security": "spring",
+    "spring": "java",
+    "hibernate": "java",
+    "kotlin": "java",
+    # Python ecosystem
+    "django": "python",
+    "flask": "python",
+    "fastapi": "python",
+    "pandas": "python",
+    "numpy": "python",
+    "scipy": "python",
+    "pytorch": "deep learning",
+    "tensorflow": "deep learning",
+    "keras": "deep learning",
+    "deep learning": "machine learning",
+    "scikit-learn": "machine learning",
+    # JavaScript ecosystem
+    "typescript": "javascript",
+    "react": "javascript",
+    "next.js": "react",
+    "redux": "react",
+    "angular": "javascript",
+    "vue": "javascript",
+    "node": "javascript",
+    "express": "node",
+    "nestjs": "node",
+    # Data stores
+    "postgresql": "sql",
+    "mysql": "sql",
+    "sql server": "sql",
+    "sqlite": "sql",
+    # DevOps
+    "kubernetes": "containers",
+    "docker": "containers",
+    "helm": "kubernetes",
+    "terraform": "infrastructure as code",
+    "ansible": "infrastructure as code",
+    "github actions": "ci/cd",
+    "jenkins": "ci/cd",
+    "gitlab ci": "ci/cd",
+}
+
+# Score granted to a required skill by a related candidate skill
+EXACT_SIMILARITY = 1.0
+CHILD_SATISFIES_PARENT = 0.8  # Candidate has "aws ec2", JD asks for "aws"
+PARENT_FOR_CHILD = 0.5  # Candidate has "aws", JD asks for "aws ec2"
+SIBLING_SIMILARITY = 0.3  # Candidate has "flask", JD asks for "django"
+TOKEN_SUPERSET_SIMILARITY = 0.7  # Candidate has "aws glue", JD asks for "aws"
+TOKEN_SUBSET_SIMILARITY = 0.4  # Candidate has "spark", JD asks for "spark streaming"
+TOKEN_OVERLAP_WEIGHT = 0.5  # Scaled by Jaccard overlap of skill tokens
+MIN_TOKEN_OVERLAP = 0.34
+ANCESTOR_DECAY = 0.8  # Applied per taxonomy level beyond the direct parent
+
+# Skills scoring at least this much count as "matched" in fuzzy mode
+FUZZY_MATCH_THRESHOLD = 0.8
+
+MATCH_MODES = ("exact", "fuzzy")
+
+_STOPWORDS = {"and", "or", "the", "of", "in", "with", "basics", "concepts", "framework", "frameworks"}
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "skill_similarity.json"
+
+
+def tokenize_skill(skill: str) -> Set[str]:
+    """Splits a normalized skill into comparable tokens."""
+    tokens = set()
+    for token in re.findall(r"[a-z0-9+#.]+", skill.lower()):
+        token = token.strip(".")
+        if token and token not in _STOPWORDS:
+            tokens.add(token)
+    return tokens
+
+
+def _ancestors(skill: str) -> List[str]:
+    """Returns the taxonomy parents of a skill, nearest first."""
+    chain = []
+    current = SKILL_TAXONOMY.get(skill)
+    while current and current not in chain and current != skill:
+        chain.append(current)
+        current = SKILL_TAXONOMY.get(current)
+    return chain
+
+
+def pair_similarity(required: str, candidate: str) -> float:
+    """
+    Scores how much a candidate skill satisfies a required skill.
+
+    Args:
+        required: Normalized required skill from the JD
+        candidate: Normalized skill from the candidate's resume
+
+    Returns:
+        Similarity in [0, 1]; 1.0 means an exact match
+    """
+    if required == candidate:
+        return EXACT_SIMILARITY
+
+    best = 0.0
+
+    # Hierarchy: candidate skill is a descendant of the required skill
+    candidate_ancestors = _ancestors(candidate)
+    if required in candidate_ancestors:
+        depth = candidate_ancestors.index(required)
+        best = max(best, CHILD_SATISFIES_PARENT * (ANCESTOR_DECAY ** depth))
+
+    # Hierarchy: candidate skill is an ancestor of the required skill
+    required_ancestors = _ancestors(required)
+    if candidate in required_ancestors:
+        depth = required_ancestors.index(candidate)
+        best = max(best, PARENT_FOR_CHILD * (ANCESTOR_DECAY ** depth))
+
+    # Hierarchy: siblings sharing a direct parent
+    if required_ancestors and candidate_ancestors and required_ancestors[0] == candidate_ancestors[0]:
+        best = max(best, SIBLING_SIMILARITY)
+
+    # Token overlap for skills the taxonomy does not know about
+    required_tokens = tokenize_skill(required)
+    candidate_tokens = tokenize_skill(candidate)
+    if required_tokens and candidate_tokens:
+        if required_tokens < candidate_tokens:
+            best = max(best, TOKEN_SUPERSET_SIMILARITY)
+        elif candidate_tokens < required_tokens:
+            best = max(best, TOKEN_SUBSET_SIMILARITY)
+        else:
+            overlap = len(required_tokens & candidate_tokens) / len(required_tokens | candidate_tokens)
+            if overlap >= MIN_TOKEN_OVERLAP:
+                best = max(best, TOKEN_OVERLAP_WEIGHT * overlap)
+
+    return round(best, 3)
+
+
+# ============================================================================
+# Sparse Similarity Table
+# ============================================================================
+
+class SkillSimilarityTable:
+    """
+    Sparse, asymmetric similarity matrix: rows[required][candidate] = score.
+
+    Only related pairs (shared token or taxonomy link) are stored, so the
+    table stays small and a candidate is scored by intersecting each required
+    skill's row with the candidate's skill set.
+    """
+
+    def __init__(self, cache_path: Optional[Path] = CACHE_PATH):
+        self.cache_path = cache_path
+        self.rows: Dict[str, Dict[str, float]] = {}
+        self._token_index: Dict[str, Set[str]] = {}
+        self._children: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+        self.ensure(set(SKILL_TAXONOMY) | set(SKILL_TAXONOMY.values()))
+
+    def _load(self):
+        """Loads a previously cached table from disk."""
+        if not self.cache_path or not self.cache_path.exists():
+            return
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached.get("taxonomy_size") != len(SKILL_TAXONOMY):
+                return  # Taxonomy changed - rebuild from scratch
+            for skill in cached.get("skills", []):
+                self._index(skill)
+            self.rows = {skill: dict(row) for skill, row in cached.get("rows", {}).items()}
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable skill similarity cache: {e}")
+            self.rows = {}
+            self._token_index = {}
+            self._children = {}
+
+    def save(self):
+        """Persists the table if it changed since the last save."""
+        if not self.cache_path or not self._dirty:
+            return
+        with self._lock:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.cache_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "taxonomy_size": len(SKILL_TAXONOMY),
+                    "skills": sorted(self.rows),
+                    "rows": self.rows
+                }, f, ensure_ascii=False)
+            self._dirty = False
+
+    def _index(self, skill: str):
+        """Registers a skill in the token and taxonomy indexes."""
+        self.rows.setdefault(skill, {skill: EXACT_SIMILARITY})
+        for token in tokenize_skill(skill):
+            self._token_index.setdefault(token, set()).add(skill)
+        parent = SKILL_TAXONOMY.get(skill)
+        if parent:
+            self._children.setdefault(parent, set()).add(skill)
+
+    def _related(self, skill: str) -> Set[str]:
+        """Known skills that may have non-zero similarity with `skill`."""
+        related = set()
+        for token in tokenize_skill(skill):
+            related |= self._token_index.get(token, set())
+        lineage = _ancestors(skill)
+        related.update(s for s in lineage if s in self.rows)
+        for ancestor in [skill] + lineage[:1]:
+            related |= self._children.get(ancestor, set())
+        # Descendants beyond one level
+        frontier = list(self._children.get(skill, set()))
+        while frontier:
+            child = frontier.pop()
+            for grandchild in self._children.get(child, set()):
+                if grandchild not in related:
+                    related.add(grandchild)
+                    frontier.append(grandchild)
+        related.discard(skill)
+        return related
+
+    def ensure(self, skills: Iterable[str]) -> None:
+        """
+        Adds normalized skills to the table, computing only the new rows and
+        the new entries in existing rows.
+        """
+        new_skills = [s for s in set(skills) if s and s not in self.rows]
+        if not new_skills:
+            return
+
+        with self._lock:
+            for skill in new_skills:
+                self._index(skill)
+            for skill in new_skills:
+                for other in self._related(skill):
+                    forward = pair_similarity(skill, other)
+                    if forward > 0:
+                        self.rows[skill][other] = forward
+                    backward = pair_similarity(other, skill)
+                    if backward > 0:
+                        self.rows[other][skill] = backward
+            self._dirty = True
+
+    def row(self, required: str) -> Dict[str, float]:
+        """Returns the sparse similarity row for a required skill."""
+        if required not in self.rows:
+            self.ensure([required])
+        return self.rows[required]
+
+
+_table: Optional[SkillSimilarityTable] = None
+_table_lock = threading.Lock()
+
+
+def get_similarity_table() -> SkillSimilarityTable:
+    """Returns the process-wide similarity table, loading the cache once."""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = SkillSimilarityTable()
+    return _table
+
+
+# ============================================================================
+# Fuzzy Skill Matching
+# ============================================================================
+
+def fuzzy_skill_match(
+    candidate_skills: List[str],
+    required_skills: List[str],
+    table: Optional[SkillSimilarityTable] = None
+) -> Dict[str, Any]:
+    """
+    Calculates partial-credit skill coverage using the similarity table.
+
+    Args:
+        candidate_skills: List of candidate's skills
+        required_skills: List of required skills from JD
+        table: Similarity table to use (defaults to the shared cached table)
+
+    Returns:
+        Dictionary with matched/missing skills, coverage percentage and the
+        related skill that earned partial credit for each requirement
+    """
+    table = table or get_similarity_table()
+
+    normalized_candidate = set(normalize_skill(s) for s in candidate_skills if s)
+    normalized_required = sorted(set(normalize_skill(s) for s in required_skills if s))
+    table.ensure(normalized_candidate | set(normalized_required))
+
+    matched, missing, partial = [], [], []
+    credit_total = 0.0
+
+    for required in normalized_required:
+        row = table.row(required)
+        best_skill, best_score = None, 0.0
+        # Iterate over whichever side is smaller
+        if len(row) <= len(normalized_candidate):
+            for skill, score in row.items():
+                if score > best_score and skill in normalized_candidate:
+                    best_skill, best_score = skill, score
+        else:
+            for skill in normalized_candidate:
+                score = row.get(skill, 0.0)
+                if score > best_score:
+                    best_skill, best_score = skill, score
+
+        credit_total += best_score
+        if best_score >= FUZZY_MATCH_THRESHOLD:
+            matched.append(required)
+        else:
+            missing.append(required)
+        if best_skill and best_skill != required:
+            partial.append({"required": required, "matched_by": best_skill, "credit": best_score})
+
+    # No requirements -> no credit, as in exact mode and fast ranking
+    coverage = (credit_total / len(normalized_required) * 100) if normalized_required else 0.0
+
+    return {
+        "matched": matched,
+        "missing": missing,
+        "partial_matches": partial,
+        "coverage_percent": round(coverage, 1),
+        "match_count": len(matched),
+        "total_required": len(normalized_required)
+    }
@@ -16,6 +16,7 @@ from pathlib import Path
 import json
 from datetime import datetime
 from .tools import load_all_resumes, load_jd_by_id
+from .scoring_profiles import DEFAULT_PROFILE, get_profile_registry
 
 
 # ============================================================================
@@ -88,6 +89,7 @@ def save_rankings_callback(callback_context):
         jd_id = session.state.get("jd_id")
         jd_title = session.state.get("jd_title", "Unknown")
         jd_location = session.state.get("jd_location", "Unknown")
+        profile = get_profile_registry().get(session.state.get("scoring_profile", DEFAULT_PROFILE))
         
         if not ranking_output:
             print("⚠️  No ranking output in state")
@@ -102,11 +104,12 @@ def save_rankings_callback(callback_context):
         # Create full ranking document
         ranking_id = f"RANK-{jd_id}-{int(datetime.now().timestamp())}"
         
-        # Categorize candidates
+        # Categorize candidates (cut-offs from the scoring profile)
         ranked_list = ranking_data.get("ranked_candidates", [])
-        top_candidates = [c["candidate_id"] for c in ranked_list if c["match_score"]["total_score"] >= 70]
-        acceptable = [c["candidate_id"] for c in ranked_list if 50 <= c["match_score"]["total_score"] < 70]
-        not_recommended = [c["candidate_id"] for c in ranked_list if c["match_score"]["total_score"] < 50]
+        categories = profile.categorize(ranked_list)
+        top_candidates = categories["top_candidates"]
+        acceptable = categories["acceptable_candidates"]
+        not_recommended = categories["not_recommended"]
         
         document = {
             "ranking_id": ranking_id,
@@ -114,6 +117,7 @@ def save_rankings_callback(callback_context):
             "jd_id": jd_id,
             "jd_title": jd_title,
             "jd_location": jd_location,
+            "scoring_profile": profile.name,
             "total_candidates_evaluated": len(ranked_list),
             "ranked_candidates": ranked_list,
             "top_candidates": top_candidates,
@@ -139,6 +143,27 @@ def save_rankings_callback(callback_context):
         traceback.print_exc()
 
 
+# ============================================================================
+# Structured Output Binding
+# ============================================================================
+
+def bind_ranking_schema(callback_context, llm_request):
+    """
+    Asks Gemini for JSON constrained to RankingOutput on every model call.
+
+    The schema is bound on the request rather than as the agent's output_schema:
+    ADK validates output_schema output as a whole and raises on the first bad
+    candidate (or a response truncated by the token limit), losing the batch.
+    With the raw text in state, ranking_agent.output_decoding validates each
+    candidate separately and only the failures are re-requested.
+    """
+    if llm_request.config is None:
+        llm_request.config = genai_types.GenerateContentConfig()
+    llm_request.config.response_mime_type = "application/json"
+    llm_request.config.response_schema = RankingOutput
+    return None
+
+
 # ============================================================================
 # Smart Ranking Agent
 # ============================================================================
@@ -151,9 +176,10 @@ smart_ranking_agent = Agent(
     # No conversation history - agent operates on injected data only
     include_contents='none',
     
-    # No output schema - let LLM generate free-form JSON
-    # This allows tools to work and gives LLM more flexibility
+    # Raw JSON text is saved; RankingOutput is enforced by bind_ranking_schema
+    # and validated per candidate by output_decoding
     output_key="ranking_output",
+    before_model_callback=bind_ranking_schema,
     
     # Tools to load candidate data
     tools=[],
@@ -191,14 +217,9 @@ Rank ALL candidates above. For EACH candidate:
    - alignment: "Perfect Match", "Close Match", "Below Requirements", or "Underqualified"
 
 7. **Scores** (0-100 total):
-   - mandatory_skills_score: (coverage% / 100) * 40
-   - good_to_have_skills_score: (coverage% / 100) * 20
-   - experience_score: 25 if perfect, 20 if close, 10 if below, 5 if under
-   - location_score: 10 (assume all match)
-   - salary_score: 3 (assume unknown)
-   - **total_score**: Sum all above
-
-8. **recommendation**: "Highly Recommended" (≥70), "Recommended" (50-69), "Not Recommended" (<50)
+{scoring_rules}
+
+8. **recommendation**: {recommendation_rules}
 
 9. **justification**: 2-3 sentences explaining the score
 
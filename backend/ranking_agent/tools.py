@@ -7,6 +7,8 @@ import json
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
+from .location_matching import LocationMatcher
+
 
 # ============================================================================
 # File Loading Tools
@@ -133,7 +135,8 @@ def normalize_skill(skill: str) -> str:
 
 def calculate_skill_match(
     candidate_skills: List[str],
-    required_skills: List[str]
+    required_skills: List[str],
+    match_mode: str = "exact"
 ) -> Dict[str, Any]:
     """
     Calculates skill match between candidate and requirements.
@@ -141,10 +144,16 @@ def calculate_skill_match(
     Args:
         candidate_skills: List of candidate's skills
         required_skills: List of required skills from JD
+        match_mode: "exact" for normalized set intersection, or "fuzzy" to give
+            partial credit for related skills (e.g. "AWS EC2" for "AWS")
     
     Returns:
         Dictionary with matched/missing skills and coverage percentage
     """
+    if match_mode == "fuzzy":
+        from .skill_similarity import fuzzy_skill_match
+        return fuzzy_skill_match(candidate_skills, required_skills)
+    
     # Normalize all skills
     normalized_candidate = set(normalize_skill(s) for s in candidate_skills)
     normalized_required = set(normalize_skill(s) for s in required_skills)
@@ -153,8 +162,8 @@ def calculate_skill_match(
     matched = normalized_required & normalized_candidate
     missing = normalized_required - normalized_candidate
     
-    # Calculate coverage
-    coverage = (len(matched) / len(normalized_required) * 100) if normalized_required else 100.0
+    # Calculate coverage (no requirements -> no credit, in both modes and in fast ranking)
+    coverage = (len(matched) / len(normalized_required) * 100) if normalized_required else 0.0
     
     return {
         "matched": list(matched),
@@ -266,39 +275,21 @@ def calculate_location_score(
     Returns:
         Dictionary with score (0-10) and compatibility status
     """
-    # Normalize locations for comparison
-    cand_loc = candidate_location.lower().strip()
-    job_loc = jd_location.lower().strip()
-    
-    # Check for exact match
-    if cand_loc == job_loc or cand_loc in job_loc or job_loc in cand_loc:
-        return {
-            "score": 10,
-            "is_match": True,
-            "compatibility": "Exact Match"
-        }
+    # Alias-aware comparison (Bengaluru == Bangalore, Gurgaon in Delhi NCR, remote JDs)
+    result = LocationMatcher(jd_location, relocation_willing).match(candidate_location)
     
-    # Check for remote / anywhere
-    if "remote" in job_loc or "anywhere" in job_loc:
+    if result["score"] is None:
+        # Location missing on either side - assume compatible
         return {
             "score": 10,
             "is_match": True,
-            "compatibility": "Remote Possible"
-        }
-    
-    # Check relocation willingness
-    if relocation_willing:
-        return {
-            "score": 8,
-            "is_match": False,
-            "compatibility": "Willing to Relocate"
+            "compatibility": "Unknown"
         }
     
-    # No match, not willing to relocate
     return {
-        "score": 0,
-        "is_match": False,
-        "compatibility": "Location Mismatch"
+        "score": result["score"],
+        "is_match": result["is_match"],
+        "compatibility": result["compatibility"]
     }
 
 
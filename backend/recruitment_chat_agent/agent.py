@@ -108,6 +108,16 @@ def query_jobs(keyword: Optional[str] = None) -> dict:
     }
 
 
+def get_candidate_skills(resume_data: dict) -> List[str]:
+    """Flatten all skill categories from a parsed resume's technical_skills"""
+    tech_skills = resume_data.get("parsed_data", {}).get("technical_skills", {})
+    skills = []
+    for category in tech_skills.values():
+        if isinstance(category, list):
+            skills.extend(category)
+    return skills
+
+
 # Tool 2: Query Candidates/Resumes
 def query_candidates(skill: Optional[str] = None, min_experience: Optional[int] = None) -> dict:
     """
@@ -132,26 +142,31 @@ def query_candidates(skill: Optional[str] = None, min_experience: Optional[int]
         if "error" in resume_data:
             continue
         
+        candidate_info = resume_data.get("candidate_info", {})
+        parsed_data = resume_data.get("parsed_data", {})
+        all_skills = get_candidate_skills(resume_data)
+        
         # Filter by skill
         if skill:
-            candidate_skills = [s.lower() for s in resume_data.get("skills", [])]
+            candidate_skills = [s.lower() for s in all_skills]
             if skill.lower() not in candidate_skills:
                 continue
         
         # Filter by experience
-        experience = resume_data.get("total_experience_years", 0)
+        experience = parsed_data.get("total_experience_years", 0)
         if min_experience and experience < min_experience:
             continue
         
+        work_experience = parsed_data.get("work_experience", [])
         candidates.append({
             "candidate_id": resume_data.get("candidate_id"),
-            "name": resume_data.get("name"),
-            "email": resume_data.get("email"),
-            "phone": resume_data.get("phone"),
+            "name": candidate_info.get("name"),
+            "email": candidate_info.get("email"),
+            "phone": candidate_info.get("phone"),
             "experience_years": experience,
-            "skills": resume_data.get("skills", [])[:10],  # Top 10 skills
-            "current_role": resume_data.get("current_role"),
-            "target_job_title": resume_data.get("target_job_title")
+            "skills": all_skills[:10],  # Top 10 skills
+            "current_role": work_experience[0].get("title") if work_experience else None,
+            "target_job_title": candidate_info.get("target_job_title")
         })
     
     return {
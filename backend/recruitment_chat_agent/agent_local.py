@@ -6,6 +6,7 @@ from google.adk.agents import Agent
 from .tools_local import (
     query_jobs_local,
     query_candidates_local, 
+    search_resumes_local,
     get_candidate_rankings_local,
     get_recruitment_stats_local
 )
@@ -40,6 +41,7 @@ recruitment_rag_agent_local = Agent(
     - "How many Python developers do we have?"
     - "What's the status of our recruitment pipeline?"
     - "Find candidates with more than 5 years of experience in React"
+    - "Who has worked on Kafka streaming pipelines?" (use search_resumes_local)
     
     **Response Format:**
     - Be clear and concise
@@ -50,6 +52,7 @@ recruitment_rag_agent_local = Agent(
     tools=[
         query_jobs_local,
         query_candidates_local,
+        search_resumes_local,
         get_candidate_rankings_local,
         get_recruitment_stats_local
     ],
@@ -6,9 +6,14 @@ This version reads from local JSON files instead of GCS for testing without clou
 
 import json
 import os
+import sys
 from typing import List, Dict, Optional
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from shared.resume_search import search_resumes
+
 
 def load_local_json(file_path: Path) -> dict:
     """Load JSON from local file"""
@@ -58,6 +63,16 @@ def query_jobs_local(keyword: Optional[str] = None) -> dict:
     }
 
 
+def get_candidate_skills(resume_data: dict) -> List[str]:
+    """Flatten all skill categories from a parsed resume's technical_skills"""
+    tech_skills = resume_data.get("parsed_data", {}).get("technical_skills", {})
+    skills = []
+    for category in tech_skills.values():
+        if isinstance(category, list):
+            skills.extend(category)
+    return skills
+
+
 # Tool 2: Query Candidates (Local)
 def query_candidates_local(skill: Optional[str] = None, min_experience: Optional[int] = None) -> dict:
     """Query candidates from local files"""
@@ -73,26 +88,31 @@ def query_candidates_local(skill: Optional[str] = None, min_experience: Optional
         if "error" in resume_data:
             continue
         
+        candidate_info = resume_data.get("candidate_info", {})
+        parsed_data = resume_data.get("parsed_data", {})
+        all_skills = get_candidate_skills(resume_data)
+        
         # Filter by skill
         if skill:
-            candidate_skills = [s.lower() for s in resume_data.get("skills", [])]
+            candidate_skills = [s.lower() for s in all_skills]
             if skill.lower() not in candidate_skills:
                 continue
         
         # Filter by experience
-        experience = resume_data.get("total_experience_years", 0)
+        experience = parsed_data.get("total_experience_years", 0)
         if min_experience and experience < min_experience:
             continue
         
+        work_experience = parsed_data.get("work_experience", [])
         candidates.append({
             "candidate_id": resume_data.get("candidate_id"),
-            "name": resume_data.get("name"),
-            "email": resume_data.get("email"),
-            "phone": resume_data.get("phone"),
+            "name": candidate_info.get("name"),
+            "email": candidate_info.get("email"),
+            "phone": candidate_info.get("phone"),
             "experience_years": experience,
-            "skills": resume_data.get("skills", [])[:10],
-            "current_role": resume_data.get("current_role"),
-            "target_job_title": resume_data.get("target_job_title")
+            "skills": all_skills[:10],
+            "current_role": work_experience[0].get("title") if work_experience else None,
+            "target_job_title": candidate_info.get("target_job_title")
         })
     
     return {
@@ -101,7 +121,25 @@ def query_candidates_local(skill: Optional[str] = None, min_experience: Optional
     }
 
 
-# Tool 3: Get Rankings (Local)
+# Tool 3: Full-Text Resume Search (Local)
+def search_resumes_local(query: str, top_n: int = 10) -> dict:
+    """
+    Search candidate resumes by free text (skills, summary, work experience, projects).
+    
+    Results are ranked by relevance (BM25), so prefer this over query_candidates_local
+    for questions like "who has worked with Kafka and Spark?".
+    
+    Args:
+        query: Free-text search query
+        top_n: Number of results to return (default: 10)
+    """
+    try:
+        return search_resumes(query, limit=top_n)
+    except Exception as e:
+        return {"error": f"Resume search failed: {str(e)}", "query": query, "results": []}
+
+
+# Tool 4: Get Rankings (Local)
 def get_candidate_rankings_local(job_id: str, top_n: int = 5) -> dict:
     """Get candidate rankings from local files"""
     ranking_dir = Path("data/rankings")
@@ -151,7 +189,7 @@ def get_candidate_rankings_local(job_id: str, top_n: int = 5) -> dict:
     }
 
 
-# Tool 4: Get Stats (Local)
+# Tool 5: Get Stats (Local)
 def get_recruitment_stats_local() -> dict:
     """Get recruitment statistics from local files"""
     jd_dir = Path("data/parsed_jds")
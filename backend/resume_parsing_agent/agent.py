@@ -6,6 +6,7 @@ and provides strict, fair evaluation with a 100-point scoring system.
 """
 
 import json
+import os
 from pathlib import Path
 from datetime import datetime
 from google.adk.agents import Agent
@@ -19,6 +20,88 @@ from .tools import analyze_github_profile, analyze_leetcode_profile, analyze_sta
 # Callback for Saving Parsed Resumes to Local JSON
 # ============================================================================
 
+def new_candidate_id(data_dir: Path) -> str:
+    """
+    Timestamp-based candidate ID (CAND-YYYYMMDD-HHMMSS).
+
+    Resumes saved within the same second (batch parsing) get a -2, -3, ... suffix
+    instead of overwriting each other.
+    """
+    base_id = f"CAND-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+    candidate_id, suffix = base_id, 2
+    while (data_dir / f"{candidate_id}.json").exists():
+        candidate_id = f"{base_id}-{suffix}"
+        suffix += 1
+    return candidate_id
+
+
+def save_parsed_resume(resume_dict: dict, session_id: str = None, candidate_id: str = None) -> dict:
+    """
+    Saves one parsed resume evaluation to data/parsed_resumes.
+
+    Args:
+        resume_dict: ResumeEvaluationOutput as a dict
+        session_id: ADK session that produced it
+        candidate_id: Existing candidate to overwrite (LLM enrichment of a
+            fast-path record); a new ID is generated when omitted
+
+    Returns:
+        Saved document (with candidate_id and metadata)
+    """
+    candidate_name = resume_dict.get("candidate_info", {}).get("name", "Unknown")
+    data_dir = Path(__file__).parent.parent / "data" / "parsed_resumes"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    candidate_id = candidate_id or new_candidate_id(data_dir)
+    file_path = data_dir / f"{candidate_id}.json"
+    
+    # Add metadata
+    document = {
+        "candidate_id": candidate_id,
+        "candidate_name": candidate_name,
+        "parsed_at": datetime.now().isoformat(),
+        "session_id": session_id,
+        **resume_dict
+    }
+    
+    if file_path.exists():
+        with open(file_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if previous.get("parsing", {}).get("tier") == "fast":
+            _merge_fast_fields(document, previous)
+    
+    # Write-then-rename so readers never see a half-written file and the
+    # directory mtime changes (the title index and preview matrix refresh on it)
+    tmp_path = file_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+    
+    print(f"✅ Resume saved to: {file_path}")
+    print(f"📊 Final Score: {document.get('evaluation', {}).get('final_score', 'N/A')}/100")
+    print(f"🎓 Grade: {document.get('evaluation', {}).get('grade', 'N/A')}")
+    return document
+
+
+def _merge_fast_fields(document: dict, fast_document: dict):
+    """Keeps fast-path contact fields the LLM left empty and records the enrichment."""
+    info = document.setdefault("candidate_info", {})
+    fast_info = fast_document.get("candidate_info", {})
+    for field in ("email", "phone", "location"):
+        if not info.get(field) and fast_info.get(field):
+            info[field] = fast_info[field]
+    links = info.setdefault("links", {}) or {}
+    for field, url in (fast_info.get("links") or {}).items():
+        if url and not links.get(field):
+            links[field] = url
+    info["links"] = links
+    document["parsing"] = {
+        "tier": "llm",
+        "status": "enriched",
+        "fast_parsed_at": fast_document.get("parsed_at"),
+        "enriched_at": document["parsed_at"],
+    }
+
+
 def save_resume_to_json(callback_context):
     """
     Callback to save parsed resume evaluation to local JSON file after agent completes.
@@ -38,31 +121,13 @@ def save_resume_to_json(callback_context):
         else:
             resume_dict = parsed_data
         
-        # Generate candidate ID based on name and timestamp
-        candidate_name = resume_dict.get("candidate_info", {}).get("name", "Unknown")
-        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        candidate_id = f"CAND-{timestamp}"
-        
-        # Add metadata
-        document = {
-            "candidate_id": candidate_id,
-            "candidate_name": candidate_name,
-            "parsed_at": datetime.now().isoformat(),
-            "session_id": callback_context.session.id,
-            **resume_dict
-        }
-        
-        # Save to local file
-        data_dir = Path(__file__).parent.parent / "data" / "parsed_resumes"
-        data_dir.mkdir(parents=True, exist_ok=True)
-        
-        file_path = data_dir / f"{candidate_id}.json"
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(document, f, indent=2, ensure_ascii=False)
+        # A candidate_id already in state means this run enriches an existing record
+        document = save_parsed_resume(
+            resume_dict, callback_context.session.id, callback_context.state.get("candidate_id")
+        )
         
-        print(f"✅ Resume saved to: {file_path}")
-        print(f"📊 Final Score: {document.get('evaluation', {}).get('final_score', 'N/A')}/100")
-        print(f"🎓 Grade: {document.get('evaluation', {}).get('grade', 'N/A')}")
+        # Callers read the generated ID back from session state
+        callback_context.state["candidate_id"] = document["candidate_id"]
     
     except Exception as e:
         print(f"⚠️ Error saving resume: {e}")
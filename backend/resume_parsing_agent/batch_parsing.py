@@ -0,0 +1,394 @@
+"""
+Batched resume parsing - several resumes per LLM request
+
+The resume evaluation instruction is several thousand tokens and is sent with
+every resume, so for short resumes most of each request is fixed prompt
+overhead. Batch mode packs resumes into one request under a token budget,
+asks for one ResumeEvaluationOutput per resume (tagged with its resume_id) and
+splits the response back into individual documents. Each document is
+validated on its own; a resume whose entry is missing, truncated or invalid is
+re-parsed alone with the regular resume_evaluation_agent.
+
+Token usage is reported per resume: the batch's prompt tokens are split into
+the shared instruction overhead (divided evenly) plus each resume's own text,
+and output tokens are split by the size of each resume's output.
+"""
+
+import asyncio
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+from pydantic import BaseModel, Field, ValidationError
+
+from shared.json_output import extract_array_items
+from .agent import resume_evaluation_agent, save_parsed_resume
+from .schemas import ResumeEvaluationOutput
+
+
+# Resume text tokens per batch request (the instruction comes on top)
+BATCH_TOKEN_BUDGET = int(os.getenv("RESUME_BATCH_TOKEN_BUDGET", "24000"))
+BATCH_MAX_RESUMES = int(os.getenv("RESUME_BATCH_MAX_RESUMES", "6"))
+
+# Output budget: gemini-2.5-flash returns at most 65k tokens per response
+BATCH_MAX_OUTPUT_TOKENS = 60000
+OUTPUT_TOKENS_PER_RESUME = 8000  # Upper estimate for one evaluation document
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English resume text
+
+APP_NAME = "resume_batch_parsing"
+
+
+# ============================================================================
+# Pydantic Schemas for Structured Output
+# ============================================================================
+
+class BatchedResumeEvaluation(BaseModel):
+    """Evaluation of one resume in a batch"""
+    resume_id: str = Field(description="ID of the resume as given in the input (e.g. R1)")
+    result: ResumeEvaluationOutput = Field(description="Complete parsing and evaluation of this resume")
+
+
+class BatchResumeEvaluationOutput(BaseModel):
+    """Evaluations of all resumes in a batch"""
+    resumes: List[BatchedResumeEvaluation] = Field(description="One entry per input resume, in input order")
+
+
+def bind_batch_schema(callback_context, llm_request):
+    """
+    Constrains the batch response to BatchResumeEvaluationOutput JSON.
+
+    Bound on the request rather than as output_schema so one invalid resume
+    does not fail ADK's whole-output validation - entries are validated
+    separately in parse_resumes().
+    """
+    if llm_request.config is None:
+        llm_request.config = genai_types.GenerateContentConfig()
+    llm_request.config.response_mime_type = "application/json"
+    llm_request.config.response_schema = BatchResumeEvaluationOutput
+    return None
+
+
+# ============================================================================
+# Batch Resume Evaluation Agent
+# ============================================================================
+
+resume_batch_evaluation_agent = Agent(
+    name="resume_batch_evaluation_agent",
+    model=resume_evaluation_agent.model,
+    description="Parses and evaluates several resumes in one request with the same rules as resume_evaluation_agent.",
+
+    include_contents="none",
+
+    instruction="""
+# Batch Mode
+
+The user message contains SEVERAL resumes, each between "=== RESUME <id> ===" and
+"=== END RESUME <id> ===" markers. Apply everything below to EACH resume separately:
+never mix information between resumes, and score each one on its own evidence.
+""" + resume_evaluation_agent.instruction + """
+## Batch Output Requirements
+Return a JSON object with a "resumes" list containing exactly one entry per input resume,
+in input order. Each entry has "resume_id" (the id from the markers) and "result"
+(the complete ResumeEvaluationOutput for that resume).
+""",
+
+    output_key="parsed_resume_batch",
+    before_model_callback=bind_batch_schema,
+
+    tools=[],
+
+    generate_content_config=genai_types.GenerateContentConfig(
+        temperature=0.1,
+        max_output_tokens=BATCH_MAX_OUTPUT_TOKENS,
+    ),
+
+    disallow_transfer_to_peers=True,
+    disallow_transfer_to_parent=True,
+)
+
+
+# ============================================================================
+# Packing
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (no tokenizer call)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def pack_batches(
+    resume_texts: List[str],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_resumes: int = BATCH_MAX_RESUMES
+) -> List[List[int]]:
+    """
+    Groups resumes (by index, in order) into batches under the token budget.
+
+    A batch is closed when the next resume would exceed the input budget, the
+    resume count, or the output budget. A resume larger than the budget gets
+    a batch of its own.
+
+    Returns:
+        List of batches, each a list of indices into resume_texts
+    """
+    max_resumes = max(1, min(max_resumes, BATCH_MAX_OUTPUT_TOKENS // OUTPUT_TOKENS_PER_RESUME))
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for index, text in enumerate(resume_texts):
+        tokens = estimate_tokens(text)
+        if current and (current_tokens + tokens > token_budget or len(current) >= max_resumes):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(index)
+        current_tokens += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def _batch_message(resume_ids: List[str], resume_texts: List[str]) -> str:
+    sections = [
+        f"=== RESUME {resume_id} ===\n{text}\n=== END RESUME {resume_id} ==="
+        for resume_id, text in zip(resume_ids, resume_texts)
+    ]
+    return (
+        f"Parse and evaluate each of these {len(resume_ids)} resumes independently "
+        f"and extract all information accurately:\n\n" + "\n\n".join(sections)
+    )
+
+
+# ============================================================================
+# Agent Calls
+# ============================================================================
+
+async def _run_agent(agent: Agent, text: str, output_key: str) -> Tuple[Any, Dict[str, Any], Dict[str, int], str]:
+    """
+    Runs one agent call.
+
+    Returns:
+        (output saved under output_key, final session state, token usage, session ID)
+    """
+    session_service = InMemorySessionService()
+    runner = Runner(agent=agent, session_service=session_service, app_name=APP_NAME)
+    session = await session_service.create_session(app_name=APP_NAME, user_id="api_user")
+    message = genai_types.Content(role="user", parts=[genai_types.Part.from_text(text=text)])
+
+    usage = {"prompt_tokens": 0, "output_tokens": 0}
+    final_text = None
+    async for event in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+        metadata = getattr(event, "usage_metadata", None)
+        if metadata:
+            usage["prompt_tokens"] += metadata.prompt_token_count or 0
+            usage["output_tokens"] += (metadata.candidates_token_count or 0) + (getattr(metadata, "thoughts_token_count", 0) or 0)
+        if event.content and event.content.parts:
+            event_text = "".join(part.text for part in event.content.parts if getattr(part, "text", None))
+            if event_text:
+                final_text = event_text
+
+    session = await session_service.get_session(app_name=APP_NAME, user_id="api_user", session_id=session.id)
+    state = dict(session.state) if session else {}
+    output = state.get(output_key)
+    return (output if output else final_text), state, usage, session.id
+
+
+def _result(name: str, mode: str, tokens: Dict[str, Any], document: Optional[Dict[str, Any]] = None, error: str = None) -> Dict[str, Any]:
+    candidate_info = (document or {}).get("candidate_info", {}) or {}
+    return {
+        "resume": name,
+        "success": document is not None,
+        "candidate_id": (document or {}).get("candidate_id", ""),
+        "candidate_name": candidate_info.get("name", ""),
+        "candidate_email": candidate_info.get("email", ""),
+        "final_score": (document or {}).get("evaluation", {}).get("final_score", 0),
+        "mode": mode,
+        "tokens": tokens,
+        "error": error,
+    }
+
+
+async def parse_single_resume(name: str, text: str, prior_tokens: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """
+    Parses one resume with resume_evaluation_agent (its callback saves the document).
+
+    Args:
+        name: Resume file name (for reporting)
+        text: Extracted resume text
+        prior_tokens: Tokens already spent on this resume in a failed batch, added to the report
+    """
+    tokens = {"prompt_tokens": 0, "output_tokens": 0, "batch_size": 1}
+    if prior_tokens:
+        tokens["prompt_tokens"] += prior_tokens.get("prompt_tokens", 0)
+        tokens["output_tokens"] += prior_tokens.get("output_tokens", 0)
+    try:
+        output, state, usage, _ = await _run_agent(
+            resume_evaluation_agent,
+            f"Parse this resume and extract all information accurately:\n\n{text}",
+            "parsed_resume_evaluation"
+        )
+        tokens["prompt_tokens"] += usage["prompt_tokens"]
+        tokens["output_tokens"] += usage["output_tokens"]
+        tokens["total_tokens"] = tokens["prompt_tokens"] + tokens["output_tokens"]
+        if not output or not state.get("candidate_id"):
+            raise ValueError("Agent produced no parsed resume")
+        if hasattr(output, "model_dump"):
+            output = output.model_dump()
+        document = {"candidate_id": state["candidate_id"], **output}
+        return _result(name, "single", tokens, document)
+    except Exception as e:
+        tokens["total_tokens"] = tokens["prompt_tokens"] + tokens["output_tokens"]
+        print(f"❌ Failed to parse {name}: {e}")
+        return _result(name, "single", tokens, error=str(e))
+
+
+async def _parse_batch(names: List[str], texts: List[str]) -> List[Dict[str, Any]]:
+    """Parses one packed batch; entries that fail validation are re-parsed alone."""
+    resume_ids = [f"R{i + 1}" for i in range(len(texts))]
+    print(f"🤖 Parsing {len(texts)} resumes in one request ({sum(estimate_tokens(t) for t in texts)} est. resume tokens)...")
+    try:
+        output, state, usage, session_id = await _run_agent(
+            resume_batch_evaluation_agent, _batch_message(resume_ids, texts), "parsed_resume_batch"
+        )
+    except Exception as e:
+        print(f"⚠️ Batch request failed, parsing {len(texts)} resumes one by one: {e}")
+        singles = await asyncio.gather(*(parse_single_resume(n, t) for n, t in zip(names, texts)))
+        for single in singles:
+            single["mode"] = "batch_fallback"
+        return list(singles)
+
+    # Validate each resume's entry separately
+    entries, errors = extract_array_items(output, "resumes", "resume_id")
+    for error in errors:
+        print(f"⚠️ Batch output: {error}")
+    valid: Dict[str, Dict[str, Any]] = {}
+    output_sizes: Dict[str, int] = {}
+    for entry in entries:
+        resume_id = entry.get("resume_id") if isinstance(entry, dict) else None
+        if resume_id not in resume_ids or resume_id in valid:
+            continue
+        output_sizes[resume_id] = len(json.dumps(entry.get("result"), ensure_ascii=False))
+        try:
+            valid[resume_id] = ResumeEvaluationOutput.model_validate(entry.get("result")).model_dump()
+        except ValidationError as e:
+            print(f"⚠️ Invalid batch entry {resume_id} ({names[resume_ids.index(resume_id)]}): {e.error_count()} validation errors")
+
+    # Split the request's tokens across its resumes
+    resume_tokens = [estimate_tokens(t) for t in texts]
+    overhead = max(0, usage["prompt_tokens"] - sum(resume_tokens)) / len(texts)
+    prompt_scale = usage["prompt_tokens"] / (sum(resume_tokens) + overhead * len(texts)) if usage["prompt_tokens"] else 0
+    total_output_size = sum(output_sizes.values()) or 1
+
+    results: List[Dict[str, Any]] = []
+    fallbacks = []
+    for position, (resume_id, name, text) in enumerate(zip(resume_ids, names, texts)):
+        share = {
+            "prompt_tokens": round((resume_tokens[position] + overhead) * prompt_scale),
+            "output_tokens": round(usage["output_tokens"] * output_sizes.get(resume_id, 0) / total_output_size),
+        }
+        if resume_id in valid:
+            document = save_parsed_resume(valid[resume_id], session_id)
+            tokens = {**share, "total_tokens": share["prompt_tokens"] + share["output_tokens"], "batch_size": len(texts)}
+            results.append(_result(name, "batch", tokens, document))
+        else:
+            results.append(None)
+            fallbacks.append((position, name, text, share))
+
+    if fallbacks:
+        print(f"🔁 Re-parsing {len(fallbacks)} resumes individually (batch entry missing or invalid)...")
+        singles = await asyncio.gather(*(
+            parse_single_resume(name, text, prior_tokens=share) for _, name, text, share in fallbacks
+        ))
+        for (position, *_), single in zip(fallbacks, singles):
+            single["mode"] = "batch_fallback"
+            results[position] = single
+    return results
+
+
+async def parse_resumes(
+    resumes: List[Tuple[str, str]],
+    token_budget: int = BATCH_TOKEN_BUDGET,
+    max_resumes: int = BATCH_MAX_RESUMES
+) -> List[Dict[str, Any]]:
+    """
+    Parses resumes in token-budgeted batches and saves one document per resume
+
+    Args:
+        resumes: (file name, extracted text) pairs
+        token_budget: Resume text tokens per batch request
+        max_resumes: Maximum resumes per batch request
+
+    Returns:
+        One result per input resume, in input order: resume, success, candidate_id,
+        candidate_name, candidate_email, final_score, mode ("batch", "single" or
+        "batch_fallback"), tokens (prompt/output/total, batch_size) and error
+    """
+    names = [name for name, _ in resumes]
+    texts = [text for _, text in resumes]
+    batches = pack_batches(texts, token_budget, max_resumes)
+    print(f"📦 {len(resumes)} resumes packed into {len(batches)} requests (budget {token_budget} tokens, max {max_resumes} per request)")
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(resumes)
+    for batch in batches:
+        if len(batch) == 1:
+            index = batch[0]
+            results[index] = await parse_single_resume(names[index], texts[index])
+            continue
+        batch_results = await _parse_batch([names[i] for i in batch], [texts[i] for i in batch])
+        for index, result in zip(batch, batch_results):
+            results[index] = result
+
+    summary = summarize_token_usage(results)
+    print(f"✅ Parsed {summary['successful']}/{len(resumes)} resumes, {summary['tokens_per_resume']} tokens per resume on average")
+    return results
+
+
+def summarize_token_usage(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Totals and per-resume averages of the token usage in parse_resumes() results."""
+    total = sum(r["tokens"].get("total_tokens", 0) for r in results)
+    by_mode: Dict[str, Dict[str, int]] = {}
+    for r in results:
+        mode = by_mode.setdefault(r["mode"], {"resumes": 0, "total_tokens": 0})
+        mode["resumes"] += 1
+        mode["total_tokens"] += r["tokens"].get("total_tokens", 0)
+    for mode in by_mode.values():
+        mode["tokens_per_resume"] = round(mode["total_tokens"] / mode["resumes"])
+    return {
+        "resumes": len(results),
+        "successful": sum(1 for r in results if r["success"]),
+        "total_tokens": total,
+        "tokens_per_resume": round(total / len(results)) if results else 0,
+        "by_mode": by_mode,
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    from pathlib import Path
+
+    import PyPDF2
+
+    parser = argparse.ArgumentParser(description="Parse resume files in token-budgeted batches and report tokens per resume")
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--budget", type=int, default=BATCH_TOKEN_BUDGET)
+    parser.add_argument("--max-resumes", type=int, default=BATCH_MAX_RESUMES)
+    args = parser.parse_args()
+
+    def read_resume(path: Path) -> str:
+        if path.suffix.lower() == ".pdf":
+            with open(path, "rb") as f:
+                return "\n".join(page.extract_text() for page in PyPDF2.PdfReader(f).pages)
+        return path.read_text(encoding="utf-8")
+
+    inputs = [(path.name, read_resume(path)) for path in args.files]
+
+    results = asyncio.run(parse_resumes(inputs, args.budget, args.max_resumes))
+    for r in results:
+        status = r["candidate_id"] if r["success"] else f"FAILED ({r['error']})"
+        print(f"  {r['resume']:<40} {r['mode']:<15} {r['tokens'].get('total_tokens', 0):>7} tokens  {status}")
+    print(json.dumps(summarize_token_usage(results), indent=2))
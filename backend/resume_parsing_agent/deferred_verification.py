@@ -0,0 +1,239 @@
+"""
+Deferred external profile verification - a background stage after parsing
+
+Parsing never waits on GitHub / LeetCode / Stack Overflow: the resume is saved
+with whatever the LLM read from the resume text, and verify_and_merge() later
+checks the candidate's profile links (profile_verification.verify_profiles),
+replaces external_profiles with the verified data, re-scores the "External
+Profile Quality" category with the rubric from the evaluation instruction and
+shifts final_score / grade by the difference. The change is recorded in the
+document's "profile_verification" block:
+
+    "profile_verification": {
+        "status": "verified",
+        "accessible": ["github"], "errors": {"leetcode": "User not found on LeetCode"},
+        "evaluation_delta": {"external_profiles": {"before": 5, "after": 3},
+                             "final_score": {"before": 85, "after": 83}, "delta": -2,
+                             "grade": {"before": "A", "after": "A"}}
+    }
+"""
+
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .profile_verification import verify_candidates
+
+
+RESUMES_DIR = Path(__file__).parent.parent / "data" / "parsed_resumes"
+
+# Failures that say nothing about the profile itself - the LLM's sub-score is kept
+_TRANSIENT_ERROR_RE = re.compile(r"Network error|status (403|429|5\d\d)|rate limit", re.IGNORECASE)
+
+
+# ============================================================================
+# External Profile Scoring
+# ============================================================================
+
+def _usable(profile: Optional[Dict[str, Any]]) -> bool:
+    return bool(profile) and bool(profile.get("profile_accessible"))
+
+
+def _transient(profile: Optional[Dict[str, Any]]) -> bool:
+    return bool(profile) and not profile.get("profile_accessible") \
+        and bool(_TRANSIENT_ERROR_RE.search(profile.get("error_message") or ""))
+
+
+def _github_points(profile: Dict[str, Any]) -> int:
+    # Repos, stars and notable projects stand in for activity the API does not show
+    repos = profile.get("repositories", 0)
+    stars = profile.get("stars", 0)
+    notable = len(profile.get("notable_projects") or [])
+    if repos >= 10 and (stars >= 50 or notable >= 2):
+        points = 4
+    elif repos >= 5 and (stars >= 10 or notable >= 1):
+        points = 3
+    elif repos >= 3:
+        points = 2
+    else:
+        points = 1 if repos >= 1 else 0
+
+    # The deep analyzer counts commits from public events (a 90-day lower bound)
+    if "recent_activity" in profile:
+        commits = profile.get("commits_last_year", 0)
+        commit_points = 4 if commits >= 50 else 3 if commits >= 20 else 2 if commits >= 10 else 1 if commits else 0
+        points = max(points, commit_points)
+    return points
+
+
+def _coding_points(profile: Dict[str, Any]) -> int:
+    solved = profile.get("problems_solved", 0)
+    if solved >= 200:
+        return 3
+    if solved >= 100:
+        return 2
+    return 1 if solved >= 50 else 0
+
+
+def _community_points(profile: Dict[str, Any]) -> int:
+    reputation = profile.get("reputation", 0)
+    if reputation >= 500:
+        return 3
+    if reputation >= 100:
+        return 2
+    return 1 if reputation > 0 else 0
+
+
+def score_external_profiles(verified: Dict[str, Any], previous: Dict[str, Any]) -> Dict[str, int]:
+    """
+    ExternalProfilesScore from verified profile data
+
+    Args:
+        verified: external_profiles from the verification stage
+        previous: The LLM's ExternalProfilesScore, kept for platforms that
+            were not checked or could not be reached (not the candidate's fault)
+
+    Returns:
+        {"github", "coding_platforms", "community", "total", "max"}
+    """
+    github = verified.get("github")
+    coding = (verified.get("coding_platforms") or [None])[0]
+    stackoverflow = verified.get("stackoverflow")
+
+    def points(profile, scorer, key):
+        if profile is None or _transient(profile):
+            return previous.get(key, 0)
+        return scorer(profile) if _usable(profile) else 0
+
+    scores = {
+        "github": points(github, _github_points, "github"),
+        "coding_platforms": points(coding, _coding_points, "coding_platforms"),
+        "community": points(stackoverflow, _community_points, "community"),
+    }
+    scores["total"] = sum(scores.values())
+    scores["max"] = 10
+    return scores
+
+
+def grade_for(score: int) -> str:
+    """Letter grade from the evaluation instruction's grading scale."""
+    for threshold, grade in ((90, "A+"), (80, "A"), (70, "B"), (60, "C"), (50, "D")):
+        if score >= threshold:
+            return grade
+    return "F"
+
+
+# ============================================================================
+# Merge
+# ============================================================================
+
+def merge_verification(document: Dict[str, Any], verification: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Applies a verification result to a parsed resume document (in place)
+
+    Returns:
+        The "profile_verification" block written to the document
+    """
+    verified = verification["external_profiles"]
+    merged = dict(document.get("external_profiles") or {})
+    for key in ("github", "stackoverflow"):
+        if verified.get(key) is not None:
+            merged[key] = verified[key]
+    if verified.get("coding_platforms"):
+        others = [p for p in merged.get("coding_platforms") or [] if p.get("platform") != "LeetCode"]
+        merged["coding_platforms"] = verified["coding_platforms"] + others
+    document["external_profiles"] = merged
+
+    block = {
+        "status": "verified",
+        "verified_at": datetime.now().isoformat(),
+        "verified": verification["verified"],
+        "accessible": verification["accessible"],
+        "errors": verification["errors"],
+        "elapsed_ms": verification["elapsed_ms"],
+    }
+
+    evaluation = document.get("evaluation")
+    scores = (evaluation or {}).get("scores") or {}
+    if "external_profiles" in scores:
+        before = scores["external_profiles"]
+        after = score_external_profiles(verified, before)
+        delta = after["total"] - before.get("total", 0)
+        score_before = evaluation.get("final_score", 0)
+        score_after = max(0, min(100, score_before + delta))
+        grade_before = evaluation.get("grade")
+        scores["external_profiles"] = {**before, **after}
+        evaluation["final_score"] = score_after
+        evaluation["grade"] = grade_for(score_after)
+        block["evaluation_delta"] = {
+            "external_profiles": {"before": before.get("total", 0), "after": after["total"]},
+            "final_score": {"before": score_before, "after": score_after},
+            "delta": score_after - score_before,
+            "grade": {"before": grade_before, "after": evaluation["grade"]},
+        }
+
+    document["profile_verification"] = block
+    return block
+
+
+def _load(candidate_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(RESUMES_DIR / f"{candidate_id}.json", "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save(document: Dict[str, Any]):
+    file_path = RESUMES_DIR / f"{document['candidate_id']}.json"
+    tmp_path = file_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+
+def verify_and_merge_many(candidate_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Verifies the profile links of saved candidates and merges the results
+
+    All lookups of the batch run concurrently on the shared verification pool.
+
+    Returns:
+        {candidate_id: profile_verification block} (status "no_links" when
+        there is nothing to verify, "not_found" for unknown candidates)
+    """
+    documents = {cid: _load(cid) for cid in candidate_ids}
+    outcomes: Dict[str, Dict[str, Any]] = {cid: {"status": "not_found"} for cid, doc in documents.items() if doc is None}
+    pending = [(cid, doc) for cid, doc in documents.items() if doc is not None]
+    links = [(doc.get("candidate_info") or {}).get("links") or {} for _, doc in pending]
+
+    for (cid, _), verification in zip(pending, verify_candidates(links)):
+        # Re-read - enrichment or an edit may have rewritten the file while the lookups ran
+        document = _load(cid)
+        if document is None:
+            outcomes[cid] = {"status": "not_found"}
+            continue
+        if not verification["verified"]:
+            outcomes[cid] = {"status": "no_links"}
+            continue
+        outcomes[cid] = merge_verification(document, verification)
+        _save(document)
+        delta = outcomes[cid].get("evaluation_delta", {}).get("delta")
+        print(f"🔎 Verified profiles of {cid}: {', '.join(verification['accessible']) or 'none accessible'}"
+              + (f" (score {delta:+d})" if delta is not None else ""))
+    return outcomes
+
+
+def verify_and_merge(candidate_id: str) -> Dict[str, Any]:
+    """verify_and_merge_many() for one candidate."""
+    return verify_and_merge_many([candidate_id])[candidate_id]
+
+
+async def verify_in_background(candidate_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """verify_and_merge_many() off the event loop (for FastAPI background tasks)."""
+    print(f"🔎 Verifying external profiles of {len(candidate_ids)} candidates in the background...")
+    return await asyncio.get_running_loop().run_in_executor(None, verify_and_merge_many, candidate_ids)
@@ -0,0 +1,130 @@
+"""
+Two-tier resume parsing - fast deterministic record now, LLM evaluation later
+
+save_fast_resume() stores the fast_extractor result as a normal parsed-resume
+document (parsing.tier = "fast"), so the candidate shows up in the title
+index, search and rankings within milliseconds of the upload.
+enrich_resumes() then runs resume_evaluation_agent in the background and
+overwrites each record under the same candidate ID with the full evaluation
+(parsing.tier = "llm"), keeping fast-path contact fields the LLM left empty.
+"""
+
+import asyncio
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types as genai_types
+
+from .agent import resume_evaluation_agent, save_parsed_resume
+from .fast_extractor import extract_resume_fast
+
+
+# Concurrent background LLM evaluations
+ENRICHMENT_CONCURRENCY = int(os.getenv("RESUME_ENRICHMENT_CONCURRENCY", "2"))
+
+RESUMES_DIR = Path(__file__).parent.parent / "data" / "parsed_resumes"
+APP_NAME = "resume_enrichment"
+
+
+def save_fast_resume(resume_text: str) -> Dict[str, Any]:
+    """
+    Extracts a resume deterministically and saves it as a rankable record
+
+    Returns:
+        Saved document (candidate_id, candidate_info, parsed_data, parsing)
+    """
+    return save_parsed_resume(extract_resume_fast(resume_text))
+
+
+def _mark_enrichment_failed(candidate_id: str, error: str):
+    file_path = RESUMES_DIR / f"{candidate_id}.json"
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return
+    document.setdefault("parsing", {}).update({
+        "status": "enrichment_failed",
+        "error": error,
+        "failed_at": datetime.now().isoformat(),
+    })
+    tmp_path = file_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, file_path)
+
+
+def _saved_by_session(candidate_id: str, session_id: str) -> bool:
+    """True if the record on disk is the LLM evaluation written by this session."""
+    try:
+        with open(RESUMES_DIR / f"{candidate_id}.json", "r", encoding="utf-8") as f:
+            document = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return document.get("session_id") == session_id and document.get("parsing", {}).get("tier") == "llm"
+
+
+async def enrich_resume(candidate_id: str, resume_text: str) -> bool:
+    """
+    Runs the full LLM evaluation for a fast-path record and overwrites it in place
+
+    The candidate ID is pre-set in session state, so the agent's save callback
+    writes to the existing record instead of creating a new one.
+
+    Returns:
+        True if the record was enriched
+    """
+    try:
+        session_service = InMemorySessionService()
+        runner = Runner(agent=resume_evaluation_agent, session_service=session_service, app_name=APP_NAME)
+        session = await session_service.create_session(
+            app_name=APP_NAME, user_id="api_user", state={"candidate_id": candidate_id}
+        )
+        message = genai_types.Content(
+            role="user",
+            parts=[genai_types.Part.from_text(text=f"Parse this resume and extract all information accurately:\n\n{resume_text}")]
+        )
+        async for _ in runner.run_async(user_id="api_user", session_id=session.id, new_message=message):
+            pass
+
+        session = await session_service.get_session(app_name=APP_NAME, user_id="api_user", session_id=session.id)
+        if not session or not session.state.get("parsed_resume_evaluation"):
+            raise ValueError("Agent produced no parsed resume")
+        # The save callback logs and swallows its errors - check the record itself
+        if not _saved_by_session(candidate_id, session.id):
+            raise ValueError("LLM evaluation was not saved over the fast-path record")
+        print(f"✨ Enriched {candidate_id} with the LLM evaluation")
+        return True
+    except Exception as e:
+        print(f"⚠️ Enrichment failed for {candidate_id}: {e}")
+        _mark_enrichment_failed(candidate_id, str(e))
+        return False
+
+
+async def enrich_resumes(items: List[Tuple[str, str]], concurrency: int = ENRICHMENT_CONCURRENCY) -> Dict[str, int]:
+    """
+    Enriches fast-path records concurrently
+
+    Args:
+        items: (candidate_id, resume text) pairs
+        concurrency: Maximum LLM evaluations in flight
+
+    Returns:
+        {"enriched": n, "failed": n}
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(candidate_id: str, resume_text: str) -> bool:
+        async with semaphore:
+            return await enrich_resume(candidate_id, resume_text)
+
+    print(f"🤖 Enriching {len(items)} fast-parsed resumes with the LLM (concurrency {concurrency})...")
+    outcomes = await asyncio.gather(*(run(cid, text) for cid, text in items))
+    stats = {"enriched": sum(outcomes), "failed": len(outcomes) - sum(outcomes)}
+    print(f"✅ Enrichment done: {stats['enriched']} enriched, {stats['failed']} failed")
+    return stats
@@ -0,0 +1,460 @@
+"""
+Deep GitHub profile analysis - paginated, parallel repository scanning
+
+tools.analyze_github_profile() reads one page of repositories, counts the
+primary language of the first 30 and cannot see any activity. The analyzer
+here:
+
+- pages through all repositories concurrently (page count from public_repos)
+- sums language bytes (/repos/{owner}/{repo}/languages) over the candidate's
+  own repositories, forks excluded
+- derives recent activity, commits and the current streak from the public
+  events API (GitHub keeps the last 90 days / 300 events)
+
+All lookups run on one bounded pool shared by every analysis
+(GITHUB_ANALYZER_WORKERS), so concurrent verifications cannot flood GitHub.
+Listing and event pages go through tools.profile_request() (profile cache +
+rate limiter).
+Language bytes are cached per repository in data/cache/github_repos.db together
+with the repo's pushed_at and ETag: an unpushed repo costs no request on
+re-analysis, and a pushed one is revalidated with If-None-Match.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+from . import tools
+
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "github_repos.db"
+
+# Concurrent GitHub requests across all analyses
+ANALYZER_WORKERS = int(os.getenv("GITHUB_ANALYZER_WORKERS", "8"))
+
+# Repo listing pages (100 repos each) read per profile
+MAX_REPO_PAGES = int(os.getenv("GITHUB_MAX_REPO_PAGES", "10"))
+
+# Most recently pushed own repos whose language bytes are read (one request each)
+MAX_LANGUAGE_REPOS = int(os.getenv("GITHUB_MAX_LANGUAGE_REPOS", "50"))
+
+# Without GITHUB_TOKEN GitHub allows 60 requests/hour - scan far fewer repos
+UNAUTHENTICATED_MAX_LANGUAGE_REPOS = int(os.getenv("GITHUB_UNAUTHENTICATED_MAX_LANGUAGE_REPOS", "5"))
+
+PER_PAGE = 100
+EVENT_PAGES = 3  # The events API stops at 300 events
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def language_repo_limit() -> int:
+    """Repos whose language bytes are read per profile (capped when unauthenticated)."""
+    if tools.GITHUB_TOKEN:
+        return MAX_LANGUAGE_REPOS
+    return min(MAX_LANGUAGE_REPOS, UNAUTHENTICATED_MAX_LANGUAGE_REPOS)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=ANALYZER_WORKERS, thread_name_prefix="github-analyzer")
+    return _executor
+
+
+# ============================================================================
+# Per-Repo Language Cache
+# ============================================================================
+
+class RepoLanguageCache:
+    """
+    Language bytes per repository, keyed by full_name.
+
+    Table:
+        repos(full_name, pushed_at, etag, languages, fetched_at)
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH):
+        self.cache_path = Path(cache_path)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS repos (
+                    full_name TEXT PRIMARY KEY,
+                    pushed_at TEXT,
+                    etag TEXT,
+                    languages TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+
+    def get(self, full_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT pushed_at, etag, languages FROM repos WHERE full_name = ?", (full_name.lower(),)
+            ).fetchone()
+        if not row:
+            return None
+        return {"pushed_at": row[0], "etag": row[1], "languages": json.loads(row[2])}
+
+    def put(self, full_name: str, pushed_at: Optional[str], etag: Optional[str], languages: Dict[str, int]):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO repos (full_name, pushed_at, etag, languages, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (full_name.lower(), pushed_at, etag, json.dumps(languages), time.time())
+            )
+
+    def mark_current(self, full_name: str, pushed_at: Optional[str]):
+        """Records that the cached languages are still valid for pushed_at (after a 304)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE repos SET pushed_at = ?, fetched_at = ? WHERE full_name = ?",
+                (pushed_at, time.time(), full_name.lower())
+            )
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM repos")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM repos").fetchone()[0]
+        return {"repos": count}
+
+
+_repo_cache: Optional[RepoLanguageCache] = None
+_repo_cache_lock = threading.Lock()
+
+
+def get_repo_cache() -> RepoLanguageCache:
+    """Returns the process-wide repo language cache."""
+    global _repo_cache
+    if _repo_cache is None:
+        with _repo_cache_lock:
+            if _repo_cache is None:
+                _repo_cache = RepoLanguageCache()
+    return _repo_cache
+
+
+# ============================================================================
+# Requests
+# ============================================================================
+
+def _headers() -> Dict[str, str]:
+    headers = {"Accept": "application/vnd.github+json", "User-Agent": "Resume-Parser-Agent"}
+    if tools.GITHUB_TOKEN:
+        headers["Authorization"] = f"Bearer {tools.GITHUB_TOKEN}"
+    return headers
+
+
+def _get_page(username: str, url: str) -> List[Dict[str, Any]]:
+    """One listing / events page; an unavailable page counts as empty."""
+    response = tools.profile_request("github", username, "GET", url, headers=_headers())
+    if response.status_code != 200:
+        return []
+    body = response.json()
+    return body if isinstance(body, list) else []
+
+
+def _repo_languages(repo: Dict[str, Any], cache: Optional[RepoLanguageCache]) -> Tuple[Dict[str, int], str]:
+    """
+    Language bytes of one repository
+
+    Returns:
+        (languages, outcome) - outcome is unchanged / not_modified / fetched / stale / failed
+    """
+    full_name = repo["full_name"]
+    pushed_at = repo.get("pushed_at")
+    cached = cache.get(full_name) if cache else None
+    if cached and cached["pushed_at"] == pushed_at:
+        return cached["languages"], "unchanged"
+
+    headers = _headers()
+    if cached and cached["etag"]:
+        headers["If-None-Match"] = cached["etag"]
+    try:
+        response = tools._send("GET", f"{tools.GITHUB_API_URL}/repos/{full_name}/languages", headers)
+    except requests.exceptions.RequestException:
+        return (cached["languages"], "stale") if cached else ({}, "failed")
+
+    if response.status_code == 304 and cached:
+        cache.mark_current(full_name, pushed_at)
+        return cached["languages"], "not_modified"
+    if response.status_code == 200:
+        languages = response.json()
+        if cache:
+            cache.put(full_name, pushed_at, response.headers.get("ETag"), languages)
+        return languages, "fetched"
+    return (cached["languages"], "stale") if cached else ({}, "failed")
+
+
+# ============================================================================
+# Metrics
+# ============================================================================
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _push_commits(event: Dict[str, Any]) -> int:
+    payload = event.get("payload") or {}
+    if payload.get("size") is not None:
+        return payload["size"]
+    # Pushes without a commit count still represent at least one commit
+    return len(payload.get("commits") or []) or 1
+
+
+def summarize_events(events: List[Dict[str, Any]], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Recent activity from public events
+
+    Returns:
+        {"events", "push_events", "commits", "commits_last_year", "active_days",
+         "repositories", "last_active", "streak_days", "event_types"}
+    """
+    now = now or datetime.now(timezone.utc)
+    year_ago = now - timedelta(days=365)
+    event_types: Dict[str, int] = {}
+    days = set()
+    repositories = set()
+    commits = commits_last_year = pushes = 0
+    last_active = None
+
+    for event in events:
+        created = _parse_time(event.get("created_at"))
+        event_type = event.get("type") or "Unknown"
+        event_types[event_type] = event_types.get(event_type, 0) + 1
+        if (event.get("repo") or {}).get("name"):
+            repositories.add(event["repo"]["name"])
+        if created:
+            days.add(created.date())
+            last_active = max(last_active, created) if last_active else created
+        if event_type == "PushEvent":
+            pushes += 1
+            size = _push_commits(event)
+            commits += size
+            if created and created >= year_ago:
+                commits_last_year += size
+
+    # Consecutive active days ending today or yesterday
+    streak = 0
+    day = now.date()
+    if day not in days:
+        day -= timedelta(days=1)
+    while day in days:
+        streak += 1
+        day -= timedelta(days=1)
+
+    return {
+        "events": len(events),
+        "push_events": pushes,
+        "commits": commits,
+        "commits_last_year": commits_last_year,
+        "active_days": len(days),
+        "repositories": len(repositories),
+        "last_active": last_active.isoformat() if last_active else None,
+        "streak_days": streak,
+        "event_types": dict(sorted(event_types.items(), key=lambda item: item[1], reverse=True)),
+    }
+
+
+def _failed(username: Optional[str], message: str) -> Dict[str, Any]:
+    return {
+        "username": username,
+        "repositories": 0,
+        "stars": 0,
+        "commits_last_year": 0,
+        "top_languages": [],
+        "notable_projects": [],
+        "contribution_streak": None,
+        "profile_accessible": False,
+        "error_message": message
+    }
+
+
+# ============================================================================
+# Analyzer
+# ============================================================================
+
+def analyze_github_deep(github_url: str) -> Dict[str, Any]:
+    """
+    Analyzes a GitHub profile across all repositories and recent events.
+
+    Args:
+        github_url: GitHub profile URL (e.g., https://github.com/username)
+
+    Returns:
+        GitHubProfile fields (commits_last_year and contribution_streak from the
+        public events) plus:
+            language_bytes: {language: bytes} over scanned own repositories
+            recent_activity: summarize_events() result
+            scan: repos listed / scanned and language cache outcomes
+    """
+    username = tools.extract_github_username(github_url)
+    if not username:
+        return _failed(None, "Invalid GitHub URL format")
+
+    started = time.perf_counter()
+    base_url = tools.GITHUB_API_URL
+    try:
+        user_response = tools.profile_request("github", username, "GET", f"{base_url}/users/{username}", headers=_headers())
+        if user_response.status_code != 200:
+            return _failed(username, f"GitHub API returned status {user_response.status_code}")
+        user_data = user_response.json()
+        total_repos = user_data.get("public_repos", 0)
+
+        # All listing pages and the first events page at once
+        executor = _get_executor()
+        pages = min(MAX_REPO_PAGES, max(1, math.ceil(total_repos / PER_PAGE)))
+        repo_futures = [
+            executor.submit(_get_page, username, f"{base_url}/users/{username}/repos?per_page={PER_PAGE}&page={page}&sort=pushed")
+            for page in range(1, pages + 1)
+        ]
+        events_url = f"{base_url}/users/{username}/events/public?per_page={PER_PAGE}&page="
+        first_events = executor.submit(_get_page, username, f"{events_url}1")
+
+        repos = [repo for future in repo_futures for repo in future.result()]
+        events = first_events.result()
+        if len(events) == PER_PAGE:
+            more = [executor.submit(_get_page, username, f"{events_url}{page}") for page in range(2, EVENT_PAGES + 1)]
+            events += [event for future in more for event in future.result()]
+
+        # Language bytes of the most recently pushed own repositories
+        own_repos = [repo for repo in repos if not repo.get("fork") and repo.get("full_name")]
+        scanned = sorted(own_repos, key=lambda repo: repo.get("pushed_at") or "", reverse=True)[:language_repo_limit()]
+        cache = get_repo_cache() if tools.PROFILE_CACHE_ENABLED else None
+        language_results = list(executor.map(lambda repo: _repo_languages(repo, cache), scanned))
+
+    except requests.exceptions.RequestException as e:
+        return _failed(username, f"Network error: {str(e)}")
+    except Exception as e:
+        return _failed(username, f"Error analyzing GitHub profile: {str(e)}")
+
+    language_bytes: Dict[str, int] = {}
+    outcomes: Dict[str, int] = {}
+    for languages, outcome in language_results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+        for language, size in languages.items():
+            language_bytes[language] = language_bytes.get(language, 0) + size
+    language_bytes = dict(sorted(language_bytes.items(), key=lambda item: item[1], reverse=True))
+
+    top_languages = list(language_bytes)[:5]
+    if not top_languages:
+        # No byte counts (empty repos) - fall back to primary languages
+        counts: Dict[str, int] = {}
+        for repo in own_repos:
+            if repo.get("language"):
+                counts[repo["language"]] = counts.get(repo["language"], 0) + 1
+        top_languages = [lang for lang, _ in sorted(counts.items(), key=lambda item: item[1], reverse=True)[:5]]
+
+    notable_projects = [
+        f"{repo['name']} ({repo.get('stargazers_count', 0)} stars, {repo.get('forks_count', 0)} forks)"
+        for repo in sorted(own_repos, key=lambda repo: repo.get("stargazers_count", 0), reverse=True)
+        if repo.get("stargazers_count", 0) >= 10 or repo.get("forks_count", 0) >= 5
+    ]
+    activity = summarize_events(events)
+
+    return {
+        "username": username,
+        "repositories": total_repos,
+        "stars": sum(repo.get("stargazers_count", 0) for repo in repos),
+        "commits_last_year": activity["commits_last_year"],  # Public events cover the last 90 days
+        "top_languages": top_languages,
+        "notable_projects": notable_projects[:5],
+        "contribution_streak": activity["streak_days"],
+        "language_bytes": language_bytes,
+        "recent_activity": activity,
+        "scan": {
+            "repos_listed": len(repos),
+            "repos_scanned": len(scanned),
+            "forks_skipped": len(repos) - len(own_repos),
+            "languages": outcomes,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+        "profile_accessible": True,
+        "error_message": None
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from .mock_profile_server import MockProfileServer
+    from .profile_cache import ProfileCache
+
+    repo_count = int(sys.argv[1]) if len(sys.argv) > 1 else 250
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    tools.PROFILE_RATE_LIMIT_ENABLED = False
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tools.PROFILE_CACHE_ENABLED = True
+
+        # Fixture check: octocat responses in GitHub API format
+        with MockProfileServer(latency=0, fixtures=Path(__file__).parent / "github_fixture.json") as server:
+            tools.GITHUB_API_URL = server.github_url
+            tools.get_profile_cache = lambda: ProfileCache(Path(tmp) / "fixture_profiles.db")
+            _repo_cache = RepoLanguageCache(Path(tmp) / "fixture_repos.db")
+            octocat = analyze_github_deep("https://github.com/octocat")
+            assert octocat["language_bytes"] == {"CSS": 2615, "HTML": 2559}, octocat["language_bytes"]
+            assert octocat["scan"]["repos_listed"] == 8 and octocat["scan"]["forks_skipped"] == 2
+            assert octocat["recent_activity"]["commits"] == 6 and octocat["recent_activity"]["push_events"] == 3
+            assert octocat["notable_projects"][0].startswith("Spoon-Knife")
+            print(f"✅ Fixture (octocat): {octocat['language_bytes']}, {octocat['recent_activity']['commits']} commits, "
+                  f"top project {octocat['notable_projects'][0]}")
+
+        # Benchmark: light analyzer vs serial and parallel deep scans, then re-analysis
+        global_cache = ProfileCache(Path(tmp) / "profiles.db")
+        tools.get_profile_cache = lambda: global_cache
+        MAX_LANGUAGE_REPOS = UNAUTHENTICATED_MAX_LANGUAGE_REPOS = repo_count
+        with MockProfileServer(latency=latency, github_repo_count=repo_count) as server:
+            tools.GITHUB_API_URL = server.github_url
+            url = "https://github.com/dev42"
+            print(f"🧪 {repo_count} repos, {latency * 1000:.0f} ms per request")
+
+            def run(label: str, analyze=analyze_github_deep):
+                server.reset_stats()
+                started = time.perf_counter()
+                result = analyze(url)
+                elapsed = time.perf_counter() - started
+                stats = server.stats()
+                print(f"{label:<36} {elapsed:6.2f}s  {stats['requests']:4d} requests ({stats['not_modified']} answered 304)  "
+                      f"{result.get('scan', {}).get('languages', '')}")
+                return result
+
+            tools.PROFILE_CACHE_ENABLED = False
+            run("📄 tools.analyze_github_profile", tools.analyze_github_profile)
+            _executor = ThreadPoolExecutor(max_workers=1)
+            run("🐢 Deep scan, 1 worker")
+            _executor = ThreadPoolExecutor(max_workers=ANALYZER_WORKERS)
+            run(f"⚡ Deep scan, {ANALYZER_WORKERS} workers")
+
+            tools.PROFILE_CACHE_ENABLED = True
+            _repo_cache = RepoLanguageCache(Path(tmp) / "repos.db")
+            run("❄️ Cold caches")
+            global_cache.ttl_seconds, global_cache.stale_seconds = 0, 0
+            run("🔁 Re-analysis, nothing pushed")
+            for i in range(3):
+                server.touch_repo(f"dev42/dev42-project-{i}")
+            result = run("✏️ Re-analysis, 3 repos pushed")
+
+    print(f"📊 Top languages: {result['top_languages']}, {result['commits_last_year']} commits, "
+          f"streak {result['contribution_streak']} days")
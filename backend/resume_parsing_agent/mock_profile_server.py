@@ -0,0 +1,359 @@
+"""
+Local mock of the GitHub, LeetCode and Stack Exchange endpoints used by tools.py
+
+Serves deterministic fake profiles with a configurable per-request latency so
+profile verification can be exercised and benchmarked without network access
+or rate limits. HTTP/1.1 keep-alive is supported, and the server counts the
+TCP connections it accepts, so connection reuse is visible in benchmarks.
+GET responses carry an ETag and Last-Modified and answer a matching
+If-None-Match with 304, like the GitHub API. With rate_limit=(n, seconds)
+the server allows n requests per fixed window, reports X-RateLimit-Limit /
+-Remaining / -Reset on every response and answers excess requests with 429
+and Retry-After.
+
+GitHub repo listings are paginated (per_page / page, with a Link header),
+and /repos/{owner}/{repo}/languages and /users/{user}/events/public are served
+for the deep GitHub analyzer (github_analyzer.py); touch_repo() bumps a repo's
+pushed_at and language bytes to simulate a push. fixtures= loads responses
+from a JSON file ({"/users/octocat": {"status": 200, "body": ...}}, see
+github_fixture.json) that take precedence over the generated ones.
+
+Usernames starting with "missing" return 404 / empty results.
+
+Usage:
+    with MockProfileServer(latency=0.05) as server:
+        tools.GITHUB_API_URL = server.github_url
+        ...
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+_GITHUB_USER_RE = re.compile(r"^/users/([\w-]+)$")
+_GITHUB_REPOS_RE = re.compile(r"^/users/([\w-]+)/repos$")
+_GITHUB_EVENTS_RE = re.compile(r"^/users/([\w-]+)/events/public$")
+_GITHUB_LANGUAGES_RE = re.compile(r"^/repos/([\w-]+)/([\w.-]+)/languages$")
+_SO_USER_RE = re.compile(r"^/2\.3/users/(\d+)$")
+_SO_TAGS_RE = re.compile(r"^/2\.3/users/(\d+)/top-tags$")
+
+_LANGUAGES = ["Python", "Go", "TypeScript", "Rust", "Java"]
+
+
+_BASE_PUSHED_AT = datetime(2025, 1, 6, 10, 0, tzinfo=timezone.utc)
+
+
+def _github_repos(username: str, count: int = 12, versions: Optional[Dict[str, int]] = None):
+    seed = sum(map(ord, username))
+    versions = versions or {}
+    repos = []
+    for i in range(count):
+        name = f"{username}-project-{i}"
+        pushed_at = _BASE_PUSHED_AT - timedelta(days=i) + timedelta(hours=versions.get(f"{username}/{name}", 0))
+        repos.append({
+            "name": name,
+            "full_name": f"{username}/{name}",
+            "fork": i % 7 == 6,
+            "language": _LANGUAGES[(seed + i) % len(_LANGUAGES)],
+            "stargazers_count": (seed * (i + 1)) % 40,
+            "forks_count": (seed + i) % 8,
+            "pushed_at": pushed_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return repos
+
+
+def _github_languages(full_name: str, version: int = 0) -> Dict[str, int]:
+    seed = sum(map(ord, full_name))
+    primary = _LANGUAGES[seed % len(_LANGUAGES)]
+    secondary = _LANGUAGES[(seed + 2) % len(_LANGUAGES)]
+    return {primary: 20000 + seed * 37 % 50000 + version * 1000, secondary: 1000 + seed % 9000, "Shell": 300 + seed % 700}
+
+
+def _github_events(username: str, count: int = 120) -> List[Dict[str, Any]]:
+    seed = sum(map(ord, username))
+    today = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+    events = []
+    for i in range(count):
+        created = today - timedelta(days=(i * 3) // 4)
+        push = i % 3 != 2
+        events.append({
+            "type": "PushEvent" if push else ("PullRequestEvent" if i % 2 else "IssuesEvent"),
+            "repo": {"name": f"{username}/{username}-project-{(seed + i) % 5}"},
+            "payload": {"size": 1 + (seed + i) % 4} if push else {"action": "opened"},
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        })
+    return events
+
+
+class _MockProfileHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.stats_lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_rate_limit_headers(self):
+        for name, value in getattr(self, "rate_limit_headers", {}).items():
+            self.send_header(name, value)
+
+    def _send_json(self, status: int, body: Any):
+        payload = json.dumps(body).encode("utf-8")
+        etag = f'"{hashlib.sha1(payload).hexdigest()[:16]}"'
+        if self.command == "GET" and status == 200 and self.headers.get("If-None-Match") == etag:
+            with self.server.stats_lock:
+                self.server.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self._send_rate_limit_headers()
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self._send_rate_limit_headers()
+        for name, value in getattr(self, "extra_headers", {}).items():
+            self.send_header(name, value)
+        if self.command == "GET" and status == 200:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 06 Jan 2025 10:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _send_list(self, items: List[Any], query: Dict[str, List[str]]):
+        """Paginates a JSON array like the GitHub API (per_page / page, Link header)."""
+        per_page = min(100, int((query.get("per_page") or ["30"])[0]))
+        page = max(1, int((query.get("page") or ["1"])[0]))
+        last = max(1, math.ceil(len(items) / per_page))
+        links = []
+        if page < last:
+            path = self.path.split("?", 1)[0]
+            links.append(f'<{path}?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{path}?per_page={per_page}&page={last}>; rel="last"')
+        self.extra_headers = {"Link": ", ".join(links)} if links else {}
+        self._send_json(200, items[(page - 1) * per_page:page * per_page])
+
+    def _send_fixture(self, path: str, query: Dict[str, List[str]]) -> bool:
+        fixture = self.server.fixtures.get(path)
+        if fixture is None:
+            return False
+        if fixture.get("status", 200) == 200 and isinstance(fixture.get("body"), list):
+            self._send_list(fixture["body"], query)
+        else:
+            self._send_json(fixture.get("status", 200), fixture.get("body"))
+        return True
+
+    def _before_response(self) -> bool:
+        """Counts the request against the rate limit; False once a 429 was sent."""
+        self.rate_limit_headers: Dict[str, str] = {}
+        self.extra_headers: Dict[str, str] = {}
+        with self.server.stats_lock:
+            self.server.requests += 1
+            if self.server.rate_limit:
+                limit, window = self.server.rate_limit
+                now = time.time()
+                if now >= self.server.window_start + window:
+                    self.server.window_start = now - (now % window)
+                    self.server.window_count = 0
+                self.server.window_count += 1
+                reset_at = self.server.window_start + window
+                remaining = max(0, limit - self.server.window_count)
+                self.rate_limit_headers = {
+                    "X-RateLimit-Limit": str(limit),
+                    "X-RateLimit-Remaining": str(remaining),
+                    "X-RateLimit-Reset": f"{reset_at:.3f}",
+                }
+                if self.server.window_count > limit:
+                    self.server.throttled += 1
+                    self.rate_limit_headers["Retry-After"] = str(max(1, math.ceil(reset_at - now)))
+        if "Retry-After" in self.rate_limit_headers:
+            self._send_json(429, {"message": "API rate limit exceeded"})
+            return False
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        return True
+
+    def do_GET(self):
+        if not self._before_response():
+            return
+        path, _, query_string = self.path.partition("?")
+        query = parse_qs(query_string)
+        if self._send_fixture(path, query):
+            return
+        repo_count = self.server.github_repo_count
+
+        match = _GITHUB_REPOS_RE.match(path)
+        if match:
+            username = match.group(1)
+            if username.startswith("missing"):
+                return self._send_json(404, {"message": "Not Found"})
+            return self._send_list(_github_repos(username, repo_count, self.server.repo_versions), query)
+
+        match = _GITHUB_USER_RE.match(path)
+        if match:
+            username = match.group(1)
+            if username.startswith("missing"):
+                return self._send_json(404, {"message": "Not Found"})
+            return self._send_json(200, {"login": username, "public_repos": repo_count})
+
+        match = _GITHUB_LANGUAGES_RE.match(path)
+        if match:
+            full_name = f"{match.group(1)}/{match.group(2)}"
+            return self._send_json(200, _github_languages(full_name, self.server.repo_versions.get(full_name, 0)))
+
+        match = _GITHUB_EVENTS_RE.match(path)
+        if match:
+            username = match.group(1)
+            if username.startswith("missing"):
+                return self._send_json(404, {"message": "Not Found"})
+            return self._send_list(_github_events(username), query)
+
+        match = _SO_TAGS_RE.match(path)
+        if match:
+            tags = ["python", "django", "postgresql", "docker", "asyncio", "kubernetes"]
+            return self._send_json(200, {"items": [{"tag_name": t} for t in tags]})
+
+        match = _SO_USER_RE.match(path)
+        if match:
+            user_id = int(match.group(1))
+            return self._send_json(200, {"items": [{
+                "user_id": user_id,
+                "reputation": user_id % 50000,
+                "answer_count": user_id % 300,
+                "question_count": user_id % 40,
+                "badge_counts": {"gold": 2, "silver": 15, "bronze": 40},
+            }]})
+
+        self._send_json(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send_json(400, {"errors": ["invalid JSON"]})
+        if not self._before_response():
+            return
+
+        if self.path.split("?", 1)[0] != "/graphql":
+            return self._send_json(404, {"message": "Not Found"})
+
+        username = (body.get("variables") or {}).get("username", "")
+        if username.startswith("missing"):
+            return self._send_json(200, {"data": {"matchedUser": None}})
+        seed = sum(map(ord, username))
+        easy, medium, hard = 80 + seed % 100, 60 + seed % 150, 10 + seed % 40
+        self._send_json(200, {"data": {"matchedUser": {
+            "username": username,
+            "profile": {"ranking": 10000 + seed * 37, "reputation": seed % 100},
+            "submitStats": {"acSubmissionNum": [
+                {"difficulty": "All", "count": easy + medium + hard},
+                {"difficulty": "Easy", "count": easy},
+                {"difficulty": "Medium", "count": medium},
+                {"difficulty": "Hard", "count": hard},
+            ]},
+            "badges": [{"name": "50 Days Badge"}, {"name": "Knight"}],
+        }}})
+
+
+class MockProfileServer:
+    """Threaded mock profile API on 127.0.0.1 (random free port unless given)."""
+
+    def __init__(self, latency: float = 0.05, port: int = 0, rate_limit: Optional[Tuple[int, float]] = None,
+                 github_repo_count: int = 12, fixtures: Optional[Path] = None):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _MockProfileHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.stats_lock = threading.Lock()
+        self.httpd.connections = 0
+        self.httpd.requests = 0
+        self.httpd.not_modified = 0
+        self.httpd.throttled = 0
+        self.httpd.rate_limit = rate_limit
+        self.httpd.window_start = 0.0
+        self.httpd.window_count = 0
+        self.httpd.github_repo_count = github_repo_count
+        self.httpd.repo_versions: Dict[str, int] = {}
+        self.httpd.fixtures: Dict[str, Any] = {}
+        if fixtures:
+            with open(fixtures, "r", encoding="utf-8") as f:
+                self.httpd.fixtures = json.load(f)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def github_url(self) -> str:
+        return self.base_url
+
+    @property
+    def leetcode_url(self) -> str:
+        return f"{self.base_url}/graphql"
+
+    @property
+    def stackexchange_url(self) -> str:
+        return f"{self.base_url}/2.3"
+
+    def stats(self) -> dict:
+        with self.httpd.stats_lock:
+            return {"connections": self.httpd.connections, "requests": self.httpd.requests,
+                    "not_modified": self.httpd.not_modified, "throttled": self.httpd.throttled}
+
+    def reset_stats(self):
+        with self.httpd.stats_lock:
+            self.httpd.connections = 0
+            self.httpd.requests = 0
+            self.httpd.not_modified = 0
+            self.httpd.throttled = 0
+
+    def touch_repo(self, full_name: str):
+        """Simulates a push: the repo's pushed_at and language bytes change."""
+        with self.httpd.stats_lock:
+            self.httpd.repo_versions[full_name] = self.httpd.repo_versions.get(full_name, 0) + 1
+
+    def start(self) -> "MockProfileServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockProfileServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    import sys
+
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = MockProfileServer(latency=0.05, port=port)
+    print(f"🧪 Mock profile API on {server.base_url}")
+    print(f"   GITHUB_API_URL={server.github_url}")
+    print(f"   LEETCODE_GRAPHQL_URL={server.leetcode_url}")
+    print(f"   STACKEXCHANGE_API_URL={server.stackexchange_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,359 @@
+"""
+Persistent cache of external profile API responses.
+
+Every request the profile tools make (GitHub user + repos, the LeetCode GraphQL
+query, Stack Exchange user + top tags) is stored under the platform and
+username it belongs to, with the response's ETag / Last-Modified validators:
+
+- fresh (younger than PROFILE_CACHE_TTL_HOURS): served from disk, no request
+- stale but within PROFILE_CACHE_STALE_HOURS: served from disk immediately and
+  revalidated in the background (stale-while-revalidate)
+- older: revalidated before returning
+
+Revalidation sends If-None-Match / If-Modified-Since, so an unchanged profile
+costs a 304 (which GitHub does not count against the rate limit). If a
+refresh fails (network error, 403/429 throttling, 5xx) and a cached copy
+exists, the cached copy is served. Entries live in data/cache/profile_cache.db.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Set
+
+
+CACHE_PATH = Path(__file__).parent.parent / "data" / "cache" / "profile_cache.db"
+
+TTL_SECONDS = float(os.getenv("PROFILE_CACHE_TTL_HOURS", "24")) * 3600
+STALE_SECONDS = float(os.getenv("PROFILE_CACHE_STALE_HOURS", "168")) * 3600
+MAX_ENTRIES = int(os.getenv("PROFILE_CACHE_MAX_ENTRIES", "20000"))
+
+# Refresh failures that fall back to a cached copy
+_SERVE_STALE_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+class CachedResponse:
+    """The parts of requests.Response the profile tools use (status_code, headers, json())."""
+
+    def __init__(self, status_code: int, body: str, headers: Optional[Dict[str, str]] = None, cache_status: str = "miss"):
+        self.status_code = status_code
+        self.text = body
+        self.headers = headers or {}
+        self.cache_status = cache_status
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+def request_key(method: str, url: str, json_body: Any = None) -> str:
+    """Cache key of one request (POST bodies are part of the key)."""
+    body = json.dumps(json_body, sort_keys=True, separators=(",", ":")) if json_body is not None else ""
+    return hashlib.sha256(f"{method.upper()} {url}\n{body}".encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Profile Cache
+# ============================================================================
+
+class ProfileCache:
+    """
+    TTL cache of profile API responses in SQLite with conditional revalidation.
+
+    Tables:
+        responses(key, platform, username, method, url, body, etag, last_modified, fetched_at, last_used, hits)
+        meta(key, value) - lifetime counters (hits, stale_hits, misses, not_modified, refreshed, stale_on_error, ...)
+    """
+
+    def __init__(self, cache_path: Path = CACHE_PATH, ttl_seconds: float = TTL_SECONDS,
+                 stale_seconds: float = STALE_SECONDS, max_entries: int = MAX_ENTRIES):
+        self.cache_path = Path(cache_path)
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_entries = max_entries
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        self._revalidating: Set[str] = set()
+        self._background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="profile-revalidate")
+
+    def _create_tables(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    platform TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    method TEXT NOT NULL,
+                    url TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS responses_profile ON responses (platform, username);
+                CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _bump(self, counter: str, amount: int = 1):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + excluded.value",
+                (counter, amount)
+            )
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        return {"body": row[0], "etag": row[1], "last_modified": row[2], "fetched_at": row[3]}
+
+    def _touch(self, key: str, refreshed: bool = False):
+        now = time.time()
+        with self._lock, self._conn:
+            if refreshed:
+                self._conn.execute("UPDATE responses SET fetched_at = ?, last_used = ? WHERE key = ?", (now, now, key))
+            else:
+                self._conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+
+    def _store(self, key: str, platform: str, username: str, method: str, url: str, response: Any):
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, platform, username, method, url, body, etag, last_modified, fetched_at, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                (key, platform, username.lower(), method.upper(), url, response.text,
+                 response.headers.get("ETag"), response.headers.get("Last-Modified"), now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                # Trim to 90% so eviction does not run on every store
+                excess = count - int(self.max_entries * 0.9)
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_used LIMIT ?)", (excess,)
+                )
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _revalidate(self, key: str, platform: str, username: str, method: str, url: str, send: Callable,
+                    headers: Optional[Dict[str, str]], json_body: Any, cached: Optional[Dict[str, Any]]) -> CachedResponse:
+        """Conditional request; 304 keeps the cached body, 200 replaces it."""
+        conditional = dict(headers or {})
+        if cached and cached["etag"]:
+            conditional["If-None-Match"] = cached["etag"]
+        if cached and cached["last_modified"]:
+            conditional["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = send(method, url, conditional, json_body)
+        except Exception:
+            if cached:
+                self._bump("stale_on_error")
+                return CachedResponse(200, cached["body"], cache_status="stale_on_error")
+            raise
+
+        if response.status_code == 304 and cached:
+            self._touch(key, refreshed=True)
+            self._bump("not_modified")
+            return CachedResponse(200, cached["body"], response.headers, cache_status="not_modified")
+        if response.status_code == 200:
+            self._store(key, platform, username, method, url, response)
+            self._bump("refreshed" if cached else "stores")
+            return CachedResponse(200, response.text, response.headers, cache_status="refreshed" if cached else "miss")
+        if cached and response.status_code in _SERVE_STALE_STATUSES:
+            self._bump("stale_on_error")
+            return CachedResponse(200, cached["body"], response.headers, cache_status="stale_on_error")
+        # 404 and other answers are not cached - the caller reports them as before
+        return CachedResponse(response.status_code, response.text, response.headers, cache_status="uncached")
+
+    def _revalidate_in_background(self, key: str, *args):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def run():
+            try:
+                self._revalidate(key, *args)
+            except Exception as e:
+                print(f"⚠️ Background profile revalidation failed: {e}")
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+
+        self._background.submit(run)
+
+    def request(self, platform: str, username: str, method: str, url: str, send: Callable,
+                headers: Optional[Dict[str, str]] = None, json_body: Any = None) -> CachedResponse:
+        """
+        Answers a profile API request from the cache or the network
+
+        Args:
+            platform: "github", "leetcode" or "stackoverflow"
+            username: Username (or Stack Overflow user ID) the request belongs to
+            method: HTTP method
+            url: Request URL
+            send: send(method, url, headers, json_body) -> requests.Response
+            headers: Request headers
+            json_body: JSON body for POST requests (part of the cache key)
+
+        Returns:
+            CachedResponse; cache_status is hit / stale / not_modified / refreshed / miss / stale_on_error / uncached
+        """
+        key = request_key(method, url, json_body)
+        cached = self._load(key)
+        if cached is None:
+            self._bump("misses")
+            return self._revalidate(key, platform, username, method, url, send, headers, json_body, None)
+
+        age = time.time() - cached["fetched_at"]
+        if age < self.ttl_seconds:
+            self._touch(key)
+            self._bump("hits")
+            return CachedResponse(200, cached["body"], cache_status="hit")
+        if age < self.ttl_seconds + self.stale_seconds:
+            self._touch(key)
+            self._bump("stale_hits")
+            self._revalidate_in_background(key, platform, username, method, url, send, headers, json_body, cached)
+            return CachedResponse(200, cached["body"], cache_status="stale")
+
+        self._bump("expired")
+        return self._revalidate(key, platform, username, method, url, send, headers, json_body, cached)
+
+    def invalidate(self, platform: str, username: str) -> int:
+        """Drops every cached response of one profile; returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM responses WHERE platform = ? AND username = ?", (platform, username.lower())
+            ).rowcount
+
+    def clear(self):
+        """Removes all cached responses (counters are kept)."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts per platform, TTL settings and lifetime counters."""
+        with self._lock:
+            platforms = {
+                platform: {"profiles": profiles, "responses": responses}
+                for platform, profiles, responses in self._conn.execute(
+                    "SELECT platform, COUNT(DISTINCT username), COUNT(*) FROM responses GROUP BY platform"
+                )
+            }
+            entries, total_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses"
+            ).fetchone()
+            counters = {key: int(value) for key, value in self._conn.execute("SELECT key, value FROM meta")}
+        cached = counters.get("hits", 0) + counters.get("stale_hits", 0)
+        lookups = cached + counters.get("misses", 0) + counters.get("expired", 0)
+        return {
+            "entries": entries,
+            "size_bytes": total_bytes,
+            "max_entries": self.max_entries,
+            "ttl_hours": round(self.ttl_seconds / 3600, 2),
+            "stale_hours": round(self.stale_seconds / 3600, 2),
+            "platforms": platforms,
+            "hits": counters.get("hits", 0),
+            "stale_hits": counters.get("stale_hits", 0),
+            "misses": counters.get("misses", 0),
+            "expired": counters.get("expired", 0),
+            "not_modified": counters.get("not_modified", 0),
+            "stores": counters.get("stores", 0),
+            "refreshed": counters.get("refreshed", 0),
+            "stale_on_error": counters.get("stale_on_error", 0),
+            # Lookups answered without waiting for the network
+            "hit_rate": round(cached / lookups, 4) if lookups else 0.0,
+        }
+
+
+_cache: Optional[ProfileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> ProfileCache:
+    """Returns the process-wide profile cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProfileCache()
+    return _cache
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    from . import tools
+    from .mock_profile_server import MockProfileServer
+    from .profile_verification import PROFILE_VERIFIERS, verify_candidates
+
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    links_list = [
+        {
+            "github": f"https://github.com/dev{i}",
+            "leetcode": f"https://leetcode.com/u/coder{i}",
+            "stackoverflow": f"https://stackoverflow.com/users/{1000 + i}/dev{i}",
+        }
+        for i in range(candidates)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp, MockProfileServer(latency=0.05) as server:
+        cache = ProfileCache(Path(tmp) / "profile_cache.db")
+        tools.get_profile_cache = lambda: cache
+        tools.PROFILE_CACHE_ENABLED = True
+        tools.PROFILE_RATE_LIMIT_ENABLED = False
+        PROFILE_VERIFIERS["github"] = tools.analyze_github_profile  # Two requests per profile (github_analyzer has its own benchmark)
+        tools.GITHUB_API_URL = server.github_url
+        tools.LEETCODE_GRAPHQL_URL = server.leetcode_url
+        tools.STACKEXCHANGE_API_URL = server.stackexchange_url
+
+        def run(label: str):
+            server.reset_stats()
+            started = time.perf_counter()
+            verify_candidates(links_list)
+            elapsed = time.perf_counter() - started
+            stats = server.stats()
+            print(f"{label:<34} {elapsed:6.2f}s  {stats['requests']:4d} requests, {stats['not_modified']:4d} answered 304")
+
+        print(f"🧪 {candidates} candidates against the mock profile API (50 ms per request)")
+        run("❄️ Cold cache")
+        run("🔥 Warm cache (within TTL)")
+        cache.ttl_seconds, cache.stale_seconds = 0, 3600
+        run("⏳ Stale (served, revalidating)")
+        cache._background.shutdown(wait=True)
+        cache._background = ThreadPoolExecutor(max_workers=2)
+        stats = server.stats()
+        print(f"{'   ...background revalidation':<34}         {stats['requests']:4d} requests, {stats['not_modified']:4d} answered 304")
+        cache.ttl_seconds, cache.stale_seconds = 0, 0
+        run("🔁 Expired (conditional requests)")
+        print(json.dumps(cache.stats(), indent=2))
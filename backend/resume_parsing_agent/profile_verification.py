@@ -0,0 +1,196 @@
+"""
+Concurrent external profile verification
+
+The analyze_* tools in tools.py each cost one or two HTTP round-trips. Called
+one after another (as separate agent tool calls) a candidate with GitHub,
+LeetCode and Stack Overflow links waits for all of them in series.
+verify_profiles() runs every link of a candidate on a shared thread pool over
+the keep-alive session from tools.get_http_session() and returns a single
+result shaped like ExternalProfiles. verify_candidates() does the same for a
+whole batch, so the pool stays busy across candidates.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .github_analyzer import analyze_github_deep
+from .tools import GITHUB_TOKEN, analyze_github_profile, analyze_leetcode_profile, analyze_stackoverflow_profile
+
+
+# Profile lookups in flight at once (across all candidates)
+VERIFICATION_WORKERS = int(os.getenv("PROFILE_VERIFICATION_WORKERS", "16"))
+
+# Scan all repos, language bytes and recent events (github_analyzer.py) instead of one repo page.
+# On by default only with a GITHUB_TOKEN: a deep scan costs several requests per profile and
+# the unauthenticated limit is 60 requests/hour.
+GITHUB_DEEP_ANALYSIS = os.getenv("GITHUB_DEEP_ANALYSIS", "true" if GITHUB_TOKEN else "false").lower() == "true"
+
+# CandidateLinks field -> verifier
+PROFILE_VERIFIERS: Dict[str, Callable[[str], Dict[str, Any]]] = {
+    "github": analyze_github_deep if GITHUB_DEEP_ANALYSIS else analyze_github_profile,
+    "leetcode": analyze_leetcode_profile,
+    "stackoverflow": analyze_stackoverflow_profile,
+}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=VERIFICATION_WORKERS, thread_name_prefix="profile-verify")
+    return _executor
+
+
+def verification_jobs(links: Optional[Dict[str, Any]]) -> List[Tuple[str, str]]:
+    """(platform, url) pairs for the verifiable links of one candidate."""
+    links = links or {}
+    return [(platform, links[platform]) for platform in PROFILE_VERIFIERS if links.get(platform)]
+
+
+def _timed_verify(platform: str, url: str) -> Tuple[Dict[str, Any], float]:
+    started = time.perf_counter()
+    try:
+        result = PROFILE_VERIFIERS[platform](url)
+    except Exception as e:
+        # The tools catch their own errors; this guards against anything unexpected
+        result = {"profile_accessible": False, "error_message": f"Error verifying {platform} profile: {e}"}
+    return result, (time.perf_counter() - started) * 1000
+
+
+def aggregate_results(results: Dict[str, Dict[str, Any]], timings: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Combines per-platform tool results into one verification result
+
+    Returns:
+        {
+            "external_profiles": {"github", "coding_platforms", "stackoverflow"} (ExternalProfiles shape),
+            "verified": platforms checked,
+            "accessible": platforms that responded with a profile,
+            "errors": {platform: error_message},
+            "elapsed_ms": slowest lookup,
+            "verified_at": ISO timestamp
+        }
+    """
+    return {
+        "external_profiles": {
+            "github": results.get("github"),
+            "coding_platforms": [results["leetcode"]] if "leetcode" in results else [],
+            "stackoverflow": results.get("stackoverflow"),
+        },
+        "verified": list(results),
+        "accessible": [p for p, r in results.items() if r.get("profile_accessible")],
+        "errors": {p: r.get("error_message") for p, r in results.items() if not r.get("profile_accessible")},
+        "elapsed_ms": round(max(timings.values(), default=0.0), 1),
+        "verified_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def verify_candidates(links_list: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Verifies the profile links of many candidates concurrently
+
+    Every (candidate, platform) lookup is submitted to the shared pool at
+    once, so a batch takes roughly (lookups / workers) round-trips rather than
+    one per lookup.
+
+    Args:
+        links_list: CandidateLinks dicts (candidate_info.links), one per candidate
+
+    Returns:
+        One aggregate_results() dict per candidate, in input order
+    """
+    executor = _get_executor()
+    futures = [
+        [(platform, executor.submit(_timed_verify, platform, url)) for platform, url in verification_jobs(links)]
+        for links in links_list
+    ]
+
+    verified = []
+    for candidate_futures in futures:
+        results, timings = {}, {}
+        for platform, future in candidate_futures:
+            results[platform], timings[platform] = future.result()
+        verified.append(aggregate_results(results, timings))
+    return verified
+
+
+def verify_profiles(links: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Verifies all profile links of one candidate concurrently
+
+    Args:
+        links: CandidateLinks dict (github / leetcode / stackoverflow URLs)
+
+    Returns:
+        Aggregated verification result (see aggregate_results)
+    """
+    return verify_candidates([links])[0]
+
+
+async def verify_profiles_async(links: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """verify_profiles() without blocking the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, verify_profiles, links)
+
+
+if __name__ == "__main__":
+    import sys
+
+    import requests
+
+    from . import tools
+    from .mock_profile_server import MockProfileServer
+
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.05
+    links_list = [
+        {
+            "github": f"https://github.com/dev{i}",
+            "leetcode": f"https://leetcode.com/u/coder{i}",
+            "stackoverflow": f"https://stackoverflow.com/users/{1000 + i}/dev{i}",
+        }
+        for i in range(candidates)
+    ]
+    links_list.append({"github": "https://github.com/missing-user"})
+
+    with MockProfileServer(latency=latency) as server:
+        tools.GITHUB_API_URL = server.github_url
+        tools.LEETCODE_GRAPHQL_URL = server.leetcode_url
+        tools.STACKEXCHANGE_API_URL = server.stackexchange_url
+        tools.PROFILE_CACHE_ENABLED = False  # Measure the network path, not the profile cache
+        tools.PROFILE_RATE_LIMIT_ENABLED = False
+        PROFILE_VERIFIERS["github"] = analyze_github_profile  # Two requests per profile (github_analyzer has its own benchmark)
+        print(f"🧪 Mock profile API on {server.base_url} ({latency * 1000:.0f} ms per request), {len(links_list)} candidates")
+
+        # Before: one tool call after another, new connection per request
+        pooled_session = tools.get_http_session
+        tools.get_http_session = lambda: requests
+        started = time.perf_counter()
+        for links in links_list:
+            for platform, url in verification_jobs(links):
+                PROFILE_VERIFIERS[platform](url)
+        sequential_s = time.perf_counter() - started
+        sequential_stats = server.stats()
+        tools.get_http_session = pooled_session
+
+        # After: shared keep-alive pool, all lookups concurrent
+        server.reset_stats()
+        started = time.perf_counter()
+        results = verify_candidates(links_list)
+        concurrent_s = time.perf_counter() - started
+        concurrent_stats = server.stats()
+
+    accessible = sum(len(r["accessible"]) for r in results)
+    lookups = sum(len(r["verified"]) for r in results)
+    print(f"⏱️ Sequential: {sequential_s:.2f}s, {sequential_stats['requests']} requests over {sequential_stats['connections']} connections")
+    print(f"⚡ Concurrent: {concurrent_s:.2f}s, {concurrent_stats['requests']} requests over {concurrent_stats['connections']} connections "
+          f"({VERIFICATION_WORKERS} workers)")
+    print(f"📊 {accessible}/{lookups} profiles accessible, speedup {sequential_s / concurrent_s:.1f}x")
+    print(f"❌ Errors: {results[-1]['errors']}")
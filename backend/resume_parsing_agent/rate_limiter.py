@@ -0,0 +1,356 @@
+"""
+Per-host rate limiting for external profile API calls
+
+Every network request the profile tools make goes through
+ProfileRateLimiter.send(), which
+
+- takes a token from the host's token bucket first, so requests are spaced out
+  instead of fired in bursts (callers queue while the bucket is empty)
+- reads X-RateLimit-Limit / -Remaining / -Reset from each response and re-paces
+  the bucket to spread the remaining quota over the rest of the window,
+  pausing the host entirely when the quota is used up
+- retries 429s, rate-limit 403s and 502/503/504s after Retry-After (or
+  exponential backoff with full jitter when the server gives no hint)
+
+A host whose next slot is further away than PROFILE_RATE_LIMIT_MAX_WAIT_SECONDS
+fails fast with RateLimitWaitTooLong (a requests RequestException), so the
+profile cache can serve its stale copy instead of blocking a parse for an hour.
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+# Starting pace per host, until the API's own rate-limit headers are seen
+DEFAULT_RATE_PER_SECOND = float(os.getenv("PROFILE_RATE_LIMIT_PER_SECOND", "5"))
+DEFAULT_BURST = int(os.getenv("PROFILE_RATE_LIMIT_BURST", "5"))
+
+MAX_RETRIES = int(os.getenv("PROFILE_MAX_RETRIES", "4"))
+BACKOFF_BASE_SECONDS = float(os.getenv("PROFILE_BACKOFF_BASE_SECONDS", "1"))
+MAX_BACKOFF_SECONDS = float(os.getenv("PROFILE_MAX_BACKOFF_SECONDS", "60"))
+
+# Longest a request may queue for its host before giving up
+MAX_WAIT_SECONDS = float(os.getenv("PROFILE_RATE_LIMIT_MAX_WAIT_SECONDS", "120"))
+
+# Known per-host starting points (requests/second, burst)
+HOST_LIMITS = {
+    "api.github.com": (1.0, 5),               # 60/hour unauthenticated; headers re-pace it (5000/hour with a token)
+    "leetcode.com": (2.0, 4),
+    "api.stackexchange.com": (5.0, 10),       # Stack Exchange throttles above 30 requests/second per IP
+}
+
+_RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class RateLimitWaitTooLong(requests.exceptions.RequestException):
+    """The host's rate limit would keep this request queued longer than allowed."""
+
+
+def _header(headers: Any, name: str) -> Optional[str]:
+    value = headers.get(name) if headers is not None else None
+    return value if value not in (None, "") else None
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """Retry-After as seconds (either delta-seconds or an HTTP date)."""
+    value = _header(headers, "Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_throttled(response: Any) -> bool:
+    if response.status_code in (429, 503) and _header(response.headers, "Retry-After"):
+        return True
+    # GitHub answers an exhausted quota with 403 and X-RateLimit-Remaining: 0
+    return response.status_code in (403, 429) and _header(response.headers, "X-RateLimit-Remaining") == "0"
+
+
+# ============================================================================
+# Host Token Bucket
+# ============================================================================
+
+class HostRateLimiter:
+    """Token bucket for one host, re-paced from the host's rate-limit headers."""
+
+    def __init__(self, host: str, rate_per_second: float, burst: int):
+        self.host = host
+        self.rate = rate_per_second
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        # Metrics
+        self.queued = 0
+        self.max_queued = 0
+        self.acquired = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.throttled = 0
+        self.retries = 0
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait: float = MAX_WAIT_SECONDS) -> float:
+        """
+        Blocks until a request slot is free
+
+        Returns:
+            Seconds spent waiting
+
+        Raises:
+            RateLimitWaitTooLong: if the slot is more than max_wait seconds away
+        """
+        started = time.monotonic()
+        with self._lock:
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        self.in_flight += 1
+                        waited = now - started
+                        self.acquired += 1
+                        self.total_wait += waited
+                        self.max_wait = max(self.max_wait, waited)
+                        return waited
+                    if now < self.paused_until:
+                        delay = self.paused_until - now
+                    else:
+                        delay = (1 - self.tokens) / self.rate
+                if now + delay - started > max_wait:
+                    raise RateLimitWaitTooLong(
+                        f"{self.host} rate limit: next request slot in {delay:.0f}s (limit {max_wait:.0f}s)"
+                    )
+                # Short sleeps so a re-paced or un-paused bucket is noticed quickly
+                time.sleep(min(delay, 0.25))
+        finally:
+            with self._lock:
+                self.queued -= 1
+
+    def release(self):
+        """Marks a request that got no response (network error) as finished."""
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+
+    def pause(self, seconds: float):
+        """Stops handing out slots for `seconds` (Retry-After, exhausted quota, backoff)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def observe(self, response: Any):
+        """Re-paces the bucket from X-RateLimit-* headers and pauses on throttling."""
+        headers = response.headers
+        remaining = _header(headers, "X-RateLimit-Remaining")
+        reset = _header(headers, "X-RateLimit-Reset")
+        limit = _header(headers, "X-RateLimit-Limit")
+        with self._lock:
+            self.in_flight = max(0, self.in_flight - 1)
+            try:
+                if limit is not None:
+                    self.limit = int(limit)
+                if remaining is not None:
+                    self.remaining = int(remaining)
+                if reset is not None:
+                    reset_value = float(reset)
+                    # Epoch seconds (GitHub) or seconds until reset
+                    self.reset_at = reset_value if reset_value > 1e9 else time.time() + reset_value
+            except ValueError:
+                pass
+
+            if remaining is not None and self.reset_at is not None:
+                window_left = max(self.reset_at - time.time(), 0.001)
+                # Requests already sent will use up part of the reported quota
+                available = self.remaining - self.in_flight
+                if available <= 0:
+                    self.paused_until = max(self.paused_until, time.monotonic() + window_left)
+                else:
+                    # Spread what is left evenly over the rest of the window
+                    self.rate = max(available / window_left, 1e-3)
+                    self.tokens = min(self.tokens, float(available))
+
+        if _is_throttled(response):
+            with self._lock:
+                self.throttled += 1
+            delay = retry_after_seconds(headers)
+            if delay is not None:
+                self.pause(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "rate_per_second": round(self.rate, 3),
+                "burst": self.burst,
+                "queue_depth": self.queued,
+                "in_flight": self.in_flight,
+                "max_queue_depth": self.max_queued,
+                "requests": self.acquired,
+                "avg_wait_ms": round(self.total_wait / self.acquired * 1000, 1) if self.acquired else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 1),
+                "paused_for_s": round(max(0.0, self.paused_until - now), 1),
+                "throttled_responses": self.throttled,
+                "retries": self.retries,
+                "limit": self.limit,
+                "remaining": self.remaining,
+            }
+
+
+# ============================================================================
+# Scheduler
+# ============================================================================
+
+class ProfileRateLimiter:
+    """Per-host token buckets plus retry with jittered backoff."""
+
+    def __init__(self, host_limits: Optional[Dict[str, tuple]] = None, max_retries: int = MAX_RETRIES,
+                 backoff_base: float = BACKOFF_BASE_SECONDS, max_backoff: float = MAX_BACKOFF_SECONDS,
+                 max_wait: float = MAX_WAIT_SECONDS):
+        self.host_limits = dict(HOST_LIMITS if host_limits is None else host_limits)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self._hosts: Dict[str, HostRateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def host(self, url: str) -> HostRateLimiter:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._hosts:
+                rate, burst = self.host_limits.get(host, (DEFAULT_RATE_PER_SECOND, DEFAULT_BURST))
+                self._hosts[host] = HostRateLimiter(host, rate, burst)
+            return self._hosts[host]
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(max, base * 2^attempt)]."""
+        return random.uniform(0, min(self.max_backoff, self.backoff_base * (2 ** attempt)))
+
+    def send(self, request: Callable[[], Any], url: str) -> Any:
+        """
+        Sends a request through the host's bucket, retrying throttled and transient failures
+
+        Args:
+            request: Zero-argument callable performing the HTTP request
+            url: Request URL (selects the host bucket)
+
+        Returns:
+            The last response (a throttled response is returned once retries run out)
+        """
+        limiter = self.host(url)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire(self.max_wait)
+            try:
+                response = request()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                limiter.release()
+                if attempt == self.max_retries:
+                    raise
+                limiter.retries += 1
+                time.sleep(self._backoff(attempt))
+                continue
+            except Exception:
+                limiter.release()
+                raise
+
+            limiter.observe(response)
+            if attempt == self.max_retries or not (_is_throttled(response) or response.status_code in _RETRY_STATUSES):
+                return response
+
+            limiter.retries += 1
+            if retry_after_seconds(response.headers) is None and _header(response.headers, "X-RateLimit-Remaining") != "0":
+                # No hint from the server - back off with jitter so parallel callers spread out
+                limiter.pause(self._backoff(attempt))
+        return response
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-host pacing, queue depth, wait times and throttling counts."""
+        with self._lock:
+            hosts = dict(self._hosts)
+        return {host: limiter.stats() for host, limiter in hosts.items()}
+
+
+_limiter: Optional[ProfileRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> ProfileRateLimiter:
+    """Returns the process-wide profile API rate limiter."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = ProfileRateLimiter()
+    return _limiter
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    from . import tools
+    from .mock_profile_server import MockProfileServer
+    from .profile_verification import PROFILE_VERIFIERS, verify_candidates
+
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    links_list = [
+        {
+            "github": f"https://github.com/dev{i}",
+            "leetcode": f"https://leetcode.com/u/coder{i}",
+            "stackoverflow": f"https://stackoverflow.com/users/{1000 + i}/dev{i}",
+        }
+        for i in range(candidates)
+    ]
+
+    with MockProfileServer(latency=0.01, rate_limit=(limit, 1.0)) as server:
+        tools.PROFILE_CACHE_ENABLED = False
+        PROFILE_VERIFIERS["github"] = tools.analyze_github_profile  # Two requests per profile (github_analyzer has its own benchmark)
+        tools.GITHUB_API_URL = server.github_url
+        tools.LEETCODE_GRAPHQL_URL = server.leetcode_url
+        tools.STACKEXCHANGE_API_URL = server.stackexchange_url
+        print(f"🧪 {candidates} candidates, mock API allows {limit} requests/second")
+
+        def run(label: str, rate_limited: bool):
+            tools.PROFILE_RATE_LIMIT_ENABLED = rate_limited
+            server.reset_stats()
+            started = time.perf_counter()
+            results = verify_candidates(links_list)
+            elapsed = time.perf_counter() - started
+            stats = server.stats()
+            failed = sum(len(r["errors"]) for r in results)
+            lookups = sum(len(r["verified"]) for r in results)
+            print(f"{label:<18} {elapsed:6.2f}s  {failed:5d}/{lookups} lookups failed, "
+                  f"{stats['throttled']:5d} requests answered 429, {(stats['requests'] - stats['throttled']) / elapsed:6.0f} successful requests/s")
+
+        run("🚫 No limiter", rate_limited=False)
+        limiter = ProfileRateLimiter(host_limits={})
+        tools.get_rate_limiter = lambda: limiter
+        time.sleep(1.0)  # Start the limited run in a fresh quota window
+        run("🪣 Token bucket", rate_limited=True)
+        print(json.dumps(limiter.stats(), indent=2))
@@ -3,11 +3,80 @@ External profile verification tools for Resume Parsing Agent.
 Analyzes GitHub, coding platforms, and Stack Overflow profiles.
 """
 
+import os
 import requests
+import threading
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, Optional
 import re
 from urllib.parse import urlparse
 
+from .profile_cache import get_profile_cache
+from .rate_limiter import get_rate_limiter
+
+
+# API base URLs (overridable to point verification at a local mock server)
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+LEETCODE_GRAPHQL_URL = os.getenv("LEETCODE_GRAPHQL_URL", "https://leetcode.com/graphql")
+STACKEXCHANGE_API_URL = os.getenv("STACKEXCHANGE_API_URL", "https://api.stackexchange.com/2.3")
+
+# Keep-alive connections kept per host (match the verification worker count)
+HTTP_POOL_SIZE = int(os.getenv("PROFILE_HTTP_POOL_SIZE", "16"))
+
+# Answer repeat lookups from data/cache/profile_cache.db (see profile_cache.py)
+PROFILE_CACHE_ENABLED = os.getenv("PROFILE_CACHE_ENABLED", "true").lower() == "true"
+
+# Pace requests per host and retry throttled ones (see rate_limiter.py)
+PROFILE_RATE_LIMIT_ENABLED = os.getenv("PROFILE_RATE_LIMIT_ENABLED", "true").lower() == "true"
+
+# Optional GitHub token - raises the API limit from 60 to 5,000 requests/hour
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
+
+_http_session: Optional[requests.Session] = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session() -> requests.Session:
+    """
+    Process-wide HTTP session shared by all profile lookups.
+
+    Reusing one session keeps TCP/TLS connections to api.github.com,
+    leetcode.com and api.stackexchange.com alive between requests instead of
+    paying a new handshake per call. Safe to use from the verification threads.
+    """
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=8, pool_maxsize=HTTP_POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def _send(method: str, url: str, headers: Optional[Dict[str, str]] = None, json_body: Any = None):
+    def request():
+        return get_http_session().request(method, url, headers=headers, json=json_body, timeout=10)
+
+    if not PROFILE_RATE_LIMIT_ENABLED:
+        return request()
+    return get_rate_limiter().send(request, url)
+
+
+def profile_request(platform: str, username: str, method: str, url: str,
+                    headers: Optional[Dict[str, str]] = None, json_body: Any = None):
+    """
+    One profile API request, answered from the profile cache when possible.
+
+    Returns:
+        requests.Response or profile_cache.CachedResponse (status_code, headers, json())
+    """
+    if not PROFILE_CACHE_ENABLED:
+        return _send(method, url, headers, json_body)
+    return get_profile_cache().request(platform, username, method, url, _send, headers=headers, json_body=json_body)
+
 
 def analyze_github_profile(github_url: str) -> Dict[str, Any]:
     """
@@ -36,16 +105,18 @@ def analyze_github_profile(github_url: str) -> Dict[str, Any]:
             }
         
         # GitHub API endpoint (no auth required for public data)
-        user_url = f"https://api.github.com/users/{username}"
-        repos_url = f"https://api.github.com/users/{username}/repos?per_page=100&sort=updated"
+        user_url = f"{GITHUB_API_URL}/users/{username}"
+        repos_url = f"{GITHUB_API_URL}/users/{username}/repos?per_page=100&sort=updated"
         
         headers = {
             "Accept": "application/vnd.github.v3+json",
             "User-Agent": "Resume-Parser-Agent"
         }
+        if GITHUB_TOKEN:
+            headers["Authorization"] = f"Bearer {GITHUB_TOKEN}"
         
         # Fetch user data
-        user_response = requests.get(user_url, headers=headers, timeout=10)
+        user_response = profile_request("github", username, "GET", user_url, headers=headers)
         if user_response.status_code != 200:
             return {
                 "username": username,
@@ -62,7 +133,7 @@ def analyze_github_profile(github_url: str) -> Dict[str, Any]:
         user_data = user_response.json()
         
         # Fetch repositories
-        repos_response = requests.get(repos_url, headers=headers, timeout=10)
+        repos_response = profile_request("github", username, "GET", repos_url, headers=headers)
         repos_data = repos_response.json() if repos_response.status_code == 200 else []
         
         # Calculate metrics
@@ -156,7 +227,7 @@ def analyze_leetcode_profile(leetcode_url: str) -> Dict[str, Any]:
             }
         
         # LeetCode GraphQL endpoint (public)
-        url = "https://leetcode.com/graphql"
+        url = LEETCODE_GRAPHQL_URL
         
         query = """
         query getUserProfile($username: String!) {
@@ -189,7 +260,7 @@ def analyze_leetcode_profile(leetcode_url: str) -> Dict[str, Any]:
             "Referer": "https://leetcode.com"
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=10)
+        response = profile_request("leetcode", username, "POST", url, headers=headers, json_body=payload)
         
         if response.status_code != 200:
             return {
@@ -320,13 +391,13 @@ def analyze_stackoverflow_profile(stackoverflow_url: str) -> Dict[str, Any]:
             }
         
         # Stack Overflow API (no key needed for basic queries)
-        base_url = "https://api.stackexchange.com/2.3"
+        base_url = STACKEXCHANGE_API_URL
         
         # Fetch user data
         user_url = f"{base_url}/users/{user_id}?site=stackoverflow"
         headers = {"Accept": "application/json"}
         
-        response = requests.get(user_url, headers=headers, timeout=10)
+        response = profile_request("stackoverflow", user_id, "GET", user_url, headers=headers)
         
         if response.status_code != 200:
             return {
@@ -365,7 +436,7 @@ def analyze_stackoverflow_profile(stackoverflow_url: str) -> Dict[str, Any]:
         
         # Fetch top tags
         tags_url = f"{base_url}/users/{user_id}/top-tags?site=stackoverflow"
-        tags_response = requests.get(tags_url, headers=headers, timeout=10)
+        tags_response = profile_request("stackoverflow", user_id, "GET", tags_url, headers=headers)
         top_tags = []
         if tags_response.status_code == 200:
             tags_data = tags_response.json()
@@ -0,0 +1,136 @@
+"""
+Tolerant extraction of JSON arrays from LLM output.
+
+Model output may be wrapped in ```json fences, surrounded by prose, or cut off
+part-way through a list when the output token limit is hit. Instead of
+json.loads on the whole text (one bad character loses everything), the target
+array is scanned object by object so every complete item survives and the
+incomplete or malformed ones are reported individually.
+"""
+
+import json
+import re
+from typing import Any, Iterator, List, Optional, Tuple
+
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+def strip_code_fences(text: str) -> str:
+    """Returns the body of the first ``` fenced block (an unterminated fence runs to the end)."""
+    match = _FENCE_RE.search(text)
+    return match.group(1) if match else text
+
+
+def find_array_start(text: str, key: str) -> Optional[int]:
+    """Index just past the '[' of the array under `key` (or of a bare top-level array)."""
+    key_index = text.find(f'"{key}"')
+    if key_index != -1:
+        bracket = text.find("[", key_index)
+        return bracket + 1 if bracket != -1 else None
+    stripped = text.lstrip()
+    if stripped.startswith("["):
+        return len(text) - len(stripped) + 1
+    return None
+
+
+def iter_object_spans(text: str, start: int = 0) -> Iterator[Tuple[int, int]]:
+    """
+    Yields (start, end) spans of the complete top-level JSON objects in text[start:].
+
+    Brace matching is string- and escape-aware. Scanning stops at the closing
+    ']' of the enclosing array or when the text ends inside an object
+    (truncated output), so a partial last object is never yielded.
+    """
+    depth = 0
+    in_string = False
+    escaped = False
+    object_start = -1
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            if depth == 0:
+                object_start = i
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                yield object_start, i + 1
+        elif char == "]" and depth == 0:
+            return
+
+
+def loads_lenient(fragment: str) -> Any:
+    """json.loads with a second attempt after dropping trailing commas."""
+    try:
+        return json.loads(fragment)
+    except ValueError:
+        return json.loads(_TRAILING_COMMA_RE.sub(r"\1", fragment))
+
+
+def extract_array_items(raw_output: Any, key: str, id_field: str) -> Tuple[List[Any], List[str]]:
+    """
+    Pulls the items of the `key` array out of agent output of any shape.
+
+    Args:
+        raw_output: Session-state value - a Pydantic model, a dict, a list or the model's raw text
+        key: Top-level field holding the array (e.g. "ranked_candidates")
+        id_field: Item field quoted in error messages (e.g. "candidate_id")
+
+    Returns:
+        (items, errors) - items are parsed JSON values (not yet validated);
+        errors describe fragments that could not be parsed or were truncated
+    """
+    if hasattr(raw_output, "model_dump"):
+        raw_output = raw_output.model_dump()
+    if isinstance(raw_output, dict):
+        return list(raw_output.get(key) or []), []
+    if isinstance(raw_output, list):
+        return list(raw_output), []
+    if not isinstance(raw_output, str) or not raw_output.strip():
+        return [], ["empty output"]
+
+    # Fast path - the whole thing is valid JSON
+    for text in (raw_output, strip_code_fences(raw_output)):
+        try:
+            parsed = json.loads(text)
+        except ValueError:
+            continue
+        if isinstance(parsed, dict):
+            return list(parsed.get(key) or []), []
+        if isinstance(parsed, list):
+            return parsed, []
+
+    # Slow path - scan the (possibly partial) array object by object
+    text = strip_code_fences(raw_output)
+    array_start = find_array_start(text, key)
+    if array_start is None:
+        return [], [f"no {key} array in output"]
+
+    id_re = re.compile(rf'"{re.escape(id_field)}"\s*:\s*"([^"]+)"')
+    items, errors = [], []
+    last_end = array_start
+    for start, end in iter_object_spans(text, array_start):
+        fragment = text[start:end]
+        last_end = end
+        try:
+            items.append(loads_lenient(fragment))
+        except ValueError as e:
+            item_id = id_re.search(fragment)
+            errors.append(f"{item_id.group(1) if item_id else f'object at {start}'}: {e}")
+
+    rest = text[last_end:]
+    if "{" in rest and ("]" not in rest or rest.index("{") < rest.index("]")):
+        item_id = id_re.search(rest)
+        errors.append(f"output truncated inside {item_id.group(1) if item_id else 'an item'}")
+    return items, errors
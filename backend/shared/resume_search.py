@@ -0,0 +1,369 @@
+"""
+BM25 full-text search over parsed resumes.
+
+Keeps an inverted index in a local SQLite file (data/search_index/resumes.db)
+covering each resume's summary, work experience, projects and skills. The
+index is updated incrementally: only resumes added, changed or removed since
+the last refresh are (re)indexed, so queries never reload every resume.
+"""
+
+import heapq
+import json
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RESUMES_DIR = DATA_DIR / "parsed_resumes"
+INDEX_PATH = DATA_DIR / "search_index" / "resumes.db"
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Term frequency multiplier per resume field (skills are the strongest signal)
+FIELD_WEIGHTS = {
+    "skills": 3,
+    "summary": 2,
+    "work_experience": 1,
+    "projects": 1,
+}
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have",
+    "in", "is", "it", "of", "on", "or", "that", "the", "to", "was", "were", "with",
+    "who", "i", "my", "we", "our", "using", "used", "years", "year",
+}
+
+
+# ============================================================================
+# Text Processing
+# ============================================================================
+
+def stem(token: str) -> str:
+    """Light suffix stripping so "developer"/"developers" and "deploying"/"deployed" collide."""
+    for suffix in ("ing", "ers", "ed", "es", "er", "s"):
+        if len(token) > len(suffix) + 3 and token.endswith(suffix):
+            return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases, splits and stems text into index terms."""
+    terms = []
+    for token in re.findall(r"[a-z0-9+#]+(?:\.[a-z0-9]+)*", text.lower()):
+        if token in _STOPWORDS or (len(token) < 2 and token not in ("c", "r")):
+            continue
+        terms.append(stem(token))
+    return terms
+
+
+def _flatten(value: Any) -> Iterable[str]:
+    """Yields every string found in nested lists/dicts."""
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _flatten(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _flatten(item)
+
+
+def extract_resume_fields(resume: Dict[str, Any]) -> Dict[str, str]:
+    """Pulls the searchable text fields out of a parsed resume document."""
+    parsed_data = resume.get("parsed_data", {}) or {}
+    return {
+        "summary": " ".join(_flatten([
+            parsed_data.get("summary") or "",
+            (resume.get("candidate_info", {}) or {}).get("target_job_title") or "",
+        ])),
+        "work_experience": " ".join(_flatten(parsed_data.get("work_experience", []))),
+        "projects": " ".join(_flatten(parsed_data.get("projects", []))),
+        "skills": " ".join(_flatten(parsed_data.get("technical_skills", {}))),
+    }
+
+
+def weighted_term_frequencies(resume: Dict[str, Any]) -> Counter:
+    """Term frequencies for a resume with per-field weights applied."""
+    frequencies = Counter()
+    for field, text in extract_resume_fields(resume).items():
+        weight = FIELD_WEIGHTS.get(field, 1)
+        for term, count in Counter(tokenize(text)).items():
+            frequencies[term] += count * weight
+    return frequencies
+
+
+# ============================================================================
+# Inverted Index
+# ============================================================================
+
+class ResumeSearchIndex:
+    """
+    Incrementally maintained BM25 index stored in SQLite.
+
+    Tables:
+        docs(doc_id, candidate_id, source_mtime, length, name, target_job_title)
+        postings(term, doc_id, tf) - clustered by term for fast lookups
+        meta(key, value) - corpus statistics and last refresh state
+    """
+
+    def __init__(self, index_path: Path = INDEX_PATH, resumes_dir: Path = RESUMES_DIR):
+        self.index_path = Path(index_path)
+        self.resumes_dir = Path(resumes_dir)
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.index_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_tables()
+        # doc_id -> length, loaded lazily and dropped whenever docs change
+        self._lengths: Optional[Dict[int, int]] = None
+
+    def _create_tables(self):
+        with self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS docs (
+                    doc_id INTEGER PRIMARY KEY,
+                    candidate_id TEXT UNIQUE NOT NULL,
+                    source_mtime REAL NOT NULL,
+                    length INTEGER NOT NULL,
+                    name TEXT,
+                    target_job_title TEXT
+                );
+                CREATE TABLE IF NOT EXISTS postings (
+                    term TEXT NOT NULL,
+                    doc_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id);
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+            """)
+
+    def _get_meta(self, key: str, default: Any = None) -> Any:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key: str, value: Any):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+            (key, json.dumps(value))
+        )
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def _remove(self, candidate_id: str):
+        row = self._conn.execute(
+            "SELECT doc_id FROM docs WHERE candidate_id = ?", (candidate_id,)
+        ).fetchone()
+        if row:
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM docs WHERE doc_id = ?", (row[0],))
+            self._lengths = None
+
+    def _add(self, resume: Dict[str, Any], source_mtime: float):
+        candidate_id = resume.get("candidate_id")
+        if not candidate_id:
+            return
+        self._remove(candidate_id)
+        frequencies = weighted_term_frequencies(resume)
+        candidate_info = resume.get("candidate_info", {}) or {}
+        cursor = self._conn.execute(
+            "INSERT INTO docs (candidate_id, source_mtime, length, name, target_job_title) VALUES (?, ?, ?, ?, ?)",
+            (
+                candidate_id,
+                source_mtime,
+                sum(frequencies.values()),
+                candidate_info.get("name") or resume.get("candidate_name"),
+                candidate_info.get("target_job_title"),
+            )
+        )
+        doc_id = cursor.lastrowid
+        self._lengths = None
+        self._conn.executemany(
+            "INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+            [(term, doc_id, tf) for term, tf in frequencies.items()]
+        )
+
+    def index_resume(self, resume: Dict[str, Any], source_mtime: Optional[float] = None):
+        """Adds or replaces a single resume document in the index."""
+        with self._lock, self._conn:
+            self._add(resume, source_mtime if source_mtime is not None else time.time())
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """
+        Brings the index in sync with data/parsed_resumes/.
+
+        Skips the directory scan entirely when the directory has not changed
+        since the last refresh, so calling this before every query is cheap.
+
+        Returns:
+            Counts of added/updated/removed resumes
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        if not self.resumes_dir.exists():
+            return stats
+
+        dir_mtime = self.resumes_dir.stat().st_mtime
+        if not force and self._get_meta("resumes_dir_mtime") == dir_mtime:
+            return stats
+
+        with self._lock, self._conn:
+            indexed = dict(self._conn.execute("SELECT candidate_id, source_mtime FROM docs"))
+            seen = set()
+
+            for resume_file in self.resumes_dir.glob("CAND-*.json"):
+                candidate_id = resume_file.stem
+                seen.add(candidate_id)
+                mtime = resume_file.stat().st_mtime
+                if indexed.get(candidate_id) == mtime:
+                    continue
+                try:
+                    with open(resume_file, "r", encoding="utf-8") as f:
+                        resume = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Skipping unreadable resume {resume_file.name}: {e}")
+                    continue
+                resume.setdefault("candidate_id", candidate_id)
+                self._add(resume, mtime)
+                stats["updated" if candidate_id in indexed else "added"] += 1
+
+            for candidate_id in set(indexed) - seen:
+                self._remove(candidate_id)
+                stats["removed"] += 1
+
+            self._set_meta("resumes_dir_mtime", dir_mtime)
+
+        if any(stats.values()):
+            print(f"🔎 Search index refreshed: {stats}")
+        return stats
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 10) -> Dict[str, Any]:
+        """
+        Ranks resumes against a free-text query with BM25.
+
+        Args:
+            query: Free-text query (e.g. "kubernetes terraform aws")
+            limit: Maximum number of hits to return
+
+        Returns:
+            Dictionary with total_hits (all matching resumes) and results
+            sorted by score, each with candidate_id, name, target_job_title,
+            score and matched_terms
+        """
+        empty = {"total_hits": 0, "results": []}
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return empty
+
+        # The connection is shared with refresh(), which writes on it
+        with self._lock:
+            return self._search(terms, limit) or empty
+
+    def _search(self, terms: List[str], limit: int) -> Optional[Dict[str, Any]]:
+        lengths = self._lengths
+        if lengths is None:
+            lengths = self._lengths = dict(self._conn.execute("SELECT doc_id, length FROM docs"))
+        total_docs = len(lengths)
+        if not total_docs:
+            return None
+        avg_length = sum(lengths.values()) / total_docs
+
+        scores: Dict[int, float] = {}
+        matched: Dict[int, List[str]] = {}
+
+        for term in terms:
+            postings = self._conn.execute(
+                "SELECT doc_id, tf FROM postings WHERE term = ?", (term,)
+            ).fetchall()
+            if not postings:
+                continue
+            df = len(postings)
+            idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths.get(doc_id, avg_length) / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                matched.setdefault(doc_id, []).append(term)
+
+        top = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        if not top:
+            return None
+
+        placeholders = ",".join("?" * len(top))
+        details = {
+            row[0]: row[1:]
+            for row in self._conn.execute(
+                f"SELECT doc_id, candidate_id, name, target_job_title FROM docs WHERE doc_id IN ({placeholders})",
+                [doc_id for doc_id, _ in top]
+            )
+        }
+
+        return {
+            "total_hits": len(scores),
+            "results": [
+                {
+                    "candidate_id": details[doc_id][0],
+                    "name": details[doc_id][1],
+                    "target_job_title": details[doc_id][2],
+                    "score": round(score, 4),
+                    "matched_terms": matched[doc_id],
+                }
+                for doc_id, score in top
+            ]
+        }
+
+    def stats(self) -> Dict[str, int]:
+        """Basic index statistics."""
+        with self._lock:
+            docs = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            terms = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+        return {"documents": docs, "terms": terms}
+
+
+_index: Optional[ResumeSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_resume_index() -> ResumeSearchIndex:
+    """Returns the process-wide resume search index."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ResumeSearchIndex()
+    return _index
+
+
+def search_resumes(query: str, limit: int = 10) -> Dict[str, Any]:
+    """
+    Refreshes the index if resumes changed, then runs a BM25 query.
+
+    Returns:
+        Dictionary with query, total_hits, took_ms (refresh included) and results
+    """
+    index = get_resume_index()
+    started = time.perf_counter()
+    index.refresh()
+    hits = index.search(query, limit=limit)
+    return {
+        "query": query,
+        "total_hits": hits["total_hits"],
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": hits["results"],
+    }
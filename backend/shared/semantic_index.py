@@ -0,0 +1,597 @@
+"""
+Local semantic matching for job titles and candidate profiles.
+
+Embeddings are CPU-only hashed feature vectors: stemmed words, character
+trigrams and a small table of role concepts (so "Site Reliability Engineer"
+and "DevOps Engineer" share a dimension), hashed into a fixed-size L2-normalized
+vector. Candidate vectors are stored in an IVF (inverted file) index persisted
+under data/semantic_index/, so a query only compares against the vectors in the
+few clusters nearest to it instead of every candidate. Clustering (and dropping
+the rows of replaced resumes) runs on a background thread; queries keep using
+the previous clusters until the new ones are swapped in.
+"""
+
+import heapq
+import json
+import math
+import random
+import re
+import threading
+import time
+import zlib
+from array import array
+from operator import mul
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .resume_search import tokenize, RESUMES_DIR, DATA_DIR
+
+
+INDEX_DIR = DATA_DIR / "semantic_index"
+
+EMBEDDING_DIM = 128
+
+# Minimum cosine similarity for a candidate to pass the semantic title prefilter
+SEMANTIC_MATCH_THRESHOLD = 0.45
+
+# Most candidates the semantic title prefilter admits (the closest ones are kept)
+SEMANTIC_MATCH_LIMIT = 1000
+
+# IVF parameters
+MAX_CLUSTERS = 256
+DEFAULT_NPROBE = 8
+KMEANS_ITERATIONS = 6
+KMEANS_SAMPLE_PER_CLUSTER = 24
+
+# Replaced and deleted resumes leave dead rows behind; compact past this share
+MAX_DEAD_ROW_RATIO = 0.5
+
+# Feature weights per source field
+TITLE_WEIGHT = 3.0
+CONCEPT_WEIGHT = 4.0
+SKILL_WEIGHT = 1.0
+SUMMARY_WEIGHT = 0.5
+
+# Phrase -> role concept. Titles sharing a concept land close together even
+# when they share no words.
+ROLE_CONCEPTS = {
+    "site reliability": "ops",
+    "sre": "ops",
+    "devops": "ops",
+    "dev ops": "ops",
+    "platform engineer": "ops",
+    "infrastructure": "ops",
+    "cloud engineer": "ops",
+    "cloud architect": "ops",
+    "systems engineer": "ops",
+    "backend": "backend",
+    "back end": "backend",
+    "back-end": "backend",
+    "server side": "backend",
+    "api developer": "backend",
+    "frontend": "frontend",
+    "front end": "frontend",
+    "front-end": "frontend",
+    "ui developer": "frontend",
+    "react developer": "frontend",
+    "full stack": "fullstack",
+    "fullstack": "fullstack",
+    "full-stack": "fullstack",
+    "mern": "fullstack",
+    "data scientist": "ml",
+    "machine learning": "ml",
+    "ml engineer": "ml",
+    "ai engineer": "ml",
+    "ai/ml": "ml",
+    "data engineer": "data",
+    "pipeline engineer": "data",
+    "etl": "data",
+    "data analyst": "analytics",
+    "business analyst": "analytics",
+    "qa": "qa",
+    "sdet": "qa",
+    "test engineer": "qa",
+    "quality assurance": "qa",
+    "android": "mobile",
+    "ios": "mobile",
+    "mobile": "mobile",
+    "software engineer": "software",
+    "software developer": "software",
+    "developer": "software",
+    "programmer": "software",
+    "human resources": "hr",
+    "hr": "hr",
+    "recruiter": "hr",
+    "talent acquisition": "hr",
+}
+
+# Concepts that imply others (a full stack developer is also front/back end)
+CONCEPT_IMPLIES = {
+    "fullstack": ["frontend", "backend", "software"],
+    "backend": ["software"],
+    "frontend": ["software"],
+    "mobile": ["software"],
+    "ml": ["data"],
+}
+
+# Seniority words carry no semantic signal for matching roles
+_SENIORITY_TERMS = {"senior", "sr", "junior", "jr", "lead", "principal", "staff", "intern", "trainee", "associate", "head"}
+
+
+# ============================================================================
+# Embeddings
+# ============================================================================
+
+def role_concepts(text: str) -> List[str]:
+    """Returns the role concepts mentioned in a title or summary."""
+    lowered = f" {text.lower()} "
+    concepts = set()
+    for phrase, concept in ROLE_CONCEPTS.items():
+        if re.search(rf"(?<![a-z]){re.escape(phrase.strip())}(?![a-z])", lowered):
+            concepts.add(concept)
+    for concept in list(concepts):
+        concepts.update(CONCEPT_IMPLIES.get(concept, []))
+    return sorted(concepts)
+
+
+def _add_feature(vector: List[float], feature: str, weight: float):
+    """Hashes a feature into the vector using a stable signed hash."""
+    h = zlib.crc32(feature.encode("utf-8"))
+    vector[h % EMBEDDING_DIM] += weight if (h >> 16) & 1 else -weight
+
+
+def _add_text(vector: List[float], text: str, weight: float, trigrams: bool = False):
+    for term in tokenize(text):
+        if term in _SENIORITY_TERMS:
+            continue
+        _add_feature(vector, f"w:{term}", weight)
+        if trigrams and len(term) > 3:
+            padded = f"#{term}#"
+            for i in range(len(padded) - 2):
+                _add_feature(vector, f"c:{padded[i:i + 3]}", weight * 0.3)
+
+
+def _normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(v * v for v in vector))
+    return [v / norm for v in vector] if norm else vector
+
+
+def embed_text(title: str = "", skills: Optional[List[str]] = None, summary: str = "") -> List[float]:
+    """
+    Embeds a title, skill list and optional summary into a unit vector.
+
+    Args:
+        title: Job title or candidate target title
+        skills: Skill names
+        summary: Free-text summary (weighted lightly)
+
+    Returns:
+        L2-normalized vector of length EMBEDDING_DIM
+    """
+    vector = [0.0] * EMBEDDING_DIM
+    _add_text(vector, title, TITLE_WEIGHT, trigrams=True)
+    for concept in role_concepts(title):
+        _add_feature(vector, f"r:{concept}", CONCEPT_WEIGHT)
+    for skill in skills or []:
+        _add_feature(vector, f"s:{skill.lower().strip()}", SKILL_WEIGHT)
+    if summary:
+        _add_text(vector, summary, SUMMARY_WEIGHT)
+        for concept in role_concepts(summary):
+            _add_feature(vector, f"r:{concept}", SUMMARY_WEIGHT)
+    return _normalize(vector)
+
+
+def _candidate_skills(resume: Dict[str, Any]) -> List[str]:
+    skills = []
+    for category in (resume.get("parsed_data", {}) or {}).get("technical_skills", {}).values():
+        if isinstance(category, list):
+            skills.extend(category)
+    return skills
+
+
+def embed_candidate(resume: Dict[str, Any]) -> List[float]:
+    """Embeds a parsed resume from its target title, skills and summary."""
+    return embed_text(
+        title=(resume.get("candidate_info", {}) or {}).get("target_job_title") or "",
+        skills=_candidate_skills(resume),
+        summary=(resume.get("parsed_data", {}) or {}).get("summary") or "",
+    )
+
+
+def embed_jd(jd_data: Dict[str, Any]) -> List[float]:
+    """Embeds a parsed JD from its role title, skills and description."""
+    requirements = jd_data.get("requirements", {}) or {}
+    skills = (jd_data.get("mandatory_skills") or requirements.get("mandatory_skills") or []) + \
+        (jd_data.get("good_to_have_skills") or requirements.get("good_to_have_skills") or [])
+    return embed_text(
+        title=jd_data.get("role_title", jd_data.get("job_title", "")) or "",
+        skills=skills,
+        summary=jd_data.get("summary") or jd_data.get("description") or "",
+    )
+
+
+def cosine(a, b) -> float:
+    """Dot product of two unit vectors."""
+    return sum(map(mul, a, b))
+
+
+def _nearest(centroids: List[List[float]], vector) -> int:
+    best, best_score = 0, -2.0
+    for i, centroid in enumerate(centroids):
+        score = cosine(vector, centroid)
+        if score > best_score:
+            best, best_score = i, score
+    return best
+
+
+def _cluster(vectors: array, live_rows: List[int]) -> Tuple[List[List[float]], Dict[int, int]]:
+    """
+    Spherical k-means on a sample of the live rows, then every live row
+    assigned to its nearest centroid.
+
+    Returns:
+        (centroids, row -> cluster)
+    """
+    if not live_rows:
+        return [], {}
+
+    def vector(row: int) -> array:
+        return vectors[row * EMBEDDING_DIM:(row + 1) * EMBEDDING_DIM]
+
+    n_clusters = max(1, min(MAX_CLUSTERS, int(math.sqrt(len(live_rows)))))
+    rng = random.Random(42)
+    sample = rng.sample(live_rows, min(len(live_rows), n_clusters * KMEANS_SAMPLE_PER_CLUSTER))
+    centroids = [list(vector(row)) for row in rng.sample(sample, n_clusters)]
+
+    for _ in range(KMEANS_ITERATIONS):
+        sums = [[0.0] * EMBEDDING_DIM for _ in centroids]
+        for row in sample:
+            row_vector = vector(row)
+            target = sums[_nearest(centroids, row_vector)]
+            for d, value in enumerate(row_vector):
+                target[d] += value
+        centroids = [
+            _normalize(total) if any(total) else centroids[i]
+            for i, total in enumerate(sums)
+        ]
+
+    return centroids, {row: _nearest(centroids, vector(row)) for row in live_rows}
+
+
+# ============================================================================
+# IVF Index
+# ============================================================================
+
+class SemanticIndex:
+    """
+    IVF index over candidate embeddings, persisted as:
+        vectors.bin - float32 rows, one per indexed candidate
+        index.json  - candidate ids, source mtimes, centroids and cluster lists
+    """
+
+    def __init__(self, index_dir: Path = INDEX_DIR, resumes_dir: Path = RESUMES_DIR):
+        self.index_dir = Path(index_dir)
+        self.resumes_dir = Path(resumes_dir)
+        self.vectors = array("f")
+        self.ids: List[Optional[str]] = []  # Row -> candidate_id (None when deleted)
+        self.rows: Dict[str, int] = {}  # candidate_id -> row
+        self.mtimes: Dict[str, float] = {}
+        self.centroids: List[List[float]] = []
+        self.lists: List[List[int]] = []
+        self.row_cluster: Dict[int, int] = {}  # row -> cluster (live rows only)
+        self.trained_size = 0
+        self.resumes_dir_mtime: Optional[float] = None
+        self._lock = threading.RLock()
+        self._maintenance: Optional[threading.Thread] = None
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _load(self):
+        meta_path = self.index_dir / "index.json"
+        vectors_path = self.index_dir / "vectors.bin"
+        if not meta_path.exists() or not vectors_path.exists():
+            return
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("dim") != EMBEDDING_DIM:
+                return  # Embedding changed - rebuild
+            vectors = array("f")
+            with open(vectors_path, "rb") as f:
+                vectors.frombytes(f.read())
+            self.vectors = vectors
+            self.ids = meta["ids"]
+            self.rows = {cid: row for row, cid in enumerate(self.ids) if cid}
+            self.mtimes = meta.get("mtimes", {})
+            self.centroids = meta.get("centroids", [])
+            self.lists = meta.get("lists", [])
+            self.row_cluster = {row: cluster for cluster, members in enumerate(self.lists) for row in members}
+            self.trained_size = meta.get("trained_size", 0)
+            self.resumes_dir_mtime = meta.get("resumes_dir_mtime")
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable semantic index: {e}")
+            self.vectors, self.ids, self.rows, self.mtimes = array("f"), [], {}, {}
+            self.centroids, self.lists, self.row_cluster, self.trained_size = [], [], {}, 0
+
+    def save(self):
+        """Writes vectors and metadata to disk."""
+        with self._lock:
+            self.index_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.index_dir / "vectors.bin", "wb") as f:
+                self.vectors.tofile(f)
+            with open(self.index_dir / "index.json", "w", encoding="utf-8") as f:
+                json.dump({
+                    "dim": EMBEDDING_DIM,
+                    "ids": self.ids,
+                    "mtimes": self.mtimes,
+                    "centroids": self.centroids,
+                    "lists": self.lists,
+                    "trained_size": self.trained_size,
+                    "resumes_dir_mtime": self.resumes_dir_mtime,
+                }, f)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _vector(self, row: int) -> array:
+        return self.vectors[row * EMBEDDING_DIM:(row + 1) * EMBEDDING_DIM]
+
+    def _delete(self, candidate_id: str):
+        row = self.rows.pop(candidate_id, None)
+        if row is None:
+            return
+        self.ids[row] = None
+        self.mtimes.pop(candidate_id, None)
+        cluster = self.row_cluster.pop(row, None)
+        if cluster is not None:
+            self.lists[cluster].remove(row)
+
+    def add(self, candidate_id: str, vector: List[float], source_mtime: float = 0.0):
+        """Adds or replaces a candidate vector, assigning it to its nearest cluster."""
+        with self._lock:
+            self._delete(candidate_id)
+            row = len(self.ids)
+            self.ids.append(candidate_id)
+            self.rows[candidate_id] = row
+            self.mtimes[candidate_id] = source_mtime
+            self.vectors.extend(vector)
+            if self.centroids:
+                cluster = self.row_cluster[row] = _nearest(self.centroids, vector)
+                self.lists[cluster].append(row)
+
+    def _needs_training(self) -> bool:
+        live = len(self.rows)
+        if len(self.ids) - live > MAX_DEAD_ROW_RATIO * len(self.ids):
+            return True  # Re-embedded resumes leave their old row behind just like deleted ones
+        return bool(live) and (not self.centroids or live >= 2 * max(self.trained_size, 1))
+
+    def train(self):
+        """
+        (Re)clusters all live vectors and assigns every vector to its nearest
+        centroid; drops dead rows once they pass MAX_DEAD_ROW_RATIO.
+
+        Clustering runs on a snapshot without holding the lock, so queries and
+        refreshes continue against the previous clusters meanwhile. Rows added
+        during clustering are assigned when the new clusters are swapped in.
+        """
+        with self._lock:
+            snapshot_size = len(self.ids)
+            live_rows = [row for row, cid in enumerate(self.ids) if cid]
+            vectors = self.vectors[:]
+
+        centroids, assignment = _cluster(vectors, live_rows)
+
+        with self._lock:
+            for row in range(snapshot_size, len(self.ids)):
+                if self.ids[row]:
+                    assignment[row] = _nearest(centroids, self._vector(row))
+            live_rows = [row for row, cid in enumerate(self.ids) if cid]
+            if len(self.ids) - len(live_rows) > MAX_DEAD_ROW_RATIO * len(self.ids):
+                self._compact(live_rows)
+                assignment = {new_row: assignment[row] for new_row, row in enumerate(live_rows)}
+                live_rows = list(range(len(live_rows)))
+
+            self.centroids = centroids
+            self.row_cluster = {row: assignment[row] for row in live_rows}
+            self.lists = [[] for _ in centroids]
+            for row in live_rows:
+                self.lists[assignment[row]].append(row)
+            self.trained_size = len(live_rows)
+
+    def _compact(self, live_rows: List[int]):
+        """Drops deleted rows from the vectors (rows are renumbered in order)."""
+        vectors = array("f")
+        for row in live_rows:
+            vectors.extend(self._vector(row))
+        self.vectors = vectors
+        self.ids = [self.ids[row] for row in live_rows]
+        self.rows = {cid: row for row, cid in enumerate(self.ids)}
+
+    def _schedule_training(self):
+        """Starts background training unless it is already running (call with the lock held)."""
+        if self._maintenance is None:
+            self._maintenance = threading.Thread(target=self._train_in_background, name="semantic-index-train", daemon=True)
+            self._maintenance.start()
+
+    def _train_in_background(self):
+        try:
+            while True:
+                started = time.perf_counter()
+                self.train()
+                self.save()
+                print(f"🧭 Semantic index retrained: {len(self.centroids)} clusters over "
+                      f"{self.trained_size} candidates in {time.perf_counter() - started:.1f}s")
+                with self._lock:
+                    # Resumes added while training may call for another round
+                    if not self._needs_training():
+                        self._maintenance = None
+                        return
+        except Exception as e:
+            print(f"⚠️ Semantic index training failed: {e}")
+            with self._lock:
+                self._maintenance = None
+
+    def wait_for_training(self, timeout: Optional[float] = None):
+        """Blocks until background training (if any) has finished."""
+        thread = self._maintenance
+        if thread is not None:
+            thread.join(timeout)
+
+    def refresh(self, force: bool = False, background: bool = True) -> Dict[str, int]:
+        """
+        Embeds resumes added or changed since the last refresh and drops
+        deleted ones. Retrains clusters when the index has doubled in size or
+        more than MAX_DEAD_ROW_RATIO of the rows are dead - on a background
+        thread unless background=False.
+        """
+        stats = {"added": 0, "removed": 0}
+        if not self.resumes_dir.exists():
+            return stats
+
+        dir_mtime = self.resumes_dir.stat().st_mtime
+        if not force and self.resumes_dir_mtime == dir_mtime:
+            return stats
+
+        with self._lock:
+            seen = set()
+            for resume_file in self.resumes_dir.glob("CAND-*.json"):
+                candidate_id = resume_file.stem
+                seen.add(candidate_id)
+                mtime = resume_file.stat().st_mtime
+                if self.mtimes.get(candidate_id) == mtime:
+                    continue
+                try:
+                    with open(resume_file, "r", encoding="utf-8") as f:
+                        resume = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Skipping unreadable resume {resume_file.name}: {e}")
+                    continue
+                self.add(candidate_id, embed_candidate(resume), mtime)
+                stats["added"] += 1
+
+            for candidate_id in set(self.rows) - seen:
+                self._delete(candidate_id)
+                stats["removed"] += 1
+
+            self.resumes_dir_mtime = dir_mtime
+            if any(stats.values()):
+                self.save()
+                print(f"🧭 Semantic index refreshed: {stats}")
+            needs_training = self._needs_training()
+            if needs_training and background:
+                self._schedule_training()
+
+        if needs_training and not background:
+            self.train()
+            self.save()
+        return stats
+
+    # ------------------------------------------------------------------
+    # Querying
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        vector: List[float],
+        limit: int = 10,
+        nprobe: int = DEFAULT_NPROBE,
+        min_score: float = -1.0,
+        exclude: Optional[str] = None
+    ) -> List[Tuple[str, float]]:
+        """
+        Approximate nearest neighbours of a vector.
+
+        Returns:
+            (candidate_id, cosine similarity) pairs, best first
+        """
+        with self._lock:
+            if not self.rows:
+                return []
+            if self.centroids:
+                ranked_clusters = heapq.nlargest(
+                    nprobe,
+                    range(len(self.centroids)),
+                    key=lambda i: cosine(vector, self.centroids[i])
+                )
+                rows = [row for i in ranked_clusters for row in self.lists[i]]
+            else:
+                rows = list(self.rows.values())
+
+            scored = []
+            for row in rows:
+                candidate_id = self.ids[row]
+                if not candidate_id or candidate_id == exclude:
+                    continue
+                score = cosine(vector, self._vector(row))
+                if score >= min_score:
+                    scored.append((candidate_id, round(score, 4)))
+
+        return heapq.nlargest(limit, scored, key=lambda item: item[1])
+
+    def vector_for(self, candidate_id: str) -> Optional[List[float]]:
+        row = self.rows.get(candidate_id)
+        return list(self._vector(row)) if row is not None else None
+
+
+_index: Optional[SemanticIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_semantic_index() -> SemanticIndex:
+    """Returns the process-wide semantic index, refreshed against parsed resumes."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SemanticIndex()
+    _index.refresh()
+    return _index
+
+
+def semantic_title_matches(
+    jd_data: Dict[str, Any],
+    threshold: float = SEMANTIC_MATCH_THRESHOLD,
+    limit: int = SEMANTIC_MATCH_LIMIT
+) -> Dict[str, float]:
+    """
+    Candidates whose profiles are semantically close to the JD.
+
+    Args:
+        jd_data: Parsed JD
+        threshold: Minimum cosine similarity
+        limit: Most candidates returned (the closest ones); a warning is logged when reached
+
+    Returns:
+        candidate_id -> similarity for candidates at or above the threshold
+    """
+    index = get_semantic_index()
+    # One extra neighbour tells whether the limit cut anything off
+    matches = index.query(embed_jd(jd_data), limit=limit + 1, min_score=threshold)
+    if len(matches) > limit:
+        print(f"⚠️ Semantic title prefilter capped at {limit} candidates - "
+              f"less similar candidates above the {threshold} threshold were left out")
+    return dict(matches[:limit])
+
+
+def find_similar_candidates(candidate_id: str, limit: int = 5) -> Dict[str, Any]:
+    """
+    Nearest-neighbour candidates for an existing candidate.
+
+    Returns:
+        Dictionary with candidate_id, took_ms and similar (id + similarity)
+    """
+    index = get_semantic_index()
+    vector = index.vector_for(candidate_id)
+    if vector is None:
+        raise KeyError(candidate_id)
+    started = time.perf_counter()
+    neighbours = index.query(vector, limit=limit, exclude=candidate_id)
+    return {
+        "candidate_id": candidate_id,
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "similar": [{"candidate_id": cid, "similarity": score} for cid, score in neighbours],
+    }
@@ -0,0 +1,149 @@
+"""
+Skill vocabulary for deterministic (non-LLM) skill detection.
+
+Maps canonical skill names to their common spellings, grouped by the
+TechnicalSkills field they belong to. find_skills() scans a text once with a
+single alternation regex, so detection stays in the low milliseconds for a
+full resume or job description.
+"""
+
+import re
+from typing import Dict, List, Tuple
+
+
+# TechnicalSkills field -> {display name: [aliases (lowercase)]}
+SKILL_VOCABULARY: Dict[str, Dict[str, List[str]]] = {
+    "programming_languages": {
+        "Python": ["python"],
+        "JavaScript": ["javascript", "js", "es6"],
+        "TypeScript": ["typescript"],
+        "Java": ["java"],
+        "Kotlin": ["kotlin"],
+        "Scala": ["scala"],
+        "C++": ["c++", "cpp"],
+        "C#": ["c#", "csharp"],
+        "Go": ["golang"],
+        "Rust": ["rust"],
+        "Ruby": ["ruby"],
+        "PHP": ["php"],
+        "Swift": ["swift"],
+        "SQL": ["sql"],
+        "Bash": ["bash", "shell scripting"],
+        "HTML": ["html", "html5"],
+        "CSS": ["css", "css3"],
+    },
+    "frameworks": {
+        "React": ["react", "react.js", "reactjs"],
+        "Next.js": ["next.js", "nextjs"],
+        "Redux": ["redux"],
+        "Angular": ["angular", "angularjs"],
+        "Vue.js": ["vue", "vue.js", "vuejs"],
+        "Node.js": ["node", "node.js", "nodejs"],
+        "Express.js": ["express.js", "expressjs"],
+        "NestJS": ["nestjs"],
+        "Django": ["django"],
+        "Flask": ["flask"],
+        "FastAPI": ["fastapi"],
+        "Spring Boot": ["spring boot"],
+        "Spring": ["spring"],
+        "Hibernate": ["hibernate"],
+        ".NET": [".net", "asp.net", "dotnet"],
+        "Ruby on Rails": ["ruby on rails", "rails"],
+        "GraphQL": ["graphql"],
+        "Tailwind CSS": ["tailwind", "tailwind css"],
+        "Pandas": ["pandas"],
+        "NumPy": ["numpy"],
+        "scikit-learn": ["scikit-learn", "sklearn"],
+        "TensorFlow": ["tensorflow"],
+        "PyTorch": ["pytorch"],
+        "Keras": ["keras"],
+        "Spark": ["spark", "apache spark", "pyspark"],
+        "Kafka": ["kafka", "apache kafka"],
+        "Airflow": ["airflow", "apache airflow"],
+    },
+    "databases": {
+        "PostgreSQL": ["postgresql", "postgres"],
+        "MySQL": ["mysql"],
+        "SQL Server": ["sql server", "mssql"],
+        "SQLite": ["sqlite"],
+        "Oracle": ["oracle"],
+        "MongoDB": ["mongodb", "mongo"],
+        "Redis": ["redis"],
+        "Cassandra": ["cassandra"],
+        "DynamoDB": ["dynamodb"],
+        "Elasticsearch": ["elasticsearch", "elastic search"],
+        "Snowflake": ["snowflake"],
+        "BigQuery": ["bigquery"],
+    },
+    "cloud_platforms": {
+        "AWS": ["aws", "amazon web services"],
+        "Azure": ["azure", "microsoft azure"],
+        "Google Cloud Platform": ["gcp", "google cloud", "google cloud platform"],
+        "Firebase": ["firebase"],
+        "Heroku": ["heroku"],
+    },
+    "devops_tools": {
+        "Docker": ["docker"],
+        "Kubernetes": ["kubernetes", "k8s"],
+        "Helm": ["helm"],
+        "Terraform": ["terraform"],
+        "Ansible": ["ansible"],
+        "Jenkins": ["jenkins"],
+        "GitHub Actions": ["github actions"],
+        "GitLab CI": ["gitlab ci", "gitlab ci/cd"],
+        "CI/CD": ["ci/cd", "cicd"],
+        "Prometheus": ["prometheus"],
+        "Grafana": ["grafana"],
+        "Nginx": ["nginx"],
+        "Linux": ["linux"],
+    },
+    "tools": {
+        "Git": ["git"],
+        "Jira": ["jira"],
+        "Postman": ["postman"],
+        "Jest": ["jest"],
+        "Pytest": ["pytest"],
+        "Selenium": ["selenium"],
+        "Webpack": ["webpack"],
+        "Figma": ["figma"],
+        "Tableau": ["tableau"],
+        "Power BI": ["power bi", "powerbi"],
+    },
+    "methodologies": {
+        "Agile": ["agile"],
+        "Scrum": ["scrum"],
+        "Kanban": ["kanban"],
+        "Test-Driven Development": ["test-driven development", "tdd"],
+        "Microservices": ["microservices", "microservice architecture"],
+        "REST APIs": ["rest api", "rest apis", "restful", "restful apis"],
+        "DevOps": ["devops"],
+    },
+}
+
+SKILL_LOOKUP: Dict[str, Tuple[str, str]] = {
+    alias: (field, skill)
+    for field, skills in SKILL_VOCABULARY.items()
+    for skill, aliases in skills.items()
+    for alias in aliases
+}
+
+# One pass over the text: longest aliases first, boundaries that keep "c++"/"node.js" intact
+SKILL_RE = re.compile(
+    r"(?<![\w+#.])(" + "|".join(re.escape(a) for a in sorted(SKILL_LOOKUP, key=len, reverse=True)) + r")(?![\w+#]|\.\w)",
+    re.IGNORECASE
+)
+
+
+def find_skills(text: str) -> List[Tuple[str, str]]:
+    """
+    (TechnicalSkills field, canonical skill) pairs mentioned in text, in order
+    of first mention, without duplicates.
+    """
+    found: List[Tuple[str, str]] = []
+    seen = set()
+    for match in SKILL_RE.finditer(text):
+        field, skill = SKILL_LOOKUP[match.group(1).lower()]
+        if skill not in seen:
+            seen.add(skill)
+            found.append((field, skill))
+    return found
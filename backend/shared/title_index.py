@@ -0,0 +1,260 @@
+"""
+Normalized job-title index used to prefilter candidates for ranking.
+
+Each candidate's target_job_title is tokenized and stemmed, seniority words
+(Senior, Lead, Junior, ...) are split off into a seniority tag, and the
+remaining core terms are stored in an inverted index (term -> candidate ids)
+persisted at data/title_index.json. Resolving a JD's candidate set only walks
+the postings for the JD's title terms instead of every candidate.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from .resume_search import tokenize, RESUMES_DIR, DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = DATA_DIR / "title_index.json"
+
+# Seniority word (stemmed) -> seniority tag
+SENIORITY_TERMS = {
+    "intern": "intern",
+    "trainee": "intern",
+    "junior": "junior",
+    "jr": "junior",
+    "associate": "junior",
+    "entry": "junior",
+    "mid": "mid",
+    "senior": "senior",
+    "sr": "senior",
+    "lead": "lead",
+    "staff": "lead",
+    "principal": "principal",
+    "head": "principal",
+    "architect": "principal",
+}
+
+SENIORITY_ORDER = ["intern", "junior", "mid", "senior", "lead", "principal"]
+
+
+def parse_title(title: str) -> Tuple[List[str], str]:
+    """
+    Splits a job title into core terms and a seniority tag.
+
+    Args:
+        title: Raw title (e.g. "Senior Backend Developer")
+
+    Returns:
+        (sorted unique core terms, seniority tag) - e.g. (["backend", "develop"], "senior").
+        Titles without a seniority word are tagged "mid".
+    """
+    core, seniority = set(), None
+    for term in tokenize(title or ""):
+        tag = SENIORITY_TERMS.get(term)
+        if tag:
+            # Keep the most senior tag if several are present ("Senior Lead ...")
+            if seniority is None or SENIORITY_ORDER.index(tag) > SENIORITY_ORDER.index(seniority):
+                seniority = tag
+            # "Architect" is both a seniority level and part of the role
+            if term != "architect":
+                continue
+        core.add(term)
+    return sorted(core), seniority or "mid"
+
+
+class TitleIndex:
+    """Inverted index of candidate title terms, refreshed incrementally from parsed resumes."""
+
+    def __init__(self, index_path: Path = INDEX_PATH, resumes_dir: Path = RESUMES_DIR):
+        self.index_path = Path(index_path)
+        self.resumes_dir = Path(resumes_dir)
+        # candidate_id -> {"title", "terms", "seniority", "mtime"}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.postings: Dict[str, Set[str]] = {}
+        self.resumes_dir_mtime: Optional[float] = None
+        self._lock = threading.RLock()
+        self._load()
+
+    def _load(self):
+        if not self.index_path.exists():
+            return
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+            self.resumes_dir_mtime = cached.get("resumes_dir_mtime")
+            for candidate_id, entry in cached.get("entries", {}).items():
+                self._add_entry(candidate_id, entry)
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable title index: {e}")
+            self.entries, self.postings, self.resumes_dir_mtime = {}, {}, None
+
+    def save(self):
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "resumes_dir_mtime": self.resumes_dir_mtime,
+                    "entries": self.entries,
+                }, f, ensure_ascii=False)
+
+    def _add_entry(self, candidate_id: str, entry: Dict[str, Any]):
+        self._remove(candidate_id)
+        self.entries[candidate_id] = entry
+        for term in entry["terms"]:
+            self.postings.setdefault(term, set()).add(candidate_id)
+
+    def _remove(self, candidate_id: str):
+        entry = self.entries.pop(candidate_id, None)
+        if not entry:
+            return
+        for term in entry["terms"]:
+            members = self.postings.get(term)
+            if members:
+                members.discard(candidate_id)
+                if not members:
+                    del self.postings[term]
+
+    def add(self, candidate_id: str, title: str, source_mtime: float = 0.0):
+        """Indexes (or re-indexes) a candidate's target title."""
+        terms, seniority = parse_title(title)
+        with self._lock:
+            self._add_entry(candidate_id, {
+                "title": title,
+                "terms": terms,
+                "seniority": seniority,
+                "mtime": source_mtime,
+            })
+
+    def refresh(self, force: bool = False) -> Dict[str, int]:
+        """Indexes resumes added or changed since the last refresh and drops deleted ones."""
+        stats = {"added": 0, "removed": 0}
+        if not self.resumes_dir.exists():
+            return stats
+
+        dir_mtime = self.resumes_dir.stat().st_mtime
+        if not force and self.resumes_dir_mtime == dir_mtime:
+            return stats
+
+        with self._lock:
+            seen = set()
+            for resume_file in self.resumes_dir.glob("CAND-*.json"):
+                candidate_id = resume_file.stem
+                seen.add(candidate_id)
+                mtime = resume_file.stat().st_mtime
+                if self.entries.get(candidate_id, {}).get("mtime") == mtime:
+                    continue
+                try:
+                    with open(resume_file, "r", encoding="utf-8") as f:
+                        resume = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Skipping unreadable resume {resume_file.name}: {e}")
+                    continue
+                title = (resume.get("candidate_info", {}) or {}).get("target_job_title") or ""
+                self.add(candidate_id, title, mtime)
+                stats["added"] += 1
+
+            for candidate_id in set(self.entries) - seen:
+                self._remove(candidate_id)
+                stats["removed"] += 1
+
+            self.resumes_dir_mtime = dir_mtime
+            self.save()
+        return stats
+
+    def match(self, jd_title: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Candidates whose title matches the JD title.
+
+        A candidate matches when its core title terms are contained in the
+        JD's terms or vice versa - the token-level equivalent of the old
+        "either title is a substring of the other" rule, ignoring seniority.
+        Only postings for the JD's own terms are visited.
+
+        Returns:
+            candidate_id -> {"title", "seniority", "seniority_match"}
+        """
+        jd_terms, jd_seniority = parse_title(jd_title)
+        if not jd_terms:
+            return {}
+
+        with self._lock:
+            hits: Dict[str, int] = {}
+            for term in jd_terms:
+                for candidate_id in self.postings.get(term, ()):
+                    hits[candidate_id] = hits.get(candidate_id, 0) + 1
+
+            matches = {}
+            for candidate_id, shared in hits.items():
+                entry = self.entries[candidate_id]
+                if shared == len(entry["terms"]) or shared == len(jd_terms):
+                    matches[candidate_id] = {
+                        "title": entry["title"],
+                        "seniority": entry["seniority"],
+                        "seniority_match": entry["seniority"] == jd_seniority,
+                    }
+        return matches
+
+    def titles(self) -> List[str]:
+        """Distinct candidate titles currently indexed."""
+        with self._lock:
+            return sorted({entry["title"] for entry in self.entries.values() if entry["title"]})
+
+
+_index: Optional[TitleIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_title_index() -> TitleIndex:
+    """Returns the process-wide title index, refreshed against parsed resumes."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = TitleIndex()
+    _index.refresh()
+    return _index
+
+
+def load_matching_candidates(
+    jd_title: str,
+    semantic_matches: Optional[Dict[str, float]] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Loads only the parsed resumes whose title matches the JD title, plus any
+    semantic matches, without reading the rest of the resume directory.
+
+    Args:
+        jd_title: JD role title
+        semantic_matches: Optional candidate_id -> similarity from the semantic index
+
+    Returns:
+        (matched resume documents, total number of indexed candidates)
+    """
+    index = get_title_index()
+    matches = index.match(jd_title)
+    semantic_matches = semantic_matches or {}
+
+    candidates = []
+    for candidate_id in sorted(set(matches) | set(semantic_matches)):
+        resume_file = index.resumes_dir / f"{candidate_id}.json"
+        try:
+            with open(resume_file, "r", encoding="utf-8") as f:
+                candidate = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.debug("Skipping %s: %s", candidate_id, e)
+            continue
+
+        if candidate_id in matches:
+            info = matches[candidate_id]
+            logger.debug("✓ Matched: %s (%s, %s) for %s", candidate_id, info["title"], info["seniority"], jd_title)
+        else:
+            logger.debug("≈ Semantic match: %s for %s (similarity %s)", candidate_id, jd_title, semantic_matches[candidate_id])
+        candidates.append(candidate)
+
+    logger.debug("Title index resolved %d of %d candidates for %s", len(candidates), len(index.entries), jd_title)
+    return candidates, len(index.entries)